@@ -161,149 +161,36 @@ class AnalyticDataExport(Dialogs.GenForm):
         if self.libraryNum <> 0:
             # Get the Library record
             tempLibrary = Library.Library(self.libraryNum)
-
             # obtain a list of all Documents in the Library
-            tempDocumentList = DBInterface.list_of_documents(tempLibrary.number)
-            # initialize the temporary Quote List
-            tempQuoteList = []
-            # iterate through the Document List ...
-            for documentRecord in tempDocumentList:
-                # ... and add each Document's Quotes to the Temporary Quote list
-                tempQuoteList += DBInterface.list_of_quotes_by_document(documentRecord[0])
+            for documentRecord in DBInterface.list_of_documents(tempLibrary.number):
                 # Add the Document data to the Filter Dialog's Document List
                 documentList.append((documentRecord[1], tempLibrary.id, True))
-            # For all the Quotes ...
-            for quoteRecord in tempQuoteList:
-                # ... add the Quote to the Quote List for filtering ...
-                quoteList.append((quoteRecord['QuoteID'], quoteRecord['CollectNum'], True))
-                # ... retain a pointer to the Quote Number keyed to the Quote ID and Collection Number ...
-                quoteLookup[(quoteRecord['QuoteID'], quoteRecord['CollectNum'])] = quoteRecord['QuoteNum']
-                # ... now get all the keywords for this Quote ...
-                quoteKeywordList = DBInterface.list_of_keywords(Quote = quoteRecord['QuoteNum'])
-                # ... and iterate through the list of Quote keywords.
-                for quoteKeyword in quoteKeywordList:
-                    # If the keyword isn't already in the Keyword List ...
-                    if (quoteKeyword[0], quoteKeyword[1], True) not in keywordList:
-                        # ... add the keyword to the keyword list for filtering.
-                        keywordList.append((quoteKeyword[0], quoteKeyword[1], True))
-
             # obtain a list of all Episodes in that Library
-            tempEpisodeList = DBInterface.list_of_episodes_for_series(tempLibrary.id)
-            # initialize the temporary clip List
-            tempClipList = []
-            # iterate through the Episode List ...
-            for episodeRecord in tempEpisodeList:
-                # ... and add each Episode's Clips to the Temporary clip list
-                tempClipList += DBInterface.list_of_clips_by_episode(episodeRecord[0])
+            for episodeRecord in DBInterface.list_of_episodes_for_series(tempLibrary.id):
                 # Add the Episode data to the Filter Dialog's Episode List
                 episodeList.append((episodeRecord[1], tempLibrary.id, True))
-            # For all the Clips ...
-            for clipRecord in tempClipList:
-                # ... add the Clip to the Clip List for filtering ...
-                clipList.append((clipRecord['ClipID'], clipRecord['CollectNum'], True))
-                # ... retain a pointer to the Clip Number keyed to the Clip ID and Collection Number ...
-                clipLookup[(clipRecord['ClipID'], clipRecord['CollectNum'])] = clipRecord['ClipNum']
-                # ... now get all the keywords for this Clip ...
-                clipKeywordList = DBInterface.list_of_keywords(Clip = clipRecord['ClipNum'])
-                # ... and iterate through the list of clip keywords.
-                for clipKeyword in clipKeywordList:
-                    # If the keyword isn't already in the Keyword List ...
-                    if (clipKeyword[0], clipKeyword[1], True) not in keywordList:
-                        # ... add the keyword to the keyword list for filtering.
-                        keywordList.append((clipKeyword[0], clipKeyword[1], True))
-            
-        # If we have a Document Number, we set up the Document Analytic Data Export
-        elif self.documentNum <> 0:
-            # First, we get a list of all the Quotes for the Document specified
-            tempQuoteList = DBInterface.list_of_quotes_by_document(self.documentNum)
-            # For all the Quotes ...
-            for quoteRecord in tempQuoteList:
-                # ... add the Quote to the Quote List for filtering ...
-                quoteList.append((quoteRecord['QuoteID'], quoteRecord['CollectNum'], True))
-                # ... retain a pointer to the Quote Number keyed to the Quote ID and Collection Number ...
-                quoteLookup[(quoteRecord['QuoteID'], quoteRecord['CollectNum'])] = quoteRecord['QuoteNum']
-                # ... now get all the keywords for this Quote ...
-                quoteKeywordList = DBInterface.list_of_keywords(Quote = quoteRecord['QuoteNum'])
-                # ... and iterate through the list of Quote keywords.
-                for quoteKeyword in quoteKeywordList:
-                    # If the keyword isn't already in the Keyword List ...
-                    if (quoteKeyword[0], quoteKeyword[1], True) not in keywordList:
-                        # ... add the keyword to the keyword list for filtering.
-                        keywordList.append((quoteKeyword[0], quoteKeyword[1], True))
-
-        # If we have an Episode Number, we set up the Episode Analytic Data Export
-        elif self.episodeNum <> 0:
-            # First, we get a list of all the Clips for the Episode specified
-            tempClipList = DBInterface.list_of_clips_by_episode(self.episodeNum)
-            # For all the Clips ...
-            for clipRecord in tempClipList:
-                # ... add the Clip to the Clip List for filtering ...
-                clipList.append((clipRecord['ClipID'], clipRecord['CollectNum'], True))
-                # ... retain a pointer to the Clip Number keyed to the Clip ID and Collection Number ...
-                clipLookup[(clipRecord['ClipID'], clipRecord['CollectNum'])] = clipRecord['ClipNum']
-                # ... now get all the keywords for this Clip ...
-                clipKeywordList = DBInterface.list_of_keywords(Clip = clipRecord['ClipNum'])
-                # ... and iterate through the list of clip keywords.
-                for clipKeyword in clipKeywordList:
-                    # If the keyword isn't already in the Keyword List ...
-                    if (clipKeyword[0], clipKeyword[1], True) not in keywordList:
-                        # ... add the keyword to the keyword list for filtering.
-                        keywordList.append((clipKeyword[0], clipKeyword[1], True))
-
-        # If we don't have Library Number, Document Number, or Episode number, but DO have a Collection Number, we set
-        # up the Clips for the Collection specified.  If we have neither, it's the GLOBAL Analytic Data Export,
-        # requesting ALL the Quotes and Clips in the database!  We can handle both of these cases together.
-        else:
-            # If we have a specific collection specified ...
-            if self.collectionNum <> 0:
-                # ... load the specified collection.  We need its data.
-                tempCollection = Collection.Collection(self.collectionNum)
-                # Put the selected Collection's data into the Collection List as a starting place.
-                tempCollectionList = [(tempCollection.number, tempCollection.id, tempCollection.parent)]
-            # If we don't have any selected collection ...
-            else:
-                # ... then we should initialise the Collection List with data for all top-level collections, with parent = 0
-                tempCollectionList = DBInterface.list_of_collections()
-            # Iterate through the Collection List as long as it has entries
-            while len(tempCollectionList) > 0:
-                # Get the list of Quotes for the current Collection
-                tempQuoteList = DBInterface.list_of_quotes_by_collectionnum(tempCollectionList[0][0])
-                # For all the Quotes ...
-                for (quoteNo, quoteName, collNo, sourceDocNo) in tempQuoteList:
-                    # ... add the Quote to the Quote List for filtering ...
-                    quoteList.append((quoteName, collNo, True))
-                    # ... retain a pointer to the Quote Number keyed to the Quote ID and Collection Number ...
-                    quoteLookup[(quoteName, collNo)] = quoteNo
-                    # ... now get all the keywords for this Quote ...
-                    quoteKeywordList = DBInterface.list_of_keywords(Quote = quoteNo)
-                    # ... and iterate through the list of Quote keywords.
-                    for quoteKeyword in quoteKeywordList:
-                        # If the keyword isn't already in the Keyword List ...
-                        if (quoteKeyword[0], quoteKeyword[1], True) not in keywordList:
-                            # ... add the keyword to the keyword list for filtering.
-                            keywordList.append((quoteKeyword[0], quoteKeyword[1], True))
-
-                # Get the list of Clips for the current Collection
-                tempClipList = DBInterface.list_of_clips_by_collection(tempCollectionList[0][1], tempCollectionList[0][2])
-                # For all the Clips ...
-                for (clipNo, clipName, collNo) in tempClipList:
-                    # ... add the Clip to the Clip List for filtering ...
-                    clipList.append((clipName, collNo, True))
-                    # ... retain a pointer to the Clip Number keyed to the Clip ID and Collection Number ...
-                    clipLookup[(clipName, collNo)] = clipNo
-                    # ... now get all the keywords for this Clip ...
-                    clipKeywordList = DBInterface.list_of_keywords(Clip = clipNo)
-                    # ... and iterate through the list of clip keywords.
-                    for clipKeyword in clipKeywordList:
-                        # If the keyword isn't already in the Keyword List ...
-                        if (clipKeyword[0], clipKeyword[1], True) not in keywordList:
-                            # ... add the keyword to the keyword list for filtering.
-                            keywordList.append((clipKeyword[0], clipKeyword[1], True))
-
-                # Get the nested collections for the current collection and add them to the Collection List
-                tempCollectionList += DBInterface.list_of_collections(tempCollectionList[0][0])
-                # Remove the current Collection from the list.  We're done with it.
-                del(tempCollectionList[0])
+
+        # Get all the Quotes and Clips for the Library, Document, Episode, or Collection (with its nested Collections),
+        # or for the whole database for the Collection Root, along with all the Keywords applied to them.  This takes
+        # a handful of queries rather than queries for each Collection, Quote, and Clip.
+        (tempQuoteList, tempClipList, tempKeywordList) = \
+            DBInterface.list_of_quotes_clips_and_keywords(libraryNum=self.libraryNum, documentNum=self.documentNum,
+                                                          episodeNum=self.episodeNum, collectionNum=self.collectionNum)
+        # For all the Quotes ...
+        for (quoteNo, quoteName, collNo) in tempQuoteList:
+            # ... add the Quote to the Quote List for filtering ...
+            quoteList.append((quoteName, collNo, True))
+            # ... and retain a pointer to the Quote Number keyed to the Quote ID and Collection Number
+            quoteLookup[(quoteName, collNo)] = quoteNo
+        # For all the Clips ...
+        for (clipNo, clipName, collNo) in tempClipList:
+            # ... add the Clip to the Clip List for filtering ...
+            clipList.append((clipName, collNo, True))
+            # ... and retain a pointer to the Clip Number keyed to the Clip ID and Collection Number
+            clipLookup[(clipName, collNo)] = clipNo
+        # Add all the Keywords to the Keyword List for filtering.  (The list has no duplicates.)
+        for (kwg, kw) in tempKeywordList:
+            keywordList.append((kwg, kw, True))
 
         # Put the Quote List in alphabetical order in preparation for Filtering..
         quoteList.sort()
@@ -455,6 +342,11 @@ class AnalyticDataExport(Dialogs.GenForm):
             prompt = unicode(_('Collection Name\tItem Type\tItem Name\tSource File\tStart\tStop\tLength'), 'utf8')
             # Write the Header line.  We're creating a tab-delimited file, so we'll use tabs to separate the items.
             f.write(prompt)
+            # Build an index of the columns for each keyword.  Each item's row starts with all keywords absent, and only the
+            # item's own keywords need to be looked up.
+            keywordColumns = {}
+            # Count the keyword columns
+            keywordCount = 0
             # Add keywords to the Header.  Iterate through the Keyword List.
             for keyword in keywordList:
                 # See if the user has left the keyword "checked" in the filter dialog.
@@ -463,9 +355,26 @@ class AnalyticDataExport(Dialogs.GenForm):
                     kwg = keyword[0]
                     kw = keyword[1]
                     f.write('\t%s : %s' % (kwg, kw))
+                    # Note the keyword's column
+                    if keywordColumns.has_key((kwg, kw)):
+                        keywordColumns[(kwg, kw)].append(keywordCount)
+                    else:
+                        keywordColumns[(kwg, kw)] = [keywordCount]
+                    keywordCount += 1
             # Add a line break to signal the end of the Header line. 
             f.write('\n')
 
+            # Many items share Collections, Documents, and Episodes, so we only look up each one once.
+            # Collection Node Strings, keyed by Collection Number
+            collectionNodeStrings = {}
+            # (documentID, quoteSourceFilename, libraryID) values, keyed by Document Number
+            documentData = {}
+            # (episodeID, libraryID) values, keyed by Episode Number
+            episodeData = {}
+            # Use sets for the Document and Episode filter lookups
+            documentSet = set(documentList)
+            episodeSet = set(episodeList)
+
             # Now iterate through the Quote List
             for quoteRec in quoteList:
                 # See if the user has left the Quote "checked" in the filter dialog.
@@ -475,48 +384,45 @@ class AnalyticDataExport(Dialogs.GenForm):
                     # Load the Quote data.  The QuoteLookup dictionary allows this easily.
                     # No need to load the Quote Text, which can be slow to load.
                     quote = Quote.Quote(quoteLookup[quoteRec[0], quoteRec[1]], skipText=True)
-                    # Get the collection the Quote is from.
-                    collection = Collection.Collection(quote.collection_num)
+                    # If we haven't seen the collection the Quote is from yet ...
+                    if not collectionNodeStrings.has_key(quote.collection_num):
+                        # ... get the collection and remember its Node String
+                        collectionNodeStrings[quote.collection_num] = Collection.Collection(quote.collection_num).GetNodeString()
                     # Encode string values using the Export Encoding
-                    collectionID = collection.GetNodeString()
+                    collectionID = collectionNodeStrings[quote.collection_num]
                     quoteID = quote.id
-                    try:
-                        document = Document.Document(quote.source_document_num)
-                        documentID = document.id
-                        quoteSourceFilename = document.imported_file
-                        # If we're doing a Library report, we need the Quote's source document and Library for Document Filter comparison.
-                        if self.libraryNum != 0:
-                            library = Library.Library(document.library_num)
-                            libraryID = library.id
-                    # If we have an orphaned Quote ...
-                    except TransanaExceptions.RecordNotFoundError, e:
-                        # ... then we don't know these values!
-                        documentID = ''
-                        quoteSourceFilename = _('Source Document unknown')
-                        libraryID = 0
-                        
+                    # If we haven't seen the Quote's source Document yet ...
+                    if not documentData.has_key(quote.source_document_num):
+                        try:
+                            document = Document.Document(quote.source_document_num)
+                            # If we're doing a Library report, we need the Quote's source document and Library for Document Filter comparison.
+                            if self.libraryNum != 0:
+                                library = Library.Library(document.library_num)
+                                libraryID = library.id
+                            else:
+                                libraryID = None
+                            # Remember the Document data
+                            documentData[quote.source_document_num] = (document.id, document.imported_file, libraryID)
+                        # If we have an orphaned Quote ...
+                        except TransanaExceptions.RecordNotFoundError, e:
+                            # ... then we don't know these values!
+                            documentData[quote.source_document_num] = ('', _('Source Document unknown'), 0)
+                    (documentID, quoteSourceFilename, libraryID) = documentData[quote.source_document_num]
+
                     # Implement Document filtering if needed.  If we have a Library Report, we need to confirm that the Source Document
                     # is "checked" in the filter list.  (If we don't have a Library Report, this check isn't needed.)
-                    if (self.libraryNum == 0) or ((documentID == '') and (libraryID == '')) or ((documentID, libraryID, True) in documentList):
-                        # Write the Quote's data values to the output file.  We're creating a tab-delimited file,
-                        # so we'll use tabs to separate the items.
+                    if (self.libraryNum == 0) or ((documentID == '') and (libraryID == '')) or ((documentID, libraryID, True) in documentSet):
+                        # Start with all keywords absent, with a "0" indicating False ...
+                        keywordValues = ['\t0'] * keywordCount
+                        # ... and write a "1", indicating True, for each of the Quote's keywords the user left "checked"
+                        for quoteKeyword in quote.keyword_list:
+                            for col in keywordColumns.get((quoteKeyword.keywordGroup, quoteKeyword.keyword), []):
+                                keywordValues[col] = '\t1'
+                        # Write the Quote's data values, keyword values, and a line break to signal the end of the Quote
+                        # record to the output file.  We're creating a tab-delimited file, so we'll use tabs to separate the items.
                         f.write('%s\t%s\t%s\t%s\t%s\t%s\t%d' % (collectionID, '1', quoteID, quoteSourceFilename,
                                                             quote.start_char, quote.end_char,
-                                                            (quote.end_char - quote.start_char)))
-
-                        # Now we iterate through the keyword list ...
-                        for keyword in keywordList:
-                            # ... looking only at those keywords the user left "checked" in the filter dialog ...
-                            if keyword[2]:
-                                # ... and check to see if the Quote HAS the keyword.
-                                if quote.has_keyword(keyword[0], keyword[1]):
-                                    # If so, we write a "1", indicating True.
-                                    f.write('\t1')
-                                else:
-                                    # If not, we write a "0", indicating False.
-                                    f.write('\t0')
-                        # Add a line break to signal the end of the Quote record
-                        f.write('\n')
+                                                            (quote.end_char - quote.start_char)) + ''.join(keywordValues) + '\n')
 
             # Now iterate through the Clip List
             for clipRec in clipList:
@@ -527,38 +433,37 @@ class AnalyticDataExport(Dialogs.GenForm):
                     # Load the Clip data.  The ClipLookup dictionary allows this easily.
                     # No need to load the Clip Transcripts, which can be slow to load.
                     clip = Clip.Clip(clipLookup[clipRec[0], clipRec[1]], skipText=True)
-                    # Get the collection the clip is from.
-                    collection = Collection.Collection(clip.collection_num)
+                    # If we haven't seen the collection the clip is from yet ...
+                    if not collectionNodeStrings.has_key(clip.collection_num):
+                        # ... get the collection and remember its Node String
+                        collectionNodeStrings[clip.collection_num] = Collection.Collection(clip.collection_num).GetNodeString()
                     # Encode string values using the Export Encoding
-                    collectionID = collection.GetNodeString()
+                    collectionID = collectionNodeStrings[clip.collection_num]
                     clipID = clip.id
                     clipMediaFilename = clip.media_filename
                     # If we're doing a Library report, we need the clip's source episode and Library for Episode Filter comparison.
                     if self.libraryNum != 0:
-                        episode = Episode.Episode(clip.episode_num)
-                        library = Library.Library(episode.series_num)
+                        # If we haven't seen the clip's source episode yet ...
+                        if not episodeData.has_key(clip.episode_num):
+                            episode = Episode.Episode(clip.episode_num)
+                            library = Library.Library(episode.series_num)
+                            # Remember the Episode data
+                            episodeData[clip.episode_num] = (episode.id, library.id)
+                        (episodeID, libraryID) = episodeData[clip.episode_num]
                     # Implement Episode filtering if needed.  If we have a Library Report, we need to confirm that the Source Episode
                     # is "checked" in the filter list.  (If we don't have a Library Report, this check isn't needed.)
-                    if (self.libraryNum == 0) or ((episode.id, library.id, True) in episodeList):
-                        # Write the Clip's data values to the output file.  We're creating a tab-delimited file,
-                        # so we'll use tabs to separate the items.
+                    if (self.libraryNum == 0) or ((episodeID, libraryID, True) in episodeSet):
+                        # Start with all keywords absent, with a "0" indicating False ...
+                        keywordValues = ['\t0'] * keywordCount
+                        # ... and write a "1", indicating True, for each of the Clip's keywords the user left "checked"
+                        for clipKeyword in clip.keyword_list:
+                            for col in keywordColumns.get((clipKeyword.keywordGroup, clipKeyword.keyword), []):
+                                keywordValues[col] = '\t1'
+                        # Write the Clip's data values, keyword values, and a line break to signal the end of the Clip
+                        # record to the output file.  We're creating a tab-delimited file, so we'll use tabs to separate the items.
                         f.write('%s\t%s\t%s\t%s\t%s\t%s\t%10.4f' % (collectionID, '2', clipID, clipMediaFilename,
                                                             Misc.time_in_ms_to_str(clip.clip_start), Misc.time_in_ms_to_str(clip.clip_stop),
-                                                            (clip.clip_stop - clip.clip_start) / 1000.0))
-
-                        # Now we iterate through the keyword list ...
-                        for keyword in keywordList:
-                            # ... looking only at those keywords the user left "checked" in the filter dialog ...
-                            if keyword[2]:
-                                # ... and check to see if the Clip HAS the keyword.
-                                if clip.has_keyword(keyword[0], keyword[1]):
-                                    # If so, we write a "1", indicating True.
-                                    f.write('\t1')
-                                else:
-                                    # If not, we write a "0", indicating False.
-                                    f.write('\t0')
-                        # Add a line break to signal the end of the Clip record
-                        f.write('\n')
+                                                            (clip.clip_stop - clip.clip_start) / 1000.0) + ''.join(keywordValues) + '\n')
 
             # Flush the output file's buffer (probably unnecessary)
             f.flush()
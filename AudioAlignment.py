@@ -0,0 +1,200 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This module estimates the offset between two recordings of the same event (for example, two cameras
+    in a multi-camera Episode) by cross-correlating the loudness envelopes of their extracted audio (WAV) files.
+
+    The search is done coarse-to-fine.  The whole of both files is compared at a low envelope rate using
+    FFT-based cross-correlation, then the best match is refined at a high envelope rate over a limited
+    range of offsets near the coarse result. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+DEBUG = False
+if DEBUG:
+    print "AudioAlignment DEBUG is ON!!"
+
+# import numpy
+import numpy
+# import Python's wave module
+import wave
+
+# Envelope rate (samples per second) used for the coarse search over the whole of both files
+COARSE_RATE = 20
+# Envelope rate (samples per second) used to refine the coarse result
+FINE_RATE = 500
+# The longest stretch of audio (in seconds) used to refine the coarse result
+FINE_SEGMENT = 600
+# The minimum overlap (in seconds) between the two files for an offset to be considered
+MIN_OVERLAP = 5
+
+
+def LoadAudio(waveFilename):
+    """ Load a Transana extracted audio file.  Returns the amplitude (distance from silence) of each
+        sample as a numpy array, and the sample rate. """
+    # Open the Wave File
+    waveFile = wave.open(waveFilename, 'r')
+    try:
+        # Note the sample rate
+        frameRate = waveFile.getframerate()
+        # Read all the audio data
+        frames = waveFile.readframes(waveFile.getnframes())
+        # Transana's extracted audio is 8-bit mono, with 128 being silence
+        if waveFile.getsampwidth() == 1:
+            samples = numpy.frombuffer(frames, dtype=numpy.uint8).astype(numpy.float32) - 128.0
+        # 16-bit audio is signed, with 0 being silence
+        else:
+            samples = numpy.frombuffer(frames, dtype=numpy.int16).astype(numpy.float32)
+        # If there is more than one channel, just use the first one
+        if waveFile.getnchannels() > 1:
+            samples = samples[::waveFile.getnchannels()]
+    finally:
+        # Close the Wave File
+        waveFile.close()
+    # Return the amplitude of the samples and the sample rate
+    return (numpy.abs(samples), frameRate)
+
+def Envelope(amplitude, frameRate, rate):
+    """ Downsample audio amplitude data to a loudness envelope with rate samples per second.
+        Returns the envelope and its actual rate. """
+    # Determine the number of audio samples per envelope sample
+    blockSize = max(int(round(float(frameRate) / rate)), 1)
+    # Determine the number of complete blocks in the audio
+    numBlocks = len(amplitude) / blockSize
+    # Average the amplitude over each block
+    envelope = amplitude[:numBlocks * blockSize].reshape((numBlocks, blockSize)).mean(axis=1)
+    # Return the envelope and its actual sample rate
+    return (envelope, float(frameRate) / blockSize)
+
+def CrossCorrelate(x, y):
+    """ Compute the full cross-correlation of x and y using FFTs.  Returns (correlation, lags), where
+        correlation[i] is the sum of x[n + lags[i]] * y[n].  Both inputs should have their means removed. """
+    # Determine the FFT size needed to avoid circular wrap-around, rounded up to a power of 2 for speed
+    nfft = 1
+    while nfft < len(x) + len(y) - 1:
+        nfft *= 2
+    # Cross-correlation is the inverse FFT of the product of one spectrum and the conjugate of the other
+    corr = numpy.fft.irfft(numpy.fft.rfft(x, nfft) * numpy.conj(numpy.fft.rfft(y, nfft)), nfft)
+    # Negative lags wrap around to the end of the result.  Put them first.
+    corr = numpy.concatenate((corr[nfft - (len(y) - 1):], corr[:len(x)]))
+    # Return the correlation and the lag for each value
+    return (corr, numpy.arange(-(len(y) - 1), len(x)))
+
+def Normalize(envelope):
+    """ Remove the mean from an envelope and scale it to unit standard deviation """
+    # Remove the mean
+    envelope = envelope - envelope.mean()
+    # Determine the standard deviation
+    std = envelope.std()
+    # As long as the envelope isn't silent ...
+    if std > 0:
+        # ... scale it
+        envelope = envelope / std
+    return envelope
+
+def Overlap(x, y, lag):
+    """ Return the overlapping parts of x and y when x is offset by lag samples relative to y """
+    # If x is offset forward ...
+    if lag >= 0:
+        # ... x starts at lag, y starts at 0
+        length = min(len(x) - lag, len(y))
+        return (x[lag:lag + length], y[:length])
+    # If x is offset backward ...
+    else:
+        # ... x starts at 0, y starts at -lag
+        length = min(len(x), len(y) + lag)
+        return (x[:length], y[-lag:-lag + length])
+
+def EstimateOffset(waveFilename1, waveFilename2):
+    """ Estimate the offset, in milliseconds, between two extracted audio files.  The offset is the position
+        in file 1 of a moment, minus the position in file 2 of the same moment, as used by the Synchronize
+        dialog.  Returns (offset, confidence), where confidence is the correlation (0.0 - 1.0) of the two
+        envelopes at that offset.  Returns (None, 0.0) if no offset can be determined. """
+    # Load the audio data
+    (amp1, frameRate1) = LoadAudio(waveFilename1)
+    (amp2, frameRate2) = LoadAudio(waveFilename2)
+
+    # Coarse search.  Create low-rate envelopes of both files.
+    (env1, rate1) = Envelope(amp1, frameRate1, COARSE_RATE)
+    (env2, rate2) = Envelope(amp2, frameRate2, COARSE_RATE)
+    # If the files can't be compared (for example, if one is empty) ...
+    if (len(env1) < MIN_OVERLAP * rate1) or (len(env2) < MIN_OVERLAP * rate2) or (rate1 != rate2):
+        # ... we can't estimate the offset
+        return (None, 0.0)
+    # Cross-correlate the normalized envelopes
+    (corr, lags) = CrossCorrelate(Normalize(env1), Normalize(env2))
+    # Ignore offsets where the files overlap too little to be meaningful
+    minOverlap = int(MIN_OVERLAP * rate1)
+    valid = (lags <= len(env1) - minOverlap) & (lags >= -(len(env2) - minOverlap))
+    corr = numpy.where(valid, corr, -numpy.inf)
+    # The coarse offset, in seconds, is the lag with the highest correlation
+    coarseOffset = lags[numpy.argmax(corr)] / rate1
+
+    if DEBUG:
+        print "AudioAlignment.EstimateOffset():  coarse offset =", coarseOffset
+
+    # Fine search.  Create high-rate envelopes of both files.
+    (env1, rate1) = Envelope(amp1, frameRate1, FINE_RATE)
+    (env2, rate2) = Envelope(amp2, frameRate2, FINE_RATE)
+    # Convert the coarse offset to fine envelope samples
+    fineLag = int(round(coarseOffset * rate1))
+    # Get the parts of the two envelopes that overlap at the coarse offset
+    (seg1, seg2) = Overlap(env1, env2, fineLag)
+    # We only search a range of two coarse envelope samples either side of the coarse offset
+    searchRange = int(2 * rate1 / COARSE_RATE)
+    # Limit the segments to the middle FINE_SEGMENT seconds of the overlap, allowing room to shift by the search range
+    maxLength = int(FINE_SEGMENT * rate1)
+    if len(seg2) > maxLength + 2 * searchRange:
+        start = (len(seg2) - maxLength) / 2
+        seg2 = seg2[start:start + maxLength]
+        seg1 = seg1[start - searchRange:start + maxLength + searchRange]
+        # The segment of file 1 now starts searchRange samples before the segment of file 2
+        baseLag = -searchRange
+    # If the overlap is short, use all of it
+    else:
+        baseLag = 0
+    # Normalize the segments
+    seg1 = Normalize(seg1)
+    seg2 = Normalize(seg2)
+    # Initialize the best fine adjustment and its correlation
+    bestAdjustment = 0
+    bestCorr = -numpy.inf
+    # For each offset in the search range ...
+    for adjustment in range(-searchRange, searchRange + 1):
+        # ... get the overlapping parts of the segments at this offset
+        (s1, s2) = Overlap(seg1, seg2, adjustment - baseLag)
+        # Skip offsets with too little overlap
+        if len(s2) < minOverlap:
+            continue
+        # Determine the correlation of the overlapping parts
+        c = numpy.dot(s1, s2) / len(s2)
+        # If it's the best so far, remember it
+        if c > bestCorr:
+            bestCorr = c
+            bestAdjustment = adjustment
+    # Determine the refined offset in milliseconds
+    offset = int(round((fineLag + bestAdjustment) * 1000.0 / rate1))
+    # Determine the confidence, the (Pearson) correlation of the full envelopes at the refined offset
+    (s1, s2) = Overlap(env1, env2, fineLag + bestAdjustment)
+    if (len(s2) > 1) and (s1.std() > 0) and (s2.std() > 0):
+        confidence = max(0.0, float(numpy.corrcoef(s1, s2)[0, 1]))
+    else:
+        confidence = 0.0
+
+    if DEBUG:
+        print "AudioAlignment.EstimateOffset():  offset =", offset, "confidence =", confidence
+
+    return (offset, confidence)
@@ -28,23 +28,21 @@ import ctypes
 import Dialogs
 # Import Transana's Miscellaneous routines
 import Misc
+# import Transana's Conversion Scheduler
+import ConversionScheduler
 # import Transana's Constants
 import TransanaConstants
 # import Transana's Globals
 import TransanaGlobal
-# import Transana's waveform progress routines
-import WaveformProgress
+# import Transana's Waveform Cache
+import WaveformCache
 # import Python's locale module
 import locale
-# import Python's multiprocessing module
-import multiprocessing
 # import Python's os module
 import os
 # import Python's sys module
 import sys
 
-ID_PROCESSTIMER = wx.NewId()
-
 class BatchFileProcessor(Dialogs.GenForm):
     """ Batch File Processor, used for Batch Waveform Generator and Batch Episode Creation """
     def __init__(self, parent, mode):
@@ -200,10 +198,8 @@ class BatchFileProcessor(Dialogs.GenForm):
         self.SetSizeHints(max(500, width), max(500, height))
         # Center the form on screen
         TransanaGlobal.CenterOnPrimary(self)
-        # Initialize the dictionary of running conversions
-        self.runningConversions = {}
-        # Initialize the process variable
-        self.process = None
+        # Initialize the Conversion Scheduler variable
+        self.scheduler = None
 
     def get_input(self):
         """ Get the Input values from the Batch Waveform Generator form and process the selected files """
@@ -227,68 +223,32 @@ class BatchFileProcessor(Dialogs.GenForm):
             return None     # Cancel
 
     def AudioExtract(self, data):
-        """ Perform Audio Extraction using as many threads as possible """
-        # Set the list of data files to be processed
-        self.processFileList = data
-        # Create a Timer to control the multi-thread audio extraction process
-        self.processTimer = wx.Timer(self, ID_PROCESSTIMER)
-        wx.EVT_TIMER(self, ID_PROCESSTIMER, self.OnTimer)
-        # Run the time every half second
-        self.processTimer.Start(500)
-
-    def OnTimer(self, event):
-        """ Check the threads to see if we need to add more extraction processes """
-        # While there are processors free and files to process ...
-        while (len(self.runningConversions) < multiprocessing.cpu_count()) and (len(self.processFileList) > 0):
-            # Get the current filename
-            filename = self.processFileList[0]
-            # Remember the original File Name that is passed in
-            originalFilename = filename
-            # Split the path off of the file name
-            (path, filename) = os.path.split(filename)
-            # Split the extension off the file name
-            (filenameroot, extension) = os.path.splitext(filename)
-            # Build the progress box's label
-            # Encode with UTF-8 rather than TransanaGlobal.encoding because this is a prompt, not DB Data.
-            prompt = unicode(_("Extracting %s\nfrom %s"), 'utf8')
-            # Build the filename for the extracted audio out of the filename parts
-            self.waveFilename = os.path.join(TransanaGlobal.configData.visualizationPath, filenameroot + '.wav')
-            # If there is no extracted audio file, OR if we're over-writing extracted audio ...
-            if not(os.path.exists(self.waveFilename)) or self.overwrite.GetValue():
-                # Create the Progress Dialog, allowing MULTIPLE THREADS
-                progressDialog = WaveformProgress.WaveformProgress(self,
-                                                                   prompt % (self.waveFilename, originalFilename),
-                                                                   showModally=False)
-                # If there are NO currently-running conversions ...
-                if self.runningConversions == {}:
-                    # ... then set the index to 1
-                    indexNum = 1
-                # If there are currently-running conversions ...
-                else:
-                    # ... then set the index to 1 more than the largest current number
-                    indexNum = max(self.runningConversions) + 1
-                # Have the Progress Dialog remember its index number
-                progressDialog.indexNum = indexNum
-                # Have the Progress Dialog remember the name of the file being converted
-                progressDialog.originalFilename = originalFilename
-                # Add the Progress Dialog to the dictionary that holds the running conversions
-                self.runningConversions[indexNum] = progressDialog
-                # Tell the Waveform Progress Dialog to handle the audio extraction modally.
-                progressDialog.Extract(originalFilename, self.waveFilename)
-            # Remove the file from the list
-            self.processFileList = self.processFileList[1:]
-
-        # If we've requested extractio for all Files, we can stop the timer.
-        if len(self.processFileList) == 0:
-            self.processTimer.Stop()
-
-    def OnConvertComplete(self, progressDlg):
-        # Remove this conversion from the dictionary of running conversions
-        del(self.runningConversions[progressDlg.indexNum])
-        # If we have NO MORE running conversions ...
-        if len(self.runningConversions) == 0:
-            # Close and destroy the Batch File Processor
-            self.Close()
+        """ Perform Audio Extraction using as many simultaneous processes as there are computer cores """
+        # Create a Conversion Scheduler to run the extractions, retrying each failed file once
+        self.scheduler = ConversionScheduler.ConversionScheduler(self, maxRetries=1, overwrite=self.overwrite.GetValue(),
+                                                                 onComplete=self.OnBatchComplete)
+        # Encode with UTF-8 rather than TransanaGlobal.encoding because this is a prompt, not DB Data.
+        prompt = unicode(_("Extracting %s\nfrom %s"), 'utf8')
+        # For each file to be processed ...
+        for originalFilename in data:
+            # Get the Waveform Cache filename for the extracted audio, which is based on the media file's contents
+            waveFilename = WaveformCache.GetWaveFilename(originalFilename)
+            # Add an Audio Extraction job for this file to the scheduler
+            self.scheduler.AddJob(ConversionScheduler.ConversionJob(originalFilename, waveFilename,
+                                                                    prompt=prompt % (waveFilename, originalFilename)))
+        # Start the extraction processes
+        self.scheduler.Start()
+
+    def OnBatchComplete(self, scheduler):
+        """ Called by the Conversion Scheduler when all audio extraction is complete """
+        # Remove old cache files if the Waveform Cache has grown too large, keeping the files we just created
+        WaveformCache.Evict(keep=[job.destFile for job in scheduler.jobs])
+        # Show the user the summary of the extraction results
+        dlg = Dialogs.InfoDialog(self.GetParent(), scheduler.GetSummary(), dlgTitle=_('Batch Waveform Generator'))
+        dlg.ShowModal()
+        dlg.Destroy()
+        # Close and destroy the Batch File Processor
+        self.Close()
 
     def OnBrowse(self, evt):
         """ Invoked when the user presses the Get Files button. """
@@ -25,6 +25,15 @@ if DEBUG:
 
 VERSION = 300
 
+# How long (in milliseconds) messages from other users wait to be applied, so they can be applied in batches
+MESSAGE_QUEUE_DELAY = 250
+# Messages that refresh something from the database, which only need to be applied once per batch
+REFRESH_MESSAGES = ['OC', 'UKL', 'UKV', 'US', 'WFR']
+# Add messages whose effect is entirely undone by a later Delete Node message, and the Node Type each one adds
+ADD_MESSAGES = {'AS' : 'LibraryNode', 'AE' : 'EpisodeNode', 'AT' : 'TranscriptNode', 'AD' : 'DocumentNode',
+                'AC' : 'CollectionNode', 'ACl' : 'ClipNode', 'ASnap' : 'SnapshotNode', 'AKG' : 'KeywordGroupNode',
+                'AK' : 'KeywordNode'}
+
 # import wxPython
 import wx
 
@@ -58,6 +67,8 @@ import DBInterface
 import Dialogs
 # import Transana's Document Object
 import Document
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Library object
 import Library
 # import Transana's Episode object
@@ -512,6 +523,16 @@ class ChatWindow(wx.Frame):
 ##            self.processMessageQueueTimer.Bind(wx.EVT_TIMER, self.OnProcessMessageQueue)
 ##            self.processMessageQueueTimer.Start(500)
 
+        # Messages from other users that change the data are queued and applied in batches.  Initialize the queue.
+        self.messageQueue = []
+        # Create a Timer to process the queue
+        self.messageQueueTimer = wx.Timer()
+        self.messageQueueTimer.Bind(wx.EVT_TIMER, self.ProcessMessageQueue)
+        # Keep statistics on batching.  The ratio of messages received to batches applied shows how well it's working.
+        self.messagesReceived = 0
+        self.messagesApplied = 0
+        self.batchesApplied = 0
+
         # Create a Timer to check for Message Server validation.
         # Initialize to unvalidated state
         self.serverValidation = False
@@ -577,6 +598,10 @@ class ChatWindow(wx.Frame):
                     status = _('NOT secure')
                 # Add a line to the Report indicating the user name and SSL status
                 self.memo.AppendText(unicode('%s\t\t%s\n', 'utf8') % (x, status))
+            # Report how well changes from other users are being batched
+            prompt = unicode(_('%d changes received from other users, %d applied in %d batches (%0.1f per batch).'), 'utf8')
+            self.memo.AppendText(prompt % (self.messagesReceived, self.messagesApplied, self.batchesApplied,
+                                           self.GetMessageBatchingRatio()) + u'\n')
             # Add a blank line to the Report
             self.memo.AppendText('\n')
 
@@ -672,14 +697,6 @@ class ChatWindow(wx.Frame):
     def OnPostMessage(self, event):
         """ Post Message handler """
 
-        def ConvertMessageToNodeList(message):
-            """ Take a message from the Transana Message Server and convert it to a NodeList for use with the DB Tree
-                add_Node method """
-            nodelist = ()
-            for m in message.split(' >|< '):
-                nodelist += (m,)
-            return nodelist
-
         if DEBUG:
             print "ChatWindow.OnPostMessage():", event.data
                 
@@ -781,6 +798,8 @@ class ChatWindow(wx.Frame):
                 
             # Import Message
             elif messageHeader == 'I':
+                # Apply any queued messages first, so messages are applied in the order they were received
+                self.ProcessMessageQueue()
                 # Another user has imported a database.  We need to refresh the whole Database Tree!
                 # See if a Control Object has been defined.
                 if self.ControlObject != None:
@@ -813,832 +832,970 @@ class ChatWindow(wx.Frame):
             else:
                 # The remaining messages should not be processed if this user was the message sender
                 if self.userName != messageSender:
-                    # We can't have the tree selection changing because of the activity of other users.  That creates all kinds of
-                    # problems if we're in the middle of editing something.  So let's note the current selection
-                    currentSelection = self.ControlObject.DataWindow.DBTab.tree.GetSelections()
-                    # The Control Object MUST be defined (and always will be)
-                    if self.ControlObject != None:
-                        # Add Library Message
-                        if messageHeader == 'AS':
-                            tempLibrary = Library.Library(message)
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('LibraryNode', (_('Libraries'), message), tempLibrary.number, None, expandNode=False, avoidRecursiveYields = True)
-                            # Sort the list of libraries
-                            nodelist = (_('Libraries'),)
-                            node = self.ControlObject.DataWindow.DBTab.tree.select_Node(nodelist, 'LibraryRootNode', False)
-                            self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
-                            
-                        # Add Episode Message
-                        elif messageHeader == 'AE':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            tempEpisode = Episode.Episode(series=nodelist[0], episode=nodelist[1])
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('EpisodeNode', (_('Libraries'),) + nodelist, tempEpisode.number, tempEpisode.series_num, expandNode=False, avoidRecursiveYields = True)
-
-                        # Add Transcript Message
-                        elif messageHeader == 'AT':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            tempEpisode = Episode.Episode(series=nodelist[0], episode=nodelist[1])
-                            # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
-                            tempTranscript = Transcript.Transcript(nodelist[-1], ep=tempEpisode.number, skipText=True)
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('TranscriptNode', (_('Libraries'),) + nodelist, tempTranscript.number, tempEpisode.number, expandNode=False, avoidRecursiveYields = True)
-                            # Sort the list of transcripts
-                            node = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Libraries'),) + nodelist[:-1], 'EpisodeNode', False)
-                            self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
-
-                        # Add Document Message
-                        elif messageHeader == 'AD':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            tempDocument = Document.Document(libraryID=nodelist[0], documentID=nodelist[1])
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('DocumentNode', (_('Libraries'),) + nodelist, tempDocument.number, tempDocument.library_num, expandNode=False, avoidRecursiveYields = True)
-
-                        # Add Collection Message
-                        elif messageHeader == 'AC':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            parentNum = 0
-                            for coll in nodelist:
-                                tempCollection = Collection.Collection(coll, parentNum)
-                                parentNum = tempCollection.number
-                            # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('CollectionNode', (_('Collections'),) + nodelist, tempCollection.number, tempCollection.parent, expandNode=False, avoidRecursiveYields=True)
-
-                            # Sort the list of libraries
-                            nodelist = (_('Collections'),) + nodelist[:-1]
-                            node = self.ControlObject.DataWindow.DBTab.tree.select_Node(nodelist, 'CollectionsRootNode', False)
-                            self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
-
-                        # Add Quote Message
-                        elif messageHeader == 'AQ':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            parentNum = 0
-                            for coll in nodelist[:-1]:
-                                tempCollection = Collection.Collection(coll, parentNum)
-                                parentNum = tempCollection.number
-                            # Get a temporary copy of the Quote.  We don't need the quote's text, which speeds this up.
-                            tempQuote = Quote.Quote(quoteID=nodelist[-1], collectionID=tempCollection.id, collectionParent=tempCollection.parent, skipText=True)
-                            # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('QuoteNode', (_('Collections'),) + nodelist, tempQuote.number, tempCollection.number, sortOrder=tempQuote.sort_order, expandNode=False, avoidRecursiveYields=True)
-                            # If the Quote's Document is open, it needs to be updated with the Quote information!
-                            self.ControlObject.AddQuoteToOpenDocument(tempQuote)
-                            # If we are moving a Quote, the quote's Notes need to travel with the Quote.  The first step is to
-                            # get a list of those Notes.
-                            noteList = DBInterface.list_of_notes(Quote=tempQuote.number)
-                            # If there are Quote Notes, we need to make sure they travel with the Quote
-                            if noteList != []:
-                                insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist, 'QuoteNode', ensureVisible=False)
-                                # We accomplish this using the TreeCtrl's "add_note_nodes" method
-                                self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Quote=tempQuote.number)
-                                self.ControlObject.DataWindow.DBTab.tree.Refresh()
-
-                        # Add Clip Message
-                        elif messageHeader == 'ACl':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            parentNum = 0
-                            for coll in nodelist[:-1]:
-                                tempCollection = Collection.Collection(coll, parentNum)
-                                parentNum = tempCollection.number
-                            # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
-                            tempClip = Clip.Clip(nodelist[-1], tempCollection.id, tempCollection.parent, skipText=True)
-                            # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('ClipNode', (_('Collections'),) + nodelist, tempClip.number, tempCollection.number, sortOrder=tempClip.sort_order, expandNode=False, avoidRecursiveYields=True)
-                            # If we are moving a Clip, the clip's Notes need to travel with the Clip.  The first step is to
-                            # get a list of those Notes.
-                            noteList = DBInterface.list_of_notes(Clip=tempClip.number)
-                            # If there are Clip Notes, we need to make sure they travel with the Clip
-                            if noteList != []:
-                                insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist, 'ClipNode', ensureVisible=False)
-                                # We accomplish this using the TreeCtrl's "add_note_nodes" method
-                                self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Clip=tempClip.number)
-                                self.ControlObject.DataWindow.DBTab.tree.Refresh()
-
-                        # Add Clip in Sort Order Message
-                        elif messageHeader == 'AClSO':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            parentNum = 0
-                            for coll in nodelist[:-2]:
-                                tempCollection = Collection.Collection(coll, parentNum)
-                                parentNum = tempCollection.number
-                            # We need the NODE for the Clip we should place the new clip in front of.  Let's get that here.
-                            insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist[:-1], 'ClipNode', ensureVisible=False)
-                            # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
-                            tempClip = Clip.Clip(nodelist[-1], tempCollection.id, tempCollection.parent, skipText=True)
-                            # Add new node, leaving the insertNode out of the nodeList.
-                            # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('ClipNode', (_('Collections'),) + nodelist[:-2] + (nodelist[-1],), tempClip.number, tempCollection.number, sortOrder=tempClip.sort_order, expandNode=False, insertPos=insertNode, avoidRecursiveYields=True)
-                            # If we are moving a Clip, the clip's Notes need to travel with the Clip.  The first step is to
-                            # get a list of those Notes.
-                            noteList = DBInterface.list_of_notes(Clip=tempClip.number)
-                            # If there are Clip Notes, we need to make sure they travel with the Clip
-                            if noteList != []:
-                                insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist[:-2] + (nodelist[-1],), 'ClipNode', ensureVisible=False)
-                                # We accomplish this using the TreeCtrl's "add_note_nodes" method
-                                self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Clip=tempClip.number)
-                                self.ControlObject.DataWindow.DBTab.tree.Refresh()
-
-                        # Order Collection Message
-                        elif messageHeader == 'OC':
-                            # Convert the message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            # Get the Collection's Tree Node
-                            node = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist[1:], 'CollectionNode')
-                            # Update the Sort Information for that tree node
-                            self.ControlObject.DataWindow.DBTab.tree.UpdateCollectionSortOrder(node, sendMessage=False)
-
-                        # Add Snapshot Message
-                        elif messageHeader == 'ASnap':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            # Initialize the Parent Number variable
-                            parentNum = 0
-                            # Get the appropriate Collection by interating through the node list ...
-                            for coll in nodelist[:-1]:
-                                # ... get the Collection for each node ...
-                                tempCollection = Collection.Collection(coll, parentNum)
-                                # ... and the parent number
-                                parentNum = tempCollection.number
-                            # Get a temporary copy of the Snapshot.
-                            tempSnapshot = Snapshot.Snapshot(nodelist[-1], parentNum)
-                            # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('SnapshotNode', (_('Collections'),) + nodelist, tempSnapshot.number, tempCollection.number, sortOrder=tempSnapshot.sort_order, expandNode=False, avoidRecursiveYields=True)
-                            # If we are moving a Snapshot, the snapshot's Notes need to travel with the Snapshot.  The first step is to
-                            # get a list of those Notes.
-                            noteList = DBInterface.list_of_notes(Snapshot=tempSnapshot.number)
-                            # If there are Snapshot Notes, we need to make sure they travel with the Snapshot
-                            if noteList != []:
-                                insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist, 'SnapshotNode', ensureVisible=False)
-                                # We accomplish this using the TreeCtrl's "add_note_nodes" method
-                                self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Snapshot=tempSnapshot.number)
-                                self.ControlObject.DataWindow.DBTab.tree.Refresh()
-
-                        # Add Note Message
-                        elif messageHeader in ['ASN', 'ADN', 'AEN', 'ATN', 'ACN', 'AQN', 'AClN', 'ASnN']:
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            # Initialize variables
-                            parentNum = 0
-                            objectType = None
-                            nodeType = None
-                            tempObj = None
-                            parentNum = 0
-                            nodeCount = 0
-                            # Iterate through the node list to figure out what kind of Note we're looking at
-                            for node in nodelist[:-1]:
-                                # Count how far into the list we are
-                                nodeCount += 1
-                                # If the first entry in the node list is the "Library" Root Node ...
-                                if (objectType == None) and (node == 'Libraries'):
-                                    # ... then we're climbing up the Library branch, and are at a Library record.
-                                    objectType = 'Library'
-                                # If we're already at a Library record and we have an Episode or Transcript Note ...
-                                elif (objectType == 'Library') and (messageHeader in ['ASN', 'AEN', 'ATN']):
+                    # Queue the message.  Messages from other users are applied to this copy of Transana in batches.
+                    self.QueueMessage(messageHeader, message, event)
+                else:
+                    if DEBUG:
+                        print "We DON'T need to add an object, as we created it in the first place."
+
+    def QueueMessage(self, messageHeader, message, event):
+        """ Queue a message from another user that changes the data, to be applied with other queued messages.
+            When another user imports or codes many items, this avoids updating the Database Tree thousands of times. """
+        # Add the message to the queue
+        self.messageQueue.append((messageHeader, message, event))
+        # Count the message
+        self.messagesReceived += 1
+        # If the queue isn't already waiting to be processed ...
+        if not self.messageQueueTimer.IsRunning():
+            # ... process it shortly.  (The timer is not restarted for later messages, so messages never wait longer than this.)
+            self.messageQueueTimer.Start(MESSAGE_QUEUE_DELAY, wx.TIMER_ONE_SHOT)
+
+    def CollapseMessageQueue(self, messages):
+        """ Remove redundant messages from a list of (messageHeader, message, event) tuples, returning the messages that
+            need to be applied, in order """
+        # Messages that refresh something from the database only need to be applied once, as they all see the same data.
+        # Only keep the last copy of each of these messages.
+        seen = set()
+        result = []
+        for (messageHeader, message, event) in reversed(messages):
+            if messageHeader in REFRESH_MESSAGES:
+                if (messageHeader, message) in seen:
+                    continue
+                seen.add((messageHeader, message))
+            result.append((messageHeader, message, event))
+        result.reverse()
+
+        # If a node is renamed more than once, and no message in between refers to it, a single rename will do.
+        # Rename messages hold the node type, the root node, the node list with the old name, and the new name.
+        index = 0
+        while index < len(result):
+            (messageHeader, message, event) = result[index]
+            # If we have a Rename Node message ...
+            if messageHeader == 'RN':
+                nodelist = message.split(' >|< ')
+                # Look back through the queue for a message that renamed the same node to its current name
+                for prevIndex in range(index - 1, -1, -1):
+                    (prevHeader, prevMessage, prevEvent) = result[prevIndex]
+                    prevNodelist = prevMessage.split(' >|< ')
+                    if (prevHeader == 'RN') and (prevNodelist[:-2] == nodelist[:-2]) and (prevNodelist[-1] == nodelist[-2]):
+                        # Check that no message in between refers to the node by either its old or its intermediate name
+                        oldName = ' >|< '.join(prevNodelist[2:-1])
+                        intermediateName = ' >|< '.join(nodelist[2:-1])
+                        for (otherHeader, otherMessage, otherEvent) in result[prevIndex + 1:index]:
+                            if (oldName in otherMessage) or (intermediateName in otherMessage):
+                                break
+                        # If none do, replace the two renames with one from the old name to the final name, applied
+                        # in place of the second rename.  If the node ends up with its old name, neither is needed.
+                        else:
+                            if prevNodelist[-2] == nodelist[-1]:
+                                del(result[index])
+                                index -= 1
+                            else:
+                                result[index] = (messageHeader, ' >|< '.join(prevNodelist[:-1] + nodelist[-1:]), event)
+                            del(result[prevIndex])
+                            index -= 1
+                        break
+            index += 1
+
+        # If a node is added and later deleted, and no message in between refers to it, neither message is needed
+        index = 0
+        while index < len(result):
+            (messageHeader, message, event) = result[index]
+            # If we have a Delete Node message ...
+            if messageHeader == 'DN':
+                # ... get the node type and the node list, without the untranslated root node
+                nodelist = message.split(' >|< ')
+                # Look back through the queue for the message that added this node
+                for addIndex in range(index - 1, -1, -1):
+                    (addHeader, addMessage, addEvent) = result[addIndex]
+                    # If the message refers to the node being deleted ...
+                    if addMessage == ' >|< '.join(nodelist[2:]):
+                        # ... and it added the node ...
+                        if ADD_MESSAGES.get(addHeader, None) == nodelist[0]:
+                            # ... check that no message in between refers to the node
+                            for (otherHeader, otherMessage, otherEvent) in result[addIndex + 1:index]:
+                                if addMessage in otherMessage:
+                                    break
+                            # If none do, drop both messages
+                            else:
+                                del(result[index])
+                                del(result[addIndex])
+                                index -= 2
+                        break
+            index += 1
+        return result
+
+    def ProcessMessageQueue(self, event=None):
+        """ Apply the queued messages from other users in a single batch """
+        # Get the queued messages and start a new queue
+        messages = self.messageQueue
+        self.messageQueue = []
+        # If there's nothing to do, we're done
+        if (len(messages) == 0) or (self.ControlObject == None):
+            return
+        # Remove redundant messages
+        collapsed = self.CollapseMessageQueue(messages)
+        # Update the batching statistics
+        self.messagesApplied += len(collapsed)
+        self.batchesApplied += 1
+
+        if DEBUG:
+            print "ChatWindow.ProcessMessageQueue(): %d messages received, %d applied in this batch.  %d received, %d applied in %d batches (%4.1f messages per batch) overall." % \
+                  (len(messages), len(collapsed), self.messagesReceived, self.messagesApplied, self.batchesApplied,
+                   float(self.messagesReceived) / self.batchesApplied)
+
+        # Another user has changed the data, so the Data Window's Interval Trees will need to be rebuilt
+        IntervalIndex.Invalidate()
+        # Get a pointer to the Database Tree
+        tree = self.ControlObject.DataWindow.DBTab.tree
+        # We can't have the tree selection changing because of the activity of other users.  That creates all kinds of
+        # problems if we're in the middle of editing something.  So let's note the current selection
+        currentSelection = tree.GetSelections()
+        # Don't redraw the tree until all the messages have been applied
+        tree.Freeze()
+        try:
+            # Apply the messages, in order
+            for (messageHeader, message, msgEvent) in collapsed:
+                self.ApplyMessage(messageHeader, message, msgEvent)
+        finally:
+            tree.Thaw()
+        # Unless we've just deleted something, which might have been selected ...
+        if not 'DN' in [messageHeader for (messageHeader, message, msgEvent) in collapsed]:
+            # First, de-select all items
+            tree.UnselectAll()
+            for currNode in currentSelection:
+                # ... now that we're done, we should re-select the originally-selected tree item
+                tree.SelectItem(currNode)
+
+    def GetMessageBatchingRatio(self):
+        """ Return the average number of messages received from other users per batch applied """
+        if self.batchesApplied == 0:
+            return 0.0
+        return float(self.messagesReceived) / self.batchesApplied
+
+    def ApplyMessage(self, messageHeader, message, event):
+        """ Apply a message from another user that changes the data to this copy of Transana """
+
+        def ConvertMessageToNodeList(message):
+            """ Take a message from the Transana Message Server and convert it to a NodeList for use with the DB Tree
+                add_Node method """
+            nodelist = ()
+            for m in message.split(' >|< '):
+                nodelist += (m,)
+            return nodelist
+
+        # The Control Object MUST be defined (and always will be)
+        if self.ControlObject != None:
+            # Add Library Message
+            if messageHeader == 'AS':
+                tempLibrary = Library.Library(message)
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('LibraryNode', (_('Libraries'), message), tempLibrary.number, None, expandNode=False, avoidRecursiveYields = True)
+                # Sort the list of libraries
+                nodelist = (_('Libraries'),)
+                node = self.ControlObject.DataWindow.DBTab.tree.select_Node(nodelist, 'LibraryRootNode', False)
+                self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
+
+            # Add Episode Message
+            elif messageHeader == 'AE':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                tempEpisode = Episode.Episode(series=nodelist[0], episode=nodelist[1])
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('EpisodeNode', (_('Libraries'),) + nodelist, tempEpisode.number, tempEpisode.series_num, expandNode=False, avoidRecursiveYields = True)
+
+            # Add Transcript Message
+            elif messageHeader == 'AT':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                tempEpisode = Episode.Episode(series=nodelist[0], episode=nodelist[1])
+                # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
+                tempTranscript = Transcript.Transcript(nodelist[-1], ep=tempEpisode.number, skipText=True)
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('TranscriptNode', (_('Libraries'),) + nodelist, tempTranscript.number, tempEpisode.number, expandNode=False, avoidRecursiveYields = True)
+                # Sort the list of transcripts
+                node = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Libraries'),) + nodelist[:-1], 'EpisodeNode', False)
+                self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
+
+            # Add Document Message
+            elif messageHeader == 'AD':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                tempDocument = Document.Document(libraryID=nodelist[0], documentID=nodelist[1])
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('DocumentNode', (_('Libraries'),) + nodelist, tempDocument.number, tempDocument.library_num, expandNode=False, avoidRecursiveYields = True)
+
+            # Add Collection Message
+            elif messageHeader == 'AC':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                parentNum = 0
+                for coll in nodelist:
+                    tempCollection = Collection.Collection(coll, parentNum)
+                    parentNum = tempCollection.number
+                # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('CollectionNode', (_('Collections'),) + nodelist, tempCollection.number, tempCollection.parent, expandNode=False, avoidRecursiveYields=True)
+
+                # Sort the list of libraries
+                nodelist = (_('Collections'),) + nodelist[:-1]
+                node = self.ControlObject.DataWindow.DBTab.tree.select_Node(nodelist, 'CollectionsRootNode', False)
+                self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
+
+            # Add Quote Message
+            elif messageHeader == 'AQ':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                parentNum = 0
+                for coll in nodelist[:-1]:
+                    tempCollection = Collection.Collection(coll, parentNum)
+                    parentNum = tempCollection.number
+                # Get a temporary copy of the Quote.  We don't need the quote's text, which speeds this up.
+                tempQuote = Quote.Quote(quoteID=nodelist[-1], collectionID=tempCollection.id, collectionParent=tempCollection.parent, skipText=True)
+                # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('QuoteNode', (_('Collections'),) + nodelist, tempQuote.number, tempCollection.number, sortOrder=tempQuote.sort_order, expandNode=False, avoidRecursiveYields=True)
+                # If the Quote's Document is open, it needs to be updated with the Quote information!
+                self.ControlObject.AddQuoteToOpenDocument(tempQuote)
+                # If we are moving a Quote, the quote's Notes need to travel with the Quote.  The first step is to
+                # get a list of those Notes.
+                noteList = DBInterface.list_of_notes(Quote=tempQuote.number)
+                # If there are Quote Notes, we need to make sure they travel with the Quote
+                if noteList != []:
+                    insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist, 'QuoteNode', ensureVisible=False)
+                    # We accomplish this using the TreeCtrl's "add_note_nodes" method
+                    self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Quote=tempQuote.number)
+                    self.ControlObject.DataWindow.DBTab.tree.Refresh()
+
+            # Add Clip Message
+            elif messageHeader == 'ACl':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                parentNum = 0
+                for coll in nodelist[:-1]:
+                    tempCollection = Collection.Collection(coll, parentNum)
+                    parentNum = tempCollection.number
+                # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
+                tempClip = Clip.Clip(nodelist[-1], tempCollection.id, tempCollection.parent, skipText=True)
+                # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('ClipNode', (_('Collections'),) + nodelist, tempClip.number, tempCollection.number, sortOrder=tempClip.sort_order, expandNode=False, avoidRecursiveYields=True)
+                # If we are moving a Clip, the clip's Notes need to travel with the Clip.  The first step is to
+                # get a list of those Notes.
+                noteList = DBInterface.list_of_notes(Clip=tempClip.number)
+                # If there are Clip Notes, we need to make sure they travel with the Clip
+                if noteList != []:
+                    insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist, 'ClipNode', ensureVisible=False)
+                    # We accomplish this using the TreeCtrl's "add_note_nodes" method
+                    self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Clip=tempClip.number)
+                    self.ControlObject.DataWindow.DBTab.tree.Refresh()
+
+            # Add Clip in Sort Order Message
+            elif messageHeader == 'AClSO':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                parentNum = 0
+                for coll in nodelist[:-2]:
+                    tempCollection = Collection.Collection(coll, parentNum)
+                    parentNum = tempCollection.number
+                # We need the NODE for the Clip we should place the new clip in front of.  Let's get that here.
+                insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist[:-1], 'ClipNode', ensureVisible=False)
+                # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
+                tempClip = Clip.Clip(nodelist[-1], tempCollection.id, tempCollection.parent, skipText=True)
+                # Add new node, leaving the insertNode out of the nodeList.
+                # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('ClipNode', (_('Collections'),) + nodelist[:-2] + (nodelist[-1],), tempClip.number, tempCollection.number, sortOrder=tempClip.sort_order, expandNode=False, insertPos=insertNode, avoidRecursiveYields=True)
+                # If we are moving a Clip, the clip's Notes need to travel with the Clip.  The first step is to
+                # get a list of those Notes.
+                noteList = DBInterface.list_of_notes(Clip=tempClip.number)
+                # If there are Clip Notes, we need to make sure they travel with the Clip
+                if noteList != []:
+                    insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist[:-2] + (nodelist[-1],), 'ClipNode', ensureVisible=False)
+                    # We accomplish this using the TreeCtrl's "add_note_nodes" method
+                    self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Clip=tempClip.number)
+                    self.ControlObject.DataWindow.DBTab.tree.Refresh()
+
+            # Order Collection Message
+            elif messageHeader == 'OC':
+                # Convert the message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                # Get the Collection's Tree Node
+                node = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist[1:], 'CollectionNode')
+                # Update the Sort Information for that tree node
+                self.ControlObject.DataWindow.DBTab.tree.UpdateCollectionSortOrder(node, sendMessage=False)
+
+            # Add Snapshot Message
+            elif messageHeader == 'ASnap':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                # Initialize the Parent Number variable
+                parentNum = 0
+                # Get the appropriate Collection by interating through the node list ...
+                for coll in nodelist[:-1]:
+                    # ... get the Collection for each node ...
+                    tempCollection = Collection.Collection(coll, parentNum)
+                    # ... and the parent number
+                    parentNum = tempCollection.number
+                # Get a temporary copy of the Snapshot.
+                tempSnapshot = Snapshot.Snapshot(nodelist[-1], parentNum)
+                # avoidRecursiveYields added to try to prevent a problem on the Mac when converting Searches
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('SnapshotNode', (_('Collections'),) + nodelist, tempSnapshot.number, tempCollection.number, sortOrder=tempSnapshot.sort_order, expandNode=False, avoidRecursiveYields=True)
+                # If we are moving a Snapshot, the snapshot's Notes need to travel with the Snapshot.  The first step is to
+                # get a list of those Notes.
+                noteList = DBInterface.list_of_notes(Snapshot=tempSnapshot.number)
+                # If there are Snapshot Notes, we need to make sure they travel with the Snapshot
+                if noteList != []:
+                    insertNode = self.ControlObject.DataWindow.DBTab.tree.select_Node((_('Collections'),) + nodelist, 'SnapshotNode', ensureVisible=False)
+                    # We accomplish this using the TreeCtrl's "add_note_nodes" method
+                    self.ControlObject.DataWindow.DBTab.tree.add_note_nodes(noteList, insertNode, Snapshot=tempSnapshot.number)
+                    self.ControlObject.DataWindow.DBTab.tree.Refresh()
+
+            # Add Note Message
+            elif messageHeader in ['ASN', 'ADN', 'AEN', 'ATN', 'ACN', 'AQN', 'AClN', 'ASnN']:
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                # Initialize variables
+                parentNum = 0
+                objectType = None
+                nodeType = None
+                tempObj = None
+                parentNum = 0
+                nodeCount = 0
+                # Iterate through the node list to figure out what kind of Note we're looking at
+                for node in nodelist[:-1]:
+                    # Count how far into the list we are
+                    nodeCount += 1
+                    # If the first entry in the node list is the "Library" Root Node ...
+                    if (objectType == None) and (node == 'Libraries'):
+                        # ... then we're climbing up the Library branch, and are at a Library record.
+                        objectType = 'Library'
+                    # If we're already at a Library record and we have an Episode or Transcript Note ...
+                    elif (objectType == 'Library') and (messageHeader in ['ASN', 'AEN', 'ATN']):
+                        # ... then we're moving on to an Episode next
+                        objectType = 'Episode'
+                        # We might have a Library Note, at least if we stop here!
+                        nodeType = 'LibraryNoteNode'
+                        # Let's load the Library record ...
+                        tempObj = Library.Library(node)
+                        # .. and note that the parent of the NEXT object is this Library's number!
+                        parentNum = tempObj.number
+                    # If we're already at a Library record and we have a Document Note ...
+                    elif (objectType == 'Library') and (messageHeader in ['ADN']):
+                        # ... then we're moving on to an Document next
+                        objectType = 'Document'
+                        # We might have a Library Note, at least if we stop here!
+                        nodeType = 'LibraryNoteNode'
+                        # Let's load the Library record ...
+                        tempObj = Library.Library(node)
+                        # .. and note that the parent of the NEXT object is this Library's number!
+                        parentNum = tempObj.number
+                    # If we're already at a Document record ...
+                    elif (objectType == 'Document'):
+                        # ... then we're looking at a Document
+                        objectType = 'Document Note'
+                        # we have a Document Note if we stop here!
+                        nodeType = 'DocumentNoteNode'
+                        # Let's load the Document Record
+                        tempObj = Document.Document(libraryID=tempObj.id, documentID=node)
+                        # .. and note that the parent of the NEXT object is this Document's number!
+                        parentNum = tempObj.number
+                    # If we're already at an Episode record ...
+                    elif (objectType == 'Episode'):
+                        # ... then we're moving on to a Transcript next
+                        objectType = 'Transcript'
+                        # we might have an Episode Note if we stop here!
+                        nodeType = 'EpisodeNoteNode'
+                        # Let's load the Episode Record
+                        tempObj = Episode.Episode(series=tempObj.id, episode=node)
+                        # .. and note that the parent of the NEXT object is this Episode's number!
+                        parentNum = tempObj.number
+                    # If we're already at a Transcript record ...
+                    elif (objectType == 'Transcript'):
+                        # ... then the only way to go is to a Transcript Note!
+                        objectType = 'Transcript Note'
+                        # We have a Transcript Note
+                        nodeType = 'TranscriptNoteNode'
+                        # Load the Transcript record ...
+                        # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
+                        tempObj = Transcript.Transcript(node, ep=parentNum, skipText=True)
+                        # ... and note that the parent of the Transcript Note is this Trasncript.
+                        parentNum = tempObj.number
+                    # If our node is the Collections Root Node ...
+                    elif (objectType == None) and (node == 'Collections'):
+                        # ... then the first level of object we're looking at is a Collection.
+                        objectType = 'Collections'
+                    # if we're looking at a Collection and either we don't have a Quote / Clip / Snapshot Note
+                    # or we're not at the end of the list yet...
+                    elif (objectType == 'Collections') and (not (messageHeader in ['AQN', 'AClN', 'ASnN']) or (nodeCount < len(nodelist) - 1)):
+                        # ... then we're still looking at a Collection
+                        objectType = 'Collections'
+                        # ... and if we stop here, we've got a Collection Note
+                        nodeType = 'CollectionNoteNode'
+                        # Load the Collection
+                        tempObj = Collection.Collection(node, parentNum)
+                        # ... and note that the collection is the parent of the NEXT object.
+                        parentNum = tempObj.number
+                    # if we're looking at a Collection and we have a Quote Note and we're at the end of the list ...
+                    elif (objectType == 'Collections') and (messageHeader == 'AQN') and (nodeCount == len(nodelist) - 1):
+                        # ... then we're looking at a Quote
+                        objectType = 'Quote'
+                        # ... and we're dealing with a Quote Note
+                        nodeType = 'QuoteNoteNode'
+                        # Get a temporary copy of the Quote.  We don't need the Quote's transcript, which speeds this up.
+                        tempObj = Quote.Quote(quoteID=node, collectionID=tempObj.id, collectionParent=tempObj.parent, skipText=True)
+                        # ... and note its number as the parent number of the Note
+                        parentNum = tempObj.number
+                    # if we're looking at a Collection and we have a Clip Note and we're at the end of the list ...
+                    elif (objectType == 'Collections') and (messageHeader == 'AClN') and (nodeCount == len(nodelist) - 1):
+                        # ... then we're looking at a Clip
+                        objectType = 'Clip'
+                        # ... and we're dealing with a Clip Note
+                        nodeType = 'ClipNoteNode'
+                        # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
+                        tempObj = Clip.Clip(node, tempObj.id, tempObj.parent, skipText=True)
+                        # ... and note its number as the parent number of the Note
+                        parentNum = tempObj.number
+                    # if we're looking at a Collection and we have a Snapshot Note and we're at the end of the list ...
+                    elif (objectType == 'Collections') and (messageHeader == 'ASnN') and (nodeCount == len(nodelist) - 1):
+                        # ... then we're looking at a Snapshot
+                        objectType = 'Snapshot'
+                        # ... and we're dealing with a Snapshot Note
+                        nodeType = 'SnapshotNoteNode'
+                        # Get a temporary copy of the Snapshot.
+                        tempObj = Snapshot.Snapshot(node, tempObj.number)
+                        # ... and note its number as the parent number of the Note
+                        parentNum = tempObj.number
+                # Initialize the Temporary Note object
+                tempNote = None
+                # Load the Note, which we do a bit differently based on what kind of parent object we have.
+                if nodeType == 'LibraryNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Library=tempObj.number)
+                elif nodeType == 'DocumentNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Document=tempObj.number)
+                elif nodeType == 'EpisodeNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Episode=tempObj.number)
+                elif nodeType == 'TranscriptNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Transcript=tempObj.number)
+                elif nodeType == 'CollectionNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Collection=tempObj.number)
+                elif nodeType == 'QuoteNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Quote=tempObj.number)
+                elif nodeType == 'ClipNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Clip=tempObj.number)
+                elif nodeType == 'SnapshotNoteNode':
+                    tempNote = Note.Note(nodelist[-1], Snapshot=tempObj.number)
+                # Add the Note to the Database Tree
+                self.ControlObject.DataWindow.DBTab.tree.add_Node(nodeType, nodelist, tempNote.number, tempObj.number, expandNode=False, avoidRecursiveYields = True)
+                # If the Notes Browser is open ...
+                if self.ControlObject.NotesBrowserWindow != None:
+                    # ... add the Note to the Notes Browser
+                    self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('A', tempNote)
+                # Sort the list of transcripts -- (We have to strip the "NOTE" out of the NodeType!!)
+                node = self.ControlObject.DataWindow.DBTab.tree.select_Node(nodelist[:-1], nodeType[:-8] + nodeType[-4:], False)
+                self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
+
+            # Add Keyword Group Message
+            elif messageHeader == 'AKG':
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('KeywordGroupNode', (_('Keywords'),) + (message, ), 0, 0, expandNode=False, avoidRecursiveYields = True)
+                # Once we've added the Keyword Group, we need to update the Keyword Groups Data Structure
+                self.ControlObject.DataWindow.DBTab.tree.updateKWGroupsData()
+
+            # Add Keyword Message
+            elif messageHeader == 'AK':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('KeywordNode', (_('Keywords'),) + nodelist, 0, nodelist[0], expandNode=False, avoidRecursiveYields = True)
+
+            # Add Keyword Example Message
+            elif messageHeader == 'AKE':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
+                tempClip = Clip.Clip(int(nodelist[0]), skipText=True)
+                self.ControlObject.DataWindow.DBTab.tree.add_Node('KeywordExampleNode', (_('Keywords'),) + nodelist[1:], tempClip.number, tempClip.collection_num, expandNode=False, avoidRecursiveYields = True)
+
+            # Rename a Node
+            elif messageHeader == 'RN':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                # The first element in the nodelist is the nodeType, which we need for the rename_Node call.
+                # The second element in the nodelist is the UNTRANSLATED root node label.  This avoids problems
+                # in mixed-language environments.  But we now need to translate it.
+                # The last element is the name the Node should be changed to.
+                # One more wrinkle -- the Root Node label might be a string, or it might already be a Unicode
+                # object.  It needs to be handled differently.  (In English, it's unicode, otherwise it's a string.)
+                if type(_(nodelist[1])) == type(u''):
+                    tmpRootNode = _(nodelist[1])
+                else:
+                    tmpRootNode = unicode(_(nodelist[1]), 'utf8')
+                # Encode the first-level node name for the LOCAL language
+                nodelist = (nodelist[0], tmpRootNode) + nodelist[2:]
+
+                if DEBUG:
+                    tmpstr = "Calling rename_Node(%s, %s, %s) %s %s" % (nodelist[1:-1], nodelist[0], nodelist[-1], \
+                             type(nodelist[0]), type(nodelist[-1]))
+                    print tmpstr.encode('latin1')
+                    print
+
+                # Rename the tree node
+                self.ControlObject.DataWindow.DBTab.tree.rename_Node(nodelist[1:-1], nodelist[0], nodelist[-1])
+
+                # Let's see if the renamed Document, Quote, or (Episode or Clip) Transcript is currently OPEN.
+                # (Open Episodes don't need to be treated the same way because of the looser relationship to
+                #  the transcript!)
+                docType = None
+                if nodelist[0] == "DocumentNode":
+                    docType = Document.Document
+                    tmpObj = Document.Document(libraryID = nodelist[-3], documentID = nodelist[-1])
+                elif nodelist[0] == 'TranscriptNode':
+                    docType = Transcript.Transcript
+                    tmpEpisode = Episode.Episode(series=nodelist[-4], episode=nodelist[-3])
+                    # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
+                    tmpObj = Transcript.Transcript(nodelist[-1], ep=tmpEpisode.number, skipText=True)
+                elif nodelist[0] == 'QuoteNode':
+                    docType = Quote.Quote
+                    parentNum = 0
+                    for coll in nodelist[2:-2]:
+                        tmpCollection = Collection.Collection(coll, parentNum)
+                        parentNum = tmpCollection.number
+                    # Get a temporary copy of the Quote.  We don't need the quote's text, which speeds this up.
+                    tmpObj = Quote.Quote(quoteID=nodelist[-1], collectionID=tmpCollection.id, collectionParent=tmpCollection.parent, skipText=True)
+                elif nodelist[0] == 'ClipNode':
+                    docType = Transcript.Transcript
+                    parentNum = 0
+                    for coll in nodelist[2:-2]:
+                        tmpCollection = Collection.Collection(coll, parentNum)
+                        parentNum = tmpCollection.number
+                    # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
+                    tmpClip = Clip.Clip(nodelist[-1], tmpCollection.id, tmpCollection.parent)
+                    tmpObj = tmpClip.transcripts[0]
+                if (docType != None) and \
+                   self.ControlObject.GetOpenDocumentObject(docType, tmpObj.number) != None:
+                    # Note the type and number of the currently opened object in the Document Window
+                    currObjType = type(self.ControlObject.GetCurrentDocumentObject())
+                    currObjNum = self.ControlObject.GetCurrentDocumentObject().number
+                    # Close the Open Document Window for the changed object
+                    self.ControlObject.CloseOpenTranscriptWindowObject(docType, tmpObj.number)
+                    # Then open a new Document Tab for the changed object
+                    if nodelist[0] == 'DocumentNode':
+                        self.ControlObject.LoadDocument(nodelist[-3], tmpObj.id, tmpObj.number)
+                    elif nodelist[0] == 'TranscriptNode':
+                        self.ControlObject.LoadTranscript(nodelist[-4], tmpEpisode.id, tmpObj.id)
+                    elif nodelist[0] == 'QuoteNode':
+                        self.ControlObject.LoadQuote(tmpObj.number)
+                    elif nodelist[0] == 'ClipNode':
+                        self.ControlObject.LoadClipByNumber(tmpClip.number)
+                    # Finally, restore the interface to the object that was showing when we started.
+                    self.ControlObject.SelectOpenDocumentTab(currObjType, currObjNum)
+
+                # If we're removing a Keyword Group ...
+                if nodelist[0] == 'KeywordGroupNode':
+                    # ... we need to update the Keyword Groups Data Structure
+                    self.ControlObject.DataWindow.DBTab.tree.updateKWGroupsData()
+
+                # If we're renaming  a Keyword ...
+                elif nodelist[0] == 'KeywordNode':
+                    # ... see if we have an Episode or Clip object currently loaded ...
+                    if isinstance(self.ControlObject.currentObj, Episode.Episode) or isinstance(self.ControlObject.currentObj, Clip.Clip):
+                        # ... let's see if the Keywords Tab is being shown ...
+                        if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
+                            # ... and if so, iterate through its keywords ...
+                            for kw in self.ControlObject.currentObj.keyword_list:
+                                # ... and see if it contains the keyword that was changed.
+                                if (nodelist[-3].upper() == kw.keywordGroup.upper()) and (nodelist[-2].upper() == kw.keyword.upper()):
+                                    # If so, update it.  (Its Refresh() method updates data from the database.)
+                                    self.ControlObject.DataWindow.KeywordsTab.Refresh()
+                                    # ... and refresh the keyword list
+                                    self.ControlObject.currentObj.refresh_keywords()
+                                    break
+
+                    # We need to update open Snapshots that contain this keyword.
+                    # Start with a list of all the open Snapshot Windows.
+                    openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
+                    # Interate through the Snapshot Windows
+                    for win in openSnapshotWindows:
+                        # For ANY non-editable Snapshot ...
+                        if (not win.editTool.IsToggled()):
+                            # ... update the Snapshot Window
+                            win.FileClear(event)
+                            win.FileRestore(event)
+
+                            win.OnEnterWindow(event)
+
+                # If we're renaming a Note ...
+                elif nodelist[0] in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
+                                     'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']:
+                    # ... if the Notes Browser is open, we need to update the note there as well.
+                    if self.ControlObject.NotesBrowserWindow != None:
+                        # The first element in the nodelist is the NOTE Node Type.
+                        nodeType = nodelist[0]
+                        # The NOTE Node type can be dropped from the node list
+                        nodelist = nodelist[1:]
+                        # Initialize variables
+                        parentNum = 0
+                        objectType = None
+                        tempObj = None
+                        parentNum = 0
+                        nodeCount = 0
+                        # Iterate through the node list to figure out what kind of Note we're looking at,
+                        # (skipping the old and new note names, which aren't needed here!)
+                        for node in nodelist[:-2]:
+                            # Keep track of our position in the list.
+                            nodeCount += 1
+                            # If the first entry in the node list is the "Library" Root Node ...
+                            if (objectType == None) and (node == unicode(_('Libraries'), 'utf8')):
+                                # ... then we're climbing up the Library branch, and are at a Library record.
+                                objectType = 'Library'
+                            # If we're already at a Library record and we're NOT looking for a Document Note ...
+                            elif (objectType == 'Library'):
+                                if (nodeType == 'DocumentNoteNode'):
+                                    # ... then we're looking at a Document
+                                    objectType = 'Document'
+                                else:
                                     # ... then we're moving on to an Episode next
                                     objectType = 'Episode'
-                                    # We might have a Library Note, at least if we stop here!
-                                    nodeType = 'LibraryNoteNode'
-                                    # Let's load the Library record ...
-                                    tempObj = Library.Library(node)
-                                    # .. and note that the parent of the NEXT object is this Library's number!
-                                    parentNum = tempObj.number
-                                # If we're already at a Library record and we have a Document Note ...
-                                elif (objectType == 'Library') and (messageHeader in ['ADN']):
-                                    # ... then we're moving on to an Document next
-                                    objectType = 'Document'
-                                    # We might have a Library Note, at least if we stop here!
-                                    nodeType = 'LibraryNoteNode'
-                                    # Let's load the Library record ...
-                                    tempObj = Library.Library(node)
-                                    # .. and note that the parent of the NEXT object is this Library's number!
-                                    parentNum = tempObj.number
-                                # If we're already at a Document record ...
-                                elif (objectType == 'Document'):
-                                    # ... then we're looking at a Document
-                                    objectType = 'Document Note'
-                                    # we have a Document Note if we stop here!
-                                    nodeType = 'DocumentNoteNode'
-                                    # Let's load the Document Record
-                                    tempObj = Document.Document(libraryID=tempObj.id, documentID=node)
-                                    # .. and note that the parent of the NEXT object is this Document's number!
-                                    parentNum = tempObj.number
-                                # If we're already at an Episode record ...
-                                elif (objectType == 'Episode'):
-                                    # ... then we're moving on to a Transcript next
-                                    objectType = 'Transcript'
-                                    # we might have an Episode Note if we stop here!
-                                    nodeType = 'EpisodeNoteNode'
-                                    # Let's load the Episode Record
-                                    tempObj = Episode.Episode(series=tempObj.id, episode=node)
-                                    # .. and note that the parent of the NEXT object is this Episode's number!
-                                    parentNum = tempObj.number
-                                # If we're already at a Transcript record ...
-                                elif (objectType == 'Transcript'):
-                                    # ... then the only way to go is to a Transcript Note!
-                                    objectType = 'Transcript Note'
-                                    # We have a Transcript Note
-                                    nodeType = 'TranscriptNoteNode'
-                                    # Load the Transcript record ...
-                                    # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
-                                    tempObj = Transcript.Transcript(node, ep=parentNum, skipText=True)
-                                    # ... and note that the parent of the Transcript Note is this Trasncript.
-                                    parentNum = tempObj.number
-                                # If our node is the Collections Root Node ...
-                                elif (objectType == None) and (node == 'Collections'):
-                                    # ... then the first level of object we're looking at is a Collection.
-                                    objectType = 'Collections'
-                                # if we're looking at a Collection and either we don't have a Quote / Clip / Snapshot Note
-                                # or we're not at the end of the list yet...
-                                elif (objectType == 'Collections') and (not (messageHeader in ['AQN', 'AClN', 'ASnN']) or (nodeCount < len(nodelist) - 1)):
-                                    # ... then we're still looking at a Collection
-                                    objectType = 'Collections'
-                                    # ... and if we stop here, we've got a Collection Note
-                                    nodeType = 'CollectionNoteNode'
-                                    # Load the Collection
-                                    tempObj = Collection.Collection(node, parentNum)
-                                    # ... and note that the collection is the parent of the NEXT object.
-                                    parentNum = tempObj.number
-                                # if we're looking at a Collection and we have a Quote Note and we're at the end of the list ...
-                                elif (objectType == 'Collections') and (messageHeader == 'AQN') and (nodeCount == len(nodelist) - 1):
-                                    # ... then we're looking at a Quote
-                                    objectType = 'Quote'
-                                    # ... and we're dealing with a Quote Note
-                                    nodeType = 'QuoteNoteNode'
-                                    # Get a temporary copy of the Quote.  We don't need the Quote's transcript, which speeds this up.
-                                    tempObj = Quote.Quote(quoteID=node, collectionID=tempObj.id, collectionParent=tempObj.parent, skipText=True)
-                                    # ... and note its number as the parent number of the Note
-                                    parentNum = tempObj.number
-                                # if we're looking at a Collection and we have a Clip Note and we're at the end of the list ...
-                                elif (objectType == 'Collections') and (messageHeader == 'AClN') and (nodeCount == len(nodelist) - 1):
-                                    # ... then we're looking at a Clip
-                                    objectType = 'Clip'
-                                    # ... and we're dealing with a Clip Note
-                                    nodeType = 'ClipNoteNode'
-                                    # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
-                                    tempObj = Clip.Clip(node, tempObj.id, tempObj.parent, skipText=True)
-                                    # ... and note its number as the parent number of the Note
-                                    parentNum = tempObj.number
-                                # if we're looking at a Collection and we have a Snapshot Note and we're at the end of the list ...
-                                elif (objectType == 'Collections') and (messageHeader == 'ASnN') and (nodeCount == len(nodelist) - 1):
-                                    # ... then we're looking at a Snapshot
-                                    objectType = 'Snapshot'
-                                    # ... and we're dealing with a Snapshot Note
-                                    nodeType = 'SnapshotNoteNode'
-                                    # Get a temporary copy of the Snapshot.
-                                    tempObj = Snapshot.Snapshot(node, tempObj.number)
-                                    # ... and note its number as the parent number of the Note
-                                    parentNum = tempObj.number
-                            # Initialize the Temporary Note object
-                            tempNote = None
-                            # Load the Note, which we do a bit differently based on what kind of parent object we have.
-                            if nodeType == 'LibraryNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Library=tempObj.number)
-                            elif nodeType == 'DocumentNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Document=tempObj.number)
-                            elif nodeType == 'EpisodeNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Episode=tempObj.number)
-                            elif nodeType == 'TranscriptNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Transcript=tempObj.number)
-                            elif nodeType == 'CollectionNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Collection=tempObj.number)
-                            elif nodeType == 'QuoteNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Quote=tempObj.number)
-                            elif nodeType == 'ClipNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Clip=tempObj.number)
-                            elif nodeType == 'SnapshotNoteNode':
-                                tempNote = Note.Note(nodelist[-1], Snapshot=tempObj.number)
-                            # Add the Note to the Database Tree
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node(nodeType, nodelist, tempNote.number, tempObj.number, expandNode=False, avoidRecursiveYields = True)
-                            # If the Notes Browser is open ...
-                            if self.ControlObject.NotesBrowserWindow != None:
-                                # ... add the Note to the Notes Browser
-                                self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('A', tempNote)
-                            # Sort the list of transcripts -- (We have to strip the "NOTE" out of the NodeType!!)
-                            node = self.ControlObject.DataWindow.DBTab.tree.select_Node(nodelist[:-1], nodeType[:-8] + nodeType[-4:], False)
-                            self.ControlObject.DataWindow.DBTab.tree.SortChildren(node)
-
-                        # Add Keyword Group Message
-                        elif messageHeader == 'AKG':
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('KeywordGroupNode', (_('Keywords'),) + (message, ), 0, 0, expandNode=False, avoidRecursiveYields = True)
-                            # Once we've added the Keyword Group, we need to update the Keyword Groups Data Structure
-                            self.ControlObject.DataWindow.DBTab.tree.updateKWGroupsData()
-
-                        # Add Keyword Message
-                        elif messageHeader == 'AK':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('KeywordNode', (_('Keywords'),) + nodelist, 0, nodelist[0], expandNode=False, avoidRecursiveYields = True)
-
-                        # Add Keyword Example Message
-                        elif messageHeader == 'AKE':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
-                            tempClip = Clip.Clip(int(nodelist[0]), skipText=True)
-                            self.ControlObject.DataWindow.DBTab.tree.add_Node('KeywordExampleNode', (_('Keywords'),) + nodelist[1:], tempClip.number, tempClip.collection_num, expandNode=False, avoidRecursiveYields = True)
-
-                        # Rename a Node
-                        elif messageHeader == 'RN':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            # The first element in the nodelist is the nodeType, which we need for the rename_Node call.
-                            # The second element in the nodelist is the UNTRANSLATED root node label.  This avoids problems
-                            # in mixed-language environments.  But we now need to translate it.
-                            # The last element is the name the Node should be changed to.
-                            # One more wrinkle -- the Root Node label might be a string, or it might already be a Unicode
-                            # object.  It needs to be handled differently.  (In English, it's unicode, otherwise it's a string.)
-                            if type(_(nodelist[1])) == type(u''):
-                                tmpRootNode = _(nodelist[1])
-                            else:
-                                tmpRootNode = unicode(_(nodelist[1]), 'utf8')
-                            # Encode the first-level node name for the LOCAL language
-                            nodelist = (nodelist[0], tmpRootNode) + nodelist[2:]
-                            
-                            if DEBUG:
-                                tmpstr = "Calling rename_Node(%s, %s, %s) %s %s" % (nodelist[1:-1], nodelist[0], nodelist[-1], \
-                                         type(nodelist[0]), type(nodelist[-1]))
-                                print tmpstr.encode('latin1')
-                                print
-
-                            # Rename the tree node
-                            self.ControlObject.DataWindow.DBTab.tree.rename_Node(nodelist[1:-1], nodelist[0], nodelist[-1])
-
-                            # Let's see if the renamed Document, Quote, or (Episode or Clip) Transcript is currently OPEN.
-                            # (Open Episodes don't need to be treated the same way because of the looser relationship to
-                            #  the transcript!)
-                            docType = None
-                            if nodelist[0] == "DocumentNode":
-                                docType = Document.Document
-                                tmpObj = Document.Document(libraryID = nodelist[-3], documentID = nodelist[-1])
-                            elif nodelist[0] == 'TranscriptNode':
-                                docType = Transcript.Transcript
-                                tmpEpisode = Episode.Episode(series=nodelist[-4], episode=nodelist[-3])
+                                # Let's load the Library record ...
+                                tempObj = Library.Library(node)
+                                # .. and note that the parent of the NEXT object is this Library's number!
+                                parentNum = tempObj.number
+                            # if we're looking at a Library and we have a Document Note and we're at the end of the list ...
+                            elif (objectType == 'Document'):
+                                # ... then we're looking at a Document
+                                objectType = 'Document Note'
+                                # Get a temporary copy of the Document.  We don't need the Document's transcript, which speeds this up.
+                                tempObj = Document.Document(node, libraryID=tempObj.id, documentID=node, skipText=True)
+                                # ... and note its number as the parent number of the Note
+                                parentNum = tempObj.number
+                            # If we're already at an Episode record ...
+                            elif (objectType == 'Episode'):
+                                # ... then we're moving on to a Transcript next
+                                objectType = 'Transcript'
+                                # Let's load the Episode Record
+                                tempObj = Episode.Episode(series=tempObj.id, episode=node)
+                                # .. and note that the parent of the NEXT object is this Episode's number!
+                                parentNum = tempObj.number
+                            # If we're already at a Transcript record ...
+                            elif (objectType == 'Transcript'):
+                                # ... then the only way to go is to a Transcript Note!
+                                objectType = 'Transcript Note'
+                                # Load the Transcript record ...
                                 # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
-                                tmpObj = Transcript.Transcript(nodelist[-1], ep=tmpEpisode.number, skipText=True)
-                            elif nodelist[0] == 'QuoteNode':
-                                docType = Quote.Quote
-                                parentNum = 0
-                                for coll in nodelist[2:-2]:
-                                    tmpCollection = Collection.Collection(coll, parentNum)
-                                    parentNum = tmpCollection.number
-                                # Get a temporary copy of the Quote.  We don't need the quote's text, which speeds this up.
-                                tmpObj = Quote.Quote(quoteID=nodelist[-1], collectionID=tmpCollection.id, collectionParent=tmpCollection.parent, skipText=True)
-                            elif nodelist[0] == 'ClipNode':
-                                docType = Transcript.Transcript
-                                parentNum = 0
-                                for coll in nodelist[2:-2]:
-                                    tmpCollection = Collection.Collection(coll, parentNum)
-                                    parentNum = tmpCollection.number
+                                tempObj = Transcript.Transcript(node, ep=parentNum, skipText=True)
+                                # ... and note that the parent of the Transcript Note is this Trasncript.
+                                parentNum = tempObj.number
+                            # If our node is the Collections Root Node ...
+                            elif (objectType == None) and (node == unicode(_('Collections'), 'utf8')):
+                                # ... then the first level of object we're looking at is a Collection.
+                                objectType = 'Collections'
+                            # if we're looking at a Collection and either we don't have a Clip Note or we're not at the end of the list yet...
+                            elif (objectType == 'Collections') and ((nodeType == 'CollectionNoteNode') or (nodeCount < len(nodelist) - 2)):
+                                # ... then we're still looking at a Collection
+                                objectType = 'Collections'
+                                # Load the Collection
+                                tempObj = Collection.Collection(node, parentNum)
+                                # ... and note that the collection is the parent of the NEXT object.
+                                parentNum = tempObj.number
+                            # if we're looking at a Collection and we have a Quote Note and we're at the end of the list ...
+                            elif (objectType == 'Collections') and (nodeType == 'QuoteNoteNode') and (nodeCount == len(nodelist) - 2):
+                                # ... then we're looking at a Quote
+                                objectType = 'Quote'
+                                # Get a temporary copy of the Quote.  We don't need the Quote's transcript, which speeds this up.
+                                tempObj = Quote.Quote(node, quoteID=node, collectionID=tempObj.id, collectionParent=tempObj.parent, skipText=True)
+                                # ... and note its number as the parent number of the Note
+                                parentNum = tempObj.number
+                            # if we're looking at a Collection and we have a Clip Note and we're at the end of the list ...
+                            elif (objectType == 'Collections') and (nodeType == 'ClipNoteNode') and (nodeCount == len(nodelist) - 2):
+                                # ... then we're looking at a Clip
+                                objectType = 'Clip'
                                 # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
-                                tmpClip = Clip.Clip(nodelist[-1], tmpCollection.id, tmpCollection.parent)
-                                tmpObj = tmpClip.transcripts[0]
-                            if (docType != None) and \
-                               self.ControlObject.GetOpenDocumentObject(docType, tmpObj.number) != None:
-                                # Note the type and number of the currently opened object in the Document Window
-                                currObjType = type(self.ControlObject.GetCurrentDocumentObject())
-                                currObjNum = self.ControlObject.GetCurrentDocumentObject().number
-                                # Close the Open Document Window for the changed object
-                                self.ControlObject.CloseOpenTranscriptWindowObject(docType, tmpObj.number)
-                                # Then open a new Document Tab for the changed object
-                                if nodelist[0] == 'DocumentNode':
-                                    self.ControlObject.LoadDocument(nodelist[-3], tmpObj.id, tmpObj.number)
-                                elif nodelist[0] == 'TranscriptNode':
-                                    self.ControlObject.LoadTranscript(nodelist[-4], tmpEpisode.id, tmpObj.id)
-                                elif nodelist[0] == 'QuoteNode':
-                                    self.ControlObject.LoadQuote(tmpObj.number)
-                                elif nodelist[0] == 'ClipNode':
-                                    self.ControlObject.LoadClipByNumber(tmpClip.number)
-                                # Finally, restore the interface to the object that was showing when we started.
-                                self.ControlObject.SelectOpenDocumentTab(currObjType, currObjNum)
-                                
-                            # If we're removing a Keyword Group ...
-                            if nodelist[0] == 'KeywordGroupNode':
-                                # ... we need to update the Keyword Groups Data Structure
-                                self.ControlObject.DataWindow.DBTab.tree.updateKWGroupsData()
-
-                            # If we're renaming  a Keyword ...
-                            elif nodelist[0] == 'KeywordNode':
-                                # ... see if we have an Episode or Clip object currently loaded ...
-                                if isinstance(self.ControlObject.currentObj, Episode.Episode) or isinstance(self.ControlObject.currentObj, Clip.Clip):
-                                    # ... let's see if the Keywords Tab is being shown ...
-                                    if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
-                                        # ... and if so, iterate through its keywords ...
-                                        for kw in self.ControlObject.currentObj.keyword_list:
-                                            # ... and see if it contains the keyword that was changed.
-                                            if (nodelist[-3].upper() == kw.keywordGroup.upper()) and (nodelist[-2].upper() == kw.keyword.upper()):
-                                                # If so, update it.  (Its Refresh() method updates data from the database.)
-                                                self.ControlObject.DataWindow.KeywordsTab.Refresh()
-                                                # ... and refresh the keyword list
-                                                self.ControlObject.currentObj.refresh_keywords()
-                                                break
-                                            
-                                # We need to update open Snapshots that contain this keyword.
-                                # Start with a list of all the open Snapshot Windows.
-                                openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
-                                # Interate through the Snapshot Windows
-                                for win in openSnapshotWindows:
-                                    # For ANY non-editable Snapshot ...
-                                    if (not win.editTool.IsToggled()):
-                                        # ... update the Snapshot Window
-                                        win.FileClear(event)
-                                        win.FileRestore(event)
-
-                                        win.OnEnterWindow(event)
-
-                            # If we're renaming a Note ...
-                            elif nodelist[0] in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
-                                                 'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']:
-                                # ... if the Notes Browser is open, we need to update the note there as well.
-                                if self.ControlObject.NotesBrowserWindow != None:
-                                    # The first element in the nodelist is the NOTE Node Type.
-                                    nodeType = nodelist[0]
-                                    # The NOTE Node type can be dropped from the node list
-                                    nodelist = nodelist[1:]
-                                    # Initialize variables
-                                    parentNum = 0
-                                    objectType = None
-                                    tempObj = None
-                                    parentNum = 0
-                                    nodeCount = 0
-                                    # Iterate through the node list to figure out what kind of Note we're looking at,
-                                    # (skipping the old and new note names, which aren't needed here!)
-                                    for node in nodelist[:-2]:
-                                        # Keep track of our position in the list.
-                                        nodeCount += 1
-                                        # If the first entry in the node list is the "Library" Root Node ...
-                                        if (objectType == None) and (node == unicode(_('Libraries'), 'utf8')):
-                                            # ... then we're climbing up the Library branch, and are at a Library record.
-                                            objectType = 'Library'
-                                        # If we're already at a Library record and we're NOT looking for a Document Note ...
-                                        elif (objectType == 'Library'):
-                                            if (nodeType == 'DocumentNoteNode'):
-                                                # ... then we're looking at a Document
-                                                objectType = 'Document'
-                                            else:
-                                                # ... then we're moving on to an Episode next
-                                                objectType = 'Episode'
-                                            # Let's load the Library record ...
-                                            tempObj = Library.Library(node)
-                                            # .. and note that the parent of the NEXT object is this Library's number!
-                                            parentNum = tempObj.number
-                                        # if we're looking at a Library and we have a Document Note and we're at the end of the list ...
-                                        elif (objectType == 'Document'):
-                                            # ... then we're looking at a Document
-                                            objectType = 'Document Note'
-                                            # Get a temporary copy of the Document.  We don't need the Document's transcript, which speeds this up.
-                                            tempObj = Document.Document(node, libraryID=tempObj.id, documentID=node, skipText=True)
-                                            # ... and note its number as the parent number of the Note
-                                            parentNum = tempObj.number
-                                        # If we're already at an Episode record ...
-                                        elif (objectType == 'Episode'):
-                                            # ... then we're moving on to a Transcript next
-                                            objectType = 'Transcript'
-                                            # Let's load the Episode Record
-                                            tempObj = Episode.Episode(series=tempObj.id, episode=node)
-                                            # .. and note that the parent of the NEXT object is this Episode's number!
-                                            parentNum = tempObj.number
-                                        # If we're already at a Transcript record ...
-                                        elif (objectType == 'Transcript'):
-                                            # ... then the only way to go is to a Transcript Note!
-                                            objectType = 'Transcript Note'
-                                            # Load the Transcript record ...
-                                            # To save time here, we can skip loading the actual transcript text, which can take time once we start dealing with images!
-                                            tempObj = Transcript.Transcript(node, ep=parentNum, skipText=True)
-                                            # ... and note that the parent of the Transcript Note is this Trasncript.
-                                            parentNum = tempObj.number
-                                        # If our node is the Collections Root Node ...
-                                        elif (objectType == None) and (node == unicode(_('Collections'), 'utf8')):
-                                            # ... then the first level of object we're looking at is a Collection.
-                                            objectType = 'Collections'
-                                        # if we're looking at a Collection and either we don't have a Clip Note or we're not at the end of the list yet...
-                                        elif (objectType == 'Collections') and ((nodeType == 'CollectionNoteNode') or (nodeCount < len(nodelist) - 2)):
-                                            # ... then we're still looking at a Collection
-                                            objectType = 'Collections'
-                                            # Load the Collection
-                                            tempObj = Collection.Collection(node, parentNum)
-                                            # ... and note that the collection is the parent of the NEXT object.
-                                            parentNum = tempObj.number
-                                        # if we're looking at a Collection and we have a Quote Note and we're at the end of the list ...
-                                        elif (objectType == 'Collections') and (nodeType == 'QuoteNoteNode') and (nodeCount == len(nodelist) - 2):
-                                            # ... then we're looking at a Quote
-                                            objectType = 'Quote'
-                                            # Get a temporary copy of the Quote.  We don't need the Quote's transcript, which speeds this up.
-                                            tempObj = Quote.Quote(node, quoteID=node, collectionID=tempObj.id, collectionParent=tempObj.parent, skipText=True)
-                                            # ... and note its number as the parent number of the Note
-                                            parentNum = tempObj.number
-                                        # if we're looking at a Collection and we have a Clip Note and we're at the end of the list ...
-                                        elif (objectType == 'Collections') and (nodeType == 'ClipNoteNode') and (nodeCount == len(nodelist) - 2):
-                                            # ... then we're looking at a Clip
-                                            objectType = 'Clip'
-                                            # Get a temporary copy of the Clip.  We don't need the clip's transcript, which speeds this up.
-                                            tempObj = Clip.Clip(node, tempObj.id, tempObj.parent, skipText=True)
-                                            # ... and note its number as the parent number of the Note
-                                            parentNum = tempObj.number
-                                        # if we're looking at a Collection and we have a Snapshot Note and we're at the end of the list ...
-                                        elif (objectType == 'Collections') and (nodeType == 'SnapshotNoteNode') and (nodeCount == len(nodelist) - 2):
-                                            # ... then we're looking at a Snapshot
-                                            objectType = 'Snapshot'
-                                            # Get a temporary copy of the Snapshot.
-                                            tempObj = Snapshot.Snapshot(node, tempObj.number)
-                                            # ... and note its number as the parent number of the Note
-                                            parentNum = tempObj.number
-                                    # Initialize the Temporary Note object
-                                    tempNote = None
-                                    # Load the Note, which we do a bit differently based on what kind of parent object we have.
-                                    if nodeType == 'LibraryNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Library=tempObj.number)
-                                    elif nodeType == 'DocumentNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Document=tempObj.number)
-                                    elif nodeType == 'EpisodeNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Episode=tempObj.number)
-                                    elif nodeType == 'TranscriptNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Transcript=tempObj.number)
-                                    elif nodeType == 'CollectionNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Collection=tempObj.number)
-                                    elif nodeType == 'QuoteNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Quote=tempObj.number)
-                                    elif nodeType == 'ClipNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Clip=tempObj.number)
-                                    elif nodeType == 'SnapshotNoteNode':
-                                        tempNote = Note.Note(nodelist[-1], Snapshot=tempObj.number)
-                                    # Rename the Note in the Database Tree
-                                    self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('R', tempNote, oldName=nodelist[-2])
-
-                        # Move Collection Node
-                        elif messageHeader == 'MCN':
-                            # Convert the Message to a Node List
-                            nodelist = ConvertMessageToNodeList(message)
-                            # The first element in the node list needs translation.  Check it's type.
-                            if type(_(nodelist[0])).__name__ == 'str':
-                                # If string, translate it and convert it to unicode
-                                nodelist = (unicode(_(nodelist[0]), 'utf8'),) + nodelist[1:]
-                            # If not string, it's already unicode!
-                            else:
-                                # ... in which case, we just translate it.
-                                nodelist = (_(nodelist[0]),) + nodelist[1:]
-                            # Get a pointer to the Tree Control
-                            tree = self.ControlObject.DataWindow.DBTab.tree
-                            # Get the Collection node that has been moved
-                            tmpNode = tree.select_Node(nodelist, 'CollectionNode', ensureVisible=False)
-                            # Get the data underlying the tree node.
-                            tmpPyData = tree.GetPyData(tmpNode)
-                            # Load the collection underlying the node that has been moved
-                            tmpCollection = Collection.Collection(tmpPyData.recNum)
-                            # Now that we have the collection, we can build the node data for where it should be!
-                            destNodeList = (_('Collections'),) + tmpCollection.GetNodeData()[:-1]
-                            # Move the local copy of the node without sending MU Messaging
-                            tree.copy_Node('CollectionNode', nodelist, destNodeList, True, sendMessage=False)
-
-                        # Delete Node
-                        elif messageHeader == 'DN':
-                            # Extract the node list from the message
-                            nodelist = ConvertMessageToNodeList(message)
-
-                            # Check the TYPE of the translated second element.
-                            if type(_(nodelist[1])).__name__ == 'str':
-                                # If string, translate it and convert it to unicode
-                                nodelist = (nodelist[0],) + (unicode(_(nodelist[1]), 'utf8'),) + nodelist[2:]
-                            # If not string, it's unicode!
-                            else:
-                                # ... in which case, we just translate it.
-                                nodelist = (nodelist[0],) + (_(nodelist[1]),) + nodelist[2:]
-                            # Keyword Examples need a bit of extra processing.  If we have a keyword example ...
-                            if nodelist[0] == 'KeywordExampleNode':
-                                # ... pull the clip number off the end of the node list ...
-                                exampleClipNum = int(nodelist[-1])
-                                # ... remove the clip number from the node list ...
-                                nodelist = nodelist[:-1]
-                                # ... and call delete_Node, passing the clip number.  We don't want messages sent further.
-                                self.ControlObject.DataWindow.DBTab.tree.delete_Node(nodelist[1:], nodelist[0], exampleClipNum = exampleClipNum, sendMessage=False)
-                            # If we are removing any other kind of Node ...
-                            else:
+                                tempObj = Clip.Clip(node, tempObj.id, tempObj.parent, skipText=True)
+                                # ... and note its number as the parent number of the Note
+                                parentNum = tempObj.number
+                            # if we're looking at a Collection and we have a Snapshot Note and we're at the end of the list ...
+                            elif (objectType == 'Collections') and (nodeType == 'SnapshotNoteNode') and (nodeCount == len(nodelist) - 2):
+                                # ... then we're looking at a Snapshot
+                                objectType = 'Snapshot'
+                                # Get a temporary copy of the Snapshot.
+                                tempObj = Snapshot.Snapshot(node, tempObj.number)
+                                # ... and note its number as the parent number of the Note
+                                parentNum = tempObj.number
+                        # Initialize the Temporary Note object
+                        tempNote = None
+                        # Load the Note, which we do a bit differently based on what kind of parent object we have.
+                        if nodeType == 'LibraryNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Library=tempObj.number)
+                        elif nodeType == 'DocumentNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Document=tempObj.number)
+                        elif nodeType == 'EpisodeNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Episode=tempObj.number)
+                        elif nodeType == 'TranscriptNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Transcript=tempObj.number)
+                        elif nodeType == 'CollectionNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Collection=tempObj.number)
+                        elif nodeType == 'QuoteNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Quote=tempObj.number)
+                        elif nodeType == 'ClipNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Clip=tempObj.number)
+                        elif nodeType == 'SnapshotNoteNode':
+                            tempNote = Note.Note(nodelist[-1], Snapshot=tempObj.number)
+                        # Rename the Note in the Database Tree
+                        self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('R', tempNote, oldName=nodelist[-2])
+
+            # Move Collection Node
+            elif messageHeader == 'MCN':
+                # Convert the Message to a Node List
+                nodelist = ConvertMessageToNodeList(message)
+                # The first element in the node list needs translation.  Check it's type.
+                if type(_(nodelist[0])).__name__ == 'str':
+                    # If string, translate it and convert it to unicode
+                    nodelist = (unicode(_(nodelist[0]), 'utf8'),) + nodelist[1:]
+                # If not string, it's already unicode!
+                else:
+                    # ... in which case, we just translate it.
+                    nodelist = (_(nodelist[0]),) + nodelist[1:]
+                # Get a pointer to the Tree Control
+                tree = self.ControlObject.DataWindow.DBTab.tree
+                # Get the Collection node that has been moved
+                tmpNode = tree.select_Node(nodelist, 'CollectionNode', ensureVisible=False)
+                # Get the data underlying the tree node.
+                tmpPyData = tree.GetPyData(tmpNode)
+                # Load the collection underlying the node that has been moved
+                tmpCollection = Collection.Collection(tmpPyData.recNum)
+                # Now that we have the collection, we can build the node data for where it should be!
+                destNodeList = (_('Collections'),) + tmpCollection.GetNodeData()[:-1]
+                # Move the local copy of the node without sending MU Messaging
+                tree.copy_Node('CollectionNode', nodelist, destNodeList, True, sendMessage=False)
+
+            # Delete Node
+            elif messageHeader == 'DN':
+                # Extract the node list from the message
+                nodelist = ConvertMessageToNodeList(message)
+
+                # Check the TYPE of the translated second element.
+                if type(_(nodelist[1])).__name__ == 'str':
+                    # If string, translate it and convert it to unicode
+                    nodelist = (nodelist[0],) + (unicode(_(nodelist[1]), 'utf8'),) + nodelist[2:]
+                # If not string, it's unicode!
+                else:
+                    # ... in which case, we just translate it.
+                    nodelist = (nodelist[0],) + (_(nodelist[1]),) + nodelist[2:]
+                # Keyword Examples need a bit of extra processing.  If we have a keyword example ...
+                if nodelist[0] == 'KeywordExampleNode':
+                    # ... pull the clip number off the end of the node list ...
+                    exampleClipNum = int(nodelist[-1])
+                    # ... remove the clip number from the node list ...
+                    nodelist = nodelist[:-1]
+                    # ... and call delete_Node, passing the clip number.  We don't want messages sent further.
+                    self.ControlObject.DataWindow.DBTab.tree.delete_Node(nodelist[1:], nodelist[0], exampleClipNum = exampleClipNum, sendMessage=False)
+                # If we are removing any other kind of Node ...
+                else:
 
-                                # ... delete the node without passing further messages
-                                self.ControlObject.DataWindow.DBTab.tree.delete_Node(nodelist[1:], nodelist[0], sendMessage=False)
-
-                            # If we're removing a Keyword Group ...
-                            if nodelist[0] == 'KeywordGroupNode':
-                                # ... we need to update the Keyword Groups Data Structure
-                                self.ControlObject.DataWindow.DBTab.tree.updateKWGroupsData()
-                                
-                                # ... see if we have an Episode or Clip object currently loaded ...
-                                if isinstance(self.ControlObject.currentObj, Episode.Episode) or isinstance(self.ControlObject.currentObj, Clip.Clip):
-                                    # ... let's see if the Keywords Tab is being shown ...
-                                    if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
-                                        # ... and if so, iterate through its keywords ...
-                                        for kw in self.ControlObject.currentObj.keyword_list:
-                                            # ... and see if it contains the keyword that was changed.
-                                            if (nodelist[-1].upper() == kw.keywordGroup.upper()):
-                                                # If so, update it.  (Its Refresh() method updates data from the database.)
-                                                self.ControlObject.DataWindow.KeywordsTab.Refresh()
-                                                # ... and refresh the keyword list
-                                                self.ControlObject.currentObj.refresh_keywords()
-                                                break
-
-                                # We need to update open Snapshots that contain this keyword.
-                                # Start with a list of all the open Snapshot Windows.
-                                openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
-                                # Interate through the Snapshot Windows
-                                for win in openSnapshotWindows:
-                                    # For ANY non-editable Snapshot ...
-                                    if (not win.editTool.IsToggled()):
-                                        # ... update the Snapshot Window
-                                        win.FileClear(event)
-                                        win.FileRestore(event)
-
-                                        win.OnEnterWindow(event)
-
-                            # If we're deleting  a Keyword ...
-                            elif nodelist[0] == 'KeywordNode':
-                                # ... see if we have an Episode or Clip object currently loaded ...
-                                if isinstance(self.ControlObject.currentObj, Episode.Episode) or isinstance(self.ControlObject.currentObj, Clip.Clip):
-                                    # ... let's see if the Keywords Tab is being shown ...
-                                    if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
-                                        # ... and if so, iterate through its keywords ...
-                                        for kw in self.ControlObject.currentObj.keyword_list:
-                                            # ... and see if it contains the keyword that was changed.
-                                            if (nodelist[-2].upper() == kw.keywordGroup.upper()) and (nodelist[-1].upper() == kw.keyword.upper()):
-                                                # If so, update it.  (Its Refresh() method updates data from the database.)
-                                                self.ControlObject.DataWindow.KeywordsTab.Refresh()
-                                                # ... and refresh the keyword list
-                                                self.ControlObject.currentObj.refresh_keywords()
-                                                break
-
-                                # We need to update open Snapshots that contain this keyword.
-                                # Start with a list of all the open Snapshot Windows.
-                                openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
-                                # Interate through the Snapshot Windows
-                                for win in openSnapshotWindows:
-                                    # For ANY non-editable Snapshot ...
-                                    if (not win.editTool.IsToggled()):
-                                        # ... update the Snapshot Window
-                                        win.FileClear(event)
-                                        win.FileRestore(event)
-
-                                        win.OnEnterWindow(event)
-
-                            # If we're deleting a Note Node ...
-                            elif nodelist[0] in ['LibraryNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode', 'CollectionNoteNode',
-                                                 'ClipNoteNode', 'SnapshotNoteNode', 'DocumentNoteNode', 'QuoteNoteNode']:
-                                # ... and the Notes Browser is open, we need to delete the Note from there too.
-                                if self.ControlObject.NotesBrowserWindow != None:
-                                    # Determine the Note Browser's root node based on the type of Note we're deleting
-                                    if nodelist[0] == 'LibraryNoteNode':
-                                        nodeType = 'Library'
-                                    elif nodelist[0] == 'EpisodeNoteNode':
-                                        nodeType = 'Episode'
-                                    elif nodelist[0] == 'TranscriptNoteNode':
-                                        nodeType = 'Transcript'
-                                    elif nodelist[0] == 'CollectionNoteNode':
-                                        nodeType = 'Collection'
-                                    elif nodelist[0] == 'ClipNoteNode':
-                                        nodeType = 'Clip'
-                                    elif nodelist[0] == 'SnapshotNoteNode':
-                                        nodeType = 'Snapshot'
-                                    elif nodelist[0] == 'DocumentNoteNode':
-                                        nodeType = 'Document'
-                                    elif nodelist[0] == 'QuoteNoteNode':
-                                        nodeType = 'Quote'
-                                    else:
-                                        nodeType = None
-                                    # Signal the Notes Browser to delete the Note.  Shorten the node list by 1 element
-                                    # so it does not conflict with DatabaseTreeTab.py calls.
-                                    if nodeType != None:
-                                        self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('D', (nodeType, nodelist[1:]))
-                            # Otherwise, if a Library, Document, Episode, Transcript, Collection, Quote, Clip, or Snapshot node is deleted ...
-                            elif nodelist[0] in ['LibraryNode', 'DocumentNode', 'EpisodeNode', 'TranscriptNode', 'CollectionNode', 'QuoteNode', 'ClipNode', 'SnapshotNode']:
-                                # ... and if the Notes Browser is open, ...
-                                if self.ControlObject.NotesBrowserWindow != None:
-                                    # ... we need to CHECK to see if any notes were deleted.
-                                    self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('C')
-                                    
-                        # If a Quote is being deleted on another computer, we need to
-                        # Delete Quote Position from Open Document
-                        elif messageHeader == 'DQPOD':
-                            # Parse the message at the space into object type and object number
-                            msgData = message.split(' ')
-                            # ... we need to drop that Quote's Position from the source Document, if it's open.
-                            self.ControlObject.RemoveQuoteFromOpenDocument(int(msgData[0]), int(msgData[1]))
-
-                        # Update Keyword List
-                        elif messageHeader == 'UKL':
-                            # Parse the message at the space into object type and object number
-                            msgData = message.split(' ')
-                            # See if the currently loaded object matches the object described in the message.
-                            if ((isinstance(self.ControlObject.currentObj, Episode.Episode) and \
-                                 (msgData[0] == 'Episode')) or \
-                                (isinstance(self.ControlObject.currentObj, Clip.Clip) and \
-                                 (msgData[0] == 'Clip')) or \
-                                (isinstance(self.ControlObject.currentObj, Document.Document) and \
-                                 (msgData[0] == 'Document')) or \
-                                (isinstance(self.ControlObject.currentObj, Quote.Quote) and \
-                                 (msgData[0] == 'Quote'))) and \
-                               (self.ControlObject.currentObj.number == int(msgData[1])):
-                                # Let's see if the Keywords Tab is being shown
-                                if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
+                    # ... delete the node without passing further messages
+                    self.ControlObject.DataWindow.DBTab.tree.delete_Node(nodelist[1:], nodelist[0], sendMessage=False)
+
+                # If we're removing a Keyword Group ...
+                if nodelist[0] == 'KeywordGroupNode':
+                    # ... we need to update the Keyword Groups Data Structure
+                    self.ControlObject.DataWindow.DBTab.tree.updateKWGroupsData()
+
+                    # ... see if we have an Episode or Clip object currently loaded ...
+                    if isinstance(self.ControlObject.currentObj, Episode.Episode) or isinstance(self.ControlObject.currentObj, Clip.Clip):
+                        # ... let's see if the Keywords Tab is being shown ...
+                        if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
+                            # ... and if so, iterate through its keywords ...
+                            for kw in self.ControlObject.currentObj.keyword_list:
+                                # ... and see if it contains the keyword that was changed.
+                                if (nodelist[-1].upper() == kw.keywordGroup.upper()):
                                     # If so, update it.  (Its Refresh() method updates data from the database.)
                                     self.ControlObject.DataWindow.KeywordsTab.Refresh()
                                     # ... and refresh the keyword list
                                     self.ControlObject.currentObj.refresh_keywords()
+                                    break
+
+                    # We need to update open Snapshots that contain this keyword.
+                    # Start with a list of all the open Snapshot Windows.
+                    openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
+                    # Interate through the Snapshot Windows
+                    for win in openSnapshotWindows:
+                        # For ANY non-editable Snapshot ...
+                        if (not win.editTool.IsToggled()):
+                            # ... update the Snapshot Window
+                            win.FileClear(event)
+                            win.FileRestore(event)
+
+                            win.OnEnterWindow(event)
+
+                # If we're deleting  a Keyword ...
+                elif nodelist[0] == 'KeywordNode':
+                    # ... see if we have an Episode or Clip object currently loaded ...
+                    if isinstance(self.ControlObject.currentObj, Episode.Episode) or isinstance(self.ControlObject.currentObj, Clip.Clip):
+                        # ... let's see if the Keywords Tab is being shown ...
+                        if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
+                            # ... and if so, iterate through its keywords ...
+                            for kw in self.ControlObject.currentObj.keyword_list:
+                                # ... and see if it contains the keyword that was changed.
+                                if (nodelist[-2].upper() == kw.keywordGroup.upper()) and (nodelist[-1].upper() == kw.keyword.upper()):
+                                    # If so, update it.  (Its Refresh() method updates data from the database.)
+                                    self.ControlObject.DataWindow.KeywordsTab.Refresh()
+                                    # ... and refresh the keyword list
+                                    self.ControlObject.currentObj.refresh_keywords()
+                                    break
+
+                    # We need to update open Snapshots that contain this keyword.
+                    # Start with a list of all the open Snapshot Windows.
+                    openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
+                    # Interate through the Snapshot Windows
+                    for win in openSnapshotWindows:
+                        # For ANY non-editable Snapshot ...
+                        if (not win.editTool.IsToggled()):
+                            # ... update the Snapshot Window
+                            win.FileClear(event)
+                            win.FileRestore(event)
+
+                            win.OnEnterWindow(event)
+
+                # If we're deleting a Note Node ...
+                elif nodelist[0] in ['LibraryNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode', 'CollectionNoteNode',
+                                     'ClipNoteNode', 'SnapshotNoteNode', 'DocumentNoteNode', 'QuoteNoteNode']:
+                    # ... and the Notes Browser is open, we need to delete the Note from there too.
+                    if self.ControlObject.NotesBrowserWindow != None:
+                        # Determine the Note Browser's root node based on the type of Note we're deleting
+                        if nodelist[0] == 'LibraryNoteNode':
+                            nodeType = 'Library'
+                        elif nodelist[0] == 'EpisodeNoteNode':
+                            nodeType = 'Episode'
+                        elif nodelist[0] == 'TranscriptNoteNode':
+                            nodeType = 'Transcript'
+                        elif nodelist[0] == 'CollectionNoteNode':
+                            nodeType = 'Collection'
+                        elif nodelist[0] == 'ClipNoteNode':
+                            nodeType = 'Clip'
+                        elif nodelist[0] == 'SnapshotNoteNode':
+                            nodeType = 'Snapshot'
+                        elif nodelist[0] == 'DocumentNoteNode':
+                            nodeType = 'Document'
+                        elif nodelist[0] == 'QuoteNoteNode':
+                            nodeType = 'Quote'
+                        else:
+                            nodeType = None
+                        # Signal the Notes Browser to delete the Note.  Shorten the node list by 1 element
+                        # so it does not conflict with DatabaseTreeTab.py calls.
+                        if nodeType != None:
+                            self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('D', (nodeType, nodelist[1:]))
+                # Otherwise, if a Library, Document, Episode, Transcript, Collection, Quote, Clip, or Snapshot node is deleted ...
+                elif nodelist[0] in ['LibraryNode', 'DocumentNode', 'EpisodeNode', 'TranscriptNode', 'CollectionNode', 'QuoteNode', 'ClipNode', 'SnapshotNode']:
+                    # ... and if the Notes Browser is open, ...
+                    if self.ControlObject.NotesBrowserWindow != None:
+                        # ... we need to CHECK to see if any notes were deleted.
+                        self.ControlObject.NotesBrowserWindow.UpdateTreeCtrl('C')
+
+            # If a Quote is being deleted on another computer, we need to
+            # Delete Quote Position from Open Document
+            elif messageHeader == 'DQPOD':
+                # Parse the message at the space into object type and object number
+                msgData = message.split(' ')
+                # ... we need to drop that Quote's Position from the source Document, if it's open.
+                self.ControlObject.RemoveQuoteFromOpenDocument(int(msgData[0]), int(msgData[1]))
+
+            # Update Keyword List
+            elif messageHeader == 'UKL':
+                # Parse the message at the space into object type and object number
+                msgData = message.split(' ')
+                # See if the currently loaded object matches the object described in the message.
+                if ((isinstance(self.ControlObject.currentObj, Episode.Episode) and \
+                     (msgData[0] == 'Episode')) or \
+                    (isinstance(self.ControlObject.currentObj, Clip.Clip) and \
+                     (msgData[0] == 'Clip')) or \
+                    (isinstance(self.ControlObject.currentObj, Document.Document) and \
+                     (msgData[0] == 'Document')) or \
+                    (isinstance(self.ControlObject.currentObj, Quote.Quote) and \
+                     (msgData[0] == 'Quote'))) and \
+                   (self.ControlObject.currentObj.number == int(msgData[1])):
+                    # Let's see if the Keywords Tab is being shown
+                    if self.ControlObject.DataWindow.nb.GetPageText(self.ControlObject.DataWindow.nb.GetSelection()) == unicode(_('Keywords'), 'utf8'):
+                        # If so, update it.  (Its Refresh() method updates data from the database.)
+                        self.ControlObject.DataWindow.KeywordsTab.Refresh()
+                        # ... and refresh the keyword list
+                        self.ControlObject.currentObj.refresh_keywords()
+
+            # Update Keyword Visualization
+            elif messageHeader == 'UKV':
+                # Parse the message at the space into object type, object number, and possible Episode Number (if Clip)
+                msgData = message.split(' ')
+                # If no Object Type ...
+                if msgData[0] == 'None':
+                    # ... we need to update the keyword visualization no matter what.
+                    self.ControlObject.UpdateKeywordVisualization()
+                # if Object Type is Document ...
+                elif msgData[0] == 'Document':
+                    # Get the source document's object if it is open somewhere in this copy of Transana
+                    openSourceDocument = self.ControlObject.GetOpenDocumentObject(Document.Document, int(msgData[2]))
+                    # If it is open somewhere ...
+                    if openSourceDocument != None:
+                        # ... then reload it to update its QuotePositions, which may have changed due to a Quote Merge.
+                        openSourceDocument.db_load_by_num(openSourceDocument.number)
+
+                    # See if the currently loaded document matches the document number sent from the Message Server
+                    if isinstance(self.ControlObject.currentObj, Document.Document) and \
+                       self.ControlObject.currentObj.number == int(msgData[2]):
+                        # ... we need to update the keyword visualization no matter what.
+                        self.ControlObject.UpdateKeywordVisualization()
+                # if Object Type is Episode ...
+                elif msgData[0] == 'Episode':
+                    # See if the currently loaded episode matches the episode number sent from the Message Server
+                    if isinstance(self.ControlObject.currentObj, Episode.Episode) and \
+                       self.ControlObject.currentObj.number == int(msgData[1]):
+                        # ... we need to update the keyword visualization no matter what.
+                        self.ControlObject.UpdateKeywordVisualization()
+                # if Object Type is Quote ...
+                elif msgData[0] == 'Quote':
+                    # See if the currently loaded Document matches the Document number sent from the Message Server
+                    # or the currently loaded Quote matches the Quote Number sent from the Message Server
+                    if (isinstance(self.ControlObject.currentObj, Document.Document) and \
+                       self.ControlObject.currentObj.number == int(msgData[2])) or \
+                       (isinstance(self.ControlObject.currentObj, Quote.Quote) and \
+                       self.ControlObject.currentObj.number == int(msgData[1])):
+                        # ... we need to update the keyword visualization.
+                        self.ControlObject.UpdateKeywordVisualization()
+                # if Object Type is Clip ...
+                elif msgData[0] == 'Clip':
+                    # See if the currently loaded episode matches the episode number sent from the Message Server
+                    # or the currently loaded Clip matches the Clip Number sent from the Message Server
+                    if (isinstance(self.ControlObject.currentObj, Episode.Episode) and \
+                       self.ControlObject.currentObj.number == int(msgData[2])) or \
+                       (isinstance(self.ControlObject.currentObj, Clip.Clip) and \
+                       self.ControlObject.currentObj.number == int(msgData[1])):
+                        # ... we need to update the keyword visualization.
+                        self.ControlObject.UpdateKeywordVisualization()
 
-                        # Update Keyword Visualization
-                        elif messageHeader == 'UKV':
-                            # Parse the message at the space into object type, object number, and possible Episode Number (if Clip)
-                            msgData = message.split(' ')
-                            # If no Object Type ...
-                            if msgData[0] == 'None':
-                                # ... we need to update the keyword visualization no matter what.
-                                self.ControlObject.UpdateKeywordVisualization()
-                            # if Object Type is Document ...
-                            elif msgData[0] == 'Document':
-                                # Get the source document's object if it is open somewhere in this copy of Transana
-                                openSourceDocument = self.ControlObject.GetOpenDocumentObject(Document.Document, int(msgData[2]))
-                                # If it is open somewhere ...
-                                if openSourceDocument != None:
-                                    # ... then reload it to update its QuotePositions, which may have changed due to a Quote Merge.
-                                    openSourceDocument.db_load_by_num(openSourceDocument.number)
-                                
-                                # See if the currently loaded document matches the document number sent from the Message Server
-                                if isinstance(self.ControlObject.currentObj, Document.Document) and \
-                                   self.ControlObject.currentObj.number == int(msgData[2]):
-                                    # ... we need to update the keyword visualization no matter what.
-                                    self.ControlObject.UpdateKeywordVisualization()
-                            # if Object Type is Episode ...
-                            elif msgData[0] == 'Episode':
-                                # See if the currently loaded episode matches the episode number sent from the Message Server
-                                if isinstance(self.ControlObject.currentObj, Episode.Episode) and \
-                                   self.ControlObject.currentObj.number == int(msgData[1]):
-                                    # ... we need to update the keyword visualization no matter what.
-                                    self.ControlObject.UpdateKeywordVisualization()
-                            # if Object Type is Quote ...
-                            elif msgData[0] == 'Quote':
-                                # See if the currently loaded Document matches the Document number sent from the Message Server
-                                # or the currently loaded Quote matches the Quote Number sent from the Message Server
-                                if (isinstance(self.ControlObject.currentObj, Document.Document) and \
-                                   self.ControlObject.currentObj.number == int(msgData[2])) or \
-                                   (isinstance(self.ControlObject.currentObj, Quote.Quote) and \
-                                   self.ControlObject.currentObj.number == int(msgData[1])):
-                                    # ... we need to update the keyword visualization.
-                                    self.ControlObject.UpdateKeywordVisualization()
-                            # if Object Type is Clip ...
-                            elif msgData[0] == 'Clip':
-                                # See if the currently loaded episode matches the episode number sent from the Message Server
-                                # or the currently loaded Clip matches the Clip Number sent from the Message Server
-                                if (isinstance(self.ControlObject.currentObj, Episode.Episode) and \
-                                   self.ControlObject.currentObj.number == int(msgData[2])) or \
-                                   (isinstance(self.ControlObject.currentObj, Clip.Clip) and \
-                                   self.ControlObject.currentObj.number == int(msgData[1])):
-                                    # ... we need to update the keyword visualization.
-                                    self.ControlObject.UpdateKeywordVisualization()
+                else:
 
-                            else:
+                    print "ChatWindow.OnPostMessage():  UKV not processed for ", msgData[0]
+                    print
+
+            # Update Snapshot
+            elif messageHeader == 'US':
+                # Start with a list of all the open Snapshot Windows.
+                openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
+                # Interate through the Snapshot Windows
+                for win in openSnapshotWindows:
+                    # If the snapshot in question is open ...
+                    if (win.obj.number == int(message)):
+                        # ... update the Snapshot Window
+                        win.FileClear(event)
+                        win.FileRestore(event)
+                        win.OnEnterWindow(event)
+
+            # WordFrequencyReport Message
+            elif messageHeader == 'WFR':
+                # Use the Control Object to signal that Word Frequency Reports need to update
+                # We should NOT queue another MessageServer call when called from the Message Server!!
+                self.ControlObject.SignalWordFrequencyReports(doNotCall=True)
 
-                                print "ChatWindow.OnPostMessage():  UKV not processed for ", msgData[0]
-                                print
-
-                        # Update Snapshot
-                        elif messageHeader == 'US':
-                            # Start with a list of all the open Snapshot Windows.
-                            openSnapshotWindows = self.ControlObject.GetOpenSnapshotWindows()
-                            # Interate through the Snapshot Windows
-                            for win in openSnapshotWindows:
-                                # If the snapshot in question is open ...
-                                if (win.obj.number == int(message)):
-                                    # ... update the Snapshot Window
-                                    win.FileClear(event)
-                                    win.FileRestore(event)
-                                    win.OnEnterWindow(event)
-                                    
-                        # WordFrequencyReport Message
-                        elif messageHeader == 'WFR':
-                            # Use the Control Object to signal that Word Frequency Reports need to update
-                            # We should NOT queue another MessageServer call when called from the Message Server!!
-                            self.ControlObject.SignalWordFrequencyReports(doNotCall=True)
+            else:
+                if DEBUG:
+                    print "Unprocessed Message: ", event.data.encode('latin1')
+                    print
 
-                        else:
-                            if DEBUG:
-                                print "Unprocessed Message: ", event.data.encode('latin1')
-                                print
-                                
-                            # If it's not visible ...
-                            if not self.IsShown():
-                                # ... show the ChatWindow.
-                                self.Show(True)
-                            # Inform the user of the unknown message.  This should never occur.
-                            self.memo.AppendText('Unprocessed Message: "%s"\n' % event.data)
-
-                    # Unless we've just deleted it ...
-                    if messageHeader != 'DN':
-                        # First, de-select all items
-                        self.ControlObject.DataWindow.DBTab.tree.UnselectAll()
-                        for currNode in currentSelection:
-                            # ... now that we're done, we should re-select the originally-selected tree item
-                            self.ControlObject.DataWindow.DBTab.tree.SelectItem(currNode)
-                else:
-                    if DEBUG:
-                        print "We DON'T need to add an object, as we created it in the first place."
+                # If it's not visible ...
+                if not self.IsShown():
+                    # ... show the ChatWindow.
+                    self.Show(True)
+                # Inform the user of the unknown message.  This should never occur.
+                self.memo.AppendText('Unprocessed Message: "%s"\n' % event.data)
 
     def OnMessageServerLost(self, event):
         dlg = Dialogs.ErrorDialog(None, _("Your connection to the Message Server has been lost.\nYou may have lost your connection to the network, or there may be a problem with the Server.\nPlease quit Transana immediately and resolve the problem."))
@@ -1711,6 +1868,8 @@ class ChatWindow(wx.Frame):
             print sys.exc_info()[0], sys.exc_info()[1]
             import traceback
             print traceback.print_exc(file=sys.stdout)
+        # Stop the Message Queue timer.  Queued messages no longer matter.
+        self.messageQueueTimer.Stop()
         # Try to tell the listener thread to abort (probably does nothing.)
         self.listener.abort()
         # Destroy the Chat Sound player
@@ -40,6 +40,8 @@ import DBInterface
 import Dialogs
 # Import Transana's Episode Object
 import Episode
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Miscellaneous Functions
 import Misc
 # import Transana's Note Object
@@ -283,6 +285,8 @@ class Clip(DataObject.DataObject):
 
     def db_save(self, use_transactions=True):
         """Save the record to the database using Insert or Update as appropriate."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
 
         # Define and implement Demo Version limits
         if TransanaConstants.demoVersion and (self.number == 0):
@@ -553,6 +557,8 @@ class Clip(DataObject.DataObject):
         """ Delete this object record from the database.  Parameters indicate if we should use DB Transactions
             and if we should prompt about the deletion of Keyword Examples.  (in Clip Merging, for example, we
             don't want to prompt.) """
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
 
         # Assume success to begin
         result = 1
@@ -32,6 +32,8 @@ import Clip
 import DataObject
 # import Transana's Database Interface
 import DBInterface
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Note Object
 import Note
 # import Transana's Quote object
@@ -198,6 +200,8 @@ class Collection(DataObject.DataObject):
     def db_save(self, use_transactions=True):
         """Save the record to the database using Insert or Update as
         appropriate.  """
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
         # Sanity checks
         if self.id == "":
             raise SaveError, _("Collection ID is required.")
@@ -269,12 +273,19 @@ class Collection(DataObject.DataObject):
         # if new collection, Number was auto assigned, so resync.
         if (self.number == 0):
             self.db_load_by_name(self.id, self.parent)
+            # Add the new Collection to the Collection Closure table
+            DBInterface.AddCollectionToClosure(self.number, self.parent)
+        # If an existing Collection has been moved, the Collection Closure table needs to be updated
+        else:
+            DBInterface.MoveCollectionInClosure(self.number, self.parent)
         
 
     def db_delete(self, use_transactions=1):
         """Delete this object record from the database.  Raises
         RecordLockedError exception if the record is locked and unable to
         be deleted."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
         result = 1
         try:
             # Initialize delete operation, begin transaction if necessary
@@ -329,6 +340,9 @@ class Collection(DataObject.DataObject):
                 result = result and tempCollection.db_delete(0)
                 del tempCollection
 
+            # Remove the Collection from the Collection Closure table
+            DBInterface.DeleteCollectionFromClosure(self.number)
+
             # Delete the actual record
             self._db_do_delete(use_transactions, c, result)
             
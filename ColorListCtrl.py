@@ -281,6 +281,32 @@ class ColorListCtrl(wx.Panel):
         """ Set a column's string value for the appropriate item in the ListCtrl.  (Gives our Panel ListCtrl functionality.) """
         return self.lc.SetStringItem(itemNum, colNum, itemStr)
 
+    def SwapItems(self, itemNum1, itemNum2):
+        """ Exchange the positions of two items in the ListCtrl, along with their check status, color, and selection.
+            (Gives our Panel the same functionality as the FilterDialog's VirtualCheckListCtrl.) """
+        # Extract the data for both items
+        itemValues = []
+        for itemNum in (itemNum1, itemNum2):
+            # Get the text for each column
+            colValues = [self.lc.GetItem(itemNum, colNum).GetText() for colNum in range(self.lc.GetColumnCount())]
+            # Add the check status, color code (stored in the ItemData), and selection state
+            itemValues.append((colValues, self.IsChecked(itemNum), self.lc.GetItemData(itemNum),
+                               self.lc.GetItemState(itemNum, wx.LIST_STATE_SELECTED)))
+        # Place each item's data in the other item's position
+        for (itemNum, (colValues, checked, colorSpec, state)) in ((itemNum2, itemValues[0]), (itemNum1, itemValues[1])):
+            # Set the text for each column
+            for colNum in range(len(colValues)):
+                self.lc.SetStringItem(itemNum, colNum, colValues[colNum])
+            # Our itemChecks list may be smaller than the ListCtrl.  If so, pad it with "False" values.
+            while len(self.itemChecks) <= itemNum:
+                self.itemChecks.append(False)
+            # Set the check status
+            self.itemChecks[itemNum] = checked
+            # Set the color code.  This also sets the item's image to match the check status.
+            self.SetItemData(itemNum, colorSpec)
+            # Set the selection state
+            self.lc.SetItemState(itemNum, state, wx.LIST_STATE_SELECTED)
+
     def ToggleItem(self, itemNum):
         """ Toggle an item's "checked" status.  Gives ColorListCtrl functionality similar to the CheckListCtrl mixin. """
         # If the list of itemChecks is too short ...
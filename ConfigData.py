@@ -384,6 +384,8 @@ class ConfigData(object):
         self.colorConfigFilename = config.Read('/2.0/ColorConfigFilename', '')
         # Load the Quick Clips Warning setting
         self.quickClipWarning = config.ReadInt('/2.0/QuickClipWarning', True)
+        # Load the maximum Waveform Cache size, in megabytes.  (0 means unlimited.)
+        self.waveformCacheSize = config.ReadInt('/3.0/WaveformCacheSize', 2048)
         # Load the Primary Screen setting
         self.primaryScreen = config.ReadInt('/2.0/PrimaryScreen', 0)
         # Check for screen set to higher than current number of monitors
@@ -620,6 +622,8 @@ class ConfigData(object):
         config.Write('/2.0/ColorConfigFilename', self.colorConfigFilename)
         # Save the Quick Clips Warning setting
         config.WriteInt('/2.0/QuickClipWarning', self.quickClipWarning)
+        # Save the maximum Waveform Cache size
+        config.WriteInt('/3.0/WaveformCacheSize', self.waveformCacheSize)
         # For Windows only ...
         if 'wxMSW' in wx.PlatformInfo:
             # ... save the Media Player selection
@@ -60,6 +60,8 @@ import Dialogs
 import DragAndDropObjects
 # import Transana File Management System
 import FileManagement
+# import Transana's Interval Index
+import IntervalIndex
 # import Play All Clips
 import PlayAllClips
 # import the Episode Transcript Change Propagation tool
@@ -517,12 +519,16 @@ class ControlObject(object):
                 # Now point the DBTree (the notebook's parent window's DBTab's tree) to the loaded Quote
                 self.DataWindow.DBTab.tree.select_Node(nodeList, 'QuoteNode')
 
-    def LoadClipByNumber(self, clipNum, textSearchItems=[]):
+    def LoadClipByNumber(self, clipNum, textSearchItems=[], clipObj=None):
         """ When a Clip is identified to trigger systematic loading of all related information,
-            this method should be called so that all Transana Objects are set appropriately. """
+            this method should be called so that all Transana Objects are set appropriately.
+            If the Clip has already been loaded (prefetched by Play All Clips, for example), it can be passed
+            in as clipObj so it doesn't have to be loaded from the database again. """
 
-        # Load the Clip based on the ClipNumber.  (Let's get NotFound exceptions out of the way early!)
-        clipObj = Clip.Clip(clipNum)
+        # If we haven't been passed the Clip already loaded ...
+        if (clipObj is None) or (clipObj.number != clipNum):
+            # Load the Clip based on the ClipNumber.  (Let's get NotFound exceptions out of the way early!)
+            clipObj = Clip.Clip(clipNum)
 
         # First, let's see if there's already a video loaded in the system.  Iterate through all Notebook Pages.
         self.BringTranscriptToFront()
@@ -594,7 +600,8 @@ class ControlObject(object):
             if TransanaConstants.proVersion:
                 # Open the remaining clip transcripts in additional transcript windows.
                 for tr in clipObj.transcripts[1:]:
-                    self.OpenAdditionalTranscript(tr.number, isEpisodeTranscript=False)
+                    # The Clip Transcripts were loaded with the Clip, so we can pass the Transcript objects along
+                    self.OpenAdditionalTranscript(tr.number, isEpisodeTranscript=False, transcriptObj=tr)
 
             # Delineate the appropriate start and end points for Video Control
             self.SetVideoSelection(self.VideoStartPoint, self.VideoEndPoint)
@@ -1315,8 +1322,9 @@ class ControlObject(object):
         # Set focus to the new Transcript's Editor (so that CommonKeys work on the Mac)
         self.TranscriptWindow.dlg.editor.SetFocus()
 
-    def OpenAdditionalTranscript(self, transcriptNum, seriesID='', episodeID='', isEpisodeTranscript=True):
-        """ Open an additional Transcript without replacing the current one """
+    def OpenAdditionalTranscript(self, transcriptNum, seriesID='', episodeID='', isEpisodeTranscript=True, transcriptObj=None):
+        """ Open an additional Transcript without replacing the current one.  If the Transcript has already
+            been loaded, it can be passed in as transcriptObj so it doesn't have to be loaded again. """
 
         if DEBUG:
             print "ControlObjectClass.OpenAdditionalTranscript():"
@@ -1348,8 +1356,10 @@ class ControlObject(object):
 ##        # Register the Control Object (self) with the new Transcript Window
 ##        newTranscriptWindow.Register(self)
         
-        # Get out Transcript object from the database
-        transcriptObj = Transcript.Transcript(transcriptNum)
+        # If we haven't been passed the Transcript already loaded ...
+        if (transcriptObj is None) or (transcriptObj.number != transcriptNum):
+            # Get out Transcript object from the database
+            transcriptObj = Transcript.Transcript(transcriptNum)
         # Load the desired Transcript into the new Pane
         self.TranscriptWindow.LoadTranscript(transcriptObj)
 
@@ -1599,8 +1609,8 @@ class ControlObject(object):
             logonCount += 1
             # Call up the Username and Password Dialog to get new connection information
             if DBInterface.establish_db_exists():
-                # Now update the Data Window
-                self.DataWindow.DBTab.tree.refresh_tree()
+                # Now update the Data Window, using the Database Tree Cache if possible
+                self.DataWindow.DBTab.tree.refresh_tree(useCache=True)
                 # Indicate successful logon
                 loggedOn = True
             # If logon fails, inform user and offer to try again twice.
@@ -3818,6 +3828,8 @@ class ControlObject(object):
     def UpdateDataWindow(self):
         """ Update the Data Window, as when the "Update Database Window" command is issued """
         # NOTE:  This is called in MU when one user imports a database while another user is connected.
+        # The Data Window's Interval Trees will need to be rebuilt to reflect the imported data
+        IntervalIndex.Invalidate()
         # Tell the Data Window's Database Tree Tab's Tree to refresh itself
         self.DataWindow.DBTab.tree.refresh_tree()
 
@@ -3825,11 +3837,8 @@ class ControlObject(object):
         """ Update the DataWindow because a Document was edited """
         self.DataWindow.UpdateDataWindow()
 
-    def GetQuoteDataForDocument(self, documentNum, textPos=-1, textSel=(-2, -2)):
-        """ We need the Quote Data for a Document.  This data COULD be different in the live document, if edited,
-            than in the database.  This method checks to see if the Document in question is open.  If it is, it
-            returns the live Quote data.  If not, it returns the data from the database. """
-
+    def GetOpenDocument(self, documentNum):
+        """ Return the live Document object if the Document is open in the Document Window, or None if it is not """
         # Initialize a variable to hold the document when we find it
         docFound = None
         # For each Page in the TranscriptWindow Notebook ...
@@ -3846,21 +3855,32 @@ class ControlObject(object):
                 if docFound != None:
                     # ... we really can stop looking!
                     break
+        return docFound
+
+    def GetQuoteDataForDocument(self, documentNum, textPos=-1, textSel=(-2, -2)):
+        """ We need the Quote Data for a Document.  This data COULD be different in the live document, if edited,
+            than in the database.  This method checks to see if the Document in question is open.  If it is, it
+            returns the live Quote data.  If not, it returns the data from the database. """
+
+        # See if the document is open
+        docFound = self.GetOpenDocument(documentNum)
 
         # Get the Quote Data from the Database
         data = DBInterface.list_of_quotes_by_document(documentNum, textPos, textSel)
 
-        # Iterate through the list of quotes found in the DATABASE.  We need to go backwards because we may
-        # delete some elements, which screws up list iteration otherwise
-        for x in range(len(data)-1, -1, -1):
-            # If the Quote is in the LIVE document ...
-            if data[x]['QuoteNum'] in docFound.quote_dict.keys():
-                # ... use the live document's quote positions
-                (data[x]['StartChar'], data[x]['EndChar']) = docFound.quote_dict[data[x]['QuoteNum']]
-            # If the quote has been deleted from the LIVE Document ...
-            else:
-                # ... drop it from the Database List
-                del(data[x])
+        # If the document is open ...
+        if docFound != None:
+            # Iterate through the list of quotes found in the DATABASE.  We need to go backwards because we may
+            # delete some elements, which screws up list iteration otherwise
+            for x in range(len(data)-1, -1, -1):
+                # If the Quote is in the LIVE document ...
+                if data[x]['QuoteNum'] in docFound.quote_dict.keys():
+                    # ... use the live document's quote positions
+                    (data[x]['StartChar'], data[x]['EndChar']) = docFound.quote_dict[data[x]['QuoteNum']]
+                # If the quote has been deleted from the LIVE Document ...
+                else:
+                    # ... drop it from the Database List
+                    del(data[x])
         
         return data
 
@@ -4184,9 +4204,9 @@ class ControlObject(object):
         # Return the function result obtained
         return result
         
-    def AdjustIndexes(self, adjustmentAmount):
-        """ Adjust Transcript Time Codes by the specified amount """
-        self.TranscriptWindow.AdjustIndexes(adjustmentAmount)
+    def AdjustIndexes(self, adjustmentAmount, startTime=None, endTime=None):
+        """ Adjust Transcript Time Codes by the specified amount, optionally only from startTime to endTime """
+        self.TranscriptWindow.AdjustIndexes(adjustmentAmount, startTime, endTime)
 
     def TextTimeCodeConversion(self):
         """ Convert Text (H:MM:SS.hh) Time Codes to Transana's Format """
@@ -0,0 +1,316 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This module implements a scheduler that runs several FFmpeg media extraction or conversion
+    processes at the same time.  It is used by the Batch Waveform Generator, and can be used for
+    any other job that is handled by the WaveformProgress dialog, including Media Conversion. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+DEBUG = False
+if DEBUG:
+    print "ConversionScheduler DEBUG is ON!!"
+
+# import wxPython
+import wx
+# Import Transana's Miscellaneous routines
+import Misc
+# import Transana's waveform progress routines
+import WaveformProgress
+# import Python's multiprocessing module
+import multiprocessing
+# import Python's os module
+import os
+# import Python's time module
+import time
+
+# Job Status values
+JOB_PENDING   = 'pending'
+JOB_RUNNING   = 'running'
+JOB_COMPLETED = 'completed'
+JOB_SKIPPED   = 'skipped'
+JOB_FAILED    = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+
+def DefaultProcessCount():
+    """ Return the number of simultaneous processes to run by default, which is the number of computer cores """
+    # Start exception handling
+    try:
+        # Note the number of computer cores available
+        return multiprocessing.cpu_count()
+    # If this raises an exception ...
+    except:
+        # ... then we can only be sure of one core
+        return 1
+
+
+class ConversionJob(object):
+    """ A single media extraction or conversion job to be run by the ConversionScheduler.
+        mode is passed to WaveformProgress.Extract(), so can be 'AudioExtraction' or 'CustomConvert'.
+        For 'CustomConvert', processCommand must hold the FFmpeg command, as for WaveformProgress.SetProcessCommand(). """
+
+    def __init__(self, sourceFile, destFile, mode='AudioExtraction', prompt='', processCommand=None, clipStart=0, clipDuration=0):
+        """ Initialize the Conversion Job """
+        # Remember the source and destination files
+        self.sourceFile = sourceFile
+        self.destFile = destFile
+        # Remember the extraction mode and the process command, if one is needed
+        self.mode = mode
+        self.processCommand = processCommand
+        # Remember the progress dialog prompt
+        self.prompt = prompt
+        # Remember the clip start and duration, which are needed for Clip Export
+        self.clipStart = clipStart
+        self.clipDuration = clipDuration
+        # Initialize the job's status
+        self.status = JOB_PENDING
+        # Initialize the number of attempts made on this job
+        self.attempts = 0
+        # Initialize the error messages from the last attempt
+        self.errorMessages = []
+        # Initialize the start time and the elapsed time (in seconds) of the last attempt
+        self.startTime = 0.0
+        self.elapsed = 0.0
+
+
+class ConversionScheduler(object):
+    """ Run a list of ConversionJobs, keeping up to maxProcesses FFmpeg processes running at once.
+        Each running job gets its own non-modal WaveformProgress dialog to show per-file progress.
+        Jobs whose destination file is already current are skipped unless overwrite is True, and
+        failed jobs are re-queued up to maxRetries times.  When all jobs are done, onComplete(scheduler)
+        is called, and GetSummary() describes the results. """
+
+    def __init__(self, parent, maxProcesses=0, maxRetries=1, overwrite=False, onComplete=None):
+        """ Initialize the Conversion Scheduler.  maxProcesses of 0 means use the number of computer cores. """
+        # Remember the parent window, which will be the parent of the progress dialogs
+        self.parent = parent
+        # If the number of processes is not specified ...
+        if maxProcesses <= 0:
+            # ... use one process per computer core
+            maxProcesses = DefaultProcessCount()
+        self.maxProcesses = maxProcesses
+        # Remember the number of times a failed job should be retried
+        self.maxRetries = maxRetries
+        # Remember whether existing destination files should be over-written
+        self.overwrite = overwrite
+        # Remember the method to call when all jobs are done
+        self.onComplete = onComplete
+        # Initialize the list of all jobs, in the order they were added
+        self.jobs = []
+        # Initialize the queue of jobs waiting to run
+        self.pendingJobs = []
+        # Initialize the dictionary of running jobs, keyed by progress dialog index number
+        self.runningJobs = {}
+        # Initialize the number of retries performed
+        self.retryCount = 0
+        # Initialize the log of events, used for the summary
+        self.log = []
+        # Initialize the start time for the whole batch
+        self.startTime = 0.0
+        self.elapsed = 0.0
+        # Note that we are not running yet
+        self.isRunning = False
+
+        # Create a Timer to start new processes as old ones finish
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+
+    def AddJob(self, job):
+        """ Add a ConversionJob to the scheduler's queue """
+        # Add the job to the list of all jobs
+        self.jobs.append(job)
+        # Add the job to the queue of jobs to process
+        self.pendingJobs.append(job)
+
+    def Start(self):
+        """ Start processing the queued jobs """
+        # Note the time processing started
+        self.startTime = time.time()
+        # Note that we are running
+        self.isRunning = True
+        # Start as many jobs as we can right away
+        self.OnTimer(None)
+        # If we're not finished already, check for free processors every half second
+        if self.isRunning:
+            self.timer.Start(500)
+
+    def IsCurrent(self, job):
+        """ Determine if a job's destination file already exists and is newer than its source file """
+        # Start exception handling
+        try:
+            # The destination file is current if it exists, is not empty, and is not older than the source file
+            return os.path.exists(job.destFile) and \
+                   (os.path.getsize(job.destFile) > 0) and \
+                   (os.path.getmtime(job.destFile) >= os.path.getmtime(job.sourceFile))
+        # If there's a problem checking the files (such as a missing source file) ...
+        except (OSError, IOError):
+            # ... the destination file is not current
+            return False
+
+    def RemovePartialOutput(self, job):
+        """ Delete whatever a failed or cancelled job left in its destination file """
+        # Start exception handling
+        try:
+            # If the destination file exists ...
+            if os.path.exists(job.destFile):
+                # ... delete it, as it can't be trusted
+                os.remove(job.destFile)
+        # If the file can't be removed, there's nothing more we can do
+        except (OSError, IOError):
+
+            if DEBUG:
+                import sys
+                print "ConversionScheduler.RemovePartialOutput():", sys.exc_info()[0], sys.exc_info()[1]
+
+    def OnTimer(self, event):
+        """ Start more extraction processes while there are processors free and jobs to process """
+        # While there are processors free and jobs to process ...
+        while (len(self.runningJobs) < self.maxProcesses) and (len(self.pendingJobs) > 0):
+            # Get the next job from the queue
+            job = self.pendingJobs.pop(0)
+            # If this is the first attempt on this job and its destination file is already current ...
+            if (job.attempts == 0) and (not self.overwrite) and self.IsCurrent(job):
+                # ... skip the job
+                job.status = JOB_SKIPPED
+                self.log.append((job, JOB_SKIPPED))
+                continue
+            # Otherwise, start the job
+            self.StartJob(job)
+        # If there are no jobs running or waiting to run ...
+        if (len(self.runningJobs) == 0) and (len(self.pendingJobs) == 0):
+            # ... we are done!
+            self.OnBatchComplete()
+
+    def StartJob(self, job):
+        """ Start the FFmpeg process for a single job """
+        # Count the attempt
+        job.attempts += 1
+        job.status = JOB_RUNNING
+        job.errorMessages = []
+        job.startTime = time.time()
+        # Create the Progress Dialog, allowing MULTIPLE THREADS and reporting back to the scheduler
+        progressDlg = WaveformProgress.WaveformProgress(self.parent, job.prompt, job.clipStart, job.clipDuration,
+                                                        showModally=False, completionCallback=self.OnJobComplete)
+        # If there are NO currently-running jobs ...
+        if self.runningJobs == {}:
+            # ... then set the index to 1
+            indexNum = 1
+        # If there are currently-running jobs ...
+        else:
+            # ... then set the index to 1 more than the largest current number
+            indexNum = max(self.runningJobs) + 1
+        # Have the Progress Dialog remember its index number
+        progressDlg.indexNum = indexNum
+        # Have the Progress Dialog remember the name of the file being converted
+        progressDlg.originalFilename = job.sourceFile
+        # Add the job to the dictionary that holds the running jobs
+        self.runningJobs[indexNum] = job
+        # If we have a custom process command ...
+        if job.processCommand is not None:
+            # ... pass it to the Progress Dialog
+            progressDlg.SetProcessCommand(job.processCommand)
+
+        if DEBUG:
+            print "ConversionScheduler.StartJob():", indexNum, job.sourceFile.encode('utf8'), "attempt", job.attempts
+
+        # Tell the Waveform Progress Dialog to start the process
+        progressDlg.Extract(job.sourceFile, job.destFile, mode=job.mode)
+
+    def OnJobComplete(self, progressDlg):
+        """ Called by a WaveformProgress dialog when its process has ended """
+        # Get the job from the dictionary of running jobs, removing it
+        job = self.runningJobs.pop(progressDlg.indexNum)
+        # Note the time the job took
+        job.elapsed = time.time() - job.startTime
+        # Get the Error Log that may have been created
+        job.errorMessages = progressDlg.GetErrorMessages()
+        # If the job was CANCELLED by the user ...
+        if (len(job.errorMessages) == 1) and (job.errorMessages[0] == 'Cancelled'):
+            # ... remove the partial destination file ...
+            self.RemovePartialOutput(job)
+            # ... and note the cancellation.  We don't retry cancelled jobs.
+            job.status = JOB_CANCELLED
+            self.log.append((job, JOB_CANCELLED))
+        # If FFmpeg finished successfully and the destination file was created ...
+        elif (progressDlg.GetExitCode() == 0) and \
+             os.path.exists(job.destFile) and (os.path.getsize(job.destFile) > 0):
+            # ... the job succeeded
+            job.status = JOB_COMPLETED
+            self.log.append((job, JOB_COMPLETED))
+        # If the job failed but can be retried ...
+        elif job.attempts <= self.maxRetries:
+            # ... remove the partial destination file, which would otherwise look current later ...
+            self.RemovePartialOutput(job)
+            # ... note the retry ...
+            self.retryCount += 1
+            self.log.append((job, 'retry'))
+            # ... and put the job back on the queue
+            job.status = JOB_PENDING
+            self.pendingJobs.append(job)
+        # If the job failed and can't be retried ...
+        else:
+            # ... remove the partial destination file ...
+            self.RemovePartialOutput(job)
+            # ... and note the failure
+            job.status = JOB_FAILED
+            self.log.append((job, JOB_FAILED))
+        # The Progress Dialog closes itself after calling us.  Destroy it once that's done.
+        wx.CallAfter(progressDlg.Destroy)
+        # Start the next job now rather than waiting for the timer
+        self.OnTimer(None)
+
+    def OnBatchComplete(self):
+        """ All jobs have been processed """
+        # If we've already finished, there's nothing more to do
+        if not self.isRunning:
+            return
+        # Stop the timer
+        self.timer.Stop()
+        # Note that we are no longer running
+        self.isRunning = False
+        # Note the total time taken
+        self.elapsed = time.time() - self.startTime
+        # If a completion method was specified ...
+        if self.onComplete is not None:
+            # ... call it
+            self.onComplete(self)
+
+    def GetJobsByStatus(self, status):
+        """ Return a list of the jobs with the given status """
+        return [job for job in self.jobs if job.status == status]
+
+    def GetSummary(self):
+        """ Return a summary of the results of the batch as a string, for display to the user """
+        # Build the summary counts
+        prompt = unicode(_("%d file(s) processed, %d skipped because they were already current, %d failed, %d cancelled."), 'utf8')
+        summary = prompt % (len(self.GetJobsByStatus(JOB_COMPLETED)), len(self.GetJobsByStatus(JOB_SKIPPED)),
+                            len(self.GetJobsByStatus(JOB_FAILED)), len(self.GetJobsByStatus(JOB_CANCELLED)))
+        # If any jobs were retried ...
+        if self.retryCount > 0:
+            # ... report the number of retries
+            prompt = unicode(_("%d retry attempt(s) were made."), 'utf8')
+            summary += '\n' + prompt % self.retryCount
+        # Report the total time taken
+        prompt = unicode(_("Total time: %s using %d simultaneous process(es)."), 'utf8')
+        summary += '\n' + prompt % (Misc.TimeMsToStr(self.elapsed * 1000), self.maxProcesses)
+        # If there were failures ...
+        if len(self.GetJobsByStatus(JOB_FAILED)) > 0:
+            # ... list the files that failed
+            summary += '\n\n' + unicode(_("The following files could not be processed:"), 'utf8')
+            for job in self.GetJobsByStatus(JOB_FAILED):
+                summary += '\n  ' + job.sourceFile
+        return summary
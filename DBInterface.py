@@ -76,6 +76,8 @@ import CoreData
 import Dialogs
 # import Transana's Episode Object
 import Episode
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Keyword Object
 import KeywordObject
 # import Transana's Note Object
@@ -912,6 +914,33 @@ def CreateSynonymsTableQuery(num):
     # Return the query to the calling routine
     return query % num
 
+def CreateCollectionClosureTableQuery(num):
+    """ Create query for the Collection Closure Table, which has a record for each Collection paired with itself
+        and with every Collection it is nested in, so that all the Collections nested in a Collection at any
+        depth can be found with a single query """
+
+    # Collection Closure Table: Test for existence and create if needed
+    query = """
+              CREATE TABLE IF NOT EXISTS CollectionClosure%d
+                (AncestorNum    INTEGER NOT NULL, 
+                 DescendantNum  INTEGER NOT NULL, 
+                 Depth          INTEGER NOT NULL, 
+                 PRIMARY KEY (AncestorNum, DescendantNum)"""
+    # Add MySQL-specific SQL if appropriate
+    if TransanaConstants.DBInstalled in ['MySQLdb-embedded', 'MySQLdb-server', 'PyMySQL']:
+        # MySQL can index the Descendant Number as part of the CREATE TABLE query
+        query += """,
+                 KEY (DescendantNum))
+                 DEFAULT CHARACTER SET utf8
+                 COLLATE utf8_bin
+            """
+    elif TransanaConstants.DBInstalled in ['sqlite3']:
+        query += ')'
+    # Add the appropriate Table Type to the CREATE Query
+    query = SetTableType(TransanaGlobal.hasInnoDB, query)
+    # Return the query to the calling routine
+    return query % num
+
 
 def establish_db_exists(dbToOpen=None, usePrompt=True):
     """ Check for the existence of all database tables and create them
@@ -1216,6 +1245,37 @@ def establish_db_exists(dbToOpen=None, usePrompt=True):
         # Execute the Query
         dbCursor.execute(query)
 
+        # CollectionClosure2 Table: Test for existence and create if needed
+        query = CreateCollectionClosureTableQuery(2)
+        # Execute the Query
+        dbCursor.execute(query)
+        # sqlite can't index the Descendant Number in the CREATE TABLE query, so create the index separately
+        if TransanaConstants.DBInstalled in ['sqlite3']:
+            query = "CREATE INDEX IF NOT EXISTS CollectionClosure2Descendants ON CollectionClosure2 (DescendantNum)"
+            dbCursor.execute(query)
+        # The Collection Closure table is new, and isn't maintained by older versions of Transana, which may add, delete,
+        # or move Collections in a multi-user database.  Deeper records follow from each Collection's own record and
+        # its parent record, so check those against the Collections table.  First, count the Collections that are
+        # missing their own record, or whose parent record doesn't match their Parent Collection (counting a missing
+        # parent record as 0, as a top-level Collection has no parent record.)
+        query = """SELECT COUNT(*) FROM Collections2 c
+                     LEFT JOIN CollectionClosure2 s ON s.AncestorNum = c.CollectNum AND s.DescendantNum = c.CollectNum AND s.Depth = 0
+                     LEFT JOIN Collections2 p ON p.CollectNum = c.ParentCollectNum
+                     LEFT JOIN CollectionClosure2 cc ON cc.DescendantNum = c.CollectNum AND cc.Depth = 1
+                     WHERE s.DescendantNum IS NULL OR COALESCE(cc.AncestorNum, 0) <> COALESCE(p.CollectNum, 0)"""
+        dbCursor.execute(query)
+        mismatchCount = dbCursor.fetchone()[0]
+        # Then count the records left behind for Collections that have been deleted
+        query = """SELECT COUNT(*) FROM CollectionClosure2 cc
+                     LEFT JOIN Collections2 a ON a.CollectNum = cc.AncestorNum
+                     LEFT JOIN Collections2 d ON d.CollectNum = cc.DescendantNum
+                     WHERE a.CollectNum IS NULL OR d.CollectNum IS NULL"""
+        dbCursor.execute(query)
+        mismatchCount += dbCursor.fetchone()[0]
+        # If anything doesn't match, the Collection Closure table is out of date and must be rebuilt from the Collections table.
+        if mismatchCount > 0:
+            RebuildCollectionClosure()
+
         #  Clips2 Table: Test for existence and create if needed
         query = CreateClipsTableQuery(2)
         # Execute the Query
@@ -2821,12 +2881,20 @@ def list_of_quotes_by_document(DocumentNum, textPos=-1, textSel=(-2, -2)):
     DBCursor.close()
     return l
 
-def list_of_quotes_by_collectionnum(collectionNum, includeSortOrder=False):
+def list_of_quotes_by_collectionnum(collectionNum, includeSortOrder=False, includeNested=False):
     quoteList = []
-    query = """ SELECT QuoteNum, QuoteID, CollectNum, SortOrder, SourceDocumentNum
-                FROM Quotes2
-                WHERE CollectNum = %s
-                ORDER BY SortOrder, QuoteID """
+    # If requested, include the Quotes from all Nested Collections, at any depth
+    if includeNested:
+        query = """ SELECT q.QuoteNum, q.QuoteID, q.CollectNum, q.SortOrder, q.SourceDocumentNum
+                    FROM Quotes2 q, CollectionClosure2 cc
+                    WHERE q.CollectNum = cc.DescendantNum AND
+                          cc.AncestorNum = %s
+                    ORDER BY q.SortOrder, q.QuoteID """
+    else:
+        query = """ SELECT QuoteNum, QuoteID, CollectNum, SortOrder, SourceDocumentNum
+                    FROM Quotes2
+                    WHERE CollectNum = %s
+                    ORDER BY SortOrder, QuoteID """
     # Adjust the query for sqlite if needed
     query = FixQuery(query)
     cursor = get_db().cursor()
@@ -2904,12 +2972,20 @@ def list_of_clips_by_collection(CollectionID, ParentNum):
     DBCursor.close()
     return l
 
-def list_of_clips_by_collectionnum(collectionNum, includeSortOrder=False):
+def list_of_clips_by_collectionnum(collectionNum, includeSortOrder=False, includeNested=False):
     clipList = []
-    query = """ SELECT ClipNum, ClipID, CollectNum, SortOrder
-                FROM Clips2
-                WHERE CollectNum = %s
-                ORDER BY SortOrder, ClipID """
+    # If requested, include the Clips from all Nested Collections, at any depth
+    if includeNested:
+        query = """ SELECT c.ClipNum, c.ClipID, c.CollectNum, c.SortOrder
+                    FROM Clips2 c, CollectionClosure2 cc
+                    WHERE c.CollectNum = cc.DescendantNum AND
+                          cc.AncestorNum = %s
+                    ORDER BY c.SortOrder, c.ClipID """
+    else:
+        query = """ SELECT ClipNum, ClipID, CollectNum, SortOrder
+                    FROM Clips2
+                    WHERE CollectNum = %s
+                    ORDER BY SortOrder, ClipID """
     # Adjust the query for sqlite if needed
     query = FixQuery(query)
     cursor = get_db().cursor()
@@ -3184,6 +3260,293 @@ def list_of_snapshots_by_collectionnum(collectionNum, includeSortOrder=False):
     cursor.close()
     return snapshotList
 
+def list_of_nested_collections(collectionNum, depthFirst=False):
+    """ Get a list of all the Collections nested in a Collection, at any depth, as (CollectNum, CollectID,
+        ParentCollectNum) tuples.  The Collections are listed breadth-first, or depth-first (the order of the
+        Database Tree) if depthFirst is True, with sibling Collections in CollectID order.  This is the same
+        order that repeated calls to list_of_collections() give, but it takes a single query. """
+    # Get all the Collections nested in the Collection from the Collection Closure table
+    query = """ SELECT c.CollectNum, c.CollectID, c.ParentCollectNum
+                FROM Collections2 c, CollectionClosure2 cc
+                WHERE c.CollectNum = cc.DescendantNum AND
+                      cc.AncestorNum = %s AND
+                      cc.Depth > 0
+                ORDER BY c.CollectID """
+    # Adjust the query for sqlite if needed
+    query = FixQuery(query)
+    # Get a Database Cursor
+    DBCursor = get_db().cursor()
+    # Execute the Query
+    DBCursor.execute(query, (collectionNum, ))
+    # Build a dictionary of the Collections nested directly in each Collection, keeping them in CollectID order
+    nestedCollections = {}
+    for row in fetchall_named(DBCursor):
+        id = row['CollectID']
+        if 'unicode' in wx.PlatformInfo:
+            id = ProcessDBDataForUTF8Encoding(id)
+        if nestedCollections.has_key(row['ParentCollectNum']):
+            nestedCollections[row['ParentCollectNum']].append((row['CollectNum'], id, row['ParentCollectNum']))
+        else:
+            nestedCollections[row['ParentCollectNum']] = [(row['CollectNum'], id, row['ParentCollectNum'])]
+    # Close the Database Cursor
+    DBCursor.close()
+    # Walk down the Collection tree from the requested Collection
+    l = []
+    collectionsToProcess = nestedCollections.get(collectionNum, [])[:]
+    while len(collectionsToProcess) > 0:
+        # Take the next Collection from the list and add it to the results
+        collection = collectionsToProcess[0]
+        del(collectionsToProcess[0])
+        l.append(collection)
+        # Depth-first, its nested Collections come next.  Breadth-first, they come after the Collections already listed.
+        if depthFirst:
+            collectionsToProcess = nestedCollections.get(collection[0], []) + collectionsToProcess
+        else:
+            collectionsToProcess += nestedCollections.get(collection[0], [])
+    # Return the list as the function result
+    return l
+
+def AddCollectionToClosure(collectNum, parentNum):
+    """ Add a new Collection to the Collection Closure table """
+    # Get a Database Cursor
+    DBCursor = get_db().cursor()
+    # Every Collection is paired with itself, at Depth 0
+    query = "INSERT INTO CollectionClosure2 (AncestorNum, DescendantNum, Depth) VALUES (%s, %s, 0)"
+    # Adjust the query for sqlite if needed
+    query = FixQuery(query)
+    DBCursor.execute(query, (collectNum, collectNum))
+    # If the Collection is nested, pair it with its parent and everything its parent is nested in
+    if parentNum:
+        query = """ INSERT INTO CollectionClosure2 (AncestorNum, DescendantNum, Depth)
+                      SELECT AncestorNum, %s, Depth + 1
+                      FROM CollectionClosure2
+                      WHERE DescendantNum = %s """
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, (collectNum, parentNum))
+    # Close the Database Cursor
+    DBCursor.close()
+
+def MoveCollectionInClosure(collectNum, parentNum):
+    """ Update the Collection Closure table for a Collection that has been saved, in case it has been moved to a
+        different parent Collection """
+    # The Collection Root has a parent of 0 or NULL
+    if parentNum == None:
+        parentNum = 0
+    # Get a Database Cursor
+    DBCursor = get_db().cursor()
+    # Get the Collection's current parent from the Collection Closure table
+    query = "SELECT AncestorNum, Depth FROM CollectionClosure2 WHERE DescendantNum = %s AND Depth < 2"
+    # Adjust the query for sqlite if needed
+    query = FixQuery(query)
+    DBCursor.execute(query, (collectNum, ))
+    oldParentNum = 0
+    inClosure = False
+    for (ancestorNum, depth) in DBCursor.fetchall():
+        if depth == 0:
+            inClosure = True
+        else:
+            oldParentNum = ancestorNum
+    # If the Collection is missing from the Collection Closure table, the table is out of date and must be rebuilt
+    if not inClosure:
+        DBCursor.close()
+        RebuildCollectionClosure()
+    # If the Collection has been moved ...
+    elif oldParentNum != parentNum:
+        # ... get the Collection and all the Collections nested in it.  These move together.
+        query = "SELECT DescendantNum, Depth FROM CollectionClosure2 WHERE AncestorNum = %s"
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, (collectNum, ))
+        subtree = DBCursor.fetchall()
+        # Get the Collections the Collection used to be nested in
+        query = "SELECT AncestorNum FROM CollectionClosure2 WHERE DescendantNum = %s AND Depth > 0"
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, (collectNum, ))
+        oldAncestors = DBCursor.fetchall()
+        # Remove the pairings between the moved Collections and their old ancestors.  MySQL can't use a sub-query
+        # on the table being deleted from, so the Collection Numbers, which are integers, go directly into the query.
+        if len(oldAncestors) > 0:
+            query = """ DELETE FROM CollectionClosure2
+                          WHERE DescendantNum IN (%s) AND
+                                AncestorNum IN (%s) """ % (', '.join(['%d' % row[0] for row in subtree]),
+                                                           ', '.join(['%d' % row[0] for row in oldAncestors]))
+            DBCursor.execute(query)
+        # If the Collection has been nested in another Collection ...
+        if parentNum:
+            # ... get the new parent and everything it is nested in
+            query = "SELECT AncestorNum, Depth FROM CollectionClosure2 WHERE DescendantNum = %s"
+            # Adjust the query for sqlite if needed
+            query = FixQuery(query)
+            DBCursor.execute(query, (parentNum, ))
+            # Pair each of the moved Collections with each of its new ancestors
+            values = []
+            for (ancestorNum, ancestorDepth) in DBCursor.fetchall():
+                for (descendantNum, descendantDepth) in subtree:
+                    values.append((ancestorNum, descendantNum, ancestorDepth + descendantDepth + 1))
+            query = "INSERT INTO CollectionClosure2 (AncestorNum, DescendantNum, Depth) VALUES (%s, %s, %s)"
+            # Adjust the query for sqlite if needed
+            query = FixQuery(query)
+            DBCursor.executemany(query, values)
+        # Close the Database Cursor
+        DBCursor.close()
+    else:
+        # Close the Database Cursor
+        DBCursor.close()
+
+def DeleteCollectionFromClosure(collectNum):
+    """ Remove a deleted Collection from the Collection Closure table """
+    # Get a Database Cursor
+    DBCursor = get_db().cursor()
+    # Remove the Collection's records.  (Nested Collections are deleted before the Collections they're nested in.)
+    query = "DELETE FROM CollectionClosure2 WHERE AncestorNum = %s OR DescendantNum = %s"
+    # Adjust the query for sqlite if needed
+    query = FixQuery(query)
+    DBCursor.execute(query, (collectNum, collectNum))
+    # Close the Database Cursor
+    DBCursor.close()
+
+def RebuildCollectionClosure():
+    """ Rebuild the Collection Closure table from the Collections table """
+    # Get a Database Cursor
+    DBCursor = get_db().cursor()
+    # Get the parent of every Collection in a single query
+    DBCursor.execute("SELECT CollectNum, ParentCollectNum FROM Collections2")
+    parents = {}
+    for (collectNum, parentCollectNum) in DBCursor.fetchall():
+        # Top-level Collections may have a NULL parent
+        if parentCollectNum == None:
+            parentCollectNum = 0
+        parents[collectNum] = parentCollectNum
+    # Pair each Collection with itself and with each Collection above it, climbing the tree to the Collection Root.
+    # A missing parent ends the climb, and limiting the depth guards against a loop in damaged data.
+    values = []
+    for collectNum in parents.keys():
+        ancestorNum = collectNum
+        depth = 0
+        while parents.has_key(ancestorNum) and (depth < len(parents)):
+            values.append((ancestorNum, collectNum, depth))
+            ancestorNum = parents[ancestorNum]
+            depth += 1
+    # Replace the contents of the Collection Closure table
+    DBCursor.execute("DELETE FROM CollectionClosure2")
+    if len(values) > 0:
+        query = "INSERT INTO CollectionClosure2 (AncestorNum, DescendantNum, Depth) VALUES (%s, %s, %s)"
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.executemany(query, values)
+    # Close the Database Cursor
+    DBCursor.close()
+
+def list_of_quotes_clips_and_keywords(libraryNum=0, documentNum=0, episodeNum=0, collectionNum=0):
+    """ Get the Quotes and Clips for a Library, Document, Episode, or Collection (including all nested Collections),
+        or for the whole database if none of these is specified, along with the Keywords applied to them.
+        Returns a list of (QuoteNum, QuoteID, CollectNum) tuples, a list of (ClipNum, ClipID, CollectNum) tuples,
+        and a sorted list of (KeywordGroup, Keyword) tuples.  This takes a handful of queries, rather than queries
+        for each Document, Episode, Collection, Quote, and Clip. """
+    # Determine the tables and conditions that limit the Quotes and Clips to the requested scope.
+    # For a Library, we want the Quotes from the Library's Documents and the Clips from the Library's Episodes.
+    if libraryNum != 0:
+        quoteTables = "Quotes2 q, Documents2 d"
+        quoteConditions = ["q.SourceDocumentNum = d.DocumentNum", "d.LibraryNum = %s"]
+        quoteArgs = (libraryNum, )
+        clipTables = "Clips2 c, Episodes2 e"
+        clipConditions = ["c.EpisodeNum = e.EpisodeNum", "e.SeriesNum = %s"]
+        clipArgs = (libraryNum, )
+    # For a Document, we want the Document's Quotes and no Clips
+    elif documentNum != 0:
+        quoteTables = "Quotes2 q"
+        quoteConditions = ["q.SourceDocumentNum = %s"]
+        quoteArgs = (documentNum, )
+        clipTables = None
+    # For an Episode, we want the Episode's Clips and no Quotes
+    elif episodeNum != 0:
+        quoteTables = None
+        clipTables = "Clips2 c"
+        clipConditions = ["c.EpisodeNum = %s"]
+        clipArgs = (episodeNum, )
+    # For a Collection, we want the Quotes and Clips in the Collection and all its nested Collections
+    elif collectionNum != 0:
+        # The Collection Closure table pairs the Collection with itself and all its nested Collections
+        quoteTables = "Quotes2 q, CollectionClosure2 cc"
+        quoteConditions = ["q.CollectNum = cc.DescendantNum", "cc.AncestorNum = %s"]
+        quoteArgs = (collectionNum, )
+        clipTables = "Clips2 c, CollectionClosure2 cc"
+        clipConditions = ["c.CollectNum = cc.DescendantNum", "cc.AncestorNum = %s"]
+        clipArgs = (collectionNum, )
+    # For the Collection Root, we want all Quotes and Clips
+    else:
+        quoteTables = "Quotes2 q"
+        quoteConditions = []
+        quoteArgs = ()
+        clipTables = "Clips2 c"
+        clipConditions = []
+        clipArgs = ()
+
+    # Initialize the results
+    quoteList = []
+    clipList = []
+    # Keywords are collected in a set, which eliminates duplicates
+    keywordSet = set()
+    # Get a Database Cursor
+    DBCursor = get_db().cursor()
+    # If Quotes are requested ...
+    if quoteTables != None:
+        # ... get the Quotes
+        query = "SELECT q.QuoteNum, q.QuoteID, q.CollectNum FROM %s" % quoteTables
+        if len(quoteConditions) > 0:
+            query += " WHERE " + " AND ".join(quoteConditions)
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, quoteArgs)
+        for (quoteNum, quoteID, collectNum) in DBCursor.fetchall():
+            if 'unicode' in wx.PlatformInfo:
+                quoteID = ProcessDBDataForUTF8Encoding(quoteID)
+            quoteList.append((quoteNum, quoteID, collectNum))
+        # ... and get the Keywords applied to those Quotes
+        query = "SELECT DISTINCT k.KeywordGroup, k.Keyword FROM ClipKeywords2 k, %s WHERE " % quoteTables
+        query += " AND ".join(["k.QuoteNum = q.QuoteNum"] + quoteConditions)
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, quoteArgs)
+        for (kwg, kw) in DBCursor.fetchall():
+            if 'unicode' in wx.PlatformInfo:
+                kwg = ProcessDBDataForUTF8Encoding(kwg)
+                kw = ProcessDBDataForUTF8Encoding(kw)
+            keywordSet.add((kwg, kw))
+    # If Clips are requested ...
+    if clipTables != None:
+        # ... get the Clips
+        query = "SELECT c.ClipNum, c.ClipID, c.CollectNum FROM %s" % clipTables
+        if len(clipConditions) > 0:
+            query += " WHERE " + " AND ".join(clipConditions)
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, clipArgs)
+        for (clipNum, clipID, collectNum) in DBCursor.fetchall():
+            if 'unicode' in wx.PlatformInfo:
+                clipID = ProcessDBDataForUTF8Encoding(clipID)
+            clipList.append((clipNum, clipID, collectNum))
+        # ... and get the Keywords applied to those Clips
+        query = "SELECT DISTINCT k.KeywordGroup, k.Keyword FROM ClipKeywords2 k, %s WHERE " % clipTables
+        query += " AND ".join(["k.ClipNum = c.ClipNum"] + clipConditions)
+        # Adjust the query for sqlite if needed
+        query = FixQuery(query)
+        DBCursor.execute(query, clipArgs)
+        for (kwg, kw) in DBCursor.fetchall():
+            if 'unicode' in wx.PlatformInfo:
+                kwg = ProcessDBDataForUTF8Encoding(kwg)
+                kw = ProcessDBDataForUTF8Encoding(kw)
+            keywordSet.add((kwg, kw))
+    # Close the Database Cursor
+    DBCursor.close()
+    # Sort the Keywords
+    keywordList = list(keywordSet)
+    keywordList.sort()
+    # Return the results
+    return (quoteList, clipList, keywordList)
+
 def CountItemsWithoutPlainText():
     """ Return the number of Documents, Episode Transcripts, Quote, and Clip Transcripts that have NULL in their PlainText Column.
         This indicates the need to update the PlainText data! """
@@ -4334,16 +4697,36 @@ def list_all_keyword_examples_for_all_clips_in_a_collection(collectionNum):
         nested Collections recursively """
     # Start with an empty list
     kwExamples = []
-    # Get a list of all Clips in the Collection
-    for (clipNum, clipID, collectNum) in list_of_clips_by_collectionnum(collectionNum):
-        # Get a list of all Keyword Examples for each Clip
-        kwExamples = kwExamples + list_all_keyword_examples_for_a_clip(clipNum)
-    # Now get a list of Nested Collections
-    collectionList = list_of_collections(collectionNum)
-    # For each Nested Collection ...
-    for collection in collectionList:
-        # ... add its Clip Keyword Examples to the Keyword Example List recursively
-        kwExamples = kwExamples + list_all_keyword_examples_for_all_clips_in_a_collection(collection[0])
+    # Create a query to find all Keyword Examples for the Clips in the Collection and its Nested Collections
+    query = """ SELECT CK.KeywordGroup, CK.Keyword, CK.ClipNum, C.ClipID, C.CollectNum
+                FROM ClipKeywords2 CK, Clips2 C, CollectionClosure2 CC
+                WHERE CK.Example = 1 AND
+                      CK.ClipNum = C.ClipNum AND
+                      C.CollectNum = CC.DescendantNum AND
+                      CC.AncestorNum = %s
+                ORDER BY C.SortOrder, C.ClipID, CK.KeywordGroup, CK.Keyword """
+    # Adjust the query for sqlite if needed
+    query = FixQuery(query)
+    # Get a Database Cursor
+    cursor = get_db().cursor()
+    # Execute the query
+    cursor.execute(query, (collectionNum, ))
+    # Group the Keyword Examples by Collection, keeping them in Clip order
+    collectionExamples = {}
+    for (kwg, kw, clipNumber, clipID, collectNum) in cursor.fetchall():
+        kwg = ProcessDBDataForUTF8Encoding(kwg)
+        kw = ProcessDBDataForUTF8Encoding(kw)
+        clipID = ProcessDBDataForUTF8Encoding(clipID)
+        if collectionExamples.has_key(collectNum):
+            collectionExamples[collectNum].append((kwg, kw, clipNumber, clipID))
+        else:
+            collectionExamples[collectNum] = [(kwg, kw, clipNumber, clipID)]
+    # Close the Database Cursor
+    cursor.close()
+    # List the Collection's Keyword Examples first, followed by those of its Nested Collections in Database Tree order
+    kwExamples += collectionExamples.get(collectionNum, [])
+    for (collectNum, collectID, parentCollectNum) in list_of_nested_collections(collectionNum, depthFirst=True):
+        kwExamples += collectionExamples.get(collectNum, [])
     # Return the Keyword Example List to the calling routine
     return kwExamples
 
@@ -4379,6 +4762,8 @@ def list_all_keyword_examples_for_a_clip(clipnum):
 
 def delete_all_keywords_for_a_group(epnum, docnum, clipnum, quotenum, snapshotnum):
     """ Given an Episode, Document, Clip, Quote, or Snapshot number, delete the appropriate keywordgroup/word pairs. """
+    # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+    IntervalIndex.Invalidate()
     # If we have an Episode Number ...
     if epnum != 0:
         # .. delete the Episode Keywords
@@ -4422,6 +4807,8 @@ def delete_all_keywords_for_a_group(epnum, docnum, clipnum, quotenum, snapshotnu
 
 def insert_clip_keyword(ep_num, doc_num, clip_num, quote_num, snapshot_num, kw_group, kw, exampleValue=0):
     """Insert a new record in the Clip Keywords table."""
+    # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+    IntervalIndex.Invalidate()
     if 'unicode' in wx.PlatformInfo:
         kw_group = kw_group.encode(TransanaGlobal.encoding)
         kw = kw.encode(TransanaGlobal.encoding)
@@ -4475,6 +4862,8 @@ def add_keyword(group, kw_name):
 def delete_keyword_group(name):
     """Delete a Keyword Group from the database, including all associated
     keywords."""
+    # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+    IntervalIndex.Invalidate()
 
     if 'unicode' in wx.PlatformInfo:
         kwg = name.encode(TransanaGlobal.encoding)
@@ -4696,6 +5085,8 @@ def delete_keyword_group(name):
 
 def delete_keyword(group, kw_name):
     """Delete a Keyword from the database."""
+    # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+    IntervalIndex.Invalidate()
     if 'unicode' in wx.PlatformInfo:
         kwg = group.encode(TransanaGlobal.encoding)
         kw = kw_name.encode(TransanaGlobal.encoding)
@@ -5048,6 +5439,8 @@ def ClearAllSynonyms():
 
 def ClearSourceEpisodeRecords(episodeNum):
     """ When an Episode is deleted, it must be removed from any Snapshots that claim it. """
+    # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+    IntervalIndex.Invalidate()
 
     # NOTE:  This routine is not perfect.  If a Snapshot record is locked by another user, the record WILL be changed
     #        here but that change will be wiped out when the user with the record lock saves (thus restoring the
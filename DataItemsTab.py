@@ -28,6 +28,8 @@ import Clip
 import Collection
 # import Database Calls
 import DBInterface
+# import Transana's Interval Index
+import IntervalIndex
 # import Miscellaneous Routines
 import Misc
 # import Transana's Snapshot Object
@@ -105,29 +107,132 @@ class DataItemsTab(wx.Panel):
         self.SetAutoLayout(True)
         self.Layout()
 
+    def GetItemIndex(self):
+        """ Get the Interval Tree of the Clips and Snapshots for the Episode, building it from the database if needed """
+        # Get the Episode's Interval Tree, if it has already been built
+        index = IntervalIndex.GetIndex(('Episode', self.episodeObj.number))
+        # If the Interval Tree hasn't been built, or has been invalidated by a change in the data ...
+        if index is None:
+            # ... initialize the list of intervals
+            intervals = []
+            # Get ALL the clip data for the Episode from the database
+            for clip in DBInterface.list_of_clips_by_episode(self.episodeObj.number):
+                # Add the Clip's interval
+                intervals.append((clip['ClipStart'], clip['ClipStop'], ('Clip', clip['ClipNum'])))
+            if TransanaConstants.proVersion:
+                # Get ALL the snapshot data for the Episode from the database
+                for snapshot in DBInterface.list_of_snapshots_by_episode(self.episodeObj.number):
+                    # Add the Snapshot's interval
+                    intervals.append((snapshot['SnapshotStart'], snapshot['SnapshotStop'], ('Snapshot', snapshot['SnapshotNum'])))
+            # Build the Interval Tree ...
+            index = IntervalIndex.IntervalTree(intervals)
+            # ... and save it so the other tabs can use it
+            IntervalIndex.SetIndex(('Episode', self.episodeObj.number), index)
+        return index
+
+    def GetRowData(self, index, item):
+        """ Get the information needed to display an item in the Grid, loading it from the database the first time """
+        # If we've already loaded this item, we can use what we saved
+        if index.itemData.has_key(item):
+            return index.itemData[item]
+        # Split the item into the object type and number
+        (objType, objNum) = item
+        # If we have a Clip ...
+        if objType == 'Clip':
+            # ... load the Clip.  Skip the Transcripts, which we don't need.
+            tmpObj = Clip.Clip(objNum, skipText=True)
+            # ... get the start, stop times
+            startTime = tmpObj.clip_start
+            stopTime = tmpObj.clip_stop
+            # Initialize the string for all the Keywords to blank
+            kwString = unicode('', 'utf8')
+            # Initialize the prompt for building the keyword string
+            kwPrompt = '%s'
+        # If we have a Snapshot ...
+        elif objType == 'Snapshot':
+            # ... load the Snapshot
+            tmpObj = Snapshot.Snapshot(objNum)
+            # ... get the start, stop times
+            startTime = tmpObj.episode_start
+            stopTime = tmpObj.episode_start + tmpObj.episode_duration
+            # if there are whole snapshot keywords ...
+            if len(tmpObj.keyword_list) > 0:
+                # ... initialize the string for all the Keywords to indicate this
+                kwString = unicode(_('Whole:'), 'utf8') + '\n'
+            # If there are NOT whole snapshot keywords ...
+            else:
+                # ... initialize the string for all the Keywords to blank
+                kwString = unicode('', 'utf8')
+            # Initialize the prompt for building the keyword string
+            kwPrompt = '  %s'
+        # For each Keyword in the Keyword List ...
+        for kws in tmpObj.keyword_list:
+            # ... add the Keyword to the Keyword List
+            kwString += kwPrompt % kws.keywordPair
+            # If we have a Clip ...
+            if objType == 'Clip':
+                # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
+                kwPrompt = '\n%s'
+            # If we have a Snapshot ...
+            elif objType == 'Snapshot':
+                # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
+                kwPrompt = '\n  %s'
+
+        # If we have a Snapshot, we also want to display CODED Keywords in addition to the WHOLE Snapshot keywords
+        # we've already included
+        if objType == 'Snapshot':
+            # Keep a list of the coded keywords we've already displayed
+            codedKeywords = []
+            # Modify the template for additional keywords
+            kwPrompt = '\n  %s : %s'
+            # For each of the Snapshot's Coding Objects ...
+            for x in range(len(tmpObj.codingObjects)):
+                # ... if the Coding Object is visible and if it is not already in the codedKeywords list ...
+                if (tmpObj.codingObjects[x]['visible']) and \
+                  (not (tmpObj.codingObjects[x]['keywordGroup'], tmpObj.codingObjects[x]['keyword']) in codedKeywords):
+                    # ... if this is the FIRST Coded Keyword ...
+                    if len(codedKeywords) == 0:
+                        # ... and if there WERE Whole Snapshot Keywords ...
+                        if len(kwString) > 0:
+                            # ... then add a line break to the Keywords String ...
+                            kwString += '\n'
+                        # ... add the indicator to the Keywords String that we're starting to show Coded Keywords
+                        kwString += unicode(_('Coded:'), 'utf8')
+                    # ... add the coded keyword to the Keywords String ...
+                    kwString += kwPrompt % (tmpObj.codingObjects[x]['keywordGroup'], tmpObj.codingObjects[x]['keyword'])
+                    # ... add the keyword to the Coded Keywords list
+                    codedKeywords.append((tmpObj.codingObjects[x]['keywordGroup'], tmpObj.codingObjects[x]['keyword']))
+
+        # Save what we need to display the item, so we don't need to load it again
+        index.itemData[item] = {'start' : startTime,
+                                'stop' : stopTime,
+                                'nodeString' : tmpObj.GetNodeString(True),
+                                'kwString' : kwString,
+                                'number' : tmpObj.number,
+                                'objType' : objType}
+        return index.itemData[item]
+
     def DisplayCells(self, TimeCode):
-        """ Get data from the database and populate the Episode Clips / Selected Clips Grid """
-        # Get clip data from the database
-        clipData = DBInterface.list_of_clips_by_episode(self.episodeObj.number, TimeCode)
-        if TransanaConstants.proVersion:
-            # Get the snapshot data from the database
-            snapshotData = DBInterface.list_of_snapshots_by_episode(self.episodeObj.number, TimeCode)
+        """ Populate the Episode Clips / Selected Clips Grid from the Episode's Interval Tree """
+        # Get the Interval Tree for the Episode's Clips and Snapshots
+        index = self.GetItemIndex()
+        # If we're showing all Items ...
+        if TimeCode == None:
+            # ... get all the intervals
+            intervals = index.GetAll()
+        # If we're showing Selected Items ...
+        else:
+            # ... find the intervals that contain the Time Code.  Items end just BEFORE their stop time.
+            intervals = [interval for interval in index.Stab(TimeCode) if interval[0] <= TimeCode < interval[1]]
 
-        # Combine the two lists
+        # Get the display data for each item
         cellData = {}
-        # For each Clip ...
-        for clip in clipData:
-            # load the Clip
-            tmpObj = Clip.Clip(clip['ClipNum'])
-            # add the Clip to the cellData
-            cellData[(clip['ClipStart'], clip['ClipStop'], tmpObj.GetNodeString(True).upper())] = tmpObj
-        if TransanaConstants.proVersion:
-            # for each Snapshot ...
-            for snapshot in snapshotData:
-                # load the Snapshot
-                tmpObj = Snapshot.Snapshot(snapshot['SnapshotNum'])
-                # add the Snapshot to the cellData
-                cellData[(snapshot['SnapshotStart'], snapshot['SnapshotStop'], tmpObj.GetNodeString(True).upper())] = tmpObj
+        # For each interval ...
+        for (start, stop, item) in intervals:
+            # ... get the item's display data
+            rowData = self.GetRowData(index, item)
+            # add the item to the cellData
+            cellData[(start, stop, rowData['nodeString'].upper())] = rowData
 
         # Get the Keys for the cellData
         sortedKeys = cellData.keys()
@@ -144,83 +249,19 @@ class DataItemsTab(wx.Panel):
         loop = 0
         # Add the data to the Grid
         for keyVals in sortedKeys:
-            # If we have a Clip ...
-            if isinstance(cellData[keyVals], Clip.Clip):
-                # ... get the start, stop times and the object type
-                startTime = cellData[keyVals].clip_start
-                stopTime = cellData[keyVals].clip_stop
-                objType = 'Clip'
-                # Initialize the string for all the Keywords to blank
-                kwString = unicode('', 'utf8')
-                # Initialize the prompt for building the keyword string
-                kwPrompt = '%s'
-            # If we have a Snapshot ...
-            elif isinstance(cellData[keyVals], Snapshot.Snapshot):
-                # ... get the start, stop times and the object type
-                startTime = cellData[keyVals].episode_start
-                stopTime = cellData[keyVals].episode_start + cellData[keyVals].episode_duration
-                objType = 'Snapshot'
-                # if there are whole snapshot keywords ...
-                if len(cellData[keyVals].keyword_list) > 0:
-                    # ... initialize the string for all the Keywords to indicate this
-                    kwString = unicode(_('Whole:'), 'utf8') + '\n'
-                # If there are NOT whole snapshot keywords ...
-                else:
-                    # ... initialize the string for all the Keywords to blank
-                    kwString = unicode('', 'utf8')
-                # Initialize the prompt for building the keyword string
-                kwPrompt = '  %s'
-            # For each Keyword in the Keyword List ...
-            for kws in cellData[keyVals].keyword_list:
-                # ... add the Keyword to the Keyword List
-                kwString += kwPrompt % kws.keywordPair
-                # If we have a Clip ...
-                if isinstance(cellData[keyVals], Clip.Clip):
-                    # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
-                    kwPrompt = '\n%s'
-                # If we have a Snapshot ...
-                elif isinstance(cellData[keyVals], Snapshot.Snapshot):
-                    # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
-                    kwPrompt = '\n  %s'
-
-            # If we have a Snapshot, we also want to display CODED Keywords in addition to the WHOLE Snapshot keywords
-            # we've already included
-            if isinstance(cellData[keyVals], Snapshot.Snapshot):
-                # Keep a list of the coded keywords we've already displayed
-                codedKeywords = []
-                # Modify the template for additional keywords
-                kwPrompt = '\n  %s : %s'
-                # For each of the Snapshot's Coding Objects ...
-                for x in range(len(cellData[keyVals].codingObjects)):
-                    # ... if the Coding Object is visible and if it is not already in the codedKeywords list ...
-                    if (cellData[keyVals].codingObjects[x]['visible']) and \
-                      (not (cellData[keyVals].codingObjects[x]['keywordGroup'], cellData[keyVals].codingObjects[x]['keyword']) in codedKeywords):
-                        # ... if this is the FIRST Coded Keyword ...
-                        if len(codedKeywords) == 0:
-                            # ... and if there WERE Whole Snapshot Keywords ...
-                            if len(kwString) > 0:
-                                # ... then add a line break to the Keywords String ...
-                                kwString += '\n'
-                            # ... add the indicator to the Keywords String that we're starting to show Coded Keywords
-                            kwString += unicode(_('Coded:'), 'utf8')
-                        # ... add the coded keyword to the Keywords String ...
-                        kwString += kwPrompt % (cellData[keyVals].codingObjects[x]['keywordGroup'], cellData[keyVals].codingObjects[x]['keyword'])
-                        # ... add the keyword to the Coded Keywords list
-                        codedKeywords.append((cellData[keyVals].codingObjects[x]['keywordGroup'], cellData[keyVals].codingObjects[x]['keyword']))
-
             # Insert the data values into the Grid Row
             # Start and Stop time in column 0
-            self.gridClips.SetCellValue(loop, 0, "%s -\n %s" % (Misc.time_in_ms_to_str(startTime), Misc.time_in_ms_to_str(stopTime)))
+            self.gridClips.SetCellValue(loop, 0, "%s -\n %s" % (Misc.time_in_ms_to_str(cellData[keyVals]['start']), Misc.time_in_ms_to_str(cellData[keyVals]['stop'])))
             # Node String (including Item name) in column 1
-            self.gridClips.SetCellValue(loop, 1, cellData[keyVals].GetNodeString(True))
+            self.gridClips.SetCellValue(loop, 1, cellData[keyVals]['nodeString'])
             # make the Collection / Item ID line auto-word-wrap
             self.gridClips.SetCellRenderer(loop, 1, grid.GridCellAutoWrapStringRenderer())
             # Keywords in column 2
-            self.gridClips.SetCellValue(loop, 2, kwString)
+            self.gridClips.SetCellValue(loop, 2, cellData[keyVals]['kwString'])
             # Item Number (hidden) in column 3.  Convert value to a string
-            self.gridClips.SetCellValue(loop, 3, "%s" % cellData[keyVals].number)
+            self.gridClips.SetCellValue(loop, 3, "%s" % cellData[keyVals]['number'])
             # Item Type (hidden) in column 4
-            self.gridClips.SetCellValue(loop, 4, "%s" % objType)
+            self.gridClips.SetCellValue(loop, 4, "%s" % cellData[keyVals]['objType'])
             # Auto-size THIS row
             self.gridClips.AutoSizeRow(loop, True)
             # Increment the Row Counter
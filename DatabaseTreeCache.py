@@ -0,0 +1,143 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This module saves the data used to build the Database Tree to a file in the user's Transana directory,
+    so that the next time the database is opened the tree can be built without querying the database.
+
+    Each cache file is stamped with the number of records and the highest record number in each table shown
+    in the Database Tree.  If the stamp no longer matches the database, the cache is not used. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+DEBUG = False
+if DEBUG:
+    print "DatabaseTreeCache DEBUG is ON!!"
+
+# import Python's cPickle module
+import cPickle
+# import Python's hashlib module
+import hashlib
+# import Python's os module
+import os
+
+# import Transana's Database Interface
+import DBInterface
+# import Transana's Constants
+import TransanaConstants
+# import Transana's Globals
+import TransanaGlobal
+
+# Increase this number whenever the data saved in the cache changes, so that old cache files won't be used
+CACHE_VERSION = 1
+
+# The tables whose contents are shown in the Database Tree, with the record number field for each one
+CACHE_TABLES = [('Series2', 'SeriesNum'), ('Episodes2', 'EpisodeNum'), ('Transcripts2', 'TranscriptNum'),
+                ('Documents2', 'DocumentNum'), ('Collections2', 'CollectNum'), ('Clips2', 'ClipNum'),
+                ('Quotes2', 'QuoteNum'), ('Snapshots2', 'SnapshotNum'), ('Notes2', 'NoteNum'),
+                ('Keywords2', None)]
+
+
+def GetCacheFilename():
+    """ Return the name of the cache file for the current database """
+    # In the single-user version, databases are identified by their directory and name.  Otherwise, by host and name.
+    if TransanaConstants.singleUserVersion:
+        dbKey = u'%s|%s' % (TransanaGlobal.configData.databaseDir, TransanaGlobal.configData.database)
+    else:
+        dbKey = u'%s|%s' % (TransanaGlobal.configData.host, TransanaGlobal.configData.database)
+    # Database names can contain characters that aren't allowed in file names, so use a hash of the key as the file name
+    filename = 'DBTree_%s.cache' % hashlib.md5(dbKey.encode('utf8')).hexdigest()
+    return os.path.join(TransanaGlobal.configData.GetDefaultProfilePath(), 'TreeCache', filename)
+
+def GetVersionStamp():
+    """ Return the version stamp for the current state of the database, the record count and highest record number
+        for each table in the Database Tree """
+    # Start the stamp with the cache version and program version, as these affect what's in the cache
+    stamp = [CACHE_VERSION, TransanaConstants.proVersion]
+    # Get a Database Cursor
+    DBCursor = DBInterface.get_db().cursor()
+    # For each table ...
+    for (table, numField) in CACHE_TABLES:
+        # ... get the number of records and the highest record number
+        if numField != None:
+            query = "SELECT COUNT(*), MAX(%s) FROM %s" % (numField, table)
+        else:
+            query = "SELECT COUNT(*) FROM %s" % table
+        DBCursor.execute(query)
+        stamp.append(tuple(DBCursor.fetchone()))
+    # Close the Database Cursor
+    DBCursor.close()
+    return tuple(stamp)
+
+def Load(stamp):
+    """ Return the cached Database Tree data for the current database, or None if there is no cache or
+        if it was saved under a different version stamp """
+    # Start exception handling
+    try:
+        # Read the cache file
+        cacheFile = open(GetCacheFilename(), 'rb')
+        try:
+            (cacheStamp, data) = cPickle.load(cacheFile)
+        finally:
+            cacheFile.close()
+    # If the file doesn't exist or can't be read, there's no cache
+    except (IOError, OSError, EOFError, ValueError, TypeError, cPickle.UnpicklingError):
+        return None
+    # If the database has changed since the cache was saved, the cache can't be used
+    if cacheStamp != stamp:
+
+        if DEBUG:
+            print "DatabaseTreeCache.Load():  Cache is out of date."
+
+        return None
+    return data
+
+def Save(stamp, data):
+    """ Save the Database Tree data for the current database under the version stamp """
+    # Get the cache file name
+    filename = GetCacheFilename()
+    # Start exception handling
+    try:
+        # Make sure the cache directory exists
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        # Write to a temporary file first, so that an interrupted save can't leave a damaged cache
+        cacheFile = open(filename + '.tmp', 'wb')
+        try:
+            cPickle.dump((stamp, data), cacheFile, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            cacheFile.close()
+        # Replace the old cache file with the new one
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rename(filename + '.tmp', filename)
+    # The cache is just for speed.  If it can't be saved, the tree will be built from the database next time.
+    except (IOError, OSError):
+
+        if DEBUG:
+            import sys
+            print "DatabaseTreeCache.Save():", sys.exc_info()[0], sys.exc_info()[1]
+
+def Discard():
+    """ Remove the cache for the current database, because the Database Tree has changed """
+    # Start exception handling
+    try:
+        # If there is a cache file ...
+        if os.path.exists(GetCacheFilename()):
+            # ... remove it
+            os.remove(GetCacheFilename())
+    # If the file can't be removed, there's nothing more we can do
+    except (IOError, OSError):
+        pass
@@ -54,8 +54,12 @@ from TransanaExceptions import *
 import KWManager
 import exceptions
 import DBInterface
+# import Transana's Database Tree Cache
+import DatabaseTreeCache
 import Dialogs
 import NoteEditor
+# import Python's copy module
+import copy
 # import Python's datetime module
 import datetime
 import os
@@ -75,6 +79,10 @@ import PropagateChanges             # Transana's Change Propagation routines
 import MediaConvert
 import WordFrequencyReport          # Transana's Word Frequency Report
 
+# How long (in milliseconds) to wait after the tree is built from the Database Tree Cache before checking the cache
+# against the database in the multi-user version
+TREE_CACHE_RECONCILE_DELAY = 2000
+
 class DatabaseTreeTab(wx.Panel):
     """This class defines the object for the "Database" tab of the Data
     window."""
@@ -2265,6 +2273,7 @@ class _NodeData:
         self.sortOrder = sortOrder  # sortOrder indicates order of Clips and Snapshots in a Collection
         self.sourceObj = sourceObj
         self.textSearchItems = textSearchItems
+        self.sortKey = None         # sortKey is the node's position key among its siblings, set by the tree when sorting
 
     def __repr__(self):
         """ Provides a string representation of the data in the _NodeData object """
@@ -2314,13 +2323,36 @@ class _DBTreeCtrl(wx.TreeCtrl):
         self.image_list.Add(TransanaImages.db_unlocked.GetBitmap())
         self.SetImageList(self.image_list)
 
+        # When the Database Tree is loaded lazily, the children of a node aren't added to the tree until the node is
+        # expanded or its children are requested.  Until then, they wait here as lists of (label, nodedata, image),
+        # keyed by the parent node's Node Data.
+        self.pendingChildren = {}
+        # To find nodes by name quickly, we keep an index of each node's children, keyed by the node's Node Data.
+        # Each index is a dictionary of lists of child nodes, keyed by upper-case node text.  Indexes are built
+        # as they are needed and discarded whenever the node's children change.
+        self.childIndexes = {}
+        # The data used to build the tree can be saved in the Database Tree Cache so the tree can be built without
+        # querying the database the next time the database is opened.  treeCacheData holds cached data being used
+        # to build the tree, and newTreeCacheData collects data to be saved to the cache.
+        self.treeCacheData = None
+        self.newTreeCacheData = None
+        # cachedTreeData holds the cached data the tree was last built from, if any
+        self.cachedTreeData = None
+        # treeCacheIncomplete indicates that some of the data used to build the tree was missing from the cache
+        self.treeCacheIncomplete = False
+        # treeCacheQueries remembers the queries used to build the tree, so they can be re-run to check the cache
+        self.treeCacheQueries = {}
+        # treeCacheCurrent indicates whether the saved cache matches the tree.  Changing the tree makes it out of date.
+        self.treeCacheCurrent = False
+
         # Define the Drop Target for the tree.  The custom drop target object
         # accepts the tree as a parameter so it can query it about where the
         # drop is supposed to be occurring to see if it will allow the drop.
         dt = DragAndDropObjects.DataTreeDropTarget(self)
         self.SetDropTarget(dt)
         
-        self.refresh_tree()
+        # Build the tree, using the Database Tree Cache if possible
+        self.refresh_tree(useCache=True)
 
         self.create_menus()
 
@@ -2346,77 +2378,42 @@ class _DBTreeCtrl(wx.TreeCtrl):
         # Process Database Tree Label Edits
         wx.EVT_TREE_END_LABEL_EDIT(self, id, self.OnEndLabelEdit)
 
+        # Load the children of a lazily-loaded node when it is expanded
+        wx.EVT_TREE_ITEM_EXPANDING(self, id, self.OnItemExpanding)
+
         # Process Key Presses
         self.Bind(wx.EVT_KEY_DOWN, self.OnKeyDown)
 
-    def OnCompareItems(self, item1, item2):
-        """ This method over-rides the wxTreeCtrl method, and implements the sort order for the TreeCtrl's SortChildren() method """
-        # Get the PyData for the two nodes passed in
-        pyData1 = self.GetPyData(item1)
-        pyData2 = self.GetPyData(item2)
-        # For convenience, get the Node Types for the two nodes
-        type1 = pyData1.nodetype
-        type2 = pyData2.nodetype
-
-        text1 = self.GetItemText(item1)
-        text2 = self.GetItemText(item2)
-
-        # If we're inside a Collection Node ...
-        if (type1 in ['CollectionNode', 'QuoteNode', 'ClipNode', 'SnapshotNode', 'CollectionNoteNode']) and \
-           (type2 in ['CollectionNode', 'QuoteNode', 'ClipNode', 'SnapshotNode', 'CollectionNoteNode']):
-
-            # If Item1 is NOT a Collection and Item 2 IS, or
-            #    Item 1 is a Note and Item 2 isn't ...
-            if ((type1 != 'CollectionNode') and (type2 == 'CollectionNode')) or \
-               ((type1 == 'CollectionNoteNode') and (type2 != 'CollectionNoteNode')):
-                # ... return 1 to indicate that the Note comes after the other item
-                return 1
-            # If Item 1 is a Collection and Item 2 is not, or
-            #    Item 2 is a Note and Item 1 isn't ...
-            elif ((type1 == 'CollectionNode') and (type2 != 'CollectionNode')) or \
-                 ((type1 != 'CollectionNoteNode') and (type2 == 'CollectionNoteNode')):
-                # ... return -1 to indicate that the Note comes after the other item
-                return -1
-            # If both Items are either Collections or Notes
-            elif ((type1 == 'CollectionNode') and (type2 == 'CollectionNode')) or \
-                 ((type1 == 'CollectionNoteNode') and (type2 == 'CollectionNoteNode')):
-                # ... a simple alphabetic sort will do
-                if self.GetItemText(item1) < self.GetItemText(item2):
-                    return -1
-                else:
-                    return 1
-            # If neither Item is a Collection or a Note ...
-            else:
-                # ... compare their Sort Order, returning a negative if the order should be switched
-                return pyData1.sortOrder - pyData2.sortOrder
-
-        # If we are sorting the Search Quotes, Search Clips and Search Snapshots in a Search Collection ...
-        elif (type1 in ['SearchQuoteNode', 'SearchClipNode', 'SearchSnapshotNode']) and (type1 in ['SearchQuoteNode', 'SearchClipNode', 'SearchSnapshotNode']):
-            # ... just compare the sort orders
-            return pyData1.sortOrder - pyData2.sortOrder
+    def GetSortKey(self, nodedata, text):
+        """ Return the key that determines where a node goes among its siblings when they are sorted.  The key is a
+            (type rank, sort order, text) tuple.  Nodes of a lower type rank come first.  Nodes of the same type rank
+            are sorted by their Sort Order (for Quotes, Clips, and Snapshots) or alphabetically, ignoring case. """
+        # For convenience, get the Node Type
+        nodetype = nodedata.nodetype
+        # Note Node Types come after everything else
+        if nodetype in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
+                        'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']:
+            return (2, 0, text.upper(), text)
+        # Inside a Collection or a Search Collection, Quotes, Clips and Snapshots come after nested Collections
+        # and are sorted by their Sort Order
+        elif nodetype in ['QuoteNode', 'ClipNode', 'SnapshotNode', 'SearchQuoteNode', 'SearchClipNode', 'SearchSnapshotNode']:
+            return (1, nodedata.sortOrder, u'', u'')
+        # Other nodes, including Collections, come first in alphabetical order
+        else:
+            return (0, 0, text.upper(), text)
 
+    def SetSortKeys(self, item):
+        """ Set the sort keys in the Node Data of item's children so that they can be sorted """
+        (child, cookie) = wx.TreeCtrl.GetFirstChild(self, item)
+        while child.IsOk():
+            nodedata = self.GetPyData(child)
+            nodedata.sortKey = self.GetSortKey(nodedata, self.GetItemText(child))
+            (child, cookie) = wx.TreeCtrl.GetNextChild(self, item, cookie)
 
-        # If item2 is a Note and item1 is not ...
-        elif (type2 in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
-                        'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']) and \
-             (not type1 in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
-                        'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']):
-            return -1
-        
-        # If item1 is a Note and item2 is not ...
-        elif (type1 in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
-                        'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']) and \
-             (not type2 in ['LibraryNoteNode', 'DocumentNoteNode', 'EpisodeNoteNode', 'TranscriptNoteNode',
-                        'CollectionNoteNode', 'QuoteNoteNode', 'ClipNoteNode', 'SnapshotNoteNode']):
-            return 1
-        
-        # If we have other node types ...
-        else:
-            # ... a simple alphabetic sort will do
-            if self.GetItemText(item1) < self.GetItemText(item2):
-                return -1
-            else:
-                return 1
+    def OnCompareItems(self, item1, item2):
+        """ This method over-rides the wxTreeCtrl method, and implements the sort order for the TreeCtrl's SortChildren() method.
+            The sort keys are set by SortChildren() before sorting starts, so comparisons don't need to look at node types or text. """
+        return cmp(self.GetPyData(item1).sortKey, self.GetPyData(item2).sortKey)
 
     def set_image(self, item, icon_name):
         """Set the item's icon image for all states."""
@@ -2425,10 +2422,380 @@ class _DBTreeCtrl(wx.TreeCtrl):
         self.SetItemImage(item, index, wx.TreeItemIcon_Selected)
         self.SetItemImage(item, index, wx.TreeItemIcon_Expanded)
         self.SetItemImage(item, index, wx.TreeItemIcon_SelectedExpanded)
+
+    def AppendNode(self, parent, label, nodedata, image):
+        """ Add a node to the tree while it is being built from the database.  parent is either a tree node or
+            the value returned by AppendNode() for the parent node.  If the Database Tree is loaded lazily, the new
+            node is held until its parent is expanded and its Node Data is returned.  Otherwise, the new tree node
+            is returned. """
+        # If the Database Tree is loaded lazily ...
+        if TransanaConstants.lazyDatabaseTree:
+            # ... if the parent is an actual tree node ...
+            if not isinstance(parent, _NodeData):
+                # ... the parent needs to show that it has children, even though they haven't been added yet ...
+                self.SetItemHasChildren(parent, True)
+                # ... and we need the parent's Node Data
+                parent = self.GetPyData(parent)
+            # Add the new node to the parent's list of children waiting to be added to the tree
+            if self.pendingChildren.has_key(parent):
+                self.pendingChildren[parent].append((label, nodedata, image))
+            else:
+                self.pendingChildren[parent] = [(label, nodedata, image)]
+            # The new node's Node Data identifies the node until it is added to the tree
+            return nodedata
+        # If the Database Tree is NOT loaded lazily ...
+        else:
+            # ... create the tree node
+            item = self.AppendItem(parent, label)
+            # Associate the node data with the node
+            self.SetPyData(item, nodedata)
+            # Add the node's image
+            self.set_image(item, image)
+            return item
+
+    def LoadChildren(self, item):
+        """ Add any children of item that are waiting to be added to the tree """
+        # If no nodes are waiting, there's nothing to do
+        if len(self.pendingChildren) == 0:
+            return
+        # Get the node's Node Data
+        nodedata = self.GetPyData(item)
+        # If the node has children waiting to be added ...
+        if (nodedata != None) and self.pendingChildren.has_key(nodedata):
+            # ... get them, and note that they're no longer waiting
+            children = self.pendingChildren[nodedata]
+            del(self.pendingChildren[nodedata])
+            # The children of Collections are sorted.  Sorting them here, before they are added, avoids SortChildren().
+            if nodedata.nodetype in ['CollectionsRootNode', 'CollectionNode']:
+                for (label, childdata, image) in children:
+                    childdata.sortKey = self.GetSortKey(childdata, label)
+                children.sort(key=lambda child: child[1].sortKey)
+            # Add each child to the tree
+            for (label, childdata, image) in children:
+                # Create the tree node
+                child = wx.TreeCtrl.AppendItem(self, item, label)
+                # Associate the node data with the node
+                self.SetPyData(child, childdata)
+                # Add the node's image
+                self.set_image(child, image)
+                # If the child has children waiting, it needs to show that it has children
+                if self.pendingChildren.has_key(childdata):
+                    self.SetItemHasChildren(child, True)
+            # The node's children have changed, so its child index is out of date
+            self.InvalidateChildIndex(item)
+
+            if DEBUG:
+                print "DatabaseTreeTab.LoadChildren():", self.GetItemText(item).encode('utf8'), len(children)
+
+    def DiscardChildren(self, item):
+        """ Forget any nodes waiting to be added below item, and any child indexes for item and the nodes below it,
+            as they are about to be deleted """
+        # If no nodes are waiting and no child indexes have been built, there's nothing to do
+        if (len(self.pendingChildren) == 0) and (len(self.childIndexes) == 0):
+            return
+        # Start with the node's Node Data
+        nodesToCheck = [self.GetPyData(item)]
+        # Add the Node Data for the node's descendants that are in the tree
+        itemsToCheck = [item]
+        while len(itemsToCheck) > 0:
+            (child, cookie) = wx.TreeCtrl.GetFirstChild(self, itemsToCheck.pop())
+            while child.IsOk():
+                nodesToCheck.append(self.GetPyData(child))
+                itemsToCheck.append(child)
+                (child, cookie) = wx.TreeCtrl.GetNextChild(self, child, cookie)
+        # As long as there are nodes to check ...
+        while len(nodesToCheck) > 0:
+            # ... get the next one
+            nodedata = nodesToCheck.pop()
+            # If it has a child index, forget it
+            if (nodedata != None) and self.childIndexes.has_key(nodedata):
+                del(self.childIndexes[nodedata])
+            # If it has children waiting ...
+            if (nodedata != None) and self.pendingChildren.has_key(nodedata):
+                # ... they need to be checked too ...
+                for (label, childdata, image) in self.pendingChildren[nodedata]:
+                    nodesToCheck.append(childdata)
+                # ... and then forgotten
+                del(self.pendingChildren[nodedata])
+
+    def GetChildIndex(self, item):
+        """ Return the index of item's children, a dictionary of lists of child nodes keyed by upper-case node text """
+        # Get the node's Node Data
+        nodedata = self.GetPyData(item)
+        # If the node's child index has already been built, use it
+        if (nodedata != None) and self.childIndexes.has_key(nodedata):
+            return self.childIndexes[nodedata]
+        # Otherwise, build the index, keeping the children in tree order
+        index = {}
+        (child, cookie) = self.GetFirstChild(item)
+        while child.IsOk():
+            key = Misc.unistrip(self.GetItemText(child)).upper()
+            if index.has_key(key):
+                index[key].append(child)
+            else:
+                index[key] = [child]
+            (child, cookie) = self.GetNextChild(item, cookie)
+        # Remember the index for next time
+        if nodedata != None:
+            self.childIndexes[nodedata] = index
+        return index
+
+    def FindChildNodes(self, item, text):
+        """ Return a list of item's children whose node text matches text, ignoring case, in tree order """
+        return self.GetChildIndex(item).get(Misc.unistrip(text).upper(), [])
+
+    def InvalidateChildIndex(self, item):
+        """ Discard the child index for item because item's children have changed """
+        # If we have a valid node with a child index ...
+        if (item != None) and item.IsOk():
+            nodedata = self.GetPyData(item)
+            if (nodedata != None) and self.childIndexes.has_key(nodedata):
+                # ... discard the index
+                del(self.childIndexes[nodedata])
+
+    def OnItemExpanding(self, event):
+        """ Load the children of a lazily-loaded node when it is expanded """
+        self.LoadChildren(event.GetItem())
+        event.Skip()
+
+    # Everything that looks at or changes the children of a node must see the children that are waiting to be added,
+    # so the following wxTreeCtrl methods add them first.
+
+    def AppendItem(self, parent, *args, **kwargs):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(parent)
+        self.InvalidateChildIndex(parent)
+        self.DiscardTreeCache(parent)
+        return wx.TreeCtrl.AppendItem(self, parent, *args, **kwargs)
+
+    def PrependItem(self, parent, *args, **kwargs):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(parent)
+        self.InvalidateChildIndex(parent)
+        self.DiscardTreeCache(parent)
+        return wx.TreeCtrl.PrependItem(self, parent, *args, **kwargs)
+
+    def InsertItem(self, parent, *args, **kwargs):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(parent)
+        self.InvalidateChildIndex(parent)
+        self.DiscardTreeCache(parent)
+        return wx.TreeCtrl.InsertItem(self, parent, *args, **kwargs)
+
+    def InsertItemBefore(self, parent, *args, **kwargs):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(parent)
+        self.InvalidateChildIndex(parent)
+        self.DiscardTreeCache(parent)
+        return wx.TreeCtrl.InsertItemBefore(self, parent, *args, **kwargs)
+
+    def GetFirstChild(self, item):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(item)
+        return wx.TreeCtrl.GetFirstChild(self, item)
+
+    def GetLastChild(self, item):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(item)
+        return wx.TreeCtrl.GetLastChild(self, item)
+
+    def GetChildrenCount(self, item, *args, **kwargs):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(item)
+        return wx.TreeCtrl.GetChildrenCount(self, item, *args, **kwargs)
+
+    def SortChildren(self, item):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first and sort keys are set """
+        self.LoadChildren(item)
+        self.InvalidateChildIndex(item)
+        # Sorting follows a change to the children's Sort Orders, which the Database Tree Cache saves
+        self.DiscardTreeCache(item)
+        # Set the children's sort keys so OnCompareItems() can compare them quickly
+        self.SetSortKeys(item)
+        wx.TreeCtrl.SortChildren(self, item)
+
+    def Expand(self, item):
+        """ Over-ride the wxTreeCtrl method so that waiting children are added first """
+        self.LoadChildren(item)
+        wx.TreeCtrl.Expand(self, item)
+
+    def Delete(self, item):
+        """ Over-ride the wxTreeCtrl method so that waiting children and child indexes are forgotten """
+        self.DiscardChildren(item)
+        self.InvalidateChildIndex(self.GetItemParent(item))
+        self.DiscardTreeCache(item)
+        wx.TreeCtrl.Delete(self, item)
+
+    def DeleteChildren(self, item):
+        """ Over-ride the wxTreeCtrl method so that waiting children and child indexes are forgotten """
+        self.DiscardChildren(item)
+        self.DiscardTreeCache(item)
+        wx.TreeCtrl.DeleteChildren(self, item)
+
+    def DeleteAllItems(self):
+        """ Over-ride the wxTreeCtrl method so that waiting children and child indexes are forgotten """
+        self.pendingChildren = {}
+        self.childIndexes = {}
+        wx.TreeCtrl.DeleteAllItems(self)
+
+    def SetItemText(self, item, text):
+        """ Over-ride the wxTreeCtrl method so that the parent's child index is discarded """
+        self.InvalidateChildIndex(self.GetItemParent(item))
+        self.DiscardTreeCache(item)
+        wx.TreeCtrl.SetItemText(self, item, text)
         
+    def QueryTreeData(self, name, query, **kwargs):
+        """ Return the results of the DBInterface function query, called with kwargs, for building the tree.
+            While the tree is being built from the Database Tree Cache, the results come from the cache. """
+        # Remember the query so it can be re-run to check the cache
+        self.treeCacheQueries[name] = (query, kwargs)
+        # If we're building the tree from the cache and the cache has this data ...
+        if (self.treeCacheData != None) and self.treeCacheData.has_key(name):
+            # ... use it
+            result = self.treeCacheData[name]
+        # Otherwise ...
+        else:
+            # ... if we're building the tree from the cache, the cache is incomplete and will need to be saved again
+            if self.treeCacheData != None:
+                self.treeCacheIncomplete = True
+            # Query the database
+            result = query(**kwargs)
+        # If we're collecting data for the cache, save the results, wherever they came from
+        if self.newTreeCacheData != None:
+            self.newTreeCacheData[name] = result
+        return result
+
+    def DiscardTreeCache(self, item):
+        """ The tree is being changed at item, so the Database Tree Cache no longer matches the database """
+        # If the cache is current ...
+        if self.treeCacheCurrent:
+            # ... get the node's data
+            nodedata = self.GetPyData(item)
+            # Search Results aren't cached, so changes to them don't matter
+            if (nodedata != None) and (nodedata.nodetype[:6] == 'Search'):
+                return
+            # Discard the cache
+            DatabaseTreeCache.Discard()
+            self.treeCacheCurrent = False
+
+    def ReconcileTreeCache(self):
+        """ The tree was built from the Database Tree Cache.  Re-run the queries and, if anything was changed in a way
+            the cache's version stamp doesn't detect (such as another user renaming something), rebuild the tree. """
+        # If the tree has already been changed or rebuilt, there's nothing to check
+        if not self.treeCacheCurrent:
+            return
+        # Get the version stamp before querying, so a change made during the queries will make the cache out of date
+        stamp = DatabaseTreeCache.GetVersionStamp()
+        # Re-run the queries
+        data = {}
+        for name in self.treeCacheQueries.keys():
+            (query, kwargs) = self.treeCacheQueries[name]
+            data[name] = query(**kwargs)
+        # If the tree has been changed while we were querying, or the data matches the cache, we're done
+        if (not self.treeCacheCurrent) or (data == self.cachedTreeData):
+            return
+
+        if DEBUG:
+            print "DatabaseTreeTab.ReconcileTreeCache():  Cache is out of date.  Rebuilding the Database Tree."
+
+        # The user may have been working in the tree since it was built, so note which nodes are expanded and selected
+        treeState = self.GetTreeState()
+        # Rebuild the tree from the new data, which becomes the new cache
+        self.refresh_tree(treeData=(stamp, data))
+        # Expand and select the nodes again, as far as they still exist
+        self.RestoreTreeState(treeState)
+
+    def GetNodePath(self, item):
+        """ Return the path to item from the root node as a tuple of (node text, node type) pairs """
+        path = ()
+        while (item != self.GetRootItem()) and item.IsOk():
+            path = ((self.GetItemText(item), self.GetPyData(item).nodetype),) + path
+            item = self.GetItemParent(item)
+        return path
+
+    def FindNodeByPath(self, path):
+        """ Return the node at path, as returned by GetNodePath(), or None if there is no such node """
+        item = self.GetRootItem()
+        for (text, nodetype) in path:
+            # Find the child with the right text and node type
+            for child in self.FindChildNodes(item, text):
+                if self.GetPyData(child).nodetype == nodetype:
+                    item = child
+                    break
+            # If there is no such child, there is no such node
+            else:
+                return None
+        return item
+
+    def GetTreeState(self):
+        """ Return the paths of the expanded nodes and the selected nodes, so they can be restored by RestoreTreeState()
+            after the tree is rebuilt """
+        expandedPaths = []
+        # Look through the expanded nodes.  Nodes whose children are waiting to be added haven't been expanded, so the
+        # wxTreeCtrl methods can be used to avoid adding them.
+        itemsToCheck = [self.GetRootItem()]
+        while len(itemsToCheck) > 0:
+            item = itemsToCheck.pop()
+            (child, cookie) = wx.TreeCtrl.GetFirstChild(self, item)
+            while child.IsOk():
+                if self.IsExpanded(child):
+                    expandedPaths.append(self.GetNodePath(child))
+                    itemsToCheck.append(child)
+                (child, cookie) = wx.TreeCtrl.GetNextChild(self, item, cookie)
+        # Get the paths of the selected nodes
+        selectedPaths = [self.GetNodePath(item) for item in self.GetSelections()]
+        return (expandedPaths, selectedPaths)
+
+    def RestoreTreeState(self, treeState):
+        """ Expand and select the nodes noted by GetTreeState() that are still in the tree """
+        (expandedPaths, selectedPaths) = treeState
+        # Expand the nodes that were expanded.  Parents come before their children in the list.
+        for path in expandedPaths:
+            item = self.FindNodeByPath(path)
+            if item != None:
+                self.Expand(item)
+        # Select the nodes that were selected
+        selectedItems = [self.FindNodeByPath(path) for path in selectedPaths]
+        selectedItems = [item for item in selectedItems if item != None]
+        if len(selectedItems) > 0:
+            self.UnselectAll()
+            for item in selectedItems:
+                self.SelectItem(item)
+
     # FIXME: Doesn't preserve node 'expanded' states
-    def refresh_tree(self, evt=None):
-        """Load information from database and re-create the tree."""
+    def refresh_tree(self, evt=None, useCache=False, treeData=None):
+        """Load information from database and re-create the tree.  If useCache is True, the tree is built from the
+           Database Tree Cache if it matches the database.  treeData, if given, is a (version stamp, data) tuple to
+           build the tree from."""
+        # The cache is out of date while the tree is rebuilt
+        self.treeCacheCurrent = False
+        self.cachedTreeData = None
+        # If we're using the Database Tree Cache ...
+        if TransanaConstants.useDatabaseTreeCache:
+            # If we've been given the data ...
+            if treeData != None:
+                (stamp, self.treeCacheData) = treeData
+            # Otherwise ...
+            else:
+                # ... get the version stamp before querying, so a change made during the queries will make the cache out of date
+                stamp = DatabaseTreeCache.GetVersionStamp()
+                # If we're supposed to, load the data from the cache, if it matches the database
+                if useCache:
+                    self.cachedTreeData = DatabaseTreeCache.Load(stamp)
+                    # An empty cache can't be used
+                    if not self.cachedTreeData:
+                        self.cachedTreeData = None
+                    self.treeCacheData = self.cachedTreeData
+            # Collect the data to save to the cache
+            self.newTreeCacheData = {}
+            # Note whether any data is missing from the cache
+            self.treeCacheIncomplete = False
+        self.treeCacheQueries = {}
+
+        if DEBUG:
+            print "DatabaseTreeTab.refresh_tree():  Building tree from cache:", self.treeCacheData != None
+            start = time.time()
+            
         self.DeleteAllItems()
         self.create_root_node()
         self.create_series_node()
@@ -2439,6 +2806,27 @@ class _DBTreeCtrl(wx.TreeCtrl):
         self.UnselectAll()
         self.SelectItem(self.GetRootItem())
 
+        if DEBUG:
+            print "DatabaseTreeTab.refresh_tree():  %4.2f seconds" % (time.time() - start)
+
+        # If we're using the Database Tree Cache ...
+        if TransanaConstants.useDatabaseTreeCache:
+            # If we didn't build the tree from the cache, or the cache was missing some of the data, save the data
+            if (self.cachedTreeData == None) or self.treeCacheIncomplete:
+                DatabaseTreeCache.Save(stamp, self.newTreeCacheData)
+            # If we built the tree from the cache, remember all the data it was built from, for ReconcileTreeCache()
+            if self.cachedTreeData != None:
+                self.cachedTreeData = self.newTreeCacheData
+            # The cache now matches the tree
+            self.treeCacheCurrent = True
+            # We're done collecting data
+            self.treeCacheData = None
+            self.newTreeCacheData = None
+            # In the multi-user version, other users may have renamed or moved things in ways the version stamp doesn't
+            # detect.  If we built the tree from the cache, check the cache against the database once the program is idle.
+            if (self.cachedTreeData != None) and not TransanaConstants.singleUserVersion:
+                wx.CallLater(TREE_CACHE_RECONCILE_DELAY, self.ReconcileTreeCache)
+
     def OnMotion(self, event):
         """ Detects Mouse Movement in the Database Tree Tab so that we can scroll as needed
             during Drag-and-Drop operations. """
@@ -2721,18 +3109,15 @@ class _DBTreeCtrl(wx.TreeCtrl):
         # easily locate the node we want to add a child node to.
 
         # Populate the tree with all Library records
-        for (libraryNo, libraryID) in DBInterface.list_of_series():
-            # Create the tree node
-            item = self.AppendItem(root_item, libraryID)
-            # Add the node's image and node data
+        for (libraryNo, libraryID) in self.QueryTreeData('Libraries', DBInterface.list_of_series):
+            # Create the tree node with its node data and image
             nodedata = _NodeData(nodetype='LibraryNode', recNum=libraryNo)          # Identify this as a Library node
-            self.SetPyData(item, nodedata)                       # Associate this data with the node
-            self.set_image(item, "Library16")
+            item = self.AppendNode(root_item, libraryID, nodedata, "Library16")
             # Add the new node to the map dictionary
             mapDict['Libraries'][libraryNo] = item
 
         # Populate the tree with all Documents AND Episodes
-        tmpDict = DBInterface.dictionary_of_documents_and_episodes()
+        tmpDict = self.QueryTreeData('DocumentsAndEpisodes', DBInterface.dictionary_of_documents_and_episodes)
         keys = tmpDict.keys()
         keys.sort()
         for key in keys:
@@ -2744,41 +3129,35 @@ class _DBTreeCtrl(wx.TreeCtrl):
                 if TransanaConstants.proVersion or objType != 'Document':
                     # Find the correct Library node using the map dictionary
                     libitem = mapDict['Libraries'][objParentNum]
-                    # Create the tree node
-                    deitem = self.AppendItem(libitem, key[0])
                     if objType == 'Document':
-                        # Add the node's image and node data
+                        # Create the tree node with its node data and image
                         nodedata = _NodeData(nodetype='DocumentNode', recNum=objNum, parent=objParentNum)  # Identify this as a Document node
-                        self.set_image(deitem, "Document16")
+                        deitem = self.AppendNode(libitem, key[0], nodedata, "Document16")
                         # Add the new node to the map dictionary
                         mapDict['Document'][objNum] = deitem
                     elif objType == 'Episode':
-                        # Add the node's image and node data
+                        # Create the tree node with its node data and image
                         nodedata = _NodeData(nodetype='EpisodeNode', recNum=objNum, parent=objParentNum)     # Identify this as an Episode node
-                        self.set_image(deitem, "Episode16")
+                        deitem = self.AppendNode(libitem, key[0], nodedata, "Episode16")
                         # Add the new node to the map dictionary
                         mapDict['Episode'][objNum] = deitem
-                    self.SetPyData(deitem, nodedata)                  # Associate this data with the node
             # This shouldn't happen to anyone but me.  God, I hope not, anyway.
             else:
                 print "ABANDONED %s RECORD!" % objType.upper(), objNum, objParentNum
 
         # Populate the tree with all Episode Transcripts
-        for (transcriptNo, transcriptID, transcriptEpisodeNo) in DBInterface.list_of_episode_transcripts():
+        for (transcriptNo, transcriptID, transcriptEpisodeNo) in self.QueryTreeData('Transcripts', DBInterface.list_of_episode_transcripts):
             # Find the correct Library node using the map dictionary
             epitem = mapDict['Episode'][transcriptEpisodeNo]
-            # Create the tree node
-            titem = self.AppendItem(epitem, transcriptID)
-            # Add the node's image and node data
+            # Create the tree node with its node data and image
             nodedata = _NodeData(nodetype='TranscriptNode', recNum=transcriptNo, parent=transcriptEpisodeNo)  # Identify this as a Transcript node
-            self.SetPyData(titem, nodedata)                  # Associate this data with the node
-            self.set_image(titem, "Transcript16")
+            titem = self.AppendNode(epitem, transcriptID, nodedata, "Transcript16")
             # Add the new node to the map dictionary
             mapDict['Transcript'][transcriptNo] = titem
 
         # Now add all the Notes to the objects in the Library node of the database tree
         for (noteNum, noteID, libraryNum, episodeNum, transcriptNum, collectNum, clipNum, snapshotNum, documentNum, quoteNum) in \
-            DBInterface.list_of_node_notes(LibraryNode=True):
+            self.QueryTreeData('LibraryNotes', DBInterface.list_of_node_notes, LibraryNode=True):
             # Find the correct Library, Episode, or Transcript node using the map dictionary
             if libraryNum > 0:
                 item = mapDict['Libraries'][libraryNum]
@@ -2795,12 +3174,9 @@ class _DBTreeCtrl(wx.TreeCtrl):
 ##            elif quoteNum > 0:
 ##                item = mapDict['Quote'][documentNum]
 ##                noteNodeType = 'QuoteNoteNode'
-            # Create the tree node
-            noteitem = self.AppendItem(item, noteID)
-            # Add the node's image and node data
+            # Create the tree node with its node data and image
             nodedata = _NodeData(nodetype=noteNodeType, recNum=noteNum)  # Identify this as a Note node
-            self.SetPyData(noteitem, nodedata)                  # Associate this data with the node
-            self.set_image(noteitem, "Note16")
+            self.AppendNode(item, noteID, nodedata, "Note16")
 
     def create_collections_node(self):
         """ Create the Collections node and populate it with all appropriate data """
@@ -2826,7 +3202,7 @@ class _DBTreeCtrl(wx.TreeCtrl):
         # easily locate the node we want to add a child node to.
 
         # Populate the tree with all Collection records
-        for (collNo, collID, parentCollNo) in DBInterface.list_of_all_collections():
+        for (collNo, collID, parentCollNo) in self.QueryTreeData('Collections', DBInterface.list_of_all_collections):
 
             if DEBUG:
                 print "Collections:", collNo, collID.encode('utf8'), parentCollNo
@@ -2836,14 +3212,10 @@ class _DBTreeCtrl(wx.TreeCtrl):
                 # If so, we can identify the parent collection node (including the root node for parentless Collections)
                 # using the map dictionary
                 parentItem = mapDict['Collection'][parentCollNo]
-                # Create the tree node
-                item = self.AppendItem(parentItem, collID)
                 # Identify this as a Collection node with the proper Node Data
                 nodedata = _NodeData(nodetype='CollectionNode', recNum=collNo, parent=parentCollNo)
-                # Associate this data with the node
-                self.SetPyData(item, nodedata)
-                # Select the proper image
-                self.set_image(item, "Collection16")
+                # Create the tree node with its node data and image
+                item = self.AppendNode(parentItem, collID, nodedata, "Collection16")
                 # Add the new node to the map dictionary
                 mapDict['Collection'][collNo] = item
 
@@ -2872,14 +3244,10 @@ class _DBTreeCtrl(wx.TreeCtrl):
                         if mapDict['Collection'].has_key(dParentCollNo):
                             # We can identify the parent node using the map dictionary
                             parentItem = mapDict['Collection'][dParentCollNo]
-                            # Create the tree node
-                            item = self.AppendItem(parentItem, dCollID)
                             # Identify this as a Collection node with the proper Node Data
                             nodedata = _NodeData(nodetype='CollectionNode', recNum=dCollNo, parent=dParentCollNo)
-                            # Associate this data with the node
-                            self.SetPyData(item, nodedata)
-                            # Select the proper image
-                            self.set_image(item, "Collection16")
+                            # Create the tree node with its node data and image
+                            item = self.AppendNode(parentItem, dCollID, nodedata, "Collection16")
                             # Add the new node to the map dictionary
                             mapDict['Collection'][dCollNo] = item
                             # We need to indicate to the while loop that we found an entry that could be the parent of other entries
@@ -2900,18 +3268,15 @@ class _DBTreeCtrl(wx.TreeCtrl):
                 deferredItems.append((collNo, collID, parentCollNo))
                 
         # Populate the tree with all Clip records
-        for (clipNo, clipID, collNo, sourceNo, sortOrder) in DBInterface.list_of_clips():
+        for (clipNo, clipID, collNo, sourceNo, sortOrder) in self.QueryTreeData('Clips', DBInterface.list_of_clips):
             # Check to see if the Clip's parent collection is in the tree.  It should be there, but I did
             # have a testing database where one collection was missing, despite the presence of Clips and Notes.
             if mapDict['Collection'].has_key(collNo):
                 # First, let's see if the parent collection is in the map dictionary.
                 item = mapDict['Collection'][collNo]
-                # Create the tree node
-                clip_item = self.AppendItem(item, clipID)
-                # Create the node data and assign the node's image
+                # Create the node data, then the tree node with the node's image
                 nodedata = _NodeData(nodetype='ClipNode', recNum=clipNo, parent=collNo, sortOrder=sortOrder, sourceObj=sourceNo)       # Identify this as a Clip node
-                self.SetPyData(clip_item, nodedata)                           # Associate this data with the node
-                self.set_image(clip_item, "Clip16")
+                clip_item = self.AppendNode(item, clipID, nodedata, "Clip16")
                 # Add the new node to the map dictionary
                 mapDict['Clip'][clipNo] = clip_item
             # This shouldn't happen to anyone but me.  God, I hope not, anyway.
@@ -2921,17 +3286,14 @@ class _DBTreeCtrl(wx.TreeCtrl):
         # If we're in a Pro version, not the Standard Version ...
         if TransanaConstants.proVersion:
             # Populate the tree with all Quote records
-            for (quoteNum, quoteID, collNum, sourceDoc, sortOrder) in DBInterface.list_of_quotes():
+            for (quoteNum, quoteID, collNum, sourceDoc, sortOrder) in self.QueryTreeData('Quotes', DBInterface.list_of_quotes):
                 # Check to see if the Quote's parent collection is in the tree.  It should be there.
                 if mapDict['Collection'].has_key(collNum):
                     # First, let's see if the parent collection is in the map dictionary.
                     item = mapDict['Collection'][collNum]
-                    # Create the tree node
-                    quote_item = self.AppendItem(item, quoteID)
-                    # Create the node data and assign the node's image
+                    # Create the node data, then the tree node with the node's image
                     nodedata = _NodeData(nodetype='QuoteNode', recNum=quoteNum, parent=collNum, sortOrder=sortOrder, sourceObj=sourceDoc)
-                    self.SetPyData(quote_item, nodedata)                           # Associate this data with the node
-                    self.set_image(quote_item, "Quote16")
+                    quote_item = self.AppendNode(item, quoteID, nodedata, "Quote16")
                     # Add the new node to the map dictionary
                     mapDict['Quote'][quoteNum] = quote_item
                 # This shouldn't happen to anyone but me.  God, I hope not, anyway.
@@ -2939,32 +3301,31 @@ class _DBTreeCtrl(wx.TreeCtrl):
                     print "ABANDONED QUOTE RECORD!" , quoteNum, quoteID.encode('utf8'), collNum
 
             # Populate the tree with all Snapshot records
-            for (snapshotNo, snapshotID, collNo, sortOrder) in DBInterface.list_of_snapshots():
+            for (snapshotNo, snapshotID, collNo, sortOrder) in self.QueryTreeData('Snapshots', DBInterface.list_of_snapshots):
                 # Check to see if the Snapshot's parent collection is in the tree.  It should be there, but I did
                 # have a testing database where one collection was missing, despite the presence of Clips and Notes.
                 if mapDict['Collection'].has_key(collNo):
                     # First, let's see if the parent collection is in the map dictionary.
                     item = mapDict['Collection'][collNo]
-                    # Create the tree node
-                    snapshot_item = self.AppendItem(item, snapshotID)
-                    # Create the node data and assign the node's image
+                    # Create the node data, then the tree node with the node's image
                     nodedata = _NodeData(nodetype='SnapshotNode', recNum=snapshotNo, parent=collNo, sortOrder=sortOrder)       # Identify this as a Snapshot node
-                    self.SetPyData(snapshot_item, nodedata)                           # Associate this data with the node
-                    self.set_image(snapshot_item, "Snapshot16")
+                    snapshot_item = self.AppendNode(item, snapshotID, nodedata, "Snapshot16")
                     # Add the new node to the map dictionary
                     mapDict['Snapshot'][snapshotNo] = snapshot_item
                 # This shouldn't happen to anyone but me.  God, I hope not, anyway.
                 else:
                     print "ABANDONED SNAPSHOT RECORD!" , snapshotNo, snapshotID.encode('utf8'), collNo
 
-        # For each Collection ...
-        for key in mapDict['Collection'].keys():
-            # ... sort the collection's children!
-            self.SortChildren(mapDict['Collection'][key])
+        # If the Database Tree is NOT loaded lazily ...  (If it is, Collection children are sorted as they are loaded.)
+        if not TransanaConstants.lazyDatabaseTree:
+            # For each Collection ...
+            for key in mapDict['Collection'].keys():
+                # ... sort the collection's children!
+                self.SortChildren(mapDict['Collection'][key])
 
         # Now add all the Notes to the objects in the Collection node of the database tree
         for (noteNum, noteID, libraryNum, episodeNum, transcriptNum, collectNum, clipNum, snapshotNum, documentNum, quoteNum) in \
-            DBInterface.list_of_node_notes(CollectionNode=True):
+            self.QueryTreeData('CollectionNotes', DBInterface.list_of_node_notes, CollectionNode=True):
             item = None
             # Find the correct Collection or Clip node using the map dictionary
             if collectNum > 0:
@@ -2998,12 +3359,9 @@ class _DBTreeCtrl(wx.TreeCtrl):
                 else:
                     print "ABANDONED QUOTE NOTE RECORD!", noteNum, noteID.encode('utf8'), quoteNum
             if item != None:
-                # Create the tree node
-                noteitem = self.AppendItem(item, noteID)
-                # Add the node's image and node data
+                # Create the tree node with its node data and image
                 nodedata = _NodeData(nodetype=noteNodeType, recNum=noteNum)  # Identify this as a Note node
-                self.SetPyData(noteitem, nodedata)                  # Associate this data with the node
-                self.set_image(noteitem, "Note16")
+                self.AppendNode(item, noteID, nodedata, "Note16")
 
     def create_kwgroups_node(self):
         """ Create the Keywords node and populate it with all appropriate data """
@@ -3031,7 +3389,7 @@ class _DBTreeCtrl(wx.TreeCtrl):
         # Let's add the root node to our Keyword List
         self.kwgroups.append(kwg_root)
         # Get all Keyword Group : Keyword pairs from the database
-        for (kwg, kw) in DBInterface.list_of_all_keywords():
+        for (kwg, kw) in self.QueryTreeData('Keywords', DBInterface.list_of_all_keywords):
             # Check to see if the Keyword Group has already been added to the Database Tree and the Map dictionary 
             if not mapDict.has_key(kwg.upper()):
                 # If not, add the Keyword Group to the Tree
@@ -3048,12 +3406,10 @@ class _DBTreeCtrl(wx.TreeCtrl):
             else:
                 # ... we can identify the corresponding tree node from the map dictionary
                 kwg_item = mapDict[kwg.upper()]['item']
-            # Add the Keyword to the database tree
-            kw_item = self.AppendItem(kwg_item, kw)
-            # Specify the Keyword's node data and image
+            # Add the Keyword to the database tree with its node data and image.  (Keyword Groups are always added
+            # to the tree, as self.kwgroups needs their tree nodes.  Keywords may wait until their group is expanded.)
             nodedata = _NodeData(nodetype='KeywordNode', parent=kwg)     # Identify this as a Keyword node
-            self.SetPyData(kw_item, nodedata)                # Associate this data with the node
-            self.set_image(kw_item, "Keyword16")
+            kw_item = self.AppendNode(kwg_item, kw, nodedata, "Keyword16")
             # Add the Keyword to the map dictionary, pointing to the keyword's tree node
             mapDict[kwg.upper()][kw] = kw_item
 
@@ -3805,69 +4161,53 @@ class _DBTreeCtrl(wx.TreeCtrl):
 
             # print "Looking for %s" % node
 
-            notDone = True
-            (childNode, cookieItem) = self.GetFirstChild(currentNode)
-            while notDone and (currentNode != None):
-                itemText = Misc.unistrip(self.GetItemText(childNode))
-                # if childNode.IsOk():
-                #     print "Looking in %s at %s for %s." % (self.GetItemText(currentNode), itemText, node)
+            # If we didn't find the previous node, we can't go on
+            if currentNode == None:
+                break
+
+            # We're having a problem here going to Danish (and a couple other languages) with UTF-8 translation files.  
+            # the following few lines were added to correct that problem.
+            if ('unicode' in wx.PlatformInfo) and (type(node).__name__ == 'str'):
+                tmpNode = unicode(node, 'utf8')
+            else:
+                tmpNode = node
 
+            # Rather than walking through all the child nodes comparing their text, get the child nodes whose text matches
+            # the text of the node being sought from the current node's child index.  They are in tree order.
+            nextNode = None
+            for childNode in self.FindChildNodes(currentNode, tmpNode):
                 # Let's get the child Node's Data
                 childNodeData = self.GetPyData(childNode)
 
-                # To accept a node and climb on, the node text must match the text of the node being sought.
-                # If the node being added is a Keyword Example Node, we also need to make sure that the node being
-                # sought's Record Number matches the node being added's Record Number.  This is because it IS possible
-                # to have two clips with the same name in different collections applied as examples of the same Keyword.
+                if DEBUG:
+                    print "DatabaseTreeTab.select_Node()", self.GetItemText(childNode).encode('utf8'), childNodeData.nodetype, expectedNodeType
 
-                # Complex comparison:
-                #  1) is the childNode valid?
-                #  2) does the child node's text match the next node in the nodelist?
-                #  3) are the NodeTypes from compatible branches in the DB Tree?
+                # To accept a node and climb on, the node text must match the text of the node being sought, and
+                # the NodeTypes must be from compatible branches in the DB Tree
                 #    a) Library, Episode, or Transcript
                 #    b) Collection or Clip 
                 #    c) Keyword Group, Keyword, or Keyword Example
                 #    d) Search Results Library, Episode, or Transcript
                 #    e) Search Results Collection or Clip
-                #  4) Is it a Keyword Example OR the correct record number
+                if childNodeData.nodetype in expectedNodeType:
+                    nextNode = childNode
+                    break
 
-                # We're having a problem here going to Danish (and a couple other languages) with UTF-8 translation files.  
-                # the following few lines were added to correct that problem.
-                if ('unicode' in wx.PlatformInfo) and (type(node).__name__ == 'str'):
-                    tmpNode = unicode(node, 'utf8')
-                else:
-                    tmpNode = node
+            # If we've found the next node ...
+            if nextNode != None:
+                # ... increment the nodeListPos counter.
+                nodeListPos += 1
+                expectedNodeType = self.UpdateExpectedNodeType(expectedNodeType, nodeListPos, nodeData, nodeType)
+                currentNode = nextNode
+            # If not ...
+            else:
 
                 if DEBUG:
-                    print "DatabaseTreeTab.add_Node(1)", childNode.IsOk()
-                    # Can't print itemText or tmpNode, can't compare node!
-                    print "DatabaseTreeTab.add_Node(2)", itemText.encode('utf8'), tmpNode.encode('utf8'), type(itemText), type(tmpNode), itemText == tmpNode
-                    if childNodeData != None:
-                        print "DatabaseTreeTab.add_Node(3)", childNodeData.nodetype, expectedNodeType
-
-                if  (childNode.IsOk()) and \
-                    \
-                    (itemText.upper() == tmpNode.upper()) and \
-                    \
-                    (childNodeData.nodetype in expectedNodeType):
-
-                    # We've found the next node.  Increment the nodeListPos counter.
-                    nodeListPos += 1
-                    expectedNodeType = self.UpdateExpectedNodeType(expectedNodeType, nodeListPos, nodeData, nodeType)
-
-                    currentNode = childNode
-                    notDone = False
-                elif childNode == self.GetLastChild(currentNode):
-
-                    if DEBUG:
-                        dlg = Dialogs.ErrorDialog(self, 'Problem in _DBTreeCtrl.select_Node().\n"%s" not found for selection and display.' % node)
-                        dlg.ShowModal()
-                        dlg.Destroy()
-                    currentNode = None
-                    notDone = False
+                    dlg = Dialogs.ErrorDialog(self, 'Problem in _DBTreeCtrl.select_Node().\n"%s" not found for selection and display.' % node)
+                    dlg.ShowModal()
+                    dlg.Destroy()
 
-                if notDone:
-                    (childNode, cookieItem) = self.GetNextChild(currentNode, cookieItem)
+                currentNode = None
                 
         if (currentNode != None) and ensureVisible:
             # Unselect whatever is currently selected
@@ -3922,8 +4262,8 @@ class _DBTreeCtrl(wx.TreeCtrl):
             while tmpNode.IsOk():
                 # ... add the new node to the databse tree with the name of the child node ...
                 newNode = self.AppendItem(destNode, self.GetItemText(tmpNode))
-                # ... get the child node's Python data ...
-                pyData = self.GetPyData(tmpNode)
+                # ... get a copy of the child node's Python data, as the source node keeps its own ...
+                pyData = copy.copy(self.GetPyData(tmpNode))
                 # ... and get the destination node's Python data
                 destPyData = self.GetPyData(destNode)
                 # Assign the proper icon to the new node
@@ -4048,11 +4388,14 @@ class _DBTreeCtrl(wx.TreeCtrl):
                     elif node == keywordsPrompt:
                         msgData = nodeType + ' >|< Keywords'
 
-            notDone = True
-            (childNode, cookieItem) = self.GetFirstChild(currentNode)
+            # If we didn't find the previous node, we can't go on
+            if currentNode == None:
+                continue
 
-            while (childNode.IsOk()) and notDone and (currentNode != None):
-                itemText = Misc.unistrip(self.GetItemText(childNode))
+            # Rather than walking through all the child nodes comparing their text, get the child nodes whose text matches
+            # the text of the node being sought from the current node's child index.  They are in tree order.
+            nextNode = None
+            for childNode in self.FindChildNodes(currentNode, node):
                 childNodeData = self.GetPyData(childNode)
 
                 # To accept a node and climb on, the node text must match the text of the node being sought.
@@ -4061,42 +4404,32 @@ class _DBTreeCtrl(wx.TreeCtrl):
                 # to have two clips with the same name in different collections applied as examples of the same Keyword.
 
                 # Complex comparison:
-                #  1) is the childNode valid?
-                #  2) does the child node's text match the next node in the nodelist?
-                #  3) are the NodeTypes from compatible branches in the DB Tree?
+                #  1) are the NodeTypes from compatible branches in the DB Tree?
                 #    a) Library, Episode, or Transcript
                 #    b) Collection or Clip 
                 #    c) Keyword Group, Keyword, or Keyword Example
                 #    d) Search Results Library, Episode, or Transcript
                 #    e) Search Results Collection or Clip
-                #  4) Is it a Keyword Example OR the correct record number
-                if  (childNode.IsOk()) and \
-                    \
-                    (itemText.upper() == node.upper()) and \
-                    \
-                    (childNodeData.nodetype in expectedNodeType) and \
+                #  2) Is it a Keyword Example OR the correct record number
+                if  (childNodeData.nodetype in expectedNodeType) and \
                     \
                     ((exampleClipNum == 0) or (childNodeData.nodetype != 'KeywordExampleNode') or (childNodeData.recNum == exampleClipNum)):
+                    nextNode = childNode
+                    break
 
-                    # print "In %s, %s = %s.  Climbing on." % (self.GetItemText(currentNode), itemText, node)
-                    
-                    # We've found the next node.  Increment the nodeListPos counter.
-                    nodeListPos += 1
-                    expectedNodeType = self.UpdateExpectedNodeType(expectedNodeType, nodeListPos, nodeData, nodeType)
-
-                    currentNode = childNode
-                    notDone = False
-                elif childNode == self.GetLastChild(currentNode):
-                    if DEBUG:
-                        dlg = Dialogs.ErrorDialog(self, 'Problem in _DBTreeCtrl.delete_Node().\n"%s" not found for delete.' % node)
-                        dlg.ShowModal()
-                        dlg.Destroy()
-                    currentNode = None
-                    notDone = False
-                # if we're still looking, haven't yet reached the end of the list, ...
-                if currentNode != None:
-                    # ... get the next child node
-                    (childNode, cookieItem) = self.GetNextChild(currentNode, cookieItem)
+            # If we've found the next node ...
+            if nextNode != None:
+                # ... increment the nodeListPos counter.
+                nodeListPos += 1
+                expectedNodeType = self.UpdateExpectedNodeType(expectedNodeType, nodeListPos, nodeData, nodeType)
+                currentNode = nextNode
+            # If not ...
+            else:
+                if DEBUG:
+                    dlg = Dialogs.ErrorDialog(self, 'Problem in _DBTreeCtrl.delete_Node().\n"%s" not found for delete.' % node)
+                    dlg.ShowModal()
+                    dlg.Destroy()
+                currentNode = None
 
         # If we have found the correct node ...
         if currentNode != None:
@@ -6613,30 +6946,22 @@ class _DBTreeCtrl(wx.TreeCtrl):
                         # Let's get a  list of those Keyword Examples before we do anything.
                         kwExamples = DBInterface.list_all_keyword_examples_for_all_clips_in_a_collection(selData.recNum)
                         try:
-                            # Create a list starting with the CURRENT Collection
-                            nestedCollectionList = [(selData.recNum, self.GetItemText(sel), selData.parent)]
-                            # While the list has elements ...
-                            while len(nestedCollectionList) > 0:
-                                # ... add all nested Collections in the current Collection
-                                (tmpColNum, tmpColId, tmpParentNum) = nestedCollectionList[0]
-                                # ... drop the current Collection from the list 
-                                nestedCollectionList = nestedCollectionList[1:] + DBInterface.list_of_collections(tmpColNum)
-                                # ... get all the quotes in the current Collection
-                                quoteList = DBInterface.list_of_quotes_by_collectionnum(tmpColNum)
-                                # ... for each Quote ...
-                                for quote in quoteList:
-                                    # Remove the Object's Position Data from the Source Document, if it's open
-                                    self.parent.ControlObject.RemoveQuoteFromOpenDocument(quote[0], quote[3])
-                                    # Even if this computer doesn't need to update the Source Document, others might need to.
-                                    if not TransanaConstants.singleUserVersion:
-                                        # We need to pass the type of the deleted Object's record number and the deleted Object's
-                                        # SOURCE Document number.
+                            # Get all the quotes in the CURRENT Collection and all its nested Collections
+                            quoteList = DBInterface.list_of_quotes_by_collectionnum(selData.recNum, includeNested=True)
+                            # For each Quote ...
+                            for quote in quoteList:
+                                # Remove the Object's Position Data from the Source Document, if it's open
+                                self.parent.ControlObject.RemoveQuoteFromOpenDocument(quote[0], quote[3])
+                                # Even if this computer doesn't need to update the Source Document, others might need to.
+                                if not TransanaConstants.singleUserVersion:
+                                    # We need to pass the type of the deleted Object's record number and the deleted Object's
+                                    # SOURCE Document number.
+                                    
+                                    if DEBUG:
+                                        print 'Message to send = "DQPOD %s %s"' % (quote[0], quote[3])
                                         
-                                        if DEBUG:
-                                            print 'Message to send = "DQPOD %s %s"' % (quote[0], quote[3])
-                                            
-                                        if (TransanaGlobal.chatWindow != None) and (quote[3] > 0):
-                                            TransanaGlobal.chatWindow.SendMessage("DQPOD %s %s" % (quote[0], quote[3]))
+                                    if (TransanaGlobal.chatWindow != None) and (quote[3] > 0):
+                                        TransanaGlobal.chatWindow.SendMessage("DQPOD %s %s" % (quote[0], quote[3]))
 
                             # Try to delete the Collection, initiating a Transaction
                             delResult = collection.db_delete(1)
@@ -11665,6 +11990,9 @@ class _DBTreeCtrl(wx.TreeCtrl):
         originalName = self.GetItemText(sel_item)
         # Get the data associated with the selected item
         sel_item_data = self.GetPyData(sel_item)
+        # If the label edit is accepted, the node's text changes after this method is done, so the parent's child index
+        # will be out of date.  (The parent's Node Data is used rather than the parent node, which could be deleted first.)
+        wx.CallAfter(self.childIndexes.pop, self.GetPyData(self.GetItemParent(sel_item)), None)
         try:
             # If ESC is pressed ...
             if event.IsEditCancelled():
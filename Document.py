@@ -38,6 +38,8 @@ import DataObject
 import DBInterface
 # import Transana's Dialogs
 import Dialogs
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Miscellaneous Functions
 import Misc
 # import Transana's Note Object
@@ -294,6 +296,8 @@ class Document(DataObject.DataObject):
 
     def db_save(self, use_transactions=True, ignore_filename=False):
         """Save the record to the database using Insert or Update as appropriate."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
 
         # Define and implement Demo Version limits
         if TransanaConstants.demoVersion and (self.number == 0):
@@ -29,6 +29,8 @@ import sys
 import Collection
 # import Database Calls
 import DBInterface
+# import Transana's Interval Index
+import IntervalIndex
 ### import Miscellaneous Routines
 ##import Misc
 # import Transana's Quote Object
@@ -118,13 +120,85 @@ class DocumentQuotesTab(wx.Panel):
         self.Layout()
 
     def DisplayCells(self, textPos=-1, textSel=(-2, -2)):
-        """ Get data from the database and populate the Document Quotes Grid """
+        """ Request that the Document Quotes Grid be populated from the Document's Interval Tree """
         # Update the Position and Selection values
         self.textPos = textPos
         self.textSel = textSel
         # Signal the need to redraw the data grid
         self.redraw = True
 
+    def GetItemIndex(self):
+        """ Get the Interval Tree of the Quotes for the Document.  The saved Quote positions are loaded from the
+            database once.  If the Document is open, the LIVE Quote positions, which change as the Document is
+            edited, are used instead, and their Interval Tree is rebuilt only when they change. """
+        # Get the Interval Tree of the saved Quote positions, if it has already been built
+        index = IntervalIndex.GetIndex(('Document', self.documentObj.number))
+        # If the Interval Tree hasn't been built, or has been invalidated by a change in the data ...
+        if index is None:
+            # ... initialize the list of intervals
+            intervals = []
+            # Get ALL the quote data for the Document from the database
+            for quote in DBInterface.list_of_quotes_by_document(self.documentObj.number):
+                # Add the Quote's interval
+                intervals.append((quote['StartChar'], quote['EndChar'], ('Quote', quote['QuoteNum'])))
+            # Build the Interval Tree ...
+            index = IntervalIndex.IntervalTree(intervals)
+            # ... and save it so it can be re-used
+            IntervalIndex.SetIndex(('Document', self.documentObj.number), index)
+
+        # See if the Document is open
+        docObj = self.ControlObject.GetOpenDocument(self.documentObj.number)
+        # If the Document is NOT open, we use the saved Quote positions
+        if docObj == None:
+            return index
+
+        # Get the Interval Tree of the live Quote positions, if it has already been built
+        liveIndex = IntervalIndex.GetIndex(('LiveDocument', self.documentObj.number))
+        # If it hasn't been built, or the live Quote positions have changed since it was built ...
+        if (liveIndex is None) or (liveIndex.source != docObj.quote_dict):
+            # ... initialize the list of intervals
+            intervals = []
+            # For each saved Quote ...
+            for (startChar, endChar, item) in index.GetAll():
+                # ... if the Quote is in the LIVE document ...
+                if docObj.quote_dict.has_key(item[1]):
+                    # ... use the live document's quote positions.  (Quotes deleted from the LIVE Document are dropped.)
+                    (startChar, endChar) = docObj.quote_dict[item[1]]
+                    intervals.append((startChar, endChar, item))
+            # Build the Interval Tree
+            liveIndex = IntervalIndex.IntervalTree(intervals)
+            # Share the display data with the saved Quote positions' Interval Tree, as it doesn't depend on position
+            liveIndex.itemData = index.itemData
+            # Remember the live Quote positions the Interval Tree was built from
+            liveIndex.source = docObj.quote_dict.copy()
+            # Save the Interval Tree so it can be re-used
+            IntervalIndex.SetIndex(('LiveDocument', self.documentObj.number), liveIndex)
+        return liveIndex
+
+    def GetRowData(self, index, item):
+        """ Get the information needed to display a Quote in the Grid, loading it from the database the first time """
+        # If we've already loaded this Quote, we can use what we saved
+        if index.itemData.has_key(item):
+            return index.itemData[item]
+        # Load the Quote.  Skip the Quote Text, which we don't need.
+        tmpObj = Quote.Quote(item[1], skipText=True)
+        # Initialize the string for all the Keywords to blank
+        kwString = unicode('', 'utf8')
+        # Initialize the prompt for building the keyword string
+        kwPrompt = '%s'
+        # For each Keyword in the Keyword List ...
+        for kws in tmpObj.keyword_list:
+            # ... add the Keyword to the Keyword List
+            kwString += kwPrompt % kws.keywordPair
+            # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
+            kwPrompt = '\n%s'
+        # Save what we need to display the Quote, so we don't need to load it again
+        index.itemData[item] = {'nodeString' : tmpObj.GetNodeString(True),
+                                'kwString' : kwString,
+                                'number' : tmpObj.number,
+                                'objType' : 'Quote'}
+        return index.itemData[item]
+
     def OnIdle(self, event):
         """ Update the contents of this DataWindow tab during IDLE time, as it could be slow, especially during
             the editing of a document """
@@ -145,39 +219,41 @@ class DocumentQuotesTab(wx.Panel):
                 self.redraw = False
                 self.redrawComplete = False
 
-                # Get quote data from the CONTROL OBJECT.  This way, we will get the LIVE data if this
+                # Get the Interval Tree for the Quotes.  This way, we will get the LIVE data if this
                 # document is currently loaded, and will get the data from the database otherwise
-                quoteData = self.ControlObject.GetQuoteDataForDocument(self.documentObj.number, self.textPos, self.textSel)
-        ##        if TransanaConstants.proVersion:
-        ##            # Get the snapshot data from the database
-        ##            snapshotData = DBInterface.list_of_snapshots_by_episode(self.documentObj.number, TimeCode)
-        ##
-
-                # Combine the two lists
+                index = self.GetItemIndex()
+                # If we're showing all Quotes ...
+                if (self.textPos == -1) and (self.textSel == (-2, -2)):
+                    # ... get all the intervals
+                    intervals = index.GetAll()
+                # If we're showing the Quotes at a position or selection ...
+                else:
+                    # If we have a position but no selection, treat the position as the selection
+                    if self.textSel == (-2, -2):
+                        (selStart, selEnd) = (self.textPos, self.textPos)
+                    else:
+                        (selStart, selEnd) = self.textSel
+                    # Find the Quotes that overlap the selection, then keep the ones that the database query would have
+                    # found:  Quotes that span the start of the selection, fall within it, or span its end
+                    intervals = [(start, end, item) for (start, end, item) in index.Overlap(selStart, selEnd)
+                                 if ((start < selStart) and (end > selStart)) or \
+                                    ((start >= selStart) and (end <= selEnd)) or \
+                                    ((start < selEnd) and (end > selEnd))]
+
+                # Get the display data for each Quote
                 cellData = {}
-                # For each Quote ...
-                for quote in quoteData:
-                    # load the Quote
-                    tmpObj = Quote.Quote(quote['QuoteNum'])
-                    # Update the Quote's Start and End times based on editing changes
-                    tmpObj.start_char = quote['StartChar']
-                    tmpObj.end_char = quote['EndChar']
+                # For each interval ...
+                for (startChar, endChar, item) in intervals:
+                    # ... get the Quote's display data
+                    rowData = self.GetRowData(index, item)
                     # add the Quote to the cellData
-                    cellData[(quote['StartChar'], quote['EndChar'], tmpObj.GetNodeString(True).upper())] = tmpObj
+                    cellData[(startChar, endChar, rowData['nodeString'].upper())] = rowData
 
                     # See if other Transana actions that take priority should be allowed
                     wx.YieldIfNeeded()
                     if self.redraw:
                         break
 
-        ##        if TransanaConstants.proVersion:
-        ##            # for each Snapshot ...
-        ##            for snapshot in snapshotData:
-        ##                # load the Snapshot
-        ##                tmpObj = Snapshot.Snapshot(snapshot['SnapshotNum'])
-        ##                # add the Snapshot to the cellData
-        ##                cellData[(snapshot['SnapshotStart'], snapshot['SnapshotStop'], tmpObj.GetNodeString(True).upper())] = tmpObj
-
                 # See if other Transana actions that take priority should be allowed
                 wx.YieldIfNeeded()
 
@@ -199,33 +275,6 @@ class DocumentQuotesTab(wx.Panel):
                 loop = 0
                 # Add the data to the Grid
                 for keyVals in sortedKeys:
-                    # If we have a Quote ...
-                    if isinstance(cellData[keyVals], Quote.Quote):
-                        # ... get the start, end characters and the object type
-                        startChar = cellData[keyVals].start_char
-                        endChar = cellData[keyVals].end_char
-                        objType = 'Quote'
-                        # Initialize the string for all the Keywords to blank
-                        kwString = unicode('', 'utf8')
-                        # Initialize the prompt for building the keyword string
-                        kwPrompt = '%s'
-        ##            # If we have a Snapshot ...
-        ##            elif isinstance(cellData[keyVals], Snapshot.Snapshot):
-        ##                # ... get the start, stop times and the object type
-        ##                startTime = cellData[keyVals].episode_start
-        ##                stopTime = cellData[keyVals].episode_start + cellData[keyVals].episode_duration
-        ##                objType = 'Snapshot'
-        ##                # if there are whole snapshot keywords ...
-        ##                if len(cellData[keyVals].keyword_list) > 0:
-        ##                    # ... initialize the string for all the Keywords to indicate this
-        ##                    kwString = unicode(_('Whole:'), 'utf8') + '\n'
-        ##                # If there are NOT whole snapshot keywords ...
-        ##                else:
-        ##                    # ... initialize the string for all the Keywords to blank
-        ##                    kwString = unicode('', 'utf8')
-        ##                # Initialize the prompt for building the keyword string
-        ##                kwPrompt = '  %s'
-
 
                     # See if other Transana actions that take priority should be allowed
                     wx.YieldIfNeeded()
@@ -233,57 +282,19 @@ class DocumentQuotesTab(wx.Panel):
                     if self.redraw:
                         break
                 
-                    # For each Keyword in the Keyword List ...
-                    for kws in cellData[keyVals].keyword_list:
-                        # ... add the Keyword to the Keyword List
-                        kwString += kwPrompt % kws.keywordPair
-                        # If we have a Quote ...
-                        if isinstance(cellData[keyVals], Quote.Quote):
-                            # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
-                            kwPrompt = '\n%s'
-        ##                # If we have a Snapshot ...
-        ##                elif isinstance(cellData[keyVals], Snapshot.Snapshot):
-        ##                    # After the first keyword, we need a NewLine in front of the Keywords.  This accompishes that!
-        ##                    kwPrompt = '\n  %s'
-
-        ##            # If we have a Snapshot, we also want to display CODED Keywords in addition to the WHOLE Snapshot keywords
-        ##            # we've already included
-        ##            if isinstance(cellData[keyVals], Snapshot.Snapshot):
-        ##                # Keep a list of the coded keywords we've already displayed
-        ##                codedKeywords = []
-        ##                # Modify the template for additional keywords
-        ##                kwPrompt = '\n  %s : %s'
-        ##                # For each of the Snapshot's Coding Objects ...
-        ##                for x in range(len(cellData[keyVals].codingObjects)):
-        ##                    # ... if the Coding Object is visible and if it is not already in the codedKeywords list ...
-        ##                    if (cellData[keyVals].codingObjects[x]['visible']) and \
-        ##                      (not (cellData[keyVals].codingObjects[x]['keywordGroup'], cellData[keyVals].codingObjects[x]['keyword']) in codedKeywords):
-        ##                        # ... if this is the FIRST Coded Keyword ...
-        ##                        if len(codedKeywords) == 0:
-        ##                            # ... and if there WERE Whole Snapshot Keywords ...
-        ##                            if len(kwString) > 0:
-        ##                                # ... then add a line break to the Keywords String ...
-        ##                                kwString += '\n'
-        ##                            # ... add the indicator to the Keywords String that we're starting to show Coded Keywords
-        ##                            kwString += unicode(_('Coded:'), 'utf8')
-        ##                        # ... add the coded keyword to the Keywords String ...
-        ##                        kwString += kwPrompt % (cellData[keyVals].codingObjects[x]['keywordGroup'], cellData[keyVals].codingObjects[x]['keyword'])
-        ##                        # ... add the keyword to the Coded Keywords list
-        ##                        codedKeywords.append((cellData[keyVals].codingObjects[x]['keywordGroup'], cellData[keyVals].codingObjects[x]['keyword']))
-
                     # Insert the data values into the Grid Row
                     # Start and End Characters  in column 0
-                    self.gridQuotes.SetCellValue(loop, 0, "%s -\n %s" % (startChar, endChar))
+                    self.gridQuotes.SetCellValue(loop, 0, "%s -\n %s" % (keyVals[0], keyVals[1]))
                     # Node String (including Item name) in column 1
-                    self.gridQuotes.SetCellValue(loop, 1, cellData[keyVals].GetNodeString(True))
+                    self.gridQuotes.SetCellValue(loop, 1, cellData[keyVals]['nodeString'])
                     # make the Collection / Item ID line auto-word-wrap
                     self.gridQuotes.SetCellRenderer(loop, 1, grid.GridCellAutoWrapStringRenderer())
                     # Keywords in column 2
-                    self.gridQuotes.SetCellValue(loop, 2, kwString)
+                    self.gridQuotes.SetCellValue(loop, 2, cellData[keyVals]['kwString'])
                     # Item Number (hidden) in column 3.  Convert value to a string
-                    self.gridQuotes.SetCellValue(loop, 3, "%s" % cellData[keyVals].number)
+                    self.gridQuotes.SetCellValue(loop, 3, "%s" % cellData[keyVals]['number'])
                     # Item Type (hidden) in column 4
-                    self.gridQuotes.SetCellValue(loop, 4, "%s" % objType)
+                    self.gridQuotes.SetCellValue(loop, 4, "%s" % cellData[keyVals]['objType'])
                     # Auto-size THIS row
                     self.gridQuotes.AutoSizeRow(loop, True)
                     # Increment the Row Counter
@@ -26,6 +26,9 @@ if DEBUG:
 import wx
 # Import wxPython's CheckListCtrl Mixin
 from wx.lib.mixins.listctrl import CheckListCtrlMixin
+
+# import Python's array module
+import array
 # import Python's cPickle module
 import cPickle
 # import Python's os and sys module
@@ -47,6 +50,104 @@ import TransanaGlobal
 # Import Transana's Images
 import TransanaImages
 
+def ReconcileLists(formList, fileList, listIsOrdered=False):
+    """ Take lists from the form and from the database and reconcile them, returning the results  """
+    # We need to compare the form data to the file data and reconcile differences.
+    #   1.  detect items that are in the file that are not in the form and drop them
+    #   2.  detect items that are in the form that are not in the file.  If the list is
+    #       ordered, we can add them to the bottom.  Otherwise, we need to insert them
+    #       in place.  Either way, we make sure they are checked!
+    #
+    # As long as the list item tuples match and the last item in each tuple is the "checked" item,
+    # we don't need to know the contents of the list.
+    #
+    # Lists can hold tens of thousands of items, so we use dictionaries rather than searching the lists.
+
+    # Create an empty list for the results
+    resList = []
+
+    # Count the copies of each item in the Form List, so we can look them up quickly
+    formCounts = {}
+    for items in formList:
+        formCounts[items] = formCounts.get(items, 0) + 1
+    # Keep track of how many copies of each Form List item are matched by File List items
+    usedCounts = {}
+
+    # Iterate through the File List, which should control initial order and checked status
+    for items in fileList:
+        # Get all items except the last one
+        mostItems = items[:-1]
+        # Check to see if the file list items are in the form list, checked as True, then checked as False
+        for formItems in (mostItems + (True,), mostItems + (False,)):
+            if formCounts.get(formItems, 0) > 0:
+                resList.append(items)
+                # Note that this copy of the Form List item has been used
+                formCounts[formItems] -= 1
+                usedCounts[formItems] = usedCounts.get(formItems, 0) + 1
+                break
+
+        # If the file list item doesn't appear in the form list, it is NOT placed in
+        # the results list.
+        else:
+            if DEBUG:
+                print "In File, not Form:", items
+
+    # All that should be left in the Form List after the File List items have been removed
+    # are items that existed in the form that didn't exist in the file.  Remove the used items, in one pass.
+    # Where there are several copies of an item, the first copies are the ones that are used.
+    remainingList = []
+    for items in formList:
+        if usedCounts.get(items, 0) > 0:
+            usedCounts[items] -= 1
+        else:
+            remainingList.append(items)
+
+    # First, let's figure out how to place items in an unordered list.
+    # For the moment, we'll look at the first column of the first item.  If it's an integer,
+    # we'll use the second column.  Otherwise, we can use the first column.
+    if (len(remainingList) > 0) and (isinstance(remainingList[0][0], long)):
+        lookupCol = 1
+    else:
+        lookupCol = 0
+
+    # Make sure all the remaining items are checked
+    newItems = []
+    # Iterate through the items left in the Form List, the ones left after processing the File list.
+    for items in remainingList:
+        # If a item is in the form but not in the file, check to see if it is unchecked.
+        if items[-1] == False:
+            # If it is not checked, we need to rebuild the tuple to ensure it is checked when we're done!
+            items = items[:-1] + (True,)
+        newItems.append(items)
+
+        if DEBUG:
+            print "In Form, not File:", items
+
+    # If we have a user-ordered list ...
+    if listIsOrdered:
+        # ... just append the items to the end of the list.
+        resList.extend(newItems)
+    # If we have a list that is not user-ordered, it is alphabetical.  Each new item goes in front of the first
+    # item in the Results List that comes after it alphabetically.
+    elif len(newItems) > 0:
+        # Rather than searching the Results List for each new item, we sort once.  An item in the Results List
+        # stays in front of any new item that doesn't come before it or any item above it, so it is sorted by the
+        # largest value at or above it in the list.  New items are sorted by their own values.  Python's sort keeps
+        # items with equal values in order, which places new items after Results List items with the same value.
+        sortList = []
+        largest = None
+        for items in resList:
+            if (largest == None) or (items[lookupCol] > largest):
+                largest = items[lookupCol]
+            sortList.append((largest, items))
+        for items in newItems:
+            sortList.append((items[lookupCol], items))
+        sortList.sort(key=lambda sortItem: sortItem[0])
+        resList = [items for (value, items) in sortList]
+
+    return resList
+
+
 # Declare Constants for the Toolbar Button IDs
 T_FILE_OPEN    =  wx.NewId()
 T_FILE_SAVE    =  wx.NewId()
@@ -75,6 +176,219 @@ class CheckListCtrl(wx.ListCtrl, CheckListCtrlMixin):
     def OnItemActivated(self, event):
         self.ToggleItem(event.m_itemIndex)
 
+class VirtualCheckListCtrl(wx.ListCtrl):
+    """ This class provides a virtual CheckListCtrl for lists that can hold tens of thousands of items.  Rather than
+        creating a ListCtrl item for each entry, the data is held in one array per column and the check status in a
+        bit array, and the ListCtrl asks for the text of only the items it displays. """
+    def __init__(self, parent, multSelect=False):
+        # If multSelect is requested ...
+        if multSelect:
+            # ... create a virtual ListCtrl in Report View that allows multiple selection
+            wx.ListCtrl.__init__(self, parent, -1, style=wx.LC_REPORT | wx.LC_VIRTUAL)
+        # If multSelect is NOT requested ...
+        else:
+            # ... create a virtual ListCtrl in Report View that only allows single selection
+            wx.ListCtrl.__init__(self, parent, -1, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+        # Create an image list with the Unchecked (image 0) and Checked (image 1) check box images
+        self.imageList = wx.ImageList(16, 16)
+        self.imageList.Add(self.CreateCheckBitmap(0))
+        self.imageList.Add(self.CreateCheckBitmap(wx.CONTROL_CHECKED))
+        self.SetImageList(self.imageList, wx.IMAGE_LIST_SMALL)
+        # Initialize the list data.  There is one array per column.
+        self.columns = []
+        # Columns can have a function that converts the stored value to the text to display, such as a Collection
+        # Number to the Collection's Node String.  These are keyed by column number.
+        self.columnFormats = {}
+        # Initialize the Item Data array
+        self.itemData = array.array('l')
+        # Initialize the check status bit array, 8 items per byte
+        self.checks = bytearray()
+        # Bind the Left Mouse Down method, to catch clicks on the check boxes
+        self.Bind(wx.EVT_LEFT_DOWN, self.OnLeftDown)
+        # Bind the Item Activated method
+        self.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.OnItemActivated)
+
+    def CreateCheckBitmap(self, flag):
+        """ Create a check box bitmap, the way the CheckListCtrlMixin does """
+        # Create an empty bitmap
+        bmp = wx.EmptyBitmap(16, 16)
+        # Create a Device Context for drawing on the bitmap
+        dc = wx.MemoryDC(bmp)
+        dc.Clear()
+        # Draw the platform's check box
+        wx.RendererNative.Get().DrawCheckBox(self, dc, (0, 0, 16, 16), flag)
+        # Release the bitmap from the Device Context
+        dc.SelectObject(wx.NullBitmap)
+        return bmp
+
+    def SetData(self, dataList, columnFormats={}, itemData=None):
+        """ Replace the list's contents.  dataList is a list of tuples with one value for each column followed by the
+            checked(boolean) status.  columnFormats is a dictionary of functions that convert a column's values to the
+            text to display.  itemData is an optional list of integer Item Data values. """
+        # Note the number of items
+        itemCount = len(dataList)
+        # Note the number of columns
+        colCount = self.GetColumnCount()
+        # Split the data into columns
+        self.columns = []
+        for col in range(colCount):
+            values = [items[col] for items in dataList]
+            # Integer columns, such as Collection Numbers, are stored in compact integer arrays
+            if (itemCount > 0) and isinstance(values[0], (int, long)):
+                values = array.array('l', values)
+            self.columns.append(values)
+        # Remember the column formats
+        self.columnFormats = columnFormats
+        # Remember the Item Data
+        if itemData == None:
+            self.itemData = array.array('l', [0]) * itemCount
+        else:
+            self.itemData = array.array('l', itemData)
+        # Set the check status bits from the last value in each tuple
+        self.checks = bytearray((itemCount + 7) / 8)
+        for x in xrange(itemCount):
+            if dataList[x][-1]:
+                self.checks[x >> 3] |= 1 << (x & 7)
+        # Tell the ListCtrl how many items there are ...
+        self.SetItemCount(itemCount)
+        # ... and redraw it
+        self.Refresh()
+
+    def GetData(self):
+        """ Return the list's contents as a list of tuples with one value for each column followed by the
+            checked(boolean) status, as passed to SetData(). """
+        # Add the check status to the columns, and combine them into tuples
+        return zip(*(self.columns + [[self.IsChecked(x) for x in xrange(self.GetItemCount())]]))
+
+    def GetValue(self, itemNum, colNum):
+        """ Return the value stored for an item in a column """
+        return self.columns[colNum][itemNum]
+
+    def OnGetItemText(self, itemNum, colNum):
+        """ Provide the text for an item for the virtual ListCtrl """
+        # Get the stored value
+        value = self.columns[colNum][itemNum]
+        # If the column has a format function ...
+        if self.columnFormats.has_key(colNum):
+            # ... use it to get the text to display
+            return self.columnFormats[colNum](value)
+        return value
+
+    def OnGetItemImage(self, itemNum):
+        """ Provide the check box image for an item for the virtual ListCtrl """
+        # Image 1 is checked, image 0 is unchecked
+        if self.IsChecked(itemNum):
+            return 1
+        else:
+            return 0
+
+    def OnGetItemAttr(self, itemNum):
+        """ Provide the display attributes for an item for the virtual ListCtrl.  We use the defaults. """
+        return None
+
+    def DeleteAllItems(self):
+        """ Delete all items from the list """
+        # Clear the list data
+        self.columns = []
+        self.itemData = array.array('l')
+        self.checks = bytearray()
+        # Tell the ListCtrl there are no items ...
+        self.SetItemCount(0)
+        # ... and redraw it
+        self.Refresh()
+
+    def GetItemData(self, itemNum):
+        """ Get an item's Item Data """
+        return self.itemData[itemNum]
+
+    def SetItemData(self, itemNum, dataVal):
+        """ Set an item's Item Data """
+        self.itemData[itemNum] = dataVal
+
+    def IsChecked(self, itemNum):
+        """ Determine if an item is checked """
+        return (self.checks[itemNum >> 3] & (1 << (itemNum & 7))) != 0
+
+    def CheckItem(self, itemNum, check=True):
+        """ Check (or uncheck) an item """
+        # Set or clear the item's check bit
+        if check:
+            self.checks[itemNum >> 3] |= 1 << (itemNum & 7)
+        else:
+            self.checks[itemNum >> 3] &= ~(1 << (itemNum & 7)) & 0xFF
+        # Redraw the item
+        self.RefreshItem(itemNum)
+
+    def ToggleItem(self, itemNum):
+        """ Toggle an item's check status """
+        self.CheckItem(itemNum, not self.IsChecked(itemNum))
+
+    def CheckAll(self, check=True):
+        """ Check (or uncheck) all items at once """
+        # Replace the entire bit array
+        if check:
+            self.checks = bytearray('\xff') * len(self.checks)
+        else:
+            self.checks = bytearray(len(self.checks))
+        # Redraw the list
+        self.Refresh()
+
+    def SwapItems(self, itemNum1, itemNum2):
+        """ Exchange the positions of two items in the list, along with their check status, Item Data, and selection """
+        # Exchange the column values
+        for values in self.columns:
+            (values[itemNum1], values[itemNum2]) = (values[itemNum2], values[itemNum1])
+        # Exchange the Item Data
+        (self.itemData[itemNum1], self.itemData[itemNum2]) = (self.itemData[itemNum2], self.itemData[itemNum1])
+        # Exchange the check status
+        (checked1, checked2) = (self.IsChecked(itemNum1), self.IsChecked(itemNum2))
+        self.CheckItem(itemNum1, checked2)
+        self.CheckItem(itemNum2, checked1)
+        # Exchange the selection
+        state1 = self.GetItemState(itemNum1, wx.LIST_STATE_SELECTED)
+        self.SetItemState(itemNum1, self.GetItemState(itemNum2, wx.LIST_STATE_SELECTED), wx.LIST_STATE_SELECTED)
+        self.SetItemState(itemNum2, state1, wx.LIST_STATE_SELECTED)
+        # Redraw the items
+        self.RefreshItems(min(itemNum1, itemNum2), max(itemNum1, itemNum2))
+
+    def AutoSizeColumns(self, minWidth=100):
+        """ Size the columns to fit their headers and their longest text.  (wx.LIST_AUTOSIZE only measures the
+            items that have been displayed in a virtual ListCtrl.) """
+        # For each column ...
+        for col in range(self.GetColumnCount()):
+            # ... measure the Header
+            width = self.GetTextExtent(self.GetColumn(col).GetText())[0]
+            # If there is data ...
+            if (len(self.columns) > col) and (len(self.columns[col]) > 0):
+                # If the column has a format function ...
+                if self.columnFormats.has_key(col):
+                    # ... get the text for each different value.  (Many Clips share a Collection.)
+                    values = [self.columnFormats[col](value) for value in set(self.columns[col])]
+                else:
+                    values = self.columns[col]
+                # Measure the longest text.  Measuring every item would take too long in very long lists.
+                width = max(width, self.GetTextExtent(max(values, key=len))[0])
+            # The first column needs room for the check box
+            if col == 0:
+                width += 16
+            # Set the column width, with a margin
+            self.SetColumnWidth(col, max(width + 20, minWidth))
+
+    def OnLeftDown(self, event):
+        """ Toggle an item's check status when its check box is clicked """
+        # Determine where the click was
+        (itemNum, flags) = self.HitTest(event.GetPosition())
+        # If it was on a check box ...
+        if (itemNum > -1) and (flags & wx.LIST_HITTEST_ONITEMICON):
+            # ... toggle the item
+            self.ToggleItem(itemNum)
+        # Allow normal selection processing
+        event.Skip()
+
+    def OnItemActivated(self, event):
+        """ Toggle an item's check status when it is double-clicked """
+        self.ToggleItem(event.m_itemIndex)
+
 class FilterDialog(wx.Dialog):
     """ This window implements Document, Episode, Quote, Clip, and Keyword filtering for Transana Reports.
         Required parameters are:
@@ -181,6 +495,8 @@ class FilterDialog(wx.Dialog):
 
         # Remember the title
         self.title = title
+        # Initialize the Collection Node Strings shown in the Quote, Clip, and Snapshot lists, keyed by Collection Number
+        self.collectionNodeStrings = {}
         # If a configName exists ...
         if self.configName != '':
             # ... add it to the title for the window (but not what gets saved!)
@@ -414,8 +730,8 @@ class FilterDialog(wx.Dialog):
             pnlHSizer = wx.BoxSizer(wx.HORIZONTAL)
             # ... place the Document Panel on the Notebook, creating a Documents tab ...
             self.notebook.AddPage(self.documentsPanel, _("Documents"))
-            # ... place a Check List Ctrl on the Documents Panel ...
-            self.documentList = CheckListCtrl(self.documentsPanel, multSelect=multSelect)
+            # ... place a Virtual Check List Ctrl on the Documents Panel, as this list can be very long ...
+            self.documentList = VirtualCheckListCtrl(self.documentsPanel, multSelect=multSelect)
             # ... and place it on the panel's horizontal sizer.
             pnlHSizer.Add(self.documentList, 1, wx.EXPAND)
             # The document List needs two columns, Document ID and Library ID.
@@ -442,8 +758,8 @@ class FilterDialog(wx.Dialog):
             pnlHSizer = wx.BoxSizer(wx.HORIZONTAL)
             # ... place the Episode Panel on the Notebook, creating an Episodes tab ...
             self.notebook.AddPage(self.episodesPanel, _("Episodes"))
-            # ... place a Check List Ctrl on the Episodes Panel ...
-            self.episodeList = CheckListCtrl(self.episodesPanel, multSelect=multSelect)
+            # ... place a Virtual Check List Ctrl on the Episodes Panel, as this list can be very long ...
+            self.episodeList = VirtualCheckListCtrl(self.episodesPanel, multSelect=multSelect)
             # ... and place it on the panel's horizontal sizer.
             pnlHSizer.Add(self.episodeList, 1, wx.EXPAND)
             # The episode List needs two columns, Episode ID and Library ID.
@@ -551,8 +867,8 @@ class FilterDialog(wx.Dialog):
             pnlHSizer = wx.BoxSizer(wx.HORIZONTAL)
             # ... place the Quotes Panel on the Notebook, creating a Quotes tab ...
             self.notebook.AddPage(self.quotesPanel, _("Quotes"))
-            # ... place a Check List Ctrl on the Quotes Panel ...
-            self.quoteList = CheckListCtrl(self.quotesPanel, multSelect=multSelect)
+            # ... place a Virtual Check List Ctrl on the Quotes Panel, as this list can be very long ...
+            self.quoteList = VirtualCheckListCtrl(self.quotesPanel, multSelect=multSelect)
             # ... and place it on the panel's horizontal sizer.
             pnlHSizer.Add(self.quoteList, 1, wx.EXPAND)
             # The Quote List needs two columns, Quote ID and Collection nesting.
@@ -579,8 +895,8 @@ class FilterDialog(wx.Dialog):
             pnlHSizer = wx.BoxSizer(wx.HORIZONTAL)
             # ... place the Clips Panel on the Notebook, creating a Clips tab ...
             self.notebook.AddPage(self.clipsPanel, _("Clips"))
-            # ... place a Check List Ctrl on the Clips Panel ...
-            self.clipList = CheckListCtrl(self.clipsPanel, multSelect=multSelect)
+            # ... place a Virtual Check List Ctrl on the Clips Panel, as this list can be very long ...
+            self.clipList = VirtualCheckListCtrl(self.clipsPanel, multSelect=multSelect)
             # ... and place it on the panel's horizontal sizer.
             pnlHSizer.Add(self.clipList, 1, wx.EXPAND)
             # The Clip List needs two columns, Clip ID and Collection nesting.
@@ -590,8 +906,7 @@ class FilterDialog(wx.Dialog):
             # If Clip Sorting capacity has been requested ...
             if self.kwargs.has_key('clipSort') and self.kwargs['clipSort']:
                 print "Clip Sorting has not yet been implemented."
-                # self.originalClipData will need to be reordered the same way that self.clipList is.
-                # Otherwise, GetClips won't work right!
+                # self.clipList.SwapItems() can move Clips, as it does for Episodes and Keywords.
 
             # NOTE:  The actual list of Clips needs to be provided by the calling routine using
             #        the SetClips method.  This is because only the calling routine knows which
@@ -613,8 +928,8 @@ class FilterDialog(wx.Dialog):
             pnlHSizer = wx.BoxSizer(wx.HORIZONTAL)
             # ... place the Snapshots Panel on the Notebook, creating a Snapshots tab ...
             self.notebook.AddPage(self.snapshotsPanel, _("Snapshots"))
-            # ... place a Check List Ctrl on the Snapshots Panel ...
-            self.snapshotList = CheckListCtrl(self.snapshotsPanel, multSelect=multSelect)
+            # ... place a Virtual Check List Ctrl on the Snapshots Panel, as this list can be very long ...
+            self.snapshotList = VirtualCheckListCtrl(self.snapshotsPanel, multSelect=multSelect)
             # ... and place it on the panel's horizontal sizer.
             pnlHSizer.Add(self.snapshotList, 1, wx.EXPAND)
             # The Snapshot List needs two columns, Snapshot ID and Collection nesting.
@@ -624,8 +939,7 @@ class FilterDialog(wx.Dialog):
             # If Snapshot Sorting capacity has been requested ...
             if self.kwargs.has_key('snapshotSort') and self.kwargs['snapshotSort']:
                 print "Snapshot Sorting has not yet been implemented."
-                # self.originalSnapshotData will need to be reordered the same way that self.snapshotList is.
-                # Otherwise, GetSnapshots won't work right!
+                # self.snapshotList.SwapItems() can move Snapshots, as it does for Episodes and Keywords.
 
             # NOTE:  The actual list of Snapshots needs to be provided by the calling routine using
             #        the SetSnapshots method.  This is because only the calling routine knows which
@@ -693,8 +1007,8 @@ class FilterDialog(wx.Dialog):
                 self.keywordList = ColorListCtrl.ColorListCtrl(self.keywordsPanel, multSelect=multSelect)
             # If Keyword Color specification is disabled ...
             else:
-                # ... place a Check List Ctrl on the Keywords Panel ...
-                self.keywordList = CheckListCtrl(self.keywordsPanel, multSelect=multSelect)
+                # ... place a Virtual Check List Ctrl on the Keywords Panel ...
+                self.keywordList = VirtualCheckListCtrl(self.keywordsPanel, multSelect=multSelect)
             # ... and place it on the panel's horizontal sizer.
             pnlHSizer.Add(self.keywordList, 1, wx.EXPAND)
             # The keyword List needs two columns, Keyword Group and Keyword.
@@ -1015,85 +1329,7 @@ class FilterDialog(wx.Dialog):
 
     def ReconcileLists(self, formList, fileList, listIsOrdered=False):
         """ Take lists from the form and from the database and reconcile them, returning the results  """
-        # We need to compare the form data to the file data and reconcile differences.
-        #   1.  detect items that are in the file that are not in the form and drop them
-        #   2.  detect items that are in the form that are not in the file.  If the list is
-        #       ordered, we can add them to the bottom.  Otherwise, we need to insert them
-        #       in place.  Either way, we make sure they are checked!
-        #
-        # As long as the list item tuples match and the last item in each tuple is the "checked" item,
-        # we don't need to know the contents of the list.
-        #
-
-        # Create an empty list for the results
-        resList = []
-
-        # Iterate through the File List, which should control initial order and checked status
-        for items in fileList:
-            # Get all items except the last one
-            mostItems = items[:-1]
-            # Check to see if the file list items are in the form list, checked as True
-            if (mostItems + (True,) in formList):
-                resList.append(items)
-                formList.remove(mostItems + (True,))
-                
-            # Check to see if the file list items are in the form list, checked as False
-            elif (mostItems + (False,) in formList):
-                resList.append(items)
-                formList.remove(mostItems + (False,))
-
-            elif DEBUG:
-                print "In File, not Form:", items
-
-        # If the file list item doesn't appear in the form list, it is NOT placed in
-        # the results list.
-
-        # All that should be left in the Form List after the File List items have been removed
-        # are items that existed in the form that didn't exist in the file.  These items should
-        # be appended to the end of the list.
-
-        # First, let's figure out how to place items in an unordered list.
-        # For the moment, we'll look at the first column of the first item.  If it's an integer,
-        # we'll use the second column.  Otherwise, we can use the first column.
-        if (len(formList) > 0) and (isinstance(formList[0][0], long)):
-            lookupCol = 1
-        else:
-            lookupCol = 0
-
-        # Iterate through the items left in the Form List, the ones left after processing the File list.
-        for items in formList:
-            # If a item is in the form but not in the file, check to see if it is unchecked.
-            if items[-1] == False:
-                # If it is not checked, we need to rebuild the tuple to ensure it is checked when we're done!
-                items = items[:-1] + (True,)
-            # If we have a user-ordered list ...
-            if listIsOrdered:
-                # ... just append the items to the end of the list.
-                resList.append(items)
-            # If we have a list that is not user-ordered, it is alphabetical.  We need to figure out where to place
-            # the items that need to be added.
-            else:
-                # Indicate that the item has not been placed yet.
-                placed = False
-                # Iterate through the Results List ...
-                for x in range(len(resList)):
-                    # ... looking for where the current formList item should be located.
-                    if items[lookupCol] < resList[x][lookupCol]:
-                        # Insert the Form List item into the Results List ...
-                        resList.insert(x, items)
-                        # ... indicate that the item WAS placed ...
-                        placed = True
-                        # ... and stop looking.
-                        break
-                # If the item was never placed, ...  
-                if not placed:
-                    # ... add it to the end of the Results List.
-                    resList.append(items)
-
-            if DEBUG:
-                print "In Form, not File:", items
-
-        return resList
+        return ReconcileLists(formList, fileList, listIsOrdered)
 
     def OnFileOpen(self, event):
         """ Load a Filter Configuration appropriate to the current Report specifications """
@@ -2316,127 +2552,56 @@ class FilterDialog(wx.Dialog):
         btnID = event.GetId()
         # Determine which Tab is currently showing
         selectedTab = self.notebook.GetPageText(self.notebook.GetSelection())
-        # If we're looking at the Episodes tab ...
+        # Determine which list is on the current Tab
         if selectedTab == unicode(_("Episodes"), 'utf8'):
-            # ... iterate through the Episodes in the Episode List
-            for x in range(self.episodeList.GetItemCount()):
-                # If the Episode List Item's checked status does not match the desired status AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.episodeList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.episodeList.GetSelectedItemCount() < 2) or
-                    (self.episodeList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.episodeList.ToggleItem(x)
-        # if we're looking at the Transcripts tab ...
+            listAffected = self.episodeList
         elif selectedTab == unicode(_("Transcripts"), 'utf8'):
-            # ... iterate through the Transcript items in the Transcript List
-            for x in range(self.transcriptList.GetItemCount()):
-                # If the Transcript List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.transcriptList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.transcriptList.GetSelectedItemCount() < 2) or
-                    (self.transcriptList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.transcriptList.ToggleItem(x)
-        # If we're looking at the Documents tab ...
-        if selectedTab == unicode(_("Documents"), 'utf8'):
-            # ... iterate through the Documents in the Document List
-            for x in range(self.documentList.GetItemCount()):
-                # If the Document List Item's checked status does not match the desired status AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.documentList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.documentList.GetSelectedItemCount() < 2) or
-                    (self.documentList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.documentList.ToggleItem(x)
-        # if we're looking at the Collections tab ...
+            listAffected = self.transcriptList
+        elif selectedTab == unicode(_("Documents"), 'utf8'):
+            listAffected = self.documentList
         elif selectedTab == unicode(_("Collections"), 'utf8'):
-            # ... iterate through the Collection items in the Collection List
-            for x in range(self.collectionList.GetItemCount()):
-                # If the Collection List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.collectionList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.collectionList.GetSelectedItemCount() < 2) or
-                    (self.collectionList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.collectionList.ToggleItem(x)
-        # if we're looking at the Quotes tab ...
+            listAffected = self.collectionList
         elif selectedTab == unicode(_("Quotes"), 'utf8'):
-            # ... iterate through the Quotes in the Quote List
-            for x in range(self.quoteList.GetItemCount()):
-                # If the Quote List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.quoteList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.quoteList.GetSelectedItemCount() < 2) or
-                    (self.quoteList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.quoteList.ToggleItem(x)
-        # if we're looking at the Clips tab ...
+            listAffected = self.quoteList
         elif selectedTab == unicode(_("Clips"), 'utf8'):
-            # ... iterate through the Clips in the Clip List
-            for x in range(self.clipList.GetItemCount()):
-                # If the Clip List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.clipList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.clipList.GetSelectedItemCount() < 2) or
-                    (self.clipList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.clipList.ToggleItem(x)
-        # if we're looking at the Snapshots tab ...
+            listAffected = self.clipList
         elif selectedTab == unicode(_("Snapshots"), 'utf8'):
-            # ... iterate through the Snapshots in the Snapshot List
-            for x in range(self.snapshotList.GetItemCount()):
-                # If the Snapshot List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.snapshotList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.snapshotList.GetSelectedItemCount() < 2) or
-                    (self.snapshotList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.snapshotList.ToggleItem(x)
-        # if we're looking at the Keywords Group tab ...
+            listAffected = self.snapshotList
         elif selectedTab == unicode(_("Keyword Groups"), 'utf8'):
-            # ... iterate through the Keyword Groups in the Keyword Group List
-            for x in range(self.keywordGroupList.GetItemCount()):
-                # If the Keyword Group List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.keywordGroupList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.keywordGroupList.GetSelectedItemCount() < 2) or
-                    (self.keywordGroupList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.keywordGroupList.ToggleItem(x)
-        # if we're looking at the Keywords tab ...
+            listAffected = self.keywordGroupList
         elif selectedTab == unicode(_("Keywords"), 'utf8'):
-            # ... iterate through the Keywords in the Keyword List
-            for x in range(self.keywordList.GetItemCount()):
-                # If the Keyword List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.keywordList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.keywordList.GetSelectedItemCount() < 2) or
-                    (self.keywordList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
-                    # ... then toggle the item so it will match
-                    self.keywordList.ToggleItem(x)
-        # if we're looking at the Notes tab ...
+            listAffected = self.keywordList
         elif selectedTab == unicode(_("Notes"), 'utf8'):
-            # ... iterate through the Notes in the Notes List
-            for x in range(self.notesList.GetItemCount()):
-                # If the Notes List Item's checked status does not match the desired status  AND
-                # (one of fewer items is selected OR
-                # the current item is selected) ...
-                if (self.notesList.IsChecked(x) != (btnID == T_CHECK_ALL)) and \
-                   ((self.notesList.GetSelectedItemCount() < 2) or
-                    (self.notesList.GetItemState(x, wx.LIST_STATE_SELECTED) == wx.LIST_STATE_SELECTED)):
+            listAffected = self.notesList
+        # Other Tabs don't have a list to check
+        else:
+            return
+        # If one or fewer items are selected, all items are affected.
+        if listAffected.GetSelectedItemCount() < 2:
+            # If we have a Virtual Check List Ctrl ...
+            if isinstance(listAffected, VirtualCheckListCtrl):
+                # ... we can check or uncheck all the items at once
+                listAffected.CheckAll(btnID == T_CHECK_ALL)
+            else:
+                # ... iterate through the items in the list
+                for x in range(listAffected.GetItemCount()):
+                    # If the List Item's checked status does not match the desired status ...
+                    if listAffected.IsChecked(x) != (btnID == T_CHECK_ALL):
+                        # ... then toggle the item so it will match
+                        listAffected.ToggleItem(x)
+        # If more than one item is selected, only the selected items are affected.
+        else:
+            # Find the first selected item
+            item = listAffected.GetNextItem(-1, wx.LIST_NEXT_ALL, wx.LIST_STATE_SELECTED)
+            # While there are selected items to process ...
+            while item > -1:
+                # If the List Item's checked status does not match the desired status ...
+                if listAffected.IsChecked(item) != (btnID == T_CHECK_ALL):
                     # ... then toggle the item so it will match
-                    self.notesList.ToggleItem(x)
-                    
+                    listAffected.ToggleItem(item)
+                # ... and look for the next selected item
+                item = listAffected.GetNextItem(item, wx.LIST_NEXT_ALL, wx.LIST_STATE_SELECTED)
+
     def OnButton(self, event):
         """ Process Button Events for the Filter Dialog """
         # Get the ID of the button that triggered this event
@@ -2477,25 +2642,11 @@ class FilterDialog(wx.Dialog):
                 if item - topItem == 0:
                     # ... move the top indicator down to keep this item fixed in place
                     topItem += 1
-                # Extract the data from the List
-                col1 = listAffected.GetItem(item, 0).GetText()
-                col2 = listAffected.GetItem(item, 1).GetText()
-                checked = listAffected.IsChecked(item)
-                # We store the color code in the ItemData!
-                colorSpec = listAffected.GetItemData(item)
                 # Check to make sure there's room to move up
                 if item > topItem:
-                    # Delete the current item
-                    listAffected.DeleteItem(item)
-                    # Insert a new item one position up and add the extracted data
-                    listAffected.InsertStringItem(item - 1, col1)
-                    listAffected.SetStringItem(item - 1, 1, col2)
-                    if checked:
-                        listAffected.CheckItem(item - 1)
-                    # We store the color code in the ItemData!
-                    listAffected.SetItemData(item - 1, colorSpec)
-                    # Make sure the new item is selected
-                    listAffected.SetItemState(item - 1, wx.LIST_STATE_SELECTED, wx.LIST_STATE_SELECTED)
+                    # Exchange the item with the one above it.  This moves its data, check status, color code
+                    # (stored in the ItemData), and selection.
+                    listAffected.SwapItems(item, item - 1)
                     # Make sure the item is visible
                     listAffected.EnsureVisible(item - 1)
                 # Determine which item is selected (-1 is None)
@@ -2525,25 +2676,11 @@ class FilterDialog(wx.Dialog):
                 if item - topItem == 0:
                     # ... adjust the bottom position indicator so that it cannot be moved
                     topItem -= 1
-                # Extract the data from the  List
-                col1 = listAffected.GetItem(item, 0).GetText()
-                col2 = listAffected.GetItem(item, 1).GetText()
-                checked = listAffected.IsChecked(item)
-                # We store the color code in the ItemData!
-                colorSpec = listAffected.GetItemData(item)
                 # Check to make sure there's room to move down
                 if item < topItem:
-                    # Delete the current item
-                    listAffected.DeleteItem(item)
-                    # Insert a new item one position down and add the extracted data
-                    listAffected.InsertStringItem(item + 1, col1)
-                    listAffected.SetStringItem(item + 1, 1, col2)
-                    if checked:
-                        listAffected.CheckItem(item + 1)
-                    # We store the color code in the ItemData!
-                    listAffected.SetItemData(item + 1, colorSpec)
-                    # Make sure the new item is selected
-                    listAffected.SetItemState(item + 1, wx.LIST_STATE_SELECTED, wx.LIST_STATE_SELECTED)
+                    # Exchange the item with the one below it.  This moves its data, check status, color code
+                    # (stored in the ItemData), and selection.
+                    listAffected.SwapItems(item, item + 1)
                     # Make sure the item is visible
                     listAffected.EnsureVisible(item + 1)
 
@@ -2630,35 +2767,10 @@ class FilterDialog(wx.Dialog):
     def SetEpisodes(self, episodeList):
         """ Allows the calling routine to provide a list of Episodes that should be included on the Episodes Tab.
             A sorted list of (episodeID, seriesID, checked(boolean)) information should be passed in. """
-        # Iterate through the Episode list that was passed in
-        for (episodeID, seriesID, checked) in episodeList:
-            # Create a new Item in the Episode List at the end of the list.  Add the Episode ID data.
-            index = self.episodeList.InsertStringItem(sys.maxint, episodeID)
-            # Add the Series data
-            self.episodeList.SetStringItem(index, 1, seriesID)
-            # If the item should be checked, check it!
-            if checked:
-                self.episodeList.CheckItem(index)
-        # Column widths have proven more complicated than I'd like due to cross-platform differences.
-        # This formula seems to work pretty well.
-        # Set the column width for Episode IDs based on the Header
-        self.episodeList.SetColumnWidth(0, wx.LIST_AUTOSIZE_USEHEADER)
-        # Set the Column width for Series Data based on the Header
-        self.episodeList.SetColumnWidth(1, wx.LIST_AUTOSIZE_USEHEADER)
-        # Remember these widths
-        w11 = self.episodeList.GetColumnWidth(0) + 10
-        w12 = self.episodeList.GetColumnWidth(1) + 10
-        # Set the column width for Episode IDs based on the Data
-        self.episodeList.SetColumnWidth(0, wx.LIST_AUTOSIZE)
-        # Set the Column width for Series Data based on the Data
-        self.episodeList.SetColumnWidth(1, wx.LIST_AUTOSIZE)
-        # Remember these widths
-        w21 = self.episodeList.GetColumnWidth(0) + 10
-        w22 = self.episodeList.GetColumnWidth(1) + 10
-        # Set the proper column width for Episode IDs 
-        self.episodeList.SetColumnWidth(0, max(w11, w21, 100))
-        # Set the proper Column width for Series Data
-        self.episodeList.SetColumnWidth(1, max(w21, w22, 100))
+        # Give the Episode list to the Virtual Check List Ctrl, which only creates the items it displays
+        self.episodeList.SetData(episodeList)
+        # Size the columns to fit the Episode IDs and Library IDs
+        self.episodeList.AutoSizeColumns()
         # lay out the Episode Panel
         self.episodesPanel.Layout()
         # Lay out the Dialog
@@ -2670,14 +2782,8 @@ class FilterDialog(wx.Dialog):
         """ Allows the calling routine to retrieve the episode data from the Filter Dialog.  A sorted list
             of (episodeID, seriesID, checked(boolean)) information is returned.  (Unchecked items ARE included,
             as we don't want to lose their information for later processing.) """
-        # Create an empty Episode list
-        episodeList = []
-        # Iterate throught the EpisodeListCtrl items
-        for x in range(self.episodeList.GetItemCount()):
-            # Append the list item's data to the episode list
-            episodeList.append((self.episodeList.GetItem(x, 0).GetText(), self.episodeList.GetItem(x, 1).GetText(), self.episodeList.IsChecked(x)))
-        # Return the episode list
-        return episodeList
+        # Return the Episode list from the Virtual Check List Ctrl
+        return self.episodeList.GetData()
 
     def SetTranscripts(self, transcriptList):
         """ Allows the calling routine to provide a list of Transcripts that should be included on the Transcripts Tab.
@@ -2738,35 +2844,10 @@ class FilterDialog(wx.Dialog):
     def SetDocuments(self, documentList):
         """ Allows the calling routine to provide a list of Documents that should be included on the Documents Tab.
             A sorted list of (DocumentID, seriesID, checked(boolean)) information should be passed in. """
-        # Iterate through the Document list that was passed in
-        for (documentID, seriesID, checked) in documentList:
-            # Create a new Item in the Document List at the end of the list.  Add the Document ID data.
-            index = self.documentList.InsertStringItem(sys.maxint, documentID)
-            # Add the Library data
-            self.documentList.SetStringItem(index, 1, seriesID)
-            # If the item should be checked, check it!
-            if checked:
-                self.documentList.CheckItem(index)
-        # Column widths have proven more complicated than I'd like due to cross-platform differences.
-        # This formula seems to work pretty well.
-        # Set the column width for Document IDs based on the Header
-        self.documentList.SetColumnWidth(0, wx.LIST_AUTOSIZE_USEHEADER)
-        # Set the Column width for Library Data based on the Header
-        self.documentList.SetColumnWidth(1, wx.LIST_AUTOSIZE_USEHEADER)
-        # Remember these widths
-        w11 = self.documentList.GetColumnWidth(0) + 10
-        w12 = self.documentList.GetColumnWidth(1) + 10
-        # Set the column width for Document IDs based on the Data
-        self.documentList.SetColumnWidth(0, wx.LIST_AUTOSIZE)
-        # Set the Column width for Library Data based on the Data
-        self.documentList.SetColumnWidth(1, wx.LIST_AUTOSIZE)
-        # Remember these widths
-        w21 = self.documentList.GetColumnWidth(0) + 10
-        w22 = self.documentList.GetColumnWidth(1) + 10
-        # Set the proper column width for Document IDs 
-        self.documentList.SetColumnWidth(0, max(w11, w21, 100))
-        # Set the proper Column width for Library Data
-        self.documentList.SetColumnWidth(1, max(w21, w22, 100))
+        # Give the Document list to the Virtual Check List Ctrl, which only creates the items it displays
+        self.documentList.SetData(documentList)
+        # Size the columns to fit the Document IDs and Library IDs
+        self.documentList.AutoSizeColumns()
         # lay out the Document Panel
         self.documentsPanel.Layout()
         # Lay out the Dialog
@@ -2775,17 +2856,11 @@ class FilterDialog(wx.Dialog):
         self.CenterOnScreen()
 
     def GetDocuments(self):
-        """ Allows the calling routine to retrieve the Document data from the Filter Dialog.  A sorted list
+        """ Allows the calling routine to retrieve the document data from the Filter Dialog.  A sorted list
             of (documentID, seriesID, checked(boolean)) information is returned.  (Unchecked items ARE included,
             as we don't want to lose their information for later processing.) """
-        # Create an empty Document list
-        documentList = []
-        # Iterate throught the DocumentListCtrl items
-        for x in range(self.documentList.GetItemCount()):
-            # Append the list item's data to the document list
-            documentList.append((self.documentList.GetItem(x, 0).GetText(), self.documentList.GetItem(x, 1).GetText(), self.documentList.IsChecked(x)))
-        # Return the docuemnt list
-        return documentList
+        # Return the Document list from the Virtual Check List Ctrl
+        return self.documentList.GetData()
 
     def SetCollections(self, collectionList):
         """ Allows the calling routine to provide a list of Collections that should be included on the Collections Tab.
@@ -2829,42 +2904,23 @@ class FilterDialog(wx.Dialog):
         # Return the Collections list
         return collectionList
     
+    def GetCollectionNodeString(self, collectNum):
+        """ Return the Node String for a Collection, for display in the Quote, Clip, and Snapshot lists.  Many items
+            share each Collection, so the Node Strings are only looked up once. """
+        # If we haven't looked up this Collection yet ...
+        if not self.collectionNodeStrings.has_key(collectNum):
+            # ... load the Collection and remember its Node String
+            self.collectionNodeStrings[collectNum] = Collection.Collection(collectNum).GetNodeString()
+        return self.collectionNodeStrings[collectNum]
+
     def SetQuotes(self, quoteList):
         """ Allows the calling routine to provide a list of Quotes that should be included on the Quotes Tab.
             A sorted list of (quoteName, collectionNumber, checked(boolean)) information should be passed in. """
-        # Save the original data.  We'll need it to retrieve the Collection Number data
-        self.originalQuoteData = quoteList
-        # Iterate through the Quote list that was passed in
-        for (quoteID, collectNum, checked) in quoteList:
-            # Create a new Item in the Quote List at the end of the list.  Add the Quote ID data.
-            index = self.quoteList.InsertStringItem(sys.maxint, quoteID)
-            # Add the Collection data
-            tempColl = Collection.Collection(collectNum)
-            # Add the Collection's Node String
-            self.quoteList.SetStringItem(index, 1, tempColl.GetNodeString())
-            # If the item should be checked, check it!
-            if checked:
-                self.quoteList.CheckItem(index)
-        # Column widths have proven more complicated than I'd like due to cross-platform differences.
-        # This formula seems to work pretty well.
-        # Set the column width for Quote IDs based on the Header
-        self.quoteList.SetColumnWidth(0, wx.LIST_AUTOSIZE_USEHEADER)
-        # Set the Column width for Collection Data based on the Header
-        self.quoteList.SetColumnWidth(1, wx.LIST_AUTOSIZE_USEHEADER)
-        # Remember these widths
-        w11 = self.quoteList.GetColumnWidth(0) + 10
-        w12 = self.quoteList.GetColumnWidth(1) + 10
-        # Set the column width for Quote IDs based on the Data
-        self.quoteList.SetColumnWidth(0, wx.LIST_AUTOSIZE)
-        # Set the Column width for Collection Data based on the Data
-        self.quoteList.SetColumnWidth(1, wx.LIST_AUTOSIZE)
-        # Remember these widths
-        w21 = self.quoteList.GetColumnWidth(0) + 10
-        w22 = self.quoteList.GetColumnWidth(1) + 10
-        # Set the proper column width for Quote IDs 
-        self.quoteList.SetColumnWidth(0, max(w11, w21, 100))
-        # Set the proper Column width for Collection Data
-        self.quoteList.SetColumnWidth(1, max(w21, w22, 100))
+        # Give the Quote list to the Virtual Check List Ctrl, which only creates the items it displays.
+        # The Collection Numbers are displayed as the Collection's Node String.
+        self.quoteList.SetData(quoteList, columnFormats={1 : self.GetCollectionNodeString})
+        # Size the columns to fit the Quote IDs and Collection data
+        self.quoteList.AutoSizeColumns()
         # lay out the Quotes Panel
         self.quotesPanel.Layout()
         # Lay out the Dialog
@@ -2876,51 +2932,17 @@ class FilterDialog(wx.Dialog):
         """ Allows the calling routine to retrieve the Quote data from the Filter Dialog.  A sorted list
             of (quoteID, collectNum, checked(boolean)) information is returned.  (Unchecked items ARE included,
             as we don't want to lose their information for later processing.) """
-        # Create an empty Quote list
-        quoteList = []
-        # Iterate throught the QuoteListCtrl items
-        for x in range(self.quoteList.GetItemCount()):
-            # Append the list item's data to the Quote list
-            quoteList.append((self.quoteList.GetItem(x, 0).GetText(), self.originalQuoteData[x][1], self.quoteList.IsChecked(x)))
-        # Return the quote list
-        return quoteList
+        # Return the Quote list from the Virtual Check List Ctrl
+        return self.quoteList.GetData()
 
     def SetClips(self, clipList):
         """ Allows the calling routine to provide a list of Clips that should be included on the Clips Tab.
             A sorted list of (clipName, collectionNumber, checked(boolean)) information should be passed in. """
-        # Save the original data.  We'll need it to retrieve the Collection Number data
-        self.originalClipData = clipList
-        # Iterate through the Clip list that was passed in
-        for (clipID, collectNum, checked) in clipList:
-            # Create a new Item in the Clip List at the end of the list.  Add the Clip ID data.
-            index = self.clipList.InsertStringItem(sys.maxint, clipID)
-            # Add the Collection data
-            tempColl = Collection.Collection(collectNum)
-            # Add the Collection's Node String
-            self.clipList.SetStringItem(index, 1, tempColl.GetNodeString())
-            # If the item should be checked, check it!
-            if checked:
-                self.clipList.CheckItem(index)
-        # Column widths have proven more complicated than I'd like due to cross-platform differences.
-        # This formula seems to work pretty well.
-        # Set the column width for Clip IDs based on the Header
-        self.clipList.SetColumnWidth(0, wx.LIST_AUTOSIZE_USEHEADER)
-        # Set the Column width for Collection Data based on the Header
-        self.clipList.SetColumnWidth(1, wx.LIST_AUTOSIZE_USEHEADER)
-        # Remember these widths
-        w11 = self.clipList.GetColumnWidth(0) + 10
-        w12 = self.clipList.GetColumnWidth(1) + 10
-        # Set the column width for Clip IDs based on the Data
-        self.clipList.SetColumnWidth(0, wx.LIST_AUTOSIZE)
-        # Set the Column width for Collection Data based on the Data
-        self.clipList.SetColumnWidth(1, wx.LIST_AUTOSIZE)
-        # Remember these widths
-        w21 = self.clipList.GetColumnWidth(0) + 10
-        w22 = self.clipList.GetColumnWidth(1) + 10
-        # Set the proper column width for Clip IDs 
-        self.clipList.SetColumnWidth(0, max(w11, w21, 100))
-        # Set the proper Column width for Collection Data
-        self.clipList.SetColumnWidth(1, max(w21, w22, 100))
+        # Give the Clip list to the Virtual Check List Ctrl, which only creates the items it displays.
+        # The Collection Numbers are displayed as the Collection's Node String.
+        self.clipList.SetData(clipList, columnFormats={1 : self.GetCollectionNodeString})
+        # Size the columns to fit the Clip IDs and Collection data
+        self.clipList.AutoSizeColumns()
         # lay out the Clips Panel
         self.clipsPanel.Layout()
         # Lay out the Dialog
@@ -2932,51 +2954,17 @@ class FilterDialog(wx.Dialog):
         """ Allows the calling routine to retrieve the Clip data from the Filter Dialog.  A sorted list
             of (clipID, collectNum, checked(boolean)) information is returned.  (Unchecked items ARE included,
             as we don't want to lose their information for later processing.) """
-        # Create an empty Clip list
-        clipList = []
-        # Iterate throught the ClipListCtrl items
-        for x in range(self.clipList.GetItemCount()):
-            # Append the list item's data to the Clip list
-            clipList.append((self.clipList.GetItem(x, 0).GetText(), self.originalClipData[x][1], self.clipList.IsChecked(x)))
-        # Return the clip list
-        return clipList
+        # Return the Clip list from the Virtual Check List Ctrl
+        return self.clipList.GetData()
 
     def SetSnapshots(self, snapshotList):
         """ Allows the calling routine to provide a list of Snapshots that should be included on the Snapshots Tab.
             A sorted list of (snapshotName, collectionNumber, checked(boolean)) information should be passed in. """
-        # Save the original data.  We'll need it to retrieve the Collection Number data
-        self.originalSnapshotData = snapshotList
-        # Iterate through the Snapshot list that was passed in
-        for (snapshotID, collectNum, checked) in snapshotList:
-            # Create a new Item in the Snapshot List at the end of the list.  Add the Snapshot ID data.
-            index = self.snapshotList.InsertStringItem(sys.maxint, snapshotID)
-            # Add the Collection data
-            tempColl = Collection.Collection(collectNum)
-            # Add the Collection's Node String
-            self.snapshotList.SetStringItem(index, 1, tempColl.GetNodeString())
-            # If the item should be checked, check it!
-            if checked:
-                self.snapshotList.CheckItem(index)
-        # Column widths have proven more complicated than I'd like due to cross-platform differences.
-        # This formula seems to work pretty well.
-        # Set the column width for Snapshot IDs based on the Header
-        self.snapshotList.SetColumnWidth(0, wx.LIST_AUTOSIZE_USEHEADER)
-        # Set the Column width for Collection Data based on the Header
-        self.snapshotList.SetColumnWidth(1, wx.LIST_AUTOSIZE_USEHEADER)
-        # Remember these widths
-        w11 = self.snapshotList.GetColumnWidth(0) + 10
-        w12 = self.snapshotList.GetColumnWidth(1) + 10
-        # Set the column width for Snapshot IDs based on the Data
-        self.snapshotList.SetColumnWidth(0, wx.LIST_AUTOSIZE)
-        # Set the Column width for Collection Data based on the Data
-        self.snapshotList.SetColumnWidth(1, wx.LIST_AUTOSIZE)
-        # Remember these widths
-        w21 = self.snapshotList.GetColumnWidth(0) + 10
-        w22 = self.snapshotList.GetColumnWidth(1) + 10
-        # Set the proper column width for Snapshot IDs 
-        self.snapshotList.SetColumnWidth(0, max(w11, w21, 100))
-        # Set the proper Column width for Collection Data
-        self.snapshotList.SetColumnWidth(1, max(w21, w22, 100))
+        # Give the Snapshot list to the Virtual Check List Ctrl, which only creates the items it displays.
+        # The Collection Numbers are displayed as the Collection's Node String.
+        self.snapshotList.SetData(snapshotList, columnFormats={1 : self.GetCollectionNodeString})
+        # Size the columns to fit the Snapshot IDs and Collection data
+        self.snapshotList.AutoSizeColumns()
         # lay out the Snapshots Panel
         self.snapshotsPanel.Layout()
         # Lay out the Dialog
@@ -2988,14 +2976,8 @@ class FilterDialog(wx.Dialog):
         """ Allows the calling routine to retrieve the Snapshot data from the Filter Dialog.  A sorted list
             of (snapshotID, collectNum, checked(boolean)) information is returned.  (Unchecked items ARE included,
             as we don't want to lose their information for later processing.) """
-        # Create an empty Snapshot list
-        snapshotList = []
-        # Iterate throught the SnapshotListCtrl items
-        for x in range(self.snapshotList.GetItemCount()):
-            # Append the list item's data to the Snapshot list
-            snapshotList.append((self.snapshotList.GetItem(x, 0).GetText(), self.originalSnapshotData[x][1], self.snapshotList.IsChecked(x)))
-        # Return the Snapshot list
-        return snapshotList
+        # Return the Snapshot list from the Virtual Check List Ctrl
+        return self.snapshotList.GetData()
 
     def SetKeywordGroups(self, kwGroupList):
         """ Allows the calling routine to provide a list of keyword groups that should be included on the Keywords Tab.
@@ -3054,6 +3036,20 @@ class FilterDialog(wx.Dialog):
         """ Allows the calling routine to provide a list of keywords that should be included on the Keywords Tab.
             A sorted list of (keywordgroup, keyword, checked(boolean)) information should be passed in.
             If Keyword Colors are enabled, SetKeywordColors() should be called before SetKeywords(). """
+        # If keyword colors are NOT enabled, we have a Virtual Check List Ctrl
+        if not self.keywordColor:
+            # Give the keyword list to the Virtual Check List Ctrl, which only creates the items it displays
+            self.keywordList.SetData(kwList)
+            # Size the columns to fit the Keyword Groups and Keywords
+            self.keywordList.AutoSizeColumns()
+            # lay out the Keywords Panel
+            self.keywordsPanel.Layout()
+            # Lay out the Dialog
+            self.Layout()
+            # Center the Dialog on the screen
+            self.CenterOnScreen()
+            # The rest of this method handles the ColorListCtrl
+            return
         # Iterate through the keyword list that was passed in
         for kwrec in kwList:
             # Unpack the data record
@@ -3107,6 +3103,10 @@ class FilterDialog(wx.Dialog):
         """ Allows the calling routine to retrieve the keyword data from the Filter Dialog.  A sorted list
             of (keywordgroup, keyword, checked(boolean)) information is returned.  (Unchecked items ARE included,
             as we don't want to lose their information for later processing.) """
+        # If keyword colors are NOT enabled, we have a Virtual Check List Ctrl ...
+        if not self.keywordColor:
+            # ... so return the keyword list from it
+            return self.keywordList.GetData()
         # Create an empty keyword list
         keywordList = []
         # Iterate throught the KeywordListCtrl items
@@ -3126,8 +3126,14 @@ class FilterDialog(wx.Dialog):
             object is returned. """
         # Iterate through the keyword list ...
         for x in range(self.keywordList.GetItemCount()):
+            # If keyword colors are NOT enabled, we have a Virtual Check List Ctrl ...
+            if not self.keywordColor:
+                # ... which holds the keyword data
+                kwKey = (self.keywordList.GetValue(x, 0), self.keywordList.GetValue(x, 1))
+            else:
+                kwKey = (self.keywordList.GetItem(x, 0).GetText(), self.keywordList.GetItem(x, 1).GetText())
             # add to or update the dictionary to reflect that for the (kwg, kw) key, the Item Data is the color value
-            self.keywordColors[(self.keywordList.GetItem(x, 0).GetText(), self.keywordList.GetItem(x, 1).GetText())] = self.keywordList.GetItemData(x)
+            self.keywordColors[kwKey] = self.keywordList.GetItemData(x)
         # return the updated dictionary object
         return self.keywordColors
 
@@ -0,0 +1,53 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This file benchmarks the Filter Dialog's ReconcileLists() function with list sizes from a large project:
+    20,000 Clips in 500 Collections and 2,000 Keywords in 100 Keyword Groups.  Run it directly. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+# import wxPython
+import wx
+
+if __name__ == '__main__':
+    __builtins__._ = wx.GetTranslation
+
+# Import Python's random and time modules
+import random
+import time
+# Import the Filter Dialog's ReconcileLists() function
+from FilterDialog import ReconcileLists
+
+if __name__ == '__main__':
+    # Use the same random data each time, so timings can be compared
+    random.seed(1)
+    # Create the Clip list:  (Clip ID, Collection Number, checked), sorted as the Filter Dialog sorts it
+    clipData = [(u'Clip %06d' % x, long(random.randint(1, 500)), random.random() < 0.5) for x in xrange(20000)]
+    clipData.sort()
+    # Create the Keyword list:  (Keyword Group, Keyword, checked)
+    keywordData = [(u'Group %03d' % (x / 20), u'Keyword %04d' % x, random.random() < 0.5) for x in xrange(2000)]
+    # For each list ...
+    for (listName, formData) in ((u'Clips', clipData), (u'Keywords', keywordData)):
+        # The saved Filter Configuration is missing 10% of the current items, has all the others (checked or not),
+        # and has 10% more items that have since been deleted
+        fileData = [items[:-1] + (random.random() < 0.5,) for items in formData if random.random() > 0.1]
+        fileData += [(u'Deleted %06d' % x,) + formData[0][1:] for x in xrange(len(formData) / 10)]
+        # Time the list both unordered and ordered
+        for listIsOrdered in (False, True):
+            startTime = time.time()
+            resList = ReconcileLists(list(formData), fileData, listIsOrdered)
+            print "%-8s  %6d form items  %6d file items  ordered=%-5s  %6.3f seconds  (%d results)" % \
+                  (listName, len(formData), len(fileData), listIsOrdered, time.time() - startTime, len(resList))
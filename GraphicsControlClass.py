@@ -45,6 +45,7 @@
                                          Thus, [(300, 300, 300, 700), (300, 700, 700, 700), (700, 700, 700, 300), (700, 300, 300, 300)] draws a square.
       AddLines2(newlines)                Adds lines to drawing in a second layer.  Newlines are a list of 4-integer tuples, each specifying (startx, starty, endx, endy).
                                          This second layer can be used for temporary data that could be deleted without affecting the first layer.
+      DrawCursor(currentPosition)        Moves the position cursor.  Only the columns under the old and new cursor are redrawn.
       AddText(text, x, y)                Adds Text at position (x, y)
       AddTextCentered(text, x, y)        Adds Text centered on position (x, y)
       Clear()                            Clears the graphic
@@ -98,6 +99,15 @@ class GraphicsControl(wx.ScrolledWindow):
         self.backgroundImage = None
         # Initialize the temporary visualization image to None.
         self.visualizationImage = None
+        # Initialize the bitmap version of the temporary visualization image, which saves converting it on every redraw
+        self.visualizationBitmap = None
+        # Initialize the overlay buffer, which holds the drawing with everything EXCEPT the cursor so the cursor can be
+        # moved by re-drawing just the columns it covers instead of the whole graphic
+        self.overlayBuffer = None
+        # Initialize the X position where the cursor was last drawn on the buffer
+        self.drawnCursorX = None
+        # Initialize the selection (startTime, endTime) that was last drawn on the buffer
+        self.drawnSelection = None
         # Set default line color, pattern, and thickness
         self.thickness = 1
         self.linepattern = wx.SOLID
@@ -195,6 +205,7 @@ class GraphicsControl(wx.ScrolledWindow):
             self.backgroundImage = None
         # Initialize the Temporary Visualization Image to None to trigger creation when needed
         self.visualizationImage = None
+        self.visualizationBitmap = None
         # Signal the need to redraw the control
         self.reInitBuffer = True
 
@@ -207,6 +218,8 @@ class GraphicsControl(wx.ScrolledWindow):
         self.cursorPosition = None
         self.startTime = 0.0
         self.endTime = 0.0
+        # The selection and cursor are still on the buffered drawing, so the next cursor move will need a full redraw
+        self.overlayBuffer = None
 
     def SetColour(self, colour):
         """ Set color and create the appropriate Pen """
@@ -311,6 +324,8 @@ class GraphicsControl(wx.ScrolledWindow):
             if self.visualizationMode:
                 # ... copy the temporary Visualization Image BEFORE we add the temporary lines to it
                 self.visualizationImage = self.bmpBuffer.ConvertToImage().Copy()
+                # ... and keep a bitmap copy so we don't have to convert the image on every redraw
+                self.visualizationBitmap = wx.BitmapFromImage(self.visualizationImage)
                 
             # Draw lines based on timecodes
             # You can choose two different methods. 
@@ -333,10 +348,14 @@ class GraphicsControl(wx.ScrolledWindow):
             dc.SetBackground(wx.Brush(self.GetBackgroundColour()))
             # Clear the drawing
             dc.Clear()
+            # If we don't have a bitmap copy of the temporary Visualization Image (for example, if the image was passed in) ...
+            if self.visualizationBitmap == None:
+                # ... create one
+                self.visualizationBitmap = wx.BitmapFromImage(self.visualizationImage)
             # Create a Memory Device Context 
             dc2 = wx.MemoryDC()
             # Load the temporary Visualization Image into the memory DC
-            dc2.SelectObject(self.visualizationImage.ConvertToBitmap())
+            dc2.SelectObject(self.visualizationBitmap)
             # Copy the MemoryDC image onto the visualization window image's Device Context
             dc.Blit(0, 0, self.visualizationImage.GetWidth(), self.visualizationImage.GetHeight(), dc2, 0, 0, wx.COPY, False)
             # Now create a pen to draw a line between the image and the rest of the graphic.
@@ -358,6 +377,24 @@ class GraphicsControl(wx.ScrolledWindow):
         # Signal that the control has been redrawn
         self.reInitBuffer = False
 
+    def DrawLines2(self, dc):
+        """ Redraw the TEMPORARY lines that have been recorded, saving a copy of the drawing before the cursor is added """
+        # Draw all the temporary lines EXCEPT the cursor
+        self.DrawTemporaryLines(dc, skipCursor=True)
+        # If we're in visualizationMode ...
+        if self.visualizationMode:
+            # ... save the drawing without the cursor in the overlay buffer, so that moving the cursor
+            #     only requires restoring the columns it covered
+            self.overlayBuffer = wx.EmptyBitmap(self.canvassize[0], self.canvassize[1])
+            overlayDC = wx.MemoryDC()
+            overlayDC.SelectObject(self.overlayBuffer)
+            overlayDC.Blit(0, 0, self.canvassize[0], self.canvassize[1], dc, 0, 0, wx.COPY, False)
+            overlayDC.SelectObject(wx.NullBitmap)
+            # Remember the selection that is included in the overlay buffer
+            self.drawnSelection = (self.startTime, self.endTime)
+        # Now draw the cursor
+        self.drawnCursorX = self.DrawCursorLine(dc)
+
     def DrawRect(self, dc):
         """ Draw a rectangle surrounding the current selection. """
         if self.visualizationMode:
@@ -441,12 +478,15 @@ class GraphicsControl(wx.ScrolledWindow):
         # Let the Device Context know we are done drawing
         dc.EndDrawing()
 
-    def DrawLines2(self, dc):
-        """ Redraw the TEMPORARY lines that have been recorded """
+    def DrawTemporaryLines(self, dc, skipCursor=False):
+        """ Draw the TEMPORARY lines that have been recorded, optionally skipping the cursor """
         # Let the Device Context know that we are beginning to draw
         dc.BeginDrawing()
         # For each line in lines2, determine the color, line thickness, and line list
-        for colour, thickness, line in self.lines2:
+        for index, (colour, thickness, line) in enumerate(self.lines2):
+            # If we're skipping the cursor and this is the cursor, skip it!
+            if skipCursor and (index == self.cursorPosition):
+                continue
             # Create a Pen
             self.SetColour(colour)
             pen = wx.Pen(self.colourDef, thickness, self.linepattern)
@@ -460,6 +500,27 @@ class GraphicsControl(wx.ScrolledWindow):
         # Let the Device Context know we are done drawing
         dc.EndDrawing()
 
+    def DrawCursorLine(self, dc):
+        """ Draw the cursor line from the temporary (lines2[]) layer, if there is one.  Returns the cursor's X position, or None. """
+        # If there is no cursor in the temporary layer ...
+        if (self.cursorPosition == None) or (len(self.lines2) <= self.cursorPosition):
+            # ... there's nothing to draw
+            return None
+        # Get the cursor's color, line thickness, and line list
+        (colour, thickness, line) = self.lines2[self.cursorPosition]
+        # Let the Device Context know that we are beginning to draw
+        dc.BeginDrawing()
+        # Create a Pen and set it for the Device Context
+        self.SetColour(colour)
+        dc.SetPen(wx.Pen(self.colourDef, thickness, self.linepattern))
+        # Draw the cursor line
+        for coords in line:
+            dc.DrawLine(*coords)
+        # Let the Device Context know we are done drawing
+        dc.EndDrawing()
+        # Return the cursor's X position
+        return line[0][0]
+
     def SetSelection(self, dc):
         """ Add lines to the lines2[] structure based on startTime, endTime, canvassize """
         # The Selection should be added to the temporary lines2[] structure so it can be removed without affecting
@@ -558,6 +619,8 @@ class GraphicsControl(wx.ScrolledWindow):
             self.lines2 = []
             # That wiped out the cursor too, which is okay, but let's remember that.
             self.cursorPosition = None
+            # Dragging draws directly on the buffer, so the overlay buffer can't be used to move the cursor until the next full redraw
+            self.overlayBuffer = None
             # Put the focus on the Graphic
             self.SetFocus()
             # If we're click-dragging, we need visible feedback.  Therefore, let's start drawing until the mouse button is released.
@@ -784,6 +847,7 @@ class GraphicsControl(wx.ScrolledWindow):
             self.backgroundGraphicName = filename
             # Signal that the Visualization Image needs to be re-drawn
             self.visualizationImage = None
+            self.visualizationBitmap = None
             # Add Image Handler that allows BMP
             # wx.Image_AddHandler(wx.BMPHandler())
 
@@ -801,6 +865,8 @@ class GraphicsControl(wx.ScrolledWindow):
             tempBitmap = wx.BitmapFromImage(self.backgroundImage)
             # Set the active image (self.bmpBuffer) to the Bitmap
             self.bmpBuffer = tempBitmap
+            # The overlay buffer no longer matches the drawing
+            self.overlayBuffer = None
             # Required to get the image to show up!
             self.Refresh(False)
 
@@ -810,6 +876,8 @@ class GraphicsControl(wx.ScrolledWindow):
         self.backgroundGraphicName = ''
         # Save the passed-in wxImage as the visualizationImage
         self.visualizationImage = img
+        # The bitmap version of the visualizationImage will be created when it is needed
+        self.visualizationBitmap = None
         # Create a wxImage
         self.backgroundImage = img
         # Resize the Bitmap to the size of the Graphic Control
@@ -818,6 +886,8 @@ class GraphicsControl(wx.ScrolledWindow):
         tempBitmap = wx.BitmapFromImage(self.backgroundImage)
         # Set the active image (self.bmpBuffer) to the Bitmap
         self.bmpBuffer = tempBitmap
+        # The overlay buffer no longer matches the drawing
+        self.overlayBuffer = None
         # Required to get the image to show up!
         self.Refresh()
 
@@ -854,6 +924,9 @@ class GraphicsControl(wx.ScrolledWindow):
         self.reSetSelection = True
 
     def DrawCursor(self, currentPosition):
+        """ Move the position cursor to currentPosition (0.0 - 1.0) """
+        # Note whether the buffered drawing is up to date before we move the cursor
+        bufferIsCurrent = not self.reInitBuffer
         # If we are in a Right-To-Left Language ...
         if (TransanaGlobal.configData.LayoutDirection == wx.Layout_RightToLeft) and \
            (TransanaGlobal.configData.visualizationStyle in ['Keyword', 'Hybrid']):
@@ -879,8 +952,57 @@ class GraphicsControl(wx.ScrolledWindow):
         if len(self.lines2) > 0:
             # ... remember the cursor position in the "lines" structure so that it can be removed
             self.cursorPosition = len(self.lines2) - 1
-        
-        self.reInitBuffer = True
+
+        # If the rest of the drawing is up to date and we have a copy of it without the cursor ...
+        if bufferIsCurrent and self.visualizationMode and (self.overlayBuffer != None) and not self.isDragging and \
+           (self.drawnSelection == (self.startTime, self.endTime)):
+            # ... we don't need to redraw everything.  Just move the cursor.
+            self.reInitBuffer = False
+            self.MoveCursor()
+        # Otherwise ...
+        else:
+            # ... signal that the whole drawing needs to be redrawn
+            self.reInitBuffer = True
+
+    def CursorRect(self, x):
+        """ Return the rectangle of the buffered drawing covered by a cursor at position x """
+        # Allow for the thickness of the cursor line on both sides
+        return wx.Rect(int(x) - self.thickness - 1, 0, 2 * self.thickness + 3, self.canvassize[1])
+
+    def MoveCursor(self):
+        """ Move the cursor on the buffered drawing, re-drawing only the columns covered by the old and new cursor
+            so that media playback doesn't require redrawing the whole visualization every time the cursor moves. """
+        # Create a Memory Device Context for the buffered drawing
+        dc = wx.MemoryDC()
+        dc.SelectObject(self.bmpBuffer)
+        # Initialize the list of rectangles that need to be refreshed on screen
+        rects = []
+        # If the cursor has been drawn ...
+        if self.drawnCursorX != None:
+            # ... determine the area the old cursor covers ...
+            rect = self.CursorRect(self.drawnCursorX)
+            # ... and restore that area from the overlay buffer, which has everything but the cursor
+            overlayDC = wx.MemoryDC()
+            overlayDC.SelectObject(self.overlayBuffer)
+            dc.Blit(rect.x, rect.y, rect.width, rect.height, overlayDC, rect.x, rect.y, wx.COPY, False)
+            overlayDC.SelectObject(wx.NullBitmap)
+            rects.append(rect)
+        # Draw the cursor in its new position
+        self.drawnCursorX = self.DrawCursorLine(dc)
+        # Release the buffered drawing from the Device Context
+        dc.SelectObject(wx.NullBitmap)
+        # If a new cursor was drawn ...
+        if self.drawnCursorX != None:
+            # ... we need to refresh the area it covers too
+            rects.append(self.CursorRect(self.drawnCursorX))
+        # For each area that has changed ...
+        for rect in rects:
+            # ... translate the buffer position to the window position ...
+            (x, y) = self.CalcScrolledPosition(rect.x, rect.y)
+            # ... and refresh just that area of the window
+            self.RefreshRect(wx.Rect(x, y, rect.width, rect.height), False)
+        # note the draw time
+        self.lastUpdateTime = time.time()
 
     def DrawSelection(self, startPosition, endPosition):
         # If we are in a Right-To-Left Language ...
@@ -0,0 +1,167 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This module implements an in-memory Interval Tree, used to find the Clips and Snapshots at a given time in an
+    Episode or the Quotes at a given position in a Document without going to the database.
+
+    It also holds the Interval Trees that have been built for Episodes and Documents, so they can be shared by the
+    Data Window tabs.  Anything that changes Clips, Snapshots, Quotes, Collections, or Keywords should call
+    Invalidate() so the Interval Trees will be rebuilt the next time they are needed. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+DEBUG = False
+if DEBUG:
+    print "IntervalIndex DEBUG is ON!!"
+
+
+class IntervalNode(object):
+    """ A single node of an Interval Tree.  The node holds all intervals that contain its center point, plus the
+        subtrees for the intervals entirely to the left and entirely to the right of the center point. """
+
+    def __init__(self, intervals):
+        """ Build the node (and its subtrees) from a non-empty list of (start, stop, data) intervals """
+        # Collect all the interval end points
+        points = []
+        for (start, stop, data) in intervals:
+            points.append(start)
+            points.append(stop)
+        # Sort the end points
+        points.sort()
+        # Use the median end point as the center point, so the tree stays balanced
+        self.center = points[len(points) / 2]
+        # Initialize the lists of intervals to the left of, right of, and containing the center point
+        leftIntervals = []
+        rightIntervals = []
+        centerIntervals = []
+        # Sort the intervals into the lists
+        for interval in intervals:
+            if interval[1] < self.center:
+                leftIntervals.append(interval)
+            elif interval[0] > self.center:
+                rightIntervals.append(interval)
+            else:
+                centerIntervals.append(interval)
+        # Keep the intervals that contain the center point sorted by start, and by stop (latest first)
+        self.byStart = sorted(centerIntervals, key=lambda interval: interval[0])
+        self.byStop = sorted(centerIntervals, key=lambda interval: interval[1], reverse=True)
+        # Build the subtrees, if needed
+        if len(leftIntervals) > 0:
+            self.left = IntervalNode(leftIntervals)
+        else:
+            self.left = None
+        if len(rightIntervals) > 0:
+            self.right = IntervalNode(rightIntervals)
+        else:
+            self.right = None
+
+    def Overlap(self, start, stop, results):
+        """ Add the intervals that overlap the closed range start - stop to the results list """
+        # If the range is entirely to the left of the center point ...
+        if stop < self.center:
+            # ... the center intervals that overlap are the ones that start at or before the end of the range
+            for interval in self.byStart:
+                if interval[0] > stop:
+                    break
+                results.append(interval)
+            # ... and only the left subtree can hold more
+            if self.left is not None:
+                self.left.Overlap(start, stop, results)
+        # If the range is entirely to the right of the center point ...
+        elif start > self.center:
+            # ... the center intervals that overlap are the ones that stop at or after the start of the range
+            for interval in self.byStop:
+                if interval[1] < start:
+                    break
+                results.append(interval)
+            # ... and only the right subtree can hold more
+            if self.right is not None:
+                self.right.Overlap(start, stop, results)
+        # If the range includes the center point ...
+        else:
+            # ... all the center intervals overlap ...
+            results.extend(self.byStart)
+            # ... and both subtrees can hold more
+            if self.left is not None:
+                self.left.Overlap(start, stop, results)
+            if self.right is not None:
+                self.right.Overlap(start, stop, results)
+
+
+class IntervalTree(object):
+    """ An Interval Tree of (start, stop, data) intervals.  data is usually an (objectType, objectNumber) tuple.
+        The tree does not change once it is built.  When the intervals change, build a new tree. """
+
+    def __init__(self, intervals=[]):
+        """ Build the Interval Tree from a list of (start, stop, data) intervals """
+        # Remember the intervals
+        self.intervals = list(intervals)
+        # If there are intervals ...
+        if len(self.intervals) > 0:
+            # ... build the tree
+            self.root = IntervalNode(self.intervals)
+        # If there are no intervals ...
+        else:
+            # ... there is no tree
+            self.root = None
+        # Users of the Interval Tree can cache display information about items here, keyed by data
+        self.itemData = {}
+        # Users of the Interval Tree can note the data the intervals were built from here
+        self.source = None
+
+    def Overlap(self, start, stop):
+        """ Return a list of the (start, stop, data) intervals that overlap the closed range start - stop,
+            that is, the intervals that start at or before stop and stop at or after start """
+        # Initialize the results
+        results = []
+        # Search the tree
+        if self.root is not None:
+            self.root.Overlap(start, stop, results)
+        return results
+
+    def Stab(self, point):
+        """ Return a list of the (start, stop, data) intervals that contain point, including their end points """
+        return self.Overlap(point, point)
+
+    def GetAll(self):
+        """ Return a list of all the (start, stop, data) intervals """
+        return self.intervals
+
+
+# The Interval Trees that have been built, keyed by (objectType, objectNumber), for example ('Episode', 12)
+_indexes = {}
+
+def GetIndex(key):
+    """ Return the Interval Tree for key, or None if it hasn't been built or has been invalidated """
+    return _indexes.get(key, None)
+
+def SetIndex(key, index):
+    """ Remember the Interval Tree for key """
+    _indexes[key] = index
+
+def Invalidate(key=None):
+    """ Discard the Interval Tree for key, or all Interval Trees if no key is given, so they will be rebuilt """
+    # If no key is given ...
+    if key is None:
+        # ... discard all the Interval Trees
+        _indexes.clear()
+    # If the key has an Interval Tree ...
+    elif _indexes.has_key(key):
+        # ... discard it
+        del(_indexes[key])
+
+    if DEBUG:
+        print "IntervalIndex.Invalidate():", key
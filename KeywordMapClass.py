@@ -44,6 +44,8 @@ import Document
 import Episode
 # Import Transana's Filter Dialog
 import FilterDialog
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Keyword Object
 import KeywordObject
 # import Transana Miscellaneous functions
@@ -86,6 +88,9 @@ ID_SERIESLIST        = wx.NewId()
 # Episode List Combo Box
 ID_EPISODELIST       = wx.NewId()
 
+# Resizing the window produces a stream of Size events.  Wait this many milliseconds after the last one before redrawing.
+RESIZE_REDRAW_DELAY = 150
+
 class KeywordMap(wx.Frame):
     """ This is the main class for the Keyword Map application.
         It can be instantiated as a free-standing report with a frame, or can be
@@ -171,10 +176,16 @@ class KeywordMap(wx.Frame):
         self.startChar = -1
         self.endChar = -1
         self.keywordClipList = {}
+        # Initialize the Interval Trees used to find the items under the mouse, built from keywordClipList as needed
+        self.keywordClipIndex = {}
         self.configName = ''
         # Initialize variables required to avoid crashes when the visualization has been cleared
         self.graphicindent = 0
         self.Bounds = [1, 1, 1, 1]
+        # Note the Bounds the graph was last drawn at, so we can skip redrawing when they haven't changed
+        self.drawnBounds = None
+        # Initialize the Timer used to delay redrawing while the window is being resized
+        self.resizeTimer = None
         # Create a dictionary of the colors for each keyword.
         self.keywordColors = {'lastColor' : -1}
         if not self.embedded:
@@ -864,6 +875,10 @@ class KeywordMap(wx.Frame):
 
     def OnClose(self, event):
         """ Handle the Close Event """
+        # If we're waiting to redraw after a resize ...
+        if (self.resizeTimer != None) and self.resizeTimer.IsRunning():
+            # ... we don't need to any more
+            self.resizeTimer.Stop()
         # If the report has a defined Control Object ...
         if self.ControlObject != None:
             # ... remove this report from the Menu Window's Window Menu
@@ -895,6 +910,23 @@ class KeywordMap(wx.Frame):
             self.Bounds = (0, 0, w, h - 25)
         # If we have data defined in the graph ...
         if (self.episodeName != '') or (self.textObj != None) or (self.collection != None):
+            # The Keyword Visualization is sized by its parent, so redraw it right away
+            if self.embedded:
+                self.DrawGraph()
+            # Redrawing the Keyword Map report is slow, and resizing the window produces a stream of Size events.
+            # If we're already waiting to redraw ...
+            elif (self.resizeTimer != None) and self.resizeTimer.IsRunning():
+                # ... wait a little longer, as the user is still resizing
+                self.resizeTimer.Restart(RESIZE_REDRAW_DELAY)
+            # Otherwise ...
+            else:
+                # ... redraw once the user stops resizing
+                self.resizeTimer = wx.CallLater(RESIZE_REDRAW_DELAY, self.OnResizeRedraw)
+
+    def OnResizeRedraw(self):
+        """ Redraw the Keyword Map after the window has been resized """
+        # If the window has actually changed size since the graph was drawn ...
+        if self.Bounds != self.drawnBounds:
             # ... redraw the graph
             self.DrawGraph()
             
@@ -1017,6 +1049,19 @@ class KeywordMap(wx.Frame):
             # ... return None to signal that no keyword is at that position
             return None
 
+    def FindItems(self, kw, position):
+        """ Return the items in the Keyword Clip List for keyword kw that start at or before position and end at or
+            after it, in the order they appear in the Keyword Clip List """
+        # If we haven't built the Interval Tree for this keyword since the graph was last drawn ...
+        if not self.keywordClipIndex.has_key(kw):
+            # ... build it.  Include each item's position in the list so we can keep the list order.
+            self.keywordClipIndex[kw] = IntervalIndex.IntervalTree([(item[1], item[2], (loop, item))
+                                                                    for (loop, item) in enumerate(self.keywordClipList[kw])])
+        # Find the items at the position, and put them in list order
+        items = [data for (start, stop, data) in self.keywordClipIndex[kw].Stab(position)]
+        items.sort()
+        return [item for (loop, item) in items]
+
     def GetScaleIncrements(self, MediaLength):
         # The general rule is to try to get logical interval sizes with 8 or fewer time increments.
         # You always add a bit (20% at the lower levels) of the time interval to the MediaLength
@@ -1107,6 +1152,9 @@ class KeywordMap(wx.Frame):
             # If we deleted the last keyword in a filtered list, the Filter Dialog ended up with
             # duplicate entries.  This should prevent it!!
             self.unfilteredKeywordList = []
+            # Keep sets of the keyword list contents for fast lookups.  The lists themselves hold the display order.
+            filteredKeywordSet = set(self.filteredKeywordList)
+            unfilteredKeywordSet = set()
             if isinstance(self.textObj, Document.Document):
                 # Get the list of QUOTE Keywords to be displayed
                 SQLText = """SELECT ck.KeywordGroup, ck.Keyword
@@ -1129,10 +1177,12 @@ class KeywordMap(wx.Frame):
             for (kwg, kw) in self.DBCursor.fetchall():
                 kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
                 kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                if not (kwg, kw) in self.filteredKeywordList:
+                if not (kwg, kw) in filteredKeywordSet:
                     self.filteredKeywordList.append((kwg, kw))
-                if not (kwg, kw, True) in self.unfilteredKeywordList:
+                    filteredKeywordSet.add((kwg, kw))
+                if not (kwg, kw, True) in unfilteredKeywordSet:
                     self.unfilteredKeywordList.append((kwg, kw, True))
+                    unfilteredKeywordSet.add((kwg, kw, True))
 
 ##            if TransanaConstants.proVersion:
 ##                # Get the list of WHOLE SNAPSHOT Keywords to be displayed
@@ -1198,6 +1248,9 @@ class KeywordMap(wx.Frame):
         # Adjust the query for sqlite if needed
         SQLText = DBInterface.FixQuery(SQLText)
         self.DBCursor.execute(SQLText, (self.textObj.number, ))
+        # Keep sets of the Quote List and Quote Filter List contents for fast lookups
+        quoteSet = set(self.quoteList)
+        quoteFilterSet = set(self.quoteFilterList)
         for (kwg, kw, startChar, endChar, quoteNum, quoteID, collectNum) in self.DBCursor.fetchall():
             kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
             kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
@@ -1211,14 +1264,16 @@ class KeywordMap(wx.Frame):
             # If we're dealing with a Document, self.QuoteNum will be None and we want all Quotes.
             # If we're dealing with a Quote, we only want to deal with THIS Quote!
             if (self.quoteNum == None) or (quoteNum == self.quoteNum):
-                if (kwg, kw, startChar, endChar, quoteNum, quoteID, collectNum) not in self.quoteList:
+                if (kwg, kw, startChar, endChar, quoteNum, quoteID, collectNum) not in quoteSet:
                     if isinstance(self.textObj, Document.Document):
                         self.quoteList.append((kwg, kw, self.textObj.quote_dict[quoteNum][0], self.textObj.quote_dict[quoteNum][1], quoteNum, quoteID, collectNum))
                     elif isinstance(self.textObj, Quote.Quote):
                         self.quoteList.append((kwg, kw, startChar, endChar, quoteNum, quoteID, collectNum))
-                if (not ((quoteID, collectNum, True) in self.quoteFilterList)) and \
-                   (not ((quoteID, collectNum, False) in self.quoteFilterList)):
+                    quoteSet.add(self.quoteList[-1])
+                if (not ((quoteID, collectNum, True) in quoteFilterSet)) and \
+                   (not ((quoteID, collectNum, False) in quoteFilterSet)):
                     self.quoteFilterList.append((quoteID, collectNum, True))
+                    quoteFilterSet.add((quoteID, collectNum, True))
 
 ##        if TransanaConstants.proVersion:
 ##            # Create the WHOLE SNAPSHOT Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
@@ -1296,6 +1351,9 @@ class KeywordMap(wx.Frame):
             # If we deleted the last keyword in a filtered list, the Filter Dialog ended up with
             # duplicate entries.  This should prevent it!!
             self.unfilteredKeywordList = []
+            # Keep sets of the keyword list contents for fast lookups.  The lists themselves hold the display order.
+            filteredKeywordSet = set(self.filteredKeywordList)
+            unfilteredKeywordSet = set()
             # Get the list of CLIP Keywords to be displayed
             SQLText = """SELECT ck.KeywordGroup, ck.Keyword
                            FROM Clips2 cl, ClipKeywords2 ck
@@ -1309,10 +1367,12 @@ class KeywordMap(wx.Frame):
             for (kwg, kw) in self.DBCursor.fetchall():
                 kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
                 kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                if not (kwg, kw) in self.filteredKeywordList:
+                if not (kwg, kw) in filteredKeywordSet:
                     self.filteredKeywordList.append((kwg, kw))
-                if not (kwg, kw, True) in self.unfilteredKeywordList:
+                    filteredKeywordSet.add((kwg, kw))
+                if not (kwg, kw, True) in unfilteredKeywordSet:
                     self.unfilteredKeywordList.append((kwg, kw, True))
+                    unfilteredKeywordSet.add((kwg, kw, True))
 
             if TransanaConstants.proVersion:
                 # Get the list of WHOLE SNAPSHOT Keywords to be displayed
@@ -1328,10 +1388,12 @@ class KeywordMap(wx.Frame):
                 for (kwg, kw) in self.DBCursor.fetchall():
                     kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
                     kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                    if not (kwg, kw) in self.filteredKeywordList:
+                    if not (kwg, kw) in filteredKeywordSet:
                         self.filteredKeywordList.append((kwg, kw))
-                    if not (kwg, kw, True) in self.unfilteredKeywordList:
+                        filteredKeywordSet.add((kwg, kw))
+                    if not (kwg, kw, True) in unfilteredKeywordSet:
                         self.unfilteredKeywordList.append((kwg, kw, True))
+                        unfilteredKeywordSet.add((kwg, kw, True))
 
                 # Get the list of SNAPSHOT CODING Keywords to be displayed
                 SQLText = """SELECT ck.KeywordGroup, ck.Keyword
@@ -1346,10 +1408,12 @@ class KeywordMap(wx.Frame):
                 for (kwg, kw) in self.DBCursor.fetchall():
                     kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
                     kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                    if not (kwg, kw) in self.filteredKeywordList:
+                    if not (kwg, kw) in filteredKeywordSet:
                         self.filteredKeywordList.append((kwg, kw))
-                    if not (kwg, kw, True) in self.unfilteredKeywordList:
+                        filteredKeywordSet.add((kwg, kw))
+                    if not (kwg, kw, True) in unfilteredKeywordSet:
                         self.unfilteredKeywordList.append((kwg, kw, True))
+                        unfilteredKeywordSet.add((kwg, kw, True))
 
         # If we haven't loaded a configuration (which contains its own sort order) ...
         if self.configName == '':
@@ -1357,6 +1421,12 @@ class KeywordMap(wx.Frame):
             self.unfilteredKeywordList.sort()
             self.filteredKeywordList.sort()
         
+        # Keep sets of the Clip and Snapshot List and Filter List contents for fast lookups
+        clipSet = set(self.clipList)
+        clipFilterSet = set(self.clipFilterList)
+        snapshotSet = set(self.snapshotList)
+        snapshotFilterSet = set(self.snapshotFilterList)
+
         # Create the Clip Keyword Placement lines to be displayed.  We need them to be in ClipStart, ClipNum order so colors will be
         # distributed properly across bands.
         SQLText = """SELECT ck.KeywordGroup, ck.Keyword, cl.ClipStart, cl.ClipStop, cl.ClipNum, cl.ClipID, cl.CollectNum
@@ -1374,11 +1444,13 @@ class KeywordMap(wx.Frame):
             # If we're dealing with an Episode, self.clipNum will be None and we want all clips.
             # If we're dealing with a Clip, we only want to deal with THIS clip!
             if (self.clipNum == None) or (clipNum == self.clipNum):
-                if (kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum) not in self.clipList:
+                if (kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum) not in clipSet:
                     self.clipList.append((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum))
-                if (not ((clipID, collectNum, True) in self.clipFilterList)) and \
-                   (not ((clipID, collectNum, False) in self.clipFilterList)):
+                    clipSet.add((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum))
+                if (not ((clipID, collectNum, True) in clipFilterSet)) and \
+                   (not ((clipID, collectNum, False) in clipFilterSet)):
                     self.clipFilterList.append((clipID, collectNum, True))
+                    clipFilterSet.add((clipID, collectNum, True))
 
         if TransanaConstants.proVersion:
             # Create the WHOLE SNAPSHOT Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
@@ -1398,11 +1470,13 @@ class KeywordMap(wx.Frame):
                 # If we're dealing with an Episode, self.clipNum will be None and we want all clips.
                 # If we're dealing with a Clip, we only want to deal with THIS clip!
                 if (self.clipNum == None):
-                    if (kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum) not in self.snapshotList:
+                    if (kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum) not in snapshotSet:
                         self.snapshotList.append((kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum))
-                    if (not ((SnapshotID, collectNum, True) in self.snapshotFilterList)) and \
-                       (not ((SnapshotID, collectNum, False) in self.snapshotFilterList)):
+                        snapshotSet.add((kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum))
+                    if (not ((SnapshotID, collectNum, True) in snapshotFilterSet)) and \
+                       (not ((SnapshotID, collectNum, False) in snapshotFilterSet)):
                         self.snapshotFilterList.append((SnapshotID, collectNum, True))
+                        snapshotFilterSet.add((SnapshotID, collectNum, True))
 
             # Create the SNAPSHOT CODING Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
             # distributed properly across bands.
@@ -1421,11 +1495,13 @@ class KeywordMap(wx.Frame):
                 # If we're dealing with an Episode, self.clipNum will be None and we want all clips.
                 # If we're dealing with a Clip, we only want to deal with THIS clip!
                 if (self.clipNum == None):
-                    if (kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum) not in self.snapshotList:
+                    if (kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum) not in snapshotSet:
                         self.snapshotList.append((kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum))
-                    if (not ((SnapshotID, collectNum, True) in self.snapshotFilterList)) and \
-                       (not ((SnapshotID, collectNum, False) in self.snapshotFilterList)):
+                        snapshotSet.add((kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum))
+                    if (not ((SnapshotID, collectNum, True) in snapshotFilterSet)) and \
+                       (not ((SnapshotID, collectNum, False) in snapshotFilterSet)):
                         self.snapshotFilterList.append((SnapshotID, collectNum, True))
+                        snapshotFilterSet.add((SnapshotID, collectNum, True))
 
     def ProcessCollection(self):
         """ Process a Collection for the Collection Keyword Map variation of the Keyword Map """
@@ -1444,6 +1520,9 @@ class KeywordMap(wx.Frame):
             # If we deleted the last keyword in a filtered list, the Filter Dialog ended up with
             # duplicate entries.  This should prevent it!!
             self.unfilteredKeywordList = []
+            # Keep sets of the keyword list contents for fast lookups.  The lists themselves hold the display order.
+            filteredKeywordSet = set(self.filteredKeywordList)
+            unfilteredKeywordSet = set()
             # Get the list of CLIP Keywords to be displayed.  This query should do it.
             SQLText = """SELECT ck.KeywordGroup, ck.Keyword
                            FROM Clips2 cl, ClipKeywords2 ck
@@ -1463,6 +1542,8 @@ class KeywordMap(wx.Frame):
                 # ... and add them to the filtered and unfiltered keyword lists
                 self.filteredKeywordList.append((kwg, kw))
                 self.unfilteredKeywordList.append((kwg, kw, True))
+                filteredKeywordSet.add((kwg, kw))
+                unfilteredKeywordSet.add((kwg, kw, True))
 
             if TransanaConstants.proVersion:
                 # Get the list of WHOLE SNAPSHOT Keywords to be displayed
@@ -1483,10 +1564,12 @@ class KeywordMap(wx.Frame):
                     kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
                     # ... and IF they're not already there, add them to the filtered and unfiltered keyword lists.
                     # Unlike with Clips, a Snapshot can have multiple instances of the same keyword!!
-                    if not (kwg, kw) in self.filteredKeywordList:
+                    if not (kwg, kw) in filteredKeywordSet:
                         self.filteredKeywordList.append((kwg, kw))
-                    if not (kwg, kw, True) in self.unfilteredKeywordList:
+                        filteredKeywordSet.add((kwg, kw))
+                    if not (kwg, kw, True) in unfilteredKeywordSet:
                         self.unfilteredKeywordList.append((kwg, kw, True))
+                        unfilteredKeywordSet.add((kwg, kw, True))
 
                 # Get the list of SNAPSHOT CODING Keywords to be displayed
                 SQLText = """SELECT ck.KeywordGroup, ck.Keyword
@@ -1506,10 +1589,12 @@ class KeywordMap(wx.Frame):
                     kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
                     # ... and IF they're not already there, add them to the filtered and unfiltered keyword lists.
                     # Unlike with Clips, a Snapshot can have multiple instances of the same keyword!!
-                    if not (kwg, kw) in self.filteredKeywordList:
+                    if not (kwg, kw) in filteredKeywordSet:
                         self.filteredKeywordList.append((kwg, kw))
-                    if not (kwg, kw, True) in self.unfilteredKeywordList:
+                        filteredKeywordSet.add((kwg, kw))
+                    if not (kwg, kw, True) in unfilteredKeywordSet:
                         self.unfilteredKeywordList.append((kwg, kw, True))
+                        unfilteredKeywordSet.add((kwg, kw, True))
 
         # Sort the Keyword Lists
         self.unfilteredKeywordList.sort()
@@ -1603,6 +1688,10 @@ class KeywordMap(wx.Frame):
         keys = collectionOrder.keys()
         # Sort the Sort Order Keys, so they're in Sort Order order!!
         keys.sort()
+        # Keep sets of the Clip Filter List and the Snapshot List and Filter List contents for fast lookups
+        clipFilterSet = set(self.clipFilterList)
+        snapshotSet = set(self.snapshotList)
+        snapshotFilterSet = set(self.snapshotFilterList)
         # Iterate through the Collection Order dictionary KEYS, that is, the Collection items' Sort Order.
         # (This allows us to combine Clips and Snapshots in the correct Sort Order!)
         for sortOrder in keys:
@@ -1627,9 +1716,10 @@ class KeywordMap(wx.Frame):
                         # Add the current Clip/keyword combo to the Clip List, placing it to the right of the last clip.
                         self.clipList.append((kwg, kw, self.MediaLength - (clipStop - clipStart) - 50, self.MediaLength - 50, clipNum, clipID, collectNum))
                         # If the clip ID isn't already in the Clip Filter List ...
-                        if not ((clipID, collectNum, True) in self.clipFilterList):
+                        if not ((clipID, collectNum, True) in clipFilterSet):
                             # ... add the clip to the Clip Filter List
                             self.clipFilterList.append((clipID, collectNum, True))
+                            clipFilterSet.add((clipID, collectNum, True))
                 # If the next record is a SNAPSHOT ...
                 elif recData[0] == 'Snapshot':
                     # ... extract the Snapshot data
@@ -1648,14 +1738,16 @@ class KeywordMap(wx.Frame):
                     if (self.clipNum == None):
                         # Snapshots, unlike Clips, can have the same keyword multiple times.  Let's check to see if this Keyword is already
                         # in the Snapshot List.
-                        if (kwg, kw, self.MediaLength - snapshotDuration - 50, self.MediaLength - 50, snapshotNum, snapshotID, collectNum) not in self.snapshotList:
+                        if (kwg, kw, self.MediaLength - snapshotDuration - 50, self.MediaLength - 50, snapshotNum, snapshotID, collectNum) not in snapshotSet:
                             # Add the current Snapshot/keyword combo to the Snapshot List, placing it to the right of the last snapshot.
                             self.snapshotList.append((kwg, kw, self.MediaLength - snapshotDuration - 50, self.MediaLength - 50, snapshotNum, snapshotID, collectNum))
+                            snapshotSet.add((kwg, kw, self.MediaLength - snapshotDuration - 50, self.MediaLength - 50, snapshotNum, snapshotID, collectNum))
                         # If the snapshot ID isn't already in the Snapshot Filter List ...
-                        if (not ((snapshotID, collectNum, True) in self.snapshotFilterList)) and \
-                           (not ((snapshotID, collectNum, False) in self.snapshotFilterList)):
+                        if (not ((snapshotID, collectNum, True) in snapshotFilterSet)) and \
+                           (not ((snapshotID, collectNum, False) in snapshotFilterSet)):
                             # ... add it to the Snapshot Filter List
                             self.snapshotFilterList.append((snapshotID, collectNum, True))
+                            snapshotFilterSet.add((snapshotID, collectNum, True))
 
         # When we're done adding clips, we know the total width of the graphic.  Set self.endTime to the accumulated
         # Media Length so the graphic will render correctly.
@@ -1673,9 +1765,9 @@ class KeywordMap(wx.Frame):
         hideQuoteList = self.quoteFilterList[:]
         hideClipList = self.clipFilterList[:]
         hideSnapshotList = self.snapshotFilterList[:]
-        # Before we start, make a COPY of the keyword list so we can check for keywords that are no longer
+        # Before we start, make a SET of the keyword list so we can check for keywords that are no longer
         # included on the Map and need to be deleted from the KeywordLists
-        delKeywordList = self.unfilteredKeywordList[:]
+        delKeywordSet = set(self.unfilteredKeywordList)
 
         # if reset is true (always except Hybrid Visualization!) ...
         if reset:
@@ -1692,6 +1784,16 @@ class KeywordMap(wx.Frame):
             # Clear the Filtered Quote List
             self.quoteFilterList = []
             
+        # Keep sets of the list contents for fast lookups.  The lists themselves hold the display order.
+        clipSet = set(self.clipList)
+        clipFilterSet = set(self.clipFilterList)
+        snapshotSet = set(self.snapshotList)
+        snapshotFilterSet = set(self.snapshotFilterList)
+        quoteSet = set(self.quoteList)
+        quoteFilterSet = set(self.quoteFilterList)
+        filteredKeywordSet = set(self.filteredKeywordList)
+        unfilteredKeywordSet = set(self.unfilteredKeywordList)
+
         # Clear the graphic itself (Pass on Hybrid Visualization's reset variable!)
         self.graphic.Clear(reset=reset)
 
@@ -1717,36 +1819,42 @@ class KeywordMap(wx.Frame):
                 # If we're dealing with a Clip, we only want to deal with THIS clip!
                 if (self.clipNum == None) or (clipNum == self.clipNum):
                     # If a Clip is not found in the clipList ...
-                    if not ((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum) in self.clipList):
+                    if not ((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum) in clipSet):
                         # ... add it to the clipList ...
                         self.clipList.append((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum))
+                        clipSet.add((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum))
                         # ... and if it's not in the clipFilter List (which it probably isn't!) ...
-                        if not ((clipID, collectNum, True) in self.clipFilterList):
+                        if not ((clipID, collectNum, True) in clipFilterSet):
                             # ... add it to the clipFilterList.
                             self.clipFilterList.append((clipID, collectNum, True))
+                            clipFilterSet.add((clipID, collectNum, True))
 
                 # If the keyword is not in either of the Keyword Lists, ...
-                if not (((kwg, kw) in self.filteredKeywordList) or ((kwg, kw, False) in self.unfilteredKeywordList)):
+                if not (((kwg, kw) in filteredKeywordSet) or ((kwg, kw, False) in unfilteredKeywordSet)):
                     # ... add it to both keyword lists.
-                    if not (kwg, kw) in self.filteredKeywordList:
+                    if not (kwg, kw) in filteredKeywordSet:
                         self.filteredKeywordList.append((kwg, kw))
-                    if not (kwg, kw) in self.unfilteredKeywordList:
+                        filteredKeywordSet.add((kwg, kw))
+                    if not (kwg, kw, True) in unfilteredKeywordSet:
                         self.unfilteredKeywordList.append((kwg, kw, True))
+                        unfilteredKeywordSet.add((kwg, kw, True))
 
-                # If the keyword is in query results, it should be removed from the list of keywords to be deleted.
-                # Check that list for either True or False versions of the keyword!
-                if (kwg, kw, True) in delKeywordList:
-                    del(delKeywordList[delKeywordList.index((kwg, kw, True))])
-                if (kwg, kw, False) in delKeywordList:
-                    del(delKeywordList[delKeywordList.index((kwg, kw, False))])
+                # If the keyword is in query results, it should be removed from the set of keywords to be deleted.
+                # Check that set for either True or False versions of the keyword!
+                delKeywordSet.discard((kwg, kw, True))
+                delKeywordSet.discard((kwg, kw, False))
 
             # Now let's do a pass to see if there are any Clips that should be HIDDEN!
+            # Note the position of each entry in the current Filter list
+            clipFilterIndex = {}
+            for (index, entry) in enumerate(self.clipFilterList):
+                clipFilterIndex.setdefault(entry, index)
             # For each entry in the previous Filter list ...
             for (tmpClipID, tmpCollectionNum, tmpShowStatus) in hideClipList:
                 # ... if that entry was HIDDEN and there is a current entry that is SHOWN ...
-                if (tmpShowStatus == False) and ((tmpClipID, tmpCollectionNum, True) in self.clipFilterList):
+                if (tmpShowStatus == False) and ((tmpClipID, tmpCollectionNum, True) in clipFilterIndex):
                     # ... note the position of the entry ...
-                    index = self.clipFilterList.index((tmpClipID, tmpCollectionNum, True))
+                    index = clipFilterIndex[(tmpClipID, tmpCollectionNum, True)]
                     # ... and update it to HIDE the Clip
                     self.clipFilterList[index] = (tmpClipID, tmpCollectionNum, False)
 
@@ -1769,28 +1877,30 @@ class KeywordMap(wx.Frame):
                     kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
                     snapshotID = DBInterface.ProcessDBDataForUTF8Encoding(snapshotID)
                     # If a Snapshot is not found in the snapshotList ...
-                    if not ((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum) in self.snapshotList):
+                    if not ((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum) in snapshotSet):
                         # ... add it to the snapshotList ...
                         self.snapshotList.append((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum))
+                        snapshotSet.add((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum))
                         # ... and if it's not in the snapshotFilter List (which it probably isn't!) ...
-                        if not ((snapshotID, collectNum, True) in self.snapshotFilterList):
+                        if not ((snapshotID, collectNum, True) in snapshotFilterSet):
                             # ... add it to the snapshotFilterList.
                             self.snapshotFilterList.append((snapshotID, collectNum, True))
+                            snapshotFilterSet.add((snapshotID, collectNum, True))
 
                     # If the keyword is not in either of the Keyword Lists, ...
-                    if not (((kwg, kw) in self.filteredKeywordList) or ((kwg, kw, False) in self.unfilteredKeywordList)):
+                    if not (((kwg, kw) in filteredKeywordSet) or ((kwg, kw, False) in unfilteredKeywordSet)):
                         # ... add it to both keyword lists.
-                        if not (kwg, kw) in self.filteredKeywordList:
+                        if not (kwg, kw) in filteredKeywordSet:
                             self.filteredKeywordList.append((kwg, kw))
-                        if not (kwg, kw) in self.unfilteredKeywordList:
+                            filteredKeywordSet.add((kwg, kw))
+                        if not (kwg, kw, True) in unfilteredKeywordSet:
                             self.unfilteredKeywordList.append((kwg, kw, True))
+                            unfilteredKeywordSet.add((kwg, kw, True))
 
-                    # If the keyword is in query results, it should be removed from the list of keywords to be deleted.
-                    # Check that list for either True or False versions of the keyword!
-                    if (kwg, kw, True) in delKeywordList:
-                        del(delKeywordList[delKeywordList.index((kwg, kw, True))])
-                    if (kwg, kw, False) in delKeywordList:
-                        del(delKeywordList[delKeywordList.index((kwg, kw, False))])
+                    # If the keyword is in query results, it should be removed from the set of keywords to be deleted.
+                    # Check that set for either True or False versions of the keyword!
+                    delKeywordSet.discard((kwg, kw, True))
+                    delKeywordSet.discard((kwg, kw, False))
 
                 # Now let's create the SQL to get all relevant SNAPSHOT CODING Keyword records
                 SQLText = """SELECT ck.KeywordGroup, ck.Keyword, sn.SnapshotTimeCode, sn.SnapshotDuration, sn.SnapshotNum, sn.SnapshotID, sn.CollectNum
@@ -1808,36 +1918,42 @@ class KeywordMap(wx.Frame):
                     kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
                     snapshotID = DBInterface.ProcessDBDataForUTF8Encoding(snapshotID)
                     # If a Snapshot is not found in the snapshotList ...
-                    if not ((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum) in self.snapshotList):
+                    if not ((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum) in snapshotSet):
                         # ... add it to the snapshotList ...
                         self.snapshotList.append((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum))
+                        snapshotSet.add((kwg, kw, snapshotStart, snapshotStart + snapshotDuration, snapshotNum, snapshotID, collectNum))
                         # ... and if it's not in the snapshotFilter List (which it probably isn't!) ...
-                        if not ((snapshotID, collectNum, True) in self.snapshotFilterList):
+                        if not ((snapshotID, collectNum, True) in snapshotFilterSet):
                             # ... add it to the snapshotFilterList.
                             self.snapshotFilterList.append((snapshotID, collectNum, True))
+                            snapshotFilterSet.add((snapshotID, collectNum, True))
 
                     # If the keyword is not in either of the Keyword Lists, ...
-                    if not (((kwg, kw) in self.filteredKeywordList) or ((kwg, kw, False) in self.unfilteredKeywordList)):
+                    if not (((kwg, kw) in filteredKeywordSet) or ((kwg, kw, False) in unfilteredKeywordSet)):
                         # ... add it to both keyword lists.
-                        if not (kwg, kw) in self.filteredKeywordList:
+                        if not (kwg, kw) in filteredKeywordSet:
                             self.filteredKeywordList.append((kwg, kw))
-                        if not (kwg, kw) in self.unfilteredKeywordList:
+                            filteredKeywordSet.add((kwg, kw))
+                        if not (kwg, kw, True) in unfilteredKeywordSet:
                             self.unfilteredKeywordList.append((kwg, kw, True))
+                            unfilteredKeywordSet.add((kwg, kw, True))
 
-                    # If the keyword is in query results, it should be removed from the list of keywords to be deleted.
-                    # Check that list for either True or False versions of the keyword!
-                    if (kwg, kw, True) in delKeywordList:
-                        del(delKeywordList[delKeywordList.index((kwg, kw, True))])
-                    if (kwg, kw, False) in delKeywordList:
-                        del(delKeywordList[delKeywordList.index((kwg, kw, False))])
+                    # If the keyword is in query results, it should be removed from the set of keywords to be deleted.
+                    # Check that set for either True or False versions of the keyword!
+                    delKeywordSet.discard((kwg, kw, True))
+                    delKeywordSet.discard((kwg, kw, False))
 
                 # Now let's do a pass to see if there are any Snapshots that should be HIDDEN!
+                # Note the position of each entry in the current Filter list
+                snapshotFilterIndex = {}
+                for (index, entry) in enumerate(self.snapshotFilterList):
+                    snapshotFilterIndex.setdefault(entry, index)
                 # For each entry in the previous Filter list ...
                 for (tmpSnapshotID, tmpCollectionNum, tmpShowStatus) in hideSnapshotList:
                     # ... if that entry was HIDDEN and there is a current entry that is SHOWN ...
-                    if (tmpShowStatus == False) and ((tmpSnapshotID, tmpCollectionNum, True) in self.snapshotFilterList):
+                    if (tmpShowStatus == False) and ((tmpSnapshotID, tmpCollectionNum, True) in snapshotFilterIndex):
                         # ... note the position of the entry ...
-                        index = self.snapshotFilterList.index((tmpSnapshotID, tmpCollectionNum, True))
+                        index = snapshotFilterIndex[(tmpSnapshotID, tmpCollectionNum, True)]
                         # ... and update it to HIDE the Snapshot
                         self.snapshotFilterList[index] = (tmpSnapshotID, tmpCollectionNum, False)
 
@@ -1864,47 +1980,52 @@ class KeywordMap(wx.Frame):
                 # If we're dealing with a Quote, we only want to deal with THIS quote!
                 if (self.quoteNum == None) or (quoteNum == self.quoteNum):
                     # If a Quote is not found in the quoteList ...
-                    if not ((kwg, kw, startChar, endChar, quoteNum, quoteID, collectNum) in self.quoteList):
+                    if not ((kwg, kw, startChar, endChar, quoteNum, quoteID, collectNum) in quoteSet):
                         # ... add it to the quoteList ...
                         self.quoteList.append((kwg, kw, self.textObj.quote_dict[quoteNum][0], self.textObj.quote_dict[quoteNum][1], quoteNum, quoteID, collectNum))
+                        quoteSet.add(self.quoteList[-1])
                         # ... and if it's not in the quoteFilter List (which it probably isn't!) ...
-                        if not ((quoteID, collectNum, True) in self.quoteFilterList):
+                        if not ((quoteID, collectNum, True) in quoteFilterSet):
                             # ... add it to the quoteFilterList.
                             self.quoteFilterList.append((quoteID, collectNum, True))
+                            quoteFilterSet.add((quoteID, collectNum, True))
 
                 # If the keyword is not in either of the Keyword Lists, ...
-                if not (((kwg, kw) in self.filteredKeywordList) or ((kwg, kw, False) in self.unfilteredKeywordList)):
+                if not (((kwg, kw) in filteredKeywordSet) or ((kwg, kw, False) in unfilteredKeywordSet)):
                     # ... add it to both keyword lists.
-                    if not (kwg, kw) in self.filteredKeywordList:
+                    if not (kwg, kw) in filteredKeywordSet:
                         self.filteredKeywordList.append((kwg, kw))
-                    if not (kwg, kw) in self.unfilteredKeywordList:
+                        filteredKeywordSet.add((kwg, kw))
+                    if not (kwg, kw, True) in unfilteredKeywordSet:
                         self.unfilteredKeywordList.append((kwg, kw, True))
+                        unfilteredKeywordSet.add((kwg, kw, True))
 
-                # If the keyword is in query results, it should be removed from the list of keywords to be deleted.
-                # Check that list for either True or False versions of the keyword!
-                if (kwg, kw, True) in delKeywordList:
-                    del(delKeywordList[delKeywordList.index((kwg, kw, True))])
-                if (kwg, kw, False) in delKeywordList:
-                    del(delKeywordList[delKeywordList.index((kwg, kw, False))])
+                # If the keyword is in query results, it should be removed from the set of keywords to be deleted.
+                # Check that set for either True or False versions of the keyword!
+                delKeywordSet.discard((kwg, kw, True))
+                delKeywordSet.discard((kwg, kw, False))
 
             # Now let's do a pass to see if there are any Quotes that should be HIDDEN!
+            # Note the position of each entry in the current Filter list
+            quoteFilterIndex = {}
+            for (index, entry) in enumerate(self.quoteFilterList):
+                quoteFilterIndex.setdefault(entry, index)
             # For each entry in the previous Filter list ...
             for (tmpQuoteID, tmpCollectionNum, tmpShowStatus) in hideQuoteList:
                 # ... if that entry was HIDDEN and there is a current entry that is SHOWN ...
-                if (tmpShowStatus == False) and ((tmpQuoteID, tmpCollectionNum, True) in self.quoteFilterList):
+                if (tmpShowStatus == False) and ((tmpQuoteID, tmpCollectionNum, True) in quoteFilterIndex):
                     # ... note the position of the entry ...
-                    index = self.quoteFilterList.index((tmpQuoteID, tmpCollectionNum, True))
+                    index = quoteFilterIndex[(tmpQuoteID, tmpCollectionNum, True)]
                     # ... and update it to HIDE the Quote
                     self.quoteFilterList[index] = (tmpQuoteID, tmpCollectionNum, False)
 
-        # Iterate through ANY keywords left in the list of keywords to be deleted ...
-        for element in delKeywordList:
-            # ... and delete them from the unfiltered Keyword List
-            del(self.unfilteredKeywordList[self.unfilteredKeywordList.index(element)])
-            # If the keyword is also in the filtered keyword list ...
-            if (element[0], element[1]) in self.filteredKeywordList:
-                # ... it needs to be deleted from there too!
-                del(self.filteredKeywordList[self.filteredKeywordList.index((element[0], element[1]))])
+        # If there are ANY keywords left in the set of keywords to be deleted ...
+        if len(delKeywordSet) > 0:
+            # ... delete them from the unfiltered Keyword List
+            self.unfilteredKeywordList[:] = [element for element in self.unfilteredKeywordList if not element in delKeywordSet]
+            # If the keywords are also in the filtered keyword list, they need to be deleted from there too!
+            delKeywordPairs = set([(element[0], element[1]) for element in delKeywordSet])
+            self.filteredKeywordList[:] = [element for element in self.filteredKeywordList if not element in delKeywordPairs]
 
         # Now that the underlying data structures have been corrected, we're ready to redraw the Keyword Visualization
         self.DrawGraph()
@@ -1918,6 +2039,10 @@ class KeywordMap(wx.Frame):
     def DrawGraph(self):
         """ Actually Draw the Keyword Map """
         self.keywordClipList = {}
+        # The Interval Trees for finding the items under the mouse will need to be rebuilt for the new Keyword Clip List
+        self.keywordClipIndex = {}
+        # Note the Bounds the graph is drawn at
+        self.drawnBounds = self.Bounds
         # We need to remember Snapshot Color for when self.keywordAsColor is False
         # Otherwise, whole snapshot coding may get a different color than detail snapshot coding.
         snapshotColor = {}
@@ -2183,6 +2308,15 @@ class KeywordMap(wx.Frame):
         else:
             self.graphic.SetFontSize(7)
 
+        # Note the display position of each keyword in the keyword list, for fast lookups
+        keywordIndex = {}
+        for (index, keyword) in enumerate(self.filteredKeywordList):
+            keywordIndex.setdefault(keyword, index)
+        # Note which Clips, Snapshots, and Quotes are shown, for fast lookups
+        clipFilterSet = set(self.clipFilterList)
+        snapshotFilterSet = set(self.snapshotFilterList)
+        quoteFilterSet = set(self.quoteFilterList)
+
         # Iterate through the keyword list in order ...
         for (KWG, KW) in self.filteredKeywordList:
             # ... and assign colors to Keywords
@@ -2238,14 +2372,14 @@ class KeywordMap(wx.Frame):
             # If we're in the Keyword Visualization and showEmbeddedLabels is enabled ...
             # NOTE:  This is ONLY to be used for testing the mouse-overs, not in production!
             if self.embedded and self.showEmbeddedLabels:
-                self.graphic.AddText("%s : %s" % (KWG, KW), 2, self.CalcY(self.filteredKeywordList.index((KWG, KW))) - 7)
+                self.graphic.AddText("%s : %s" % (KWG, KW), 2, self.CalcY(keywordIndex[(KWG, KW)]) - 7)
 
         # Set a counter for missing colors
         nextColour = 0
         # For each record in the Clip List ...
         for (KWG, KW, Start, Stop, ClipNum, ClipName, CollectNum) in self.clipList:
             # If the record should be displayed based on the Clip and Keyword sections of the Filter Dialog ...
-            if ((ClipName, CollectNum, True) in self.clipFilterList) and ((KWG, KW) in self.filteredKeywordList):
+            if ((ClipName, CollectNum, True) in clipFilterSet) and ((KWG, KW) in keywordIndex):
                 # See if the Clip's start is before the portion of the map being displayed
                 if Start < self.startTime:
                     Start = self.startTime
@@ -2263,8 +2397,8 @@ class KeywordMap(wx.Frame):
                     # Initialize a list for Temporary Lines
                     tempLine = []
                     # Add the Coding Line
-                    tempLine.append((self.CalcX(Start), self.CalcY(self.filteredKeywordList.index((KWG, KW))),
-                                     self.CalcX(Stop), self.CalcY(self.filteredKeywordList.index((KWG, KW)))))
+                    tempLine.append((self.CalcX(Start), self.CalcY(keywordIndex[(KWG, KW)]),
+                                     self.CalcX(Stop), self.CalcY(keywordIndex[(KWG, KW)])))
                     # If we're in the Keyword Map and are NOT using Colors as Keywords (i.e., colors are Clips) ....
                     if (not self.embedded) and (not self.colorAsKeywords):
                         # Update the color index here, at the clip transition
@@ -2338,23 +2472,23 @@ class KeywordMap(wx.Frame):
                                 self.graphic.SetColour("GREEN")
                             else:
                                 self.graphic.SetColour("WHITE")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW))), self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW))))]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)]), self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)]))]
                             self.graphic.AddLines(tempLine)
                             if self.colorOutput:
                                 self.graphic.SetColour("RED")
                             else:
                                 self.graphic.SetColour("BLACK")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-overlapThickness+1, self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-overlapThickness+1)]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])-overlapThickness+1, self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])-overlapThickness+1)]
                             self.graphic.AddLines(tempLine)
                             if self.colorOutput:
                                 self.graphic.SetColour("BLUE")
                             else:
                                 self.graphic.SetColour("GRAY")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+overlapThickness, self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+overlapThickness)]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])+overlapThickness, self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])+overlapThickness)]
                             self.graphic.AddLines(tempLine)
                             # Let's remember the clip start and stop boundaries, to be drawn at the end so they won't get over-written
-                            overlapLines.append(((self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-(self.barHeight / 2), self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+(self.barHeight / 2)),))
-                            overlapLines.append(((self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-(self.barHeight / 2), self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+(self.barHeight / 2)),))
+                            overlapLines.append(((self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])-(self.barHeight / 2), self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])+(self.barHeight / 2)),))
+                            overlapLines.append(((self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])-(self.barHeight / 2), self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])+(self.barHeight / 2)),))
 
                     # ... add the new Clip to the Clip List
                     self.keywordClipList[(KWG, KW)].append(('Clip', Start, Stop, ClipNum, ClipName))
@@ -2367,7 +2501,7 @@ class KeywordMap(wx.Frame):
         # For each record in the Snapshot List ...
         for (KWG, KW, Start, Stop, SnapshotNum, SnapshotName, CollectNum) in self.snapshotList:
             # If the record should be displayed based on the Snapshot and Keyword sections of the Filter Dialog ...
-            if ((SnapshotName, CollectNum, True) in self.snapshotFilterList) and ((KWG, KW) in self.filteredKeywordList):
+            if ((SnapshotName, CollectNum, True) in snapshotFilterSet) and ((KWG, KW) in keywordIndex):
                 # See if the Snapshot's start is before the portion of the map being displayed
                 if Start < self.startTime:
                     Start = self.startTime
@@ -2385,8 +2519,8 @@ class KeywordMap(wx.Frame):
                     # Initialize a list for Temporary Lines
                     tempLine = []
                     # Add the Coding Line
-                    tempLine.append((self.CalcX(Start), self.CalcY(self.filteredKeywordList.index((KWG, KW))),
-                                     self.CalcX(Stop), self.CalcY(self.filteredKeywordList.index((KWG, KW)))))
+                    tempLine.append((self.CalcX(Start), self.CalcY(keywordIndex[(KWG, KW)]),
+                                     self.CalcX(Stop), self.CalcY(keywordIndex[(KWG, KW)])))
                     # If we're in the Keyword Map and are NOT using Colors as Keywords (i.e., colors are Clips) ....
                     if (not self.embedded) and (not self.colorAsKeywords):
                         # Update the color index here, at the clip transition
@@ -2459,23 +2593,23 @@ class KeywordMap(wx.Frame):
                                 self.graphic.SetColour("GREEN")
                             else:
                                 self.graphic.SetColour("WHITE")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW))), self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW))))]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)]), self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)]))]
                             self.graphic.AddLines(tempLine)
                             if self.colorOutput:
                                 self.graphic.SetColour("RED")
                             else:
                                 self.graphic.SetColour("BLACK")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-overlapThickness+1, self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-overlapThickness+1)]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])-overlapThickness+1, self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])-overlapThickness+1)]
                             self.graphic.AddLines(tempLine)
                             if self.colorOutput:
                                 self.graphic.SetColour("BLUE")
                             else:
                                 self.graphic.SetColour("GRAY")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+overlapThickness, self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+overlapThickness)]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])+overlapThickness, self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])+overlapThickness)]
                             self.graphic.AddLines(tempLine)
                             # Let's remember the clip start and stop boundaries, to be drawn at the end so they won't get over-written
-                            overlapLines.append(((self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-(self.barHeight / 2), self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+(self.barHeight / 2)),))
-                            overlapLines.append(((self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-(self.barHeight / 2), self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+(self.barHeight / 2)),))
+                            overlapLines.append(((self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])-(self.barHeight / 2), self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])+(self.barHeight / 2)),))
+                            overlapLines.append(((self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])-(self.barHeight / 2), self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])+(self.barHeight / 2)),))
 
                     # ... add the new Clip to the Clip List
                     self.keywordClipList[(KWG, KW)].append(('Snapshot', Start, Stop, SnapshotNum, SnapshotName))
@@ -2488,7 +2622,7 @@ class KeywordMap(wx.Frame):
         # For each record in the Quote List ...
         for (KWG, KW, Start, Stop, QuoteNum, QuoteName, CollectNum) in self.quoteList:
             # If the record should be displayed based on the Quote and Keyword sections of the Filter Dialog ...
-            if ((QuoteName, CollectNum, True) in self.quoteFilterList) and ((KWG, KW) in self.filteredKeywordList):
+            if ((QuoteName, CollectNum, True) in quoteFilterSet) and ((KWG, KW) in keywordIndex):
                 # See if the Quote's start is before the portion of the map being displayed
                 if Start < self.startChar:
                     Start = self.startChar
@@ -2507,8 +2641,8 @@ class KeywordMap(wx.Frame):
                     tempLine = []
 
                     # Add the Coding Line
-                    tempLine.append((self.CalcX(Start), self.CalcY(self.filteredKeywordList.index((KWG, KW))),
-                                     self.CalcX(Stop), self.CalcY(self.filteredKeywordList.index((KWG, KW)))))
+                    tempLine.append((self.CalcX(Start), self.CalcY(keywordIndex[(KWG, KW)]),
+                                     self.CalcX(Stop), self.CalcY(keywordIndex[(KWG, KW)])))
                     # If we're in the Keyword Map and are NOT using Colors as Keywords (i.e., colors are Quotes) ....
                     if (not self.embedded) and (not self.colorAsKeywords):
                         # Update the color index here, at the quote transition
@@ -2569,23 +2703,23 @@ class KeywordMap(wx.Frame):
                                 self.graphic.SetColour("GREEN")
                             else:
                                 self.graphic.SetColour("WHITE")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW))), self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW))))]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)]), self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)]))]
                             self.graphic.AddLines(tempLine)
                             if self.colorOutput:
                                 self.graphic.SetColour("RED")
                             else:
                                 self.graphic.SetColour("BLACK")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-overlapThickness+1, self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-overlapThickness+1)]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])-overlapThickness+1, self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])-overlapThickness+1)]
                             self.graphic.AddLines(tempLine)
                             if self.colorOutput:
                                 self.graphic.SetColour("BLUE")
                             else:
                                 self.graphic.SetColour("GRAY")
-                            tempLine = [(self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+overlapThickness, self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+overlapThickness)]
+                            tempLine = [(self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])+overlapThickness, self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])+overlapThickness)]
                             self.graphic.AddLines(tempLine)
                             # Let's remember the clip start and stop boundaries, to be drawn at the end so they won't get over-written
-                            overlapLines.append(((self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-(self.barHeight / 2), self.CalcX(overlapStart), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+(self.barHeight / 2)),))
-                            overlapLines.append(((self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))-(self.barHeight / 2), self.CalcX(overlapEnd), self.CalcY(self.filteredKeywordList.index((KWG, KW)))+(self.barHeight / 2)),))
+                            overlapLines.append(((self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])-(self.barHeight / 2), self.CalcX(overlapStart), self.CalcY(keywordIndex[(KWG, KW)])+(self.barHeight / 2)),))
+                            overlapLines.append(((self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])-(self.barHeight / 2), self.CalcX(overlapEnd), self.CalcY(keywordIndex[(KWG, KW)])+(self.barHeight / 2)),))
 
                     # ... add the new Quote to the Clip List
                     self.keywordClipList[(KWG, KW)].append(('Quote', Start, Stop, QuoteNum, QuoteName))
@@ -2663,7 +2797,7 @@ class KeywordMap(wx.Frame):
                         # initialize the string that will hold the names of clips being pointed to
                         clipNames = ''
                         # Get the list of Clips that contain the current Keyword from the keyword / Clip List dictionary
-                        clips = self.keywordClipList[kw]
+                        clips = self.FindItems(kw, time)
                         # Iterate through the Clip List ...
                         for (objType, startTime, endTime, clipNum, clipName) in clips:
                             # If the current Time value falls between the Clip's StartTime and EndTime ...
@@ -2687,7 +2821,7 @@ class KeywordMap(wx.Frame):
                         # initialize the string that will hold the names of quotes being pointed to.
                         quoteNames = ''
                         # Get the list of Quotes that contain the current Keyword from the keyword / Clip List dictionary
-                        quotes = self.keywordClipList[kw]
+                        quotes = self.FindItems(kw, time)
                         # Iterate through the Quote List ...
                         for (objType, startChar, endChar, quoteNum, quoteName) in quotes:
                             # If the current Character value falls between the Quote's StartChar and EndChar ...
@@ -2724,7 +2858,7 @@ class KeywordMap(wx.Frame):
                         # We don't actually need to know the names, but this signals that we're at least OVER a Clip.
                         clipNames = ''
                         # Get the list of Clips that contain the current Keyword from the keyword / Clip List dictionary
-                        clips = self.keywordClipList[kw]
+                        clips = self.FindItems(kw, time)
                         # Iterate through the Clip List ...
                         for (objType, startTime, endTime, clipNum, clipName) in clips:
                             # If the current Time value falls between the Clip's StartTime and EndTime ...
@@ -2793,7 +2927,7 @@ class KeywordMap(wx.Frame):
             # Set the Status Text to indicate the current Keyword and Time values
             self.SetStatusText(prompt % (kw[0], kw[1], Misc.time_in_ms_to_str(time)))
             # Get the list of Clips that contain the current Keyword from the keyword / Clip List dictionary
-            clips = self.keywordClipList[kw]
+            clips = self.FindItems(kw, time)
             # Iterate through the Clip List ...
             for (objType, startTime, endTime, clipNum, clipName) in clips:
                 # If the current Time value falls between the Clip's StartTime and EndTime ...
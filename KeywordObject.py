@@ -29,6 +29,7 @@ import wx
 from TransanaExceptions import *
 import DBInterface
 import Dialogs
+import IntervalIndex
 import Misc
 import TransanaConstants
 import TransanaGlobal
@@ -408,6 +409,8 @@ class Keyword(object):
     def db_save(self, use_transactions=True):
         """Save the record to the database using Insert or Update as
         appropriate."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
         # Define and implement Demo Version limits
         if TransanaConstants.demoVersion and (self._db_start_save() == 0):
             # Get a DB Cursor
@@ -22,6 +22,8 @@ DEBUG = False
 if DEBUG:
     print "LibraryMap DEBUG is ON!!"
 
+# import Python's bisect module
+import bisect
 # import Python's os and sys modules
 import os, sys
 # import Python's platform module
@@ -40,6 +42,8 @@ import DBInterface
 import Dialogs
 # Import Transana's Filter Dialog
 import FilterDialog
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Keyword Object
 import KeywordObject
 # import Transana's Globals
@@ -76,6 +80,13 @@ ID_SERIESLIST        = wx.NewId()
 # Episode List Combo Box
 ID_EPISODELIST       = wx.NewId()
 
+# Resizing the window produces a stream of Size events.  Wait this many milliseconds after the last one before redrawing.
+RESIZE_REDRAW_DELAY = 150
+# The width, in pixels, of the horizontal buckets used to find the bar under the mouse
+LOOKUP_BUCKET_WIDTH = 50
+# Bars that span more than this many buckets are checked on every lookup rather than placed in buckets
+LOOKUP_MAX_BUCKETS = 100
+
 class LibraryMap(wx.Frame):
     """ This is the main class for the Series Map application. """
     def __init__(self, parent, title, seriesNum, seriesName, reportType, controlObject=None):
@@ -131,10 +142,20 @@ class LibraryMap(wx.Frame):
         self.startTime = 0
         self.endTime = 0
         self.keywordClipList = {}
+        # Initialize the Interval Trees used to find the Clips under the mouse, built from keywordClipList as needed
+        self.keywordClipIndex = {}
         self.configName = ''
         # Initialize variables required to avoid crashes when the visualization has been cleared
         self.graphicindent = 0
         self.Bounds = [1, 1, 1, 1]
+        # Note the Bounds the graph was last drawn at, so we can skip redrawing when they haven't changed
+        self.drawnBounds = None
+        # Initialize the Timer used to delay redrawing while the window is being resized
+        self.resizeTimer = None
+        # Initialize the sorted keys and horizontal buckets for the Episode Name / Keyword Lookup table.
+        # These are built when the mouse is first moved over the graph.
+        self.lookupKeys = None
+        self.lookupBuckets = {}
         # Create a dictionary of the colors for each keyword.
         self.keywordColors = {'lastColor' : -1}
         # Get the Configuration values for the Series Map Options
@@ -561,6 +582,10 @@ class LibraryMap(wx.Frame):
 
     def OnClose(self, event):
         """ Handle the Close Event """
+        # If we're waiting to redraw after a resize ...
+        if (self.resizeTimer != None) and self.resizeTimer.IsRunning():
+            # ... we don't need to any more
+            self.resizeTimer.Stop()
         # If the report has a defined Control Object ...
         if self.ControlObject != None:
             # ... remove this report from the Menu Window's Window Menu
@@ -589,7 +614,22 @@ class LibraryMap(wx.Frame):
             self.Bounds = (5, 5, w - 10, h - 25)
         else:
             self.Bounds = (5, 40, w - 10, h - 30)
-        self.DrawGraph()
+        # Redrawing the Series Map is slow, and resizing the window produces a stream of Size events.
+        # If we're already waiting to redraw ...
+        if (self.resizeTimer != None) and self.resizeTimer.IsRunning():
+            # ... wait a little longer, as the user is still resizing
+            self.resizeTimer.Restart(RESIZE_REDRAW_DELAY)
+        # Otherwise ...
+        else:
+            # ... redraw once the user stops resizing
+            self.resizeTimer = wx.CallLater(RESIZE_REDRAW_DELAY, self.OnResizeRedraw)
+
+    def OnResizeRedraw(self):
+        """ Redraw the Series Map after the window has been resized """
+        # If the window has actually changed size since the graph was drawn ...
+        if self.Bounds != self.drawnBounds:
+            # ... redraw the graph
+            self.DrawGraph()
             
     def CalcX(self, XPos):
         """ Determine the proper horizontal coordinate for the given time """
@@ -669,10 +709,9 @@ class LibraryMap(wx.Frame):
         # If the graphic is scrolled, the raw Y value does not point to the correct Keyword.
         # Determine the unscrolled equivalent Y position.
         (modX, modY) = self.graphic.CalcUnscrolledPosition(0, y)
-        # Now we need to get the keys for the Lookup Dictionary
-        keyVals = self.epNameKWGKWLookup.keys()
-        # We need the keys to be in order, so we can quit when we've found what we're looking for.
-        keyVals.sort()
+        # Find the Lookup row for the position.  The keys are actually y values for the graph, and we want
+        # the row with the LARGEST key that is not larger than the graphic y value.
+        (yVal, tempVal) = self.FindLookupRow(modY, True)
 
         # The single-line display and the multi-line display handle the lookup differently, of course.
         # Let's start with the single-line display.
@@ -680,21 +719,6 @@ class LibraryMap(wx.Frame):
 
             # Initialize the return value to None in case nothing is found.  The single-line version expects an Episode Name.
             returnVal = None
-            # We also need a temporary value initialized to None.  Our data structure returns complex data, from which we
-            # extract the desired value.
-            tempVal = None
-
-            # Iterate through the sorted keys.  The keys are actually y values for the graph!
-            for yVal in keyVals:
-                # If we find a key value that is smaller than the unscrolled Graphic y position ...
-                if yVal <= modY:
-                    # ... then we've found a candidate for what we're looking for.  But we keep iterating,
-                    # because we want the LARGEST yVal that's smaller than the graphic y value.
-                    tempVal = self.epNameKWGKWLookup[yVal]
-                # Once our y values are too large ...
-                else:
-                    # ... we should stop iterating through the (sorted) keys.
-                    break
 
             # If we found a valid data structure ...
             if tempVal != None:
@@ -703,24 +727,87 @@ class LibraryMap(wx.Frame):
 
         # Here, we handle the multi-line display of the Sequence Map.
         else:
-            # Initialize the return value to a tuple of three Nones in case nothing is found.
-            # The multi-line version expects an Episode Name, Keyword Group, Keyword tuple.
-            returnVal = (None, None, None)
-            
-            # Iterate through the sorted keys.  The keys are actually y values for the graph!
-            for yVal in keyVals:
-                # If we find a key value that is smaller than the unscrolled Graphic y position ...
-                if yVal <= modY:
-                    # ... then we've found a candidate for what we're looking for.  But we keep iterating,
-                    # because we want the LARGEST yVal that's smaller than the graphic y value.
-                    returnVal = self.epNameKWGKWLookup[yVal]
-                # Once our y values are too large ...
-                else:
-                    # ... we should stop iterating through the (sorted) keys.
-                    break
+            # If we found a row ...
+            if tempVal != None:
+                # ... that's what we're looking for
+                returnVal = tempVal
+            # If nothing is found ...
+            else:
+                # ... return a tuple of three Nones.  The multi-line version expects an Episode Name, Keyword Group, Keyword tuple.
+                returnVal = (None, None, None)
         # Return the value we found, or None
         return returnVal
 
+    def FindLookupRow(self, y, includeEqual):
+        """ Return the (key, row) of the Episode Name / Keyword Lookup table for a vertical position, which is the
+            row with the largest key smaller than y (or equal to y, if includeEqual is True).  Returns (None, None)
+            if there is no such row. """
+        # If we haven't sorted the Lookup table keys since the graph was drawn ...
+        if self.lookupKeys == None:
+            # ... sort them now.  The keys are the top y values of the rows.
+            self.lookupKeys = self.epNameKWGKWLookup.keys()
+            self.lookupKeys.sort()
+        # Find where y falls in the sorted keys
+        if includeEqual:
+            pos = bisect.bisect_right(self.lookupKeys, y)
+        else:
+            pos = bisect.bisect_left(self.lookupKeys, y)
+        # If y is above the first row ...
+        if pos == 0:
+            # ... there's no row
+            return (None, None)
+        # Return the row above the position
+        return (self.lookupKeys[pos - 1], self.epNameKWGKWLookup[self.lookupKeys[pos - 1]])
+
+    def FindLookupRanges(self, yVal, x):
+        """ Return the keys of the X ranges in the Lookup table row with key yVal that contain the horizontal position x,
+            in the order the row's keys() method returns them """
+        # If we haven't placed this row's X ranges in buckets since the graph was drawn ...
+        if not self.lookupBuckets.has_key(yVal):
+            # ... initialize the buckets, and the list of ranges too wide to bucket
+            buckets = {}
+            wideRanges = []
+            # For each X range in the row, in order ...
+            for (loop, key) in enumerate(self.epNameKWGKWLookup[yVal].keys()):
+                # ... determine the buckets the range falls in
+                firstBucket = int(min(key[0], key[1])) / LOOKUP_BUCKET_WIDTH
+                lastBucket = int(max(key[0], key[1])) / LOOKUP_BUCKET_WIDTH
+                # If the range is too wide to bucket ...
+                if lastBucket - firstBucket > LOOKUP_MAX_BUCKETS:
+                    # ... it will be checked on every lookup
+                    wideRanges.append((loop, key))
+                # Otherwise ...
+                else:
+                    # ... add it to each of its buckets
+                    for bucket in range(firstBucket, lastBucket + 1):
+                        if buckets.has_key(bucket):
+                            buckets[bucket].append((loop, key))
+                        else:
+                            buckets[bucket] = [(loop, key)]
+            # Remember the buckets for this row
+            self.lookupBuckets[yVal] = (buckets, wideRanges)
+        # Get the buckets for this row
+        (buckets, wideRanges) = self.lookupBuckets[yVal]
+        # Find the ranges that contain the position, among the ranges that could
+        ranges = [(loop, key) for (loop, key) in buckets.get(int(x) / LOOKUP_BUCKET_WIDTH, []) + wideRanges
+                  if (x >= key[0]) and (x < key[1])]
+        # Put the ranges back in the row's order
+        ranges.sort()
+        return [key for (loop, key) in ranges]
+
+    def FindItems(self, kw, position):
+        """ Return the items in the Keyword Clip List for kw that start at or before position and end at or
+            after it, in the order they appear in the Keyword Clip List """
+        # If we haven't built the Interval Tree for this key since the graph was last drawn ...
+        if not self.keywordClipIndex.has_key(kw):
+            # ... build it.  Include each item's position in the list so we can keep the list order.
+            self.keywordClipIndex[kw] = IntervalIndex.IntervalTree([(item[1], item[2], (loop, item))
+                                                                    for (loop, item) in enumerate(self.keywordClipList[kw])])
+        # Find the items at the position, and put them in list order
+        items = [data for (start, stop, data) in self.keywordClipIndex[kw].Stab(position)]
+        items.sort()
+        return [item for (loop, item) in items]
+
     def GetScaleIncrements(self, MediaLength):
         # The general rule is to try to get logical interval sizes with 8 or fewer time increments.
         # You always add a bit (20% at the lower levels) of the time interval to the MediaLength
@@ -810,6 +897,9 @@ class LibraryMap(wx.Frame):
         if self.reportType == 2:
             epLengths = {}
 
+        # Rather than querying each Episode separately, we get the data for the whole Library with a small, fixed number
+        # of queries, then sort the results out by Episode.
+
         # Get Series Number, Episode Number, Media File Name, and Length
         SQLText = """SELECT e.EpisodeNum, e.EpisodeID, e.SeriesNum, e.MediaFile, e.EpLength, s.SeriesID
                        FROM Episodes2 e, Series2 s
@@ -820,8 +910,47 @@ class LibraryMap(wx.Frame):
         SQLText = DBInterface.FixQuery(SQLText)
         # Execute the query
         self.DBCursor.execute(SQLText, (self.seriesNum, ))
-
-        for (EpisodeNum, EpisodeID, SeriesNum, MediaFile, EpisodeLength, SeriesID) in self.DBCursor.fetchall():
+        episodes = self.DBCursor.fetchall()
+
+        # Create the Keyword Placement lines to be displayed.  We need them to be in ClipStart, ClipNum order so colors will be
+        # distributed properly across bands.  The Keywords to be displayed are the Keywords in these lines.
+        SQLText = """SELECT cl.EpisodeNum, ck.KeywordGroup, ck.Keyword, cl.ClipStart, cl.ClipStop, cl.ClipNum, cl.ClipID, cl.CollectNum
+                       FROM Episodes2 e, Clips2 cl, ClipKeywords2 ck
+                       WHERE e.SeriesNum = %s AND
+                             cl.EpisodeNum = e.EpisodeNum AND
+                             cl.ClipNum = ck.ClipNum
+                       ORDER BY cl.EpisodeNum, ClipStart, cl.ClipNum, KeywordGroup, Keyword"""
+        # Get the lines, arranged by Episode
+        clipRows = self.GetRowsByEpisode(SQLText)
+
+        # Create the WHOLE SNAPSHOT Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
+        # distributed properly across bands.
+        SQLText = """SELECT sn.EpisodeNum, ck.KeywordGroup, ck.Keyword, sn.SnapshotTimeCode, sn.SnapshotDuration, sn.SnapshotNum, sn.SnapshotID, sn.CollectNum
+                       FROM Episodes2 e, Snapshots2 sn, ClipKeywords2 ck
+                       WHERE e.SeriesNum = %s AND
+                             sn.EpisodeNum = e.EpisodeNum AND
+                             sn.SnapshotNum = ck.SnapshotNum
+                       ORDER BY sn.EpisodeNum, SnapshotTimeCode, sn.SnapshotNum, KeywordGroup, Keyword"""
+        # Get the lines, arranged by Episode
+        wholeSnapshotRows = self.GetRowsByEpisode(SQLText)
+
+        # Create the SNAPSHOT CODING Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
+        # distributed properly across bands.
+        SQLText = """SELECT sn.EpisodeNum, ck.KeywordGroup, ck.Keyword, sn.SnapshotTimeCode, sn.SnapshotDuration, sn.SnapshotNum, sn.SnapshotID, sn.CollectNum
+                       FROM Episodes2 e, Snapshots2 sn, SnapshotKeywords2 ck
+                       WHERE e.SeriesNum = %s AND
+                             sn.EpisodeNum = e.EpisodeNum AND
+                             sn.SnapshotNum = ck.SnapshotNum
+                       ORDER BY sn.EpisodeNum, SnapshotTimeCode, sn.SnapshotNum, KeywordGroup, Keyword"""
+        # Get the lines, arranged by Episode
+        snapshotCodingRows = self.GetRowsByEpisode(SQLText)
+
+        # Keep sets of the Keywords and filter entries we've already added, so we don't have to search the lists
+        keywordSet = set()
+        clipFilterSet = set()
+        snapshotFilterSet = set()
+
+        for (EpisodeNum, EpisodeID, SeriesNum, MediaFile, EpisodeLength, SeriesID) in episodes:
             EpisodeID = DBInterface.ProcessDBDataForUTF8Encoding(EpisodeID)
             SeriesID = DBInterface.ProcessDBDataForUTF8Encoding(SeriesID)
             MediaFile = DBInterface.ProcessDBDataForUTF8Encoding(MediaFile)
@@ -835,131 +964,65 @@ class LibraryMap(wx.Frame):
             # Remember the Episode's length
             self.episodeLengths[(EpisodeID, SeriesID)] = EpisodeLength
 
-            # Get the list of Keywords to be displayed
-            SQLText = """SELECT ck.KeywordGroup, ck.Keyword
-                           FROM Clips2 cl, ClipKeywords2 ck
-                           WHERE cl.EpisodeNum = %s AND
-                                 cl.ClipNum = ck.ClipNum
-                           GROUP BY ck.keywordgroup, ck.keyword
-                           ORDER BY KeywordGroup, Keyword, ClipStart"""
-            # Adjust the query for sqlite if needed
-            SQLText = DBInterface.FixQuery(SQLText)
-            self.DBCursor.execute(SQLText, (EpisodeNum, ))
-
-            for (kwg, kw) in self.DBCursor.fetchall():
-                kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
-                kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                if not (kwg, kw) in self.filteredKeywordList:
-                    self.filteredKeywordList.append((kwg, kw))
-                if not (kwg, kw, True) in self.unfilteredKeywordList:
-                    self.unfilteredKeywordList.append((kwg, kw, True))
-
-            # Get the list of WHOLE SNAPSHOT Keywords to be displayed
-            SQLText = """SELECT ck.KeywordGroup, ck.Keyword
-                           FROM Snapshots2 sn, ClipKeywords2 ck
-                           WHERE sn.EpisodeNum = %s AND
-                                 sn.SnapshotNum = ck.SnapshotNum
-                           GROUP BY ck.keywordgroup, ck.keyword
-                           ORDER BY KeywordGroup, Keyword, SnapshotTimeCode"""
-            # Adjust the query for sqlite if needed
-            SQLText = DBInterface.FixQuery(SQLText)
-            self.DBCursor.execute(SQLText, (EpisodeNum, ))
-            for (kwg, kw) in self.DBCursor.fetchall():
-                kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
-                kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                if not (kwg, kw) in self.filteredKeywordList:
-                    self.filteredKeywordList.append((kwg, kw))
-                if not (kwg, kw, True) in self.unfilteredKeywordList:
-                    self.unfilteredKeywordList.append((kwg, kw, True))
-
-            # Get the list of SNAPSHOT CODING Keywords to be displayed
-            SQLText = """SELECT ck.KeywordGroup, ck.Keyword
-                           FROM Snapshots2 sn, SnapshotKeywords2 ck
-                           WHERE sn.EpisodeNum = %s AND
-                                 sn.SnapshotNum = ck.SnapshotNum
-                           GROUP BY ck.keywordgroup, ck.keyword
-                           ORDER BY KeywordGroup, Keyword, SnapshotTimeCode"""
-            # Adjust the query for sqlite if needed
-            SQLText = DBInterface.FixQuery(SQLText)
-            self.DBCursor.execute(SQLText, (EpisodeNum, ))
-            for (kwg, kw) in self.DBCursor.fetchall():
-                kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
-                kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                if not (kwg, kw) in self.filteredKeywordList:
+            # Add the Episode's Clip Keyword Placement lines
+            for (kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum) in clipRows.get(EpisodeNum, []):
+                # Add the Keyword to the Keyword Lists, if it's not already there
+                if not (kwg, kw) in keywordSet:
+                    keywordSet.add((kwg, kw))
                     self.filteredKeywordList.append((kwg, kw))
-                if not (kwg, kw, True) in self.unfilteredKeywordList:
                     self.unfilteredKeywordList.append((kwg, kw, True))
-
-            # Sort the Keyword List
-            self.unfilteredKeywordList.sort()
-
-            # Create the Keyword Placement lines to be displayed.  We need them to be in ClipStart, ClipNum order so colors will be
-            # distributed properly across bands.
-            SQLText = """SELECT ck.KeywordGroup, ck.Keyword, cl.ClipStart, cl.ClipStop, cl.ClipNum, cl.ClipID, cl.CollectNum
-                           FROM Clips2 cl, ClipKeywords2 ck
-                           WHERE cl.EpisodeNum = %s AND
-                                 cl.ClipNum = ck.ClipNum
-                           ORDER BY ClipStart, cl.ClipNum, KeywordGroup, Keyword"""
-            # Adjust the query for sqlite if needed
-            SQLText = DBInterface.FixQuery(SQLText)
-            self.DBCursor.execute(SQLText, (EpisodeNum, ))
-            for (kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum) in self.DBCursor.fetchall():
-                kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
-                kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                clipID = DBInterface.ProcessDBDataForUTF8Encoding(clipID)
                 # If we're dealing with an Episode, self.clipNum will be None and we want all clips.
                 # If we're dealing with a Clip, we only want to deal with THIS clip!
                 if (self.clipNum == None) or (clipNum == self.clipNum):
                     self.clipList.append((kwg, kw, clipStart, clipStop, clipNum, clipID, collectNum, EpisodeID, SeriesID))
 
-                    if not ((clipID, collectNum, True) in self.clipFilterList):
+                    if not ((clipID, collectNum, True) in clipFilterSet):
+                        clipFilterSet.add((clipID, collectNum, True))
                         self.clipFilterList.append((clipID, collectNum, True))
 
-            # Create the WHOLE SNAPSHOT Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
-            # distributed properly across bands.
-            SQLText = """SELECT ck.KeywordGroup, ck.Keyword, sn.SnapshotTimeCode, sn.SnapshotDuration, sn.SnapshotNum, sn.SnapshotID, sn.CollectNum
-                           FROM Snapshots2 sn, ClipKeywords2 ck
-                           WHERE sn.EpisodeNum = %s AND
-                                 sn.SnapshotNum = ck.SnapshotNum
-                           ORDER BY SnapshotTimeCode, sn.SnapshotNum, KeywordGroup, Keyword"""
-            # Adjust the query for sqlite if needed
-            SQLText = DBInterface.FixQuery(SQLText)
-            self.DBCursor.execute(SQLText, (EpisodeNum, ))
-            for (kwg, kw, SnapshotTimeCode, SnapshotDuration, SnapshotNum, SnapshotID, collectNum) in self.DBCursor.fetchall():
-                kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
-                kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                SnapshotID = DBInterface.ProcessDBDataForUTF8Encoding(SnapshotID)
-                # If we're dealing with an Episode, self.clipNum will be None and we want all clips.
-                # If we're dealing with a Clip, we only want to deal with THIS clip!
-                if (self.clipNum == None):
-                    self.snapshotList.append((kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum, EpisodeID, SeriesID))
-                    if not ((SnapshotID, collectNum, True) in self.snapshotFilterList):
-                        self.snapshotFilterList.append((SnapshotID, collectNum, True))
-
-            # Create the SNAPSHOT CODING Keyword Placement lines to be displayed.  We need them to be in SnapshotTimeCode, SnapshotNum order so colors will be
-            # distributed properly across bands.
-            SQLText = """SELECT ck.KeywordGroup, ck.Keyword, sn.SnapshotTimeCode, sn.SnapshotDuration, sn.SnapshotNum, sn.SnapshotID, sn.CollectNum
-                           FROM Snapshots2 sn, SnapshotKeywords2 ck
-                           WHERE sn.EpisodeNum = %s AND
-                                 sn.SnapshotNum = ck.SnapshotNum
-                           ORDER BY SnapshotTimeCode, sn.SnapshotNum, KeywordGroup, Keyword"""
-            # Adjust the query for sqlite if needed
-            SQLText = DBInterface.FixQuery(SQLText)
-            self.DBCursor.execute(SQLText, (EpisodeNum, ))
-            for (kwg, kw, SnapshotTimeCode, SnapshotDuration, SnapshotNum, SnapshotID, collectNum) in self.DBCursor.fetchall():
-                kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
-                kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
-                SnapshotID = DBInterface.ProcessDBDataForUTF8Encoding(SnapshotID)
+            # Add the Episode's WHOLE SNAPSHOT and SNAPSHOT CODING Keyword Placement lines
+            for (kwg, kw, SnapshotTimeCode, SnapshotDuration, SnapshotNum, SnapshotID, collectNum) in \
+                    wholeSnapshotRows.get(EpisodeNum, []) + snapshotCodingRows.get(EpisodeNum, []):
+                # Add the Keyword to the Keyword Lists, if it's not already there
+                if not (kwg, kw) in keywordSet:
+                    keywordSet.add((kwg, kw))
+                    self.filteredKeywordList.append((kwg, kw))
+                    self.unfilteredKeywordList.append((kwg, kw, True))
                 # If we're dealing with an Episode, self.clipNum will be None and we want all clips.
                 # If we're dealing with a Clip, we only want to deal with THIS clip!
                 if (self.clipNum == None):
                     self.snapshotList.append((kwg, kw, SnapshotTimeCode, SnapshotTimeCode + SnapshotDuration, SnapshotNum, SnapshotID, collectNum, EpisodeID, SeriesID))
-                    if not ((SnapshotID, collectNum, True) in self.snapshotFilterList):
+                    if not ((SnapshotID, collectNum, True) in snapshotFilterSet):
+                        snapshotFilterSet.add((SnapshotID, collectNum, True))
                         self.snapshotFilterList.append((SnapshotID, collectNum, True))
 
-        # Sort the Keyword List
+        # Sort the Keyword Lists
+        self.unfilteredKeywordList.sort()
         self.filteredKeywordList.sort()
 
+    def GetRowsByEpisode(self, SQLText):
+        """ Run a Keyword Placement query for the Library and return a dictionary of the resulting rows, keyed by Episode Number.
+            The query's first column must be the Episode Number, followed by the Keyword Group, the Keyword, and
+            the item's start, length or stop, number, ID, and Collection Number.  Rows keep the query's order. """
+        # Initialize the results
+        rows = {}
+        # Adjust the query for sqlite if needed
+        SQLText = DBInterface.FixQuery(SQLText)
+        # Execute the query
+        self.DBCursor.execute(SQLText, (self.seriesNum, ))
+        # For each row ...
+        for (EpisodeNum, kwg, kw, start, stop, itemNum, itemID, collectNum) in self.DBCursor.fetchall():
+            # ... convert the text values to the proper UTF-8 representation
+            kwg = DBInterface.ProcessDBDataForUTF8Encoding(kwg)
+            kw = DBInterface.ProcessDBDataForUTF8Encoding(kw)
+            itemID = DBInterface.ProcessDBDataForUTF8Encoding(itemID)
+            # ... and add the row to its Episode's list
+            if rows.has_key(EpisodeNum):
+                rows[EpisodeNum].append((kwg, kw, start, stop, itemNum, itemID, collectNum))
+            else:
+                rows[EpisodeNum] = [(kwg, kw, start, stop, itemNum, itemID, collectNum)]
+        return rows
+
     def UpdateKeywordVisualization(self):
         """ Update the Keyword Visualization following something that could have changed it. """
 
@@ -1031,6 +1094,12 @@ class LibraryMap(wx.Frame):
     def DrawGraph(self):
         """ Actually Draw the Series Map """
         self.keywordClipList = {}
+        # The Interval Trees and Lookup table indexes for finding what's under the mouse will need to be rebuilt
+        self.keywordClipIndex = {}
+        self.lookupKeys = None
+        self.lookupBuckets = {}
+        # Note the Bounds the graph is drawn at
+        self.drawnBounds = self.Bounds
 
         # Series Keyword Sequence Map, if multi-line display is desired
         if (self.reportType == 1) and (not self.singleLineDisplay):
@@ -2006,47 +2075,32 @@ class LibraryMap(wx.Frame):
                 if (self.keywordClipList.has_key(overlapKey)):
                     # initialize the string that will hold the names of clips being pointed to
                     clipNames = ''
-                    # Get the list of Clips that contain the current Keyword from the keyword / Clip List dictionary
-                    clips = self.keywordClipList[overlapKey]
                     # For the single-line display ...
                     if self.singleLineDisplay:
                         # Initialize a string for the popup to show
                         clipNames = ''
-                        currentRow = None
-                        # Get a list of the Lookup dictionary keys.  These keys are top Y-coordinate values
-                        keyvals = self.epNameKWGKWLookup.keys()
-                        # Sort the keys
-                        keyvals.sort()
-                        # Iterate through the keys
-                        for yVal in keyvals:
-                            # We need the largest key value that doesn't exceed the Mouse's Y coordinate
-                            if yVal < y:
-                                currentRow = self.epNameKWGKWLookup[yVal]
-                            # Once the key val exceeds the Mouse position, we can stop looking.
-                            else:
-                                break
+                        # We need the row with the largest key value (top Y-coordinate) that is less than the Mouse's Y coordinate
+                        (yVal, currentRow) = self.FindLookupRow(y, False)
 
                         # Initialize the Episode Name, Keyword Group, and Keyword variables.
                         epName = KWG = KW = ''
                         # If we have a data record to look at ...
                         if currentRow != None:
-                            # Iterate through all the second-level lookup keys, the X ranges ...
-                            for key in currentRow.keys():
-                                # If the horizontal mouse coordinate falls in the X range of a record ...
-                                if (x >= key[0]) and (x < key[1]):
-                                    # ... iterate through the records ...
-                                    for clipKWRec in currentRow[key]:
-                                        # ... extract the Lookup data for the record ...
-                                        (epName, KWG, KW, length) = clipKWRec
-                                        # ... if it's not the first record in the list, add a comma separator ...
-                                        if clipNames != '':
-                                            clipNames += ', '
-                                        # ... and add the lookup data to the mouseover text string variable
-                                        clipNames += "%s : %s (%s)" % (KWG, KW, Misc.time_in_ms_to_str(length))
+                            # Iterate through the second-level lookup keys, the X ranges, that contain the horizontal mouse coordinate ...
+                            for key in self.FindLookupRanges(yVal, x):
+                                # ... iterate through the records ...
+                                for clipKWRec in currentRow[key]:
+                                    # ... extract the Lookup data for the record ...
+                                    (epName, KWG, KW, length) = clipKWRec
+                                    # ... if it's not the first record in the list, add a comma separator ...
+                                    if clipNames != '':
+                                        clipNames += ', '
+                                    # ... and add the lookup data to the mouseover text string variable
+                                    clipNames += "%s : %s (%s)" % (KWG, KW, Misc.time_in_ms_to_str(length))
                     # If we have the Series Keyword Sequence Map multi-line display ...
                     else:
-                        # Iterate through the Clip List ...
-                        for (objType, startTime, endTime, clipNum, clipName) in clips:
+                        # Iterate through the Clips at the current Time value ...
+                        for (objType, startTime, endTime, clipNum, clipName) in self.FindItems(overlapKey, time):
                             # If the current Time value falls between the Clip's StartTime and EndTime ...
                             if (startTime < time) and (endTime > time):
                                 # ... calculate the length of the Clip ...
@@ -2068,30 +2122,17 @@ class LibraryMap(wx.Frame):
                 self.SetStatusText('')
         # The Series Keyword Bar Graph and the Series Keyword Percentage Graph both work the same way
         elif self.reportType in [2, 3]:
-            # Initialize the current Row to None, in case we don't find data under the cursor
-            currentRow = None
-            # Get a list of the Lookup dictionary keys.  These keys are top Y-coordinate values
-            keyvals = self.epNameKWGKWLookup.keys()
-            # Sort the keys
-            keyvals.sort()
-            # Iterate through the keys
-            for yVal in keyvals:
-                # We need the largest key value that doesn't exceed the Mouse's Y coordinate
-                if yVal < y:
-                    currentRow = self.epNameKWGKWLookup[yVal]
-                # Once the key val exceeds the Mouse position, we can stop looking.
-                else:
-                    break
+            # We need the row with the largest key value (top Y-coordinate) that is less than the Mouse's Y coordinate.
+            # currentRow is None if we don't find data under the cursor.
+            (yVal, currentRow) = self.FindLookupRow(y, False)
             # Initialize the Episode Name, Keyword Group, and Keyword variables.
             epName = KWG = KW = ''
             # If we have a data record to look at ...
             if currentRow != None:
-                 # Iterate through all the second-level lookup keys, the X ranges ...
-                for key in currentRow.keys():
-                    # If the horizontal mouse coordinate falls in the X range of a record ...
-                    if (x >= key[0]) and (x < key[1]):
-                         # ... extract the Lookup data for the record.  There aren't overlapping records to deal with here.
-                        (epName, KWG, KW, length) = currentRow[key]
+                # Iterate through the second-level lookup keys, the X ranges, that contain the horizontal mouse coordinate ...
+                for key in self.FindLookupRanges(yVal, x):
+                    # ... extract the Lookup data for the record.  There aren't overlapping records to deal with here.
+                    (epName, KWG, KW, length) = currentRow[key]
             # If a data record was found ...
             if KWG != '':
                 if 'unicode' in wx.PlatformInfo:
@@ -2146,7 +2187,7 @@ class LibraryMap(wx.Frame):
                 # Set the Status Text to indicate the current Keyword and Time values
                 self.SetStatusText(prompt % (kw[0], kw[1], kw[2], Misc.time_in_ms_to_str(time)))
                 # Get the list of Clips that contain the current Keyword from the keyword / Clip List dictionary
-                clips = self.keywordClipList[kw]
+                clips = self.FindItems(kw, time)
                 # Iterate through the Clip List ...
                 for (objType, startTime, endTime, clipNum, clipName) in clips:
                     # If the current Time value falls between the Clip's StartTime and EndTime ...
@@ -0,0 +1,164 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This module extracts the Plain Text version of a Transana XML document or transcript directly from
+    the XML, without loading it into a wxRichTextCtrl.  The result matches what the Transcript Editor's
+    GetPlainTextSelection() method produces for the same XML.
+
+    This module deliberately does not import wxPython or any Transana module that does, so that
+    ExtractRecord() can be run in a multiprocessing Pool. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+DEBUG = False
+if DEBUG:
+    print "PlainTextExtractor DEBUG is ON!!"
+
+# import Python's re module
+import re
+# import the Python XML SAX handler
+import xml.sax
+import xml.sax.handler
+
+
+class UnsupportedXMLError(Exception):
+    """ Raised when XML contains structures (such as text boxes or fields) that this module can't extract
+        text from exactly the way the wxRichTextCtrl does """
+    pass
+
+
+class PlainTextHandler(xml.sax.handler.ContentHandler):
+    """ This handler collects the text of a wxRichTextCtrl XML document, one paragraph at a time """
+
+    def __init__(self):
+        """ Initialize the Plain Text handler """
+        # Initialize the list of completed paragraphs
+        self.paragraphs = []
+        # Initialize the list of text fragments in the current paragraph
+        self.fragments = []
+        # Initialize the list of characters in the current text or symbol element
+        self.data = []
+        # Define a variable for tracking what element we are collecting characters for
+        self.element = None
+        # Track how deeply paragraph layouts are nested
+        self.layoutDepth = 0
+
+    def startElement(self, name, attrs):
+        """ XML SAX - Handle the start (open) of an XML element """
+        # If we have a paragraph layout ...
+        if name == u'paragraphlayout':
+            # ... note the nesting level
+            self.layoutDepth += 1
+            # Nested paragraph layouts (text boxes and tables) aren't part of Transana documents, and the RTC
+            # handles their text differently.  We can't extract them here.
+            if self.layoutDepth > 1:
+                raise UnsupportedXMLError(name)
+        # Fields aren't part of Transana documents, and their text comes from the field type.  We can't extract them.
+        elif name == u'field':
+            raise UnsupportedXMLError(name)
+        # If we have a text or symbol element ...
+        elif name in [u'text', u'symbol']:
+            # ... start collecting its characters
+            self.element = name
+            self.data = []
+
+    def characters(self, data):
+        """ XML SAX - Handle the text between XML element tags """
+        # If the characters come from a text or symbol element ...
+        if self.element is not None:
+            # ... collect them.  SAX may deliver an element's characters in several pieces.
+            self.data.append(data)
+
+    def endElement(self, name):
+        """ XML SAX - Handle the end (close) of an XML element """
+        # If we have the end of a text element ...
+        if name == u'text':
+            # ... put the element's characters together
+            data = u''.join(self.data)
+            # If the text has leading or trailing spaces, the RTC encloses it in quotation marks in the XML.
+            # Quotation marks that are part of the text are always saved as symbols, so we can just remove these.
+            if data[:1] == u'"':
+                data = data[1:]
+            if data[-1:] == u'"':
+                data = data[:-1]
+            # Add the text to the paragraph
+            self.fragments.append(data)
+            # We're no longer collecting characters
+            self.element = None
+        # If we have the end of a symbol element ...
+        elif name == u'symbol':
+            # ... put the element's characters together
+            data = u''.join(self.data).strip()
+            # The symbol element holds the character number.  Add that character to the paragraph.
+            if len(data) > 0:
+                self.fragments.append(unichr(int(data)))
+            # We're no longer collecting characters
+            self.element = None
+        # If we have the end of a paragraph ...
+        elif name == u'paragraph':
+            # ... add the paragraph's text to the list of paragraphs ...
+            self.paragraphs.append(u''.join(self.fragments))
+            # ... and start a new paragraph
+            self.fragments = []
+        # If we have the end of a paragraph layout ...
+        elif name == u'paragraphlayout':
+            # ... note the nesting level
+            self.layoutDepth -= 1
+        # Images contribute nothing to the plain text
+
+    def GetText(self):
+        """ Return the text of the document.  Like the RTC, we separate paragraphs with newline characters. """
+        return u'\n'.join(self.paragraphs)
+
+
+def XMLToPlainText(xmlText, timeCodeChar):
+    """ Return the Plain Text version of Transana XML text, with Time Codes removed.
+        Returns None if xmlText isn't Transana XML or can't be extracted here, in which case the
+        text must be loaded into a Transcript Editor to get its Plain Text. """
+    # If we have unicode text ...
+    if isinstance(xmlText, unicode):
+        # ... the XML parser needs it encoded to match the XML header
+        xmlText = xmlText.encode('utf8')
+    # If the text isn't XML ...
+    if xmlText[:5] != '<?xml':
+        # ... we can't extract it here
+        return None
+    # Create a Plain Text handler
+    handler = PlainTextHandler()
+    # Start exception handling
+    try:
+        # Parse the XML
+        xml.sax.parseString(xmlText, handler)
+    # If the XML can't be handled here ...
+    except (xml.sax.SAXException, UnsupportedXMLError, ValueError):
+
+        if DEBUG:
+            import sys
+            print "PlainTextExtractor.XMLToPlainText():", sys.exc_info()[0], sys.exc_info()[1]
+
+        # ... signal that it must be loaded into a Transcript Editor
+        return None
+    # Strip Time Codes, as GetPlainTextSelection() does, and return the result
+    return re.sub(u"%s<[\d]*>" % timeCodeChar, u'', handler.GetText())
+
+def ExtractRecord(record):
+    """ Extract the Plain Text for a single database record.  record is a (key, xmlText, timeCodeChar) tuple,
+        and the result is a (key, plainText) tuple, where plainText is None if the text could not be extracted.
+        This is a module-level function so that it can be used with a multiprocessing Pool. """
+    # Unpack the record
+    (key, xmlText, timeCodeChar) = record
+    # Return the key and the extracted text
+    return (key, XMLToPlainText(xmlText, timeCodeChar))
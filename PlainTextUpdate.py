@@ -18,11 +18,17 @@
 
 __author__ = 'David Woods <dwoods@wcer.wisc.edu>'
 
+DEBUG = False
+if DEBUG:
+    print "PlainTextUpdate DEBUG is ON!!"
+
 # import wxPython
 import wx
 
 # Import Transana's Clip object
 import Clip
+# Import Transana's Conversion Scheduler, for the number of processes to use
+import ConversionScheduler
 # Import Transana's Database Interface
 import DBInterface
 # Import Transana's Document object
@@ -33,10 +39,22 @@ import Quote
 import TransanaConstants
 # Import Transana's global module
 import TransanaGlobal
+# Import Transana's Plain Text Extractor
+import PlainTextExtractor
 # import Transana's Transcript object
 import Transcript
 # import Transana's Rich Text Edit Control
 import TranscriptEditor_RTC
+# import Python's multiprocessing module
+import multiprocessing
+# import Python's sys module
+import sys
+
+# The number of records extracted and saved in each database transaction
+PLAIN_TEXT_BATCH_SIZE = 100
+# The smallest number of records worth starting a multiprocessing Pool for
+PLAIN_TEXT_POOL_MIN_RECORDS = 50
+
 
 class PlainTextUpdate(wx.Dialog):
     def __init__(self, parent, numRecords = 0):
@@ -75,6 +93,145 @@ class PlainTextUpdate(wx.Dialog):
         # Center the Dialog on the Screen
         TransanaGlobal.CenterOnPrimary(self)
 
+    def GetDBText(self, text):
+        """ Convert text from the database to a string, as the Document and Transcript objects do """
+        # If we have an array ...
+        if type(text).__name__ == 'array':
+            # ... convert it to unicode or a string, depending on its type
+            if text.typecode == 'u':
+                text = text.tounicode()
+            else:
+                text = text.tostring()
+        # If we have no text ...
+        elif text is None:
+            # ... use an empty string
+            text = ''
+        return text
+
+    def ExtractXMLPlainText(self, dbCursor):
+        """ Extract the Plain Text directly from the XML of all Documents, Quotes, and Transcripts that need it,
+            without loading them into the hidden RichTextCtrl.  The extraction is spread over several processes
+            where possible, and the results are saved in batches, one transaction per batch.  Records that are
+            not in XML format are skipped, and are left for the RichTextCtrl. """
+        # Define the tables to process, with their record number and text columns
+        tables = [('Document', 'Documents2', 'DocumentNum', 'XMLText'),
+                  ('Quote', 'Quotes2', 'QuoteNum', 'XMLText'),
+                  ('Transcript', 'Transcripts2', 'TranscriptNum', 'RTFText')]
+        # Initialize a dictionary of the record numbers that need Plain Text, by table
+        recordNums = {}
+        # Initialize the total number of records
+        totalRecords = 0
+        # For each table ...
+        for (label, table, numColumn, textColumn) in tables:
+            # ... get the numbers of the records that need Plain Text
+            query = "SELECT %s FROM %s WHERE PlainText IS NULL" % (numColumn, table)
+            dbCursor.execute(query)
+            recordNums[table] = [row[0] for row in dbCursor.fetchall()]
+            # Add them to the total
+            totalRecords += len(recordNums[table])
+        # If there's nothing to do, we're done
+        if totalRecords == 0:
+            return
+
+        # Initialize the Process Pool
+        pool = None
+        # If there are enough records to make it worthwhile and more than one processor to use ...
+        # (Windows can't fork, and starting a new process there re-imports Transana's main module, so we don't use a Pool on Windows.)
+        if (sys.platform != 'win32') and (totalRecords >= PLAIN_TEXT_POOL_MIN_RECORDS) and \
+           (ConversionScheduler.DefaultProcessCount() > 1):
+            # Start exception handling
+            try:
+                # Create the Process Pool
+                pool = multiprocessing.Pool(ConversionScheduler.DefaultProcessCount())
+            # If the Pool can't be created ...
+            except:
+                # ... we'll extract the text in this process
+                pool = None
+
+        # Set the Progress Bar for the number of records to extract
+        self.gauge.SetRange(totalRecords)
+        self.gauge.SetValue(0)
+        # Initialize a Record Counter
+        counter = 0
+        # For each table ...
+        for (label, table, numColumn, textColumn) in tables:
+            # Initialize the number of records extracted
+            extractedCount = 0
+            # Update User Info
+            self.txtCtrl.AppendText("%5d %s Records for XML extraction\n" % (len(recordNums[table]), label))
+            # Define the query that gets record text
+            textQuery = "SELECT %s, %s FROM %s WHERE %s IN (%%s)" % (numColumn, textColumn, table, numColumn)
+            # Define the query that saves Plain Text.  Don't over-write Plain Text someone else has saved in the meantime.
+            updateQuery = "UPDATE %s SET PlainText = %%s WHERE %s = %%s AND PlainText IS NULL" % (table, numColumn)
+            updateQuery = DBInterface.FixQuery(updateQuery)
+            # For each batch of records ...
+            for start in range(0, len(recordNums[table]), PLAIN_TEXT_BATCH_SIZE):
+                # ... get the record numbers for the batch
+                batchNums = recordNums[table][start : start + PLAIN_TEXT_BATCH_SIZE]
+                # Get the text for the records in the batch
+                query = textQuery % ', '.join(['%s'] * len(batchNums))
+                query = DBInterface.FixQuery(query)
+                dbCursor.execute(query, tuple(batchNums))
+                # Build the list of records for the extractor
+                records = [(num, self.GetDBText(text), TransanaConstants.TIMECODE_CHAR) for (num, text) in dbCursor.fetchall()]
+                # If we have a Process Pool ...
+                if pool is not None:
+                    # Start exception handling
+                    try:
+                        # ... extract the Plain Text in the Pool
+                        results = pool.map(PlainTextExtractor.ExtractRecord, records)
+                    # If the Pool fails ...
+                    except:
+
+                        if DEBUG:
+                            print "PlainTextUpdate.ExtractXMLPlainText():  Pool failed", sys.exc_info()[0], sys.exc_info()[1]
+
+                        # ... stop using the Pool ...
+                        pool.terminate()
+                        pool = None
+                        # ... and extract the Plain Text in this process
+                        results = map(PlainTextExtractor.ExtractRecord, records)
+                # If we don't have a Process Pool ...
+                else:
+                    # ... extract the Plain Text in this process
+                    results = map(PlainTextExtractor.ExtractRecord, records)
+                # Initialize the list of values to save
+                values = []
+                # For each record's results ...
+                for (num, plaintext) in results:
+                    # If the text could not be extracted, skip this record.  It will be handled by the RichTextCtrl.
+                    if plaintext is None:
+                        continue
+                    # If we're in Unicode mode, encode the Plain Text, as the Transcript object does
+                    if 'unicode' in wx.PlatformInfo:
+                        plaintext = plaintext.encode(TransanaGlobal.encoding)
+                    # Add the values to be saved
+                    values.append((plaintext, num))
+                # If there are values to save ...
+                if len(values) > 0:
+                    # ... save the whole batch in one Transaction
+                    dbCursor.execute("BEGIN")
+                    dbCursor.executemany(updateQuery, values)
+                    dbCursor.execute("COMMIT")
+                # Update the number of records extracted
+                extractedCount += len(values)
+
+                # Update the Record Counter
+                counter += len(batchNums)
+                # Update the Progress Bar
+                self.gauge.SetValue(counter)
+                # This form can freeze up and appear non-responsive.  We should avoid that with every batch.
+                wx.YieldIfNeeded()
+
+            # Update User Info
+            self.txtCtrl.AppendText("%5d %s Records extracted from XML\n" % (extractedCount, label))
+
+        # If we have a Process Pool ...
+        if pool is not None:
+            # ... we're done with it
+            pool.close()
+            pool.join()
+
     def OnConvert(self):
         """ Perform the Plain Text Extraction operation """
         # Get the database connection (required for Transactions)
@@ -82,6 +239,15 @@ class PlainTextUpdate(wx.Dialog):
         # Get a Database Cursor
         dbCursor = db.cursor()
 
+        # Extract the Plain Text directly from the XML for all the records we can
+        self.ExtractXMLPlainText(dbCursor)
+        # The remaining records (RTF, older formats, or XML we couldn't extract) must be loaded into the hidden RichTextCtrl.
+        self.numRecords = DBInterface.CountItemsWithoutPlainText()
+        # Reset the Progress Bar for the remaining records
+        if self.numRecords > 0:
+            self.gauge.SetRange(self.numRecords)
+        self.gauge.SetValue(0)
+
         # Initialize a Record Counter
         counter = 0
 
@@ -41,10 +41,18 @@ import TransanaConstants
 import TransanaExceptions
 # Import Transana's Global variables
 import TransanaGlobal
+# import Python's os module
+import os
+# import Python's threading module
+import threading
 
 # Increased from 500 to 1000 for multi-transcript clips for Transana 2.30.
 TIMER_INTERVAL = 1000
 EXTRA_LOAD_TIME = 1500
+# When the next Clip has been prefetched, it loads much faster, so it needs less extra load time
+PREFETCHED_LOAD_TIME = 500
+# The number of bytes read from the start of the next Clip's media file(s) to get them into the disk cache
+MEDIA_PREFETCH_BYTES = 4 * 1024 * 1024
 
 # Declare GUI Constants for the Play All Clips Dialog
 ID_PLAYALLCLIPSTIMER = wx.NewId()
@@ -54,6 +62,37 @@ ID_BTNCANCEL         = wx.NewId()
 ID_BTNNEXT           = wx.NewId()
 
 
+class MediaPrefetchThread(threading.Thread):
+    """ Read the start of one or more media files in the background, so the operating system has them in its disk
+        cache (and network drives have them spun up) before the media player has to open them. """
+    def __init__(self, fileList):
+        # Initialize the Thread object
+        threading.Thread.__init__(self)
+        # Remember the files to read
+        self.fileList = fileList
+        # prevent the application from hanging on Close
+        self.setDaemon(1)
+        # Start the thread
+        self.start()
+
+    def run(self):
+        """ Read the media files """
+        # For each media file ...
+        for filename in self.fileList:
+            # Start exception handling
+            try:
+                # ... open the file ...
+                f = open(filename, 'rb')
+                # ... read the beginning of it, which includes the header and index for most formats ...
+                f.read(MEDIA_PREFETCH_BYTES)
+                # ... and close it again
+                f.close()
+            # If the file can't be read ...
+            except (IOError, OSError):
+                # ... that's okay.  The media player will report the problem when the Clip is loaded.
+                pass
+
+
 class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
     """This object is responsible for controlling media playback when
     the "Play all Clips in a Collection" feature is selected.  It includes
@@ -95,18 +134,17 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
             self.clipList = DBInterface.list_of_clips_by_collection(self.collection.id, self.collection.parent)
             # If we're showing Nested Collections ...
             if self.showNested:
-                # Get the initial list of nested Collections
-                nestedCollections = DBInterface.list_of_collections(collection.number)
-                # As long as there are entries in the list of nested collections that haven't been processed ...
-                while len(nestedCollections) > 0:
-                    # ... extract the data from the top of the nested collection list ...
-                    (collNum, collName, parentCollNum) = nestedCollections[0]
-                    # ... and remove that entry from the list.
-                    del(nestedCollections[0])
-                    # now get the clips for the new collection and add them to the Major (clip) list
-                    self.clipList += DBInterface.list_of_clips_by_collection(collName, parentCollNum)
-                    # Then get the nested collections under the new collection and add them to the Nested Collection list
-                    nestedCollections += DBInterface.list_of_collections(collNum)
+                # Get the clips for all the nested collections in a single query, and sort them by collection
+                nestedClips = {}
+                for clip in DBInterface.list_of_clips_by_collectionnum(collection.number, includeNested=True):
+                    if nestedClips.has_key(clip[2]):
+                        nestedClips[clip[2]].append(clip)
+                    else:
+                        nestedClips[clip[2]] = [clip]
+                # For each nested collection, in the order they are nested ...
+                for (collNum, collName, parentCollNum) in DBInterface.list_of_nested_collections(collection.number):
+                    # ... add its clips to the Major (clip) list
+                    self.clipList += nestedClips.get(collNum, [])
 
         # If PlayAllClips is requested for a Search Collection ...
         elif searchColl != None:
@@ -323,6 +361,11 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
 
         # Point to the first clip in the list as the clip that should be played
         self.clipNowPlaying = 0
+        # Initialize the prefetched Clip and Collection.  While one Clip plays, the next one is loaded ahead of time.
+        self.prefetchedClip = None
+        self.prefetchedCollection = None
+        # Initialize the set of Clip List positions that couldn't be prefetched, so we don't keep trying them
+        self.prefetchFailures = set()
 
         # Add a Timer.  The timer checks to see if the clip that is playing has stopped, which
         # is the signal that it is time to load the next clip
@@ -377,13 +420,15 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
 
         # The original code doesn't work with the new video player infrastructure.  This is an attempt to start over.
 
-        # If the clip is playing, we don't do anything!
+        # If the clip is playing, we don't need to do anything but get the next clip ready
         if self.ControlObject.IsPlaying():
 
             if DEBUG:
                 print "Clip is playing."
             
             self.HasStartedPlaying = True
+            # Prefetch the next Clip while this one plays, if we haven't already
+            self.PrefetchNextClip()
 
         # If a Clip is in the process of loading, we don't need to do anything but wait for it to finish loading
         elif self.ControlObject.IsLoading():
@@ -404,8 +449,14 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
             if DEBUG:
                 print "Clip isn't playing, paused, or loading.  We need to load the next clip!", self.clipNowPlaying, self.clipList[self.clipNowPlaying]
 
-            # Load the Collection the next Clip is from
-            tempColl = Collection.Collection(self.clipList[self.clipNowPlaying][2])
+            # If the Collection the next Clip is from has been prefetched ...
+            if (self.prefetchedCollection is not None) and (self.prefetchedCollection.number == self.clipList[self.clipNowPlaying][2]):
+                # ... use it
+                tempColl = self.prefetchedCollection
+            # Otherwise ...
+            else:
+                # ... load the Collection the next Clip is from
+                tempColl = Collection.Collection(self.clipList[self.clipNowPlaying][2])
             # Add a label that identifies the Collection
             if 'unicode' in wx.PlatformInfo:
                 # Encode with UTF-8 rather than TransanaGlobal.encoding because this is a prompt, not DB Data.
@@ -440,8 +491,21 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
             try:
                 # Loading a Clip is slow.  Let's stop the timer, so it doesn't cause problems.  (It was with QuickTime video on Windows.)
                 self.playAllClipsTimer.Stop()
+                # If the next Clip has been prefetched ...
+                if (self.prefetchedClip is not None) and (self.prefetchedClip.number == self.clipList[self.clipNowPlaying][0]):
+                    # ... we can use it, and it needs less time to load
+                    clipObj = self.prefetchedClip
+                    loadTime = PREFETCHED_LOAD_TIME
+                # If not (such as for the first Clip, or after Previous is pressed) ...
+                else:
+                    # ... the ControlObject needs to load the Clip, and that takes longer
+                    clipObj = None
+                    loadTime = EXTRA_LOAD_TIME
+                # The prefetched Clip has been used (or is not needed), so clear it
+                self.prefetchedClip = None
+                self.prefetchedCollection = None
                 # Try to Load the next clip into the ControlObject
-                if not self.ControlObject.LoadClipByNumber(self.clipList[self.clipNowPlaying][0]):
+                if not self.ControlObject.LoadClipByNumber(self.clipList[self.clipNowPlaying][0], clipObj=clipObj):
                     # If the Media File has been moved, this failed.  Try one more time.
                     if not self.ControlObject.LoadClipByNumber(self.clipList[self.clipNowPlaying][0]):
                         # if it fails a second time, signal that Play All Clips should be stopped
@@ -455,8 +519,8 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
                 # Let's display the Keywords Tab during PlayAllClips
                 self.ControlObject.ShowDataTab(1)
 
-                # Now that the clip is loading, re-start the timer.  the extra 1.5 seconds give the clip time to load.
-                self.playAllClipsTimer.Start(TIMER_INTERVAL + EXTRA_LOAD_TIME)
+                # Now that the clip is loading, re-start the timer.  the extra time gives the clip time to load.
+                self.playAllClipsTimer.Start(TIMER_INTERVAL + loadTime)
 
             # If a Clip cannot be found ...  (This should only happen in MU if a clip is deleted by another user.)
             except TransanaExceptions.RecordNotFoundError:
@@ -482,6 +546,42 @@ class PlayAllClips(wx.Dialog):  # (wx.MDIChildFrame)
 
             self.PlayAfterLoading()
 
+    def PrefetchNextClip(self):
+        """ Load the next Clip, its Transcripts, and its Collection while the current Clip plays, and start reading
+            its media file(s), so that moving to the next Clip doesn't have to wait on the database or the disk. """
+        # If there is no next clip, or it has already been prefetched ...
+        if (self.clipNowPlaying > len(self.clipList) - 1) or \
+           ((self.prefetchedClip is not None) and (self.prefetchedClip.number == self.clipList[self.clipNowPlaying][0])) or \
+           (self.clipNowPlaying in self.prefetchFailures):
+            # ... there's nothing to do
+            return
+        # In MU, it's possible the next clip could get deleted by another user.
+        try:
+            # Load the next Clip, which includes its Transcripts
+            self.prefetchedClip = Clip.Clip(self.clipList[self.clipNowPlaying][0])
+            # Load the next Clip's Collection, which is needed for the Collection label
+            self.prefetchedCollection = Collection.Collection(self.clipList[self.clipNowPlaying][2])
+        # If the Clip or Collection can't be loaded ...
+        except TransanaExceptions.RecordNotFoundError:
+            # ... forget the prefetch.  The error will be reported when we try to load the Clip normally.
+            self.prefetchedClip = None
+            self.prefetchedCollection = None
+            # Remember that this Clip couldn't be loaded, so we don't query for it again on every timer tick
+            self.prefetchFailures.add(self.clipNowPlaying)
+            return
+
+        if DEBUG:
+            print "PlayAllClips.PrefetchNextClip():", self.clipNowPlaying, self.prefetchedClip.id.encode('utf8')
+
+        # Build a list of the next Clip's media files
+        fileList = [self.prefetchedClip.media_filename]
+        for vid in self.prefetchedClip.additional_media_files:
+            fileList.append(vid['filename'])
+        # Read the media files that aren't already loaded in the background
+        fileList = [filename for filename in fileList if (filename != self.ControlObject.VideoFilename) and os.path.exists(filename)]
+        if len(fileList) > 0:
+            MediaPrefetchThread(fileList)
+
     def PlayAfterLoading(self):
         """ After a Clip is done loading, it needs to be told to Play. """
         # If we don't have a control object or a currently loaded object ...
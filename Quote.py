@@ -40,6 +40,8 @@ import DataObject
 import DBInterface
 # import Transana's Dialogs
 import Dialogs
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Miscellaneous Functions
 import Misc
 # import Transana's Note Object
@@ -292,6 +294,8 @@ class Quote(DataObject.DataObject):
 
     def db_save(self, use_transactions=True):
         """Save the record to the database using Insert or Update as appropriate."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
 
         # Define and implement Demo Version limits
         if TransanaConstants.demoVersion and (self.number == 0):
@@ -555,6 +559,8 @@ class Quote(DataObject.DataObject):
 
     def db_delete(self, use_transactions=1):
         """Delete this object record from the database."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
         result = 1
         try:
             # Initialize delete operation, begin transaction if necessary
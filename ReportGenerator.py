@@ -371,14 +371,11 @@ class ReportGenerator(wx.Object):
 
             # If we're supposed to show Nested Collection data ...
             if self.showNested:
-                # ... we first need to get the nested collections for the top level
-                nestedCollections = DBInterface.list_of_collections(self.collection.number)
-                # As long as there are entries in the list of nested collections that haven't been processed ...
-                while len(nestedCollections) > 0:
-                    # ... extract the data from the top of the nested collection list ...
-                    (collNum, collName, parentCollNum) = nestedCollections[0]
-                    # ... and remove that entry from the list.
-                    del(nestedCollections[0])
+                # ... we first need to get the nested collections at all levels.  They are listed depth-first
+                # so that the report will mirror the organization of the database Tree.
+                nestedCollections = DBInterface.list_of_nested_collections(self.collection.number, depthFirst=True)
+                # For each nested collection ...
+                for (collNum, collName, parentCollNum) in nestedCollections:
                     # initialize a Dictionary for all Report Artifacts (for sorting!)
                     tmpDict = {}
                     # Get a list of all Clips in the Collection.
@@ -409,11 +406,6 @@ class ReportGenerator(wx.Object):
                         # Add the elemnt to the Major List.
                         majorList.append(tmpDict[x][:-1])
 
-                    # Then get the nested collections under the new collection and add them to the Nested Collection list
-                    # They get added at the FRONT of the list so that the report will mirror the organization of the
-                    # database Tree.
-                    nestedCollections = DBInterface.list_of_collections(collNum) + nestedCollections
-
                 # If we have 100 or fewer records, only show the Keyword Summary if Keywords are being shown.
                 if len(majorList) <= 100:
                     self.showKeywordSummary = self.showKeywords
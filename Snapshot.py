@@ -36,6 +36,8 @@ import DBInterface
 import Dialogs
 # Import Transana's Episode Object
 import Episode
+# import Transana's Interval Index
+import IntervalIndex
 # import Transana's Miscellaneous Functions
 import Misc
 # import Transana's Note Object
@@ -343,6 +345,8 @@ class Snapshot(DataObject.DataObject):
 
     def db_save(self, use_transactions=True):
         """Save the record to the database using Insert or Update as appropriate."""
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
 
         # Define and implement Demo Version limits
         if TransanaConstants.demoVersion and (self.number == 0):
@@ -676,6 +680,8 @@ class Snapshot(DataObject.DataObject):
 
     def db_delete(self, use_transactions=True):
         """ Delete this object record from the database.  Parameter indicates if we should use DB Transactions """
+        # The Data Window's Interval Trees will need to be rebuilt to reflect this change
+        IntervalIndex.Invalidate()
         result = 1
         try:
             # Initialize delete operation, begin transaction if necessary
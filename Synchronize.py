@@ -30,6 +30,8 @@ import time
 # Import wxPython
 import wx
 
+# Import Transana's Audio Alignment routines
+import AudioAlignment
 # Import Transana Dialogs
 import Dialogs
 # Import Transana's Graphics Control Class for making the waveforms
@@ -44,6 +46,8 @@ import TransanaImages
 import video_player
 # Import Transana's module for creating Waveform Graphics
 import WaveformGraphic
+# Import Transana's Waveform Cache
+import WaveformCache
 # Import Transana's Waveform (Audio Extraction) Progress Dialog
 import WaveformProgress
 
@@ -454,6 +458,12 @@ class Synchronize(wx.Dialog):
 
         # Add the offset text to the button sizer
         btnSizer.Add(self.txtOffset, 0, wx.ALL, 6)
+        # Create an Auto-Align button, which estimates the offset from the media files' audio
+        self.btnAutoAlign = wx.Button(self.pnl, -1, _("Auto-Align"))
+        # Add the Auto-Align button to the button sizer
+        btnSizer.Add(self.btnAutoAlign, 0, wx.TOP | wx.BOTTOM, 6)
+        # Bind a handler to the Auto-Align button
+        self.btnAutoAlign.Bind(wx.EVT_BUTTON, self.OnAutoAlign)
         # Add a horizontal spacer to the button sizer
         btnSizer.Add((0, 0), 1)
         # Create an OK button
@@ -500,6 +510,8 @@ class Synchronize(wx.Dialog):
         wx.EVT_KEY_DOWN(self.waveform1, self.OnKeyDown)
         wx.EVT_KEY_UP(self.txtOffset, self.OnKeyUp)
         wx.EVT_KEY_DOWN(self.txtOffset, self.OnKeyDown)
+        wx.EVT_KEY_UP(self.btnAutoAlign, self.OnKeyUp)
+        wx.EVT_KEY_DOWN(self.btnAutoAlign, self.OnKeyDown)
         wx.EVT_KEY_UP(self.btnOK, self.OnKeyUp)
         wx.EVT_KEY_DOWN(self.btnOK, self.OnKeyDown)
         wx.EVT_KEY_UP(self.btnCancel, self.OnKeyUp)
@@ -885,6 +897,69 @@ class Synchronize(wx.Dialog):
         # Update the offset text box
         self.txtOffset.SetValue(Misc.time_in_ms_to_str(self.pos1 - self.pos2, True))
 
+    def OnAutoAlign(self, event):
+        """ Event handler for the Auto-Align button, which proposes an offset based on the media files' audio """
+        # If either media player is playing, pause it so the positions don't change while we work
+        if self.mp1.IsPlaying() or self.mp2.IsPlaying():
+            # Pausing via the Play Both button keeps the form's buttons consistent
+            evt = wx.CommandEvent(wx.wxEVT_COMMAND_BUTTON_CLICKED, self.btnPlay2.GetId())
+            self.OnPlay(evt)
+        # Show the wait cursor while we compare the audio
+        wx.BeginBusyCursor()
+        # Start exception handling
+        try:
+            # Estimate the offset between the two wave files
+            (offset, confidence) = AudioAlignment.EstimateOffset(self.waveFile1, self.waveFile2)
+        # If there's a problem ...
+        except:
+
+            if DEBUG:
+                import traceback
+                traceback.print_exc(file=sys.stdout)
+
+            # ... we weren't able to estimate the offset
+            (offset, confidence) = (None, 0.0)
+        # Restore the normal cursor
+        wx.EndBusyCursor()
+        # If no offset could be determined ...
+        if offset == None:
+            # ... tell the user
+            prompt = unicode(_('Transana was unable to align the audio of these media files.'), 'utf8')
+            dlg = Dialogs.InfoDialog(self, prompt)
+            dlg.ShowModal()
+            dlg.Destroy()
+            return
+        # Ask the user whether to use the proposed offset
+        prompt = unicode(_('The proposed offset is %s (%d%% confidence).\nDo you want to use this offset?'), 'utf8')
+        dlg = Dialogs.QuestionDialog(self, prompt % (Misc.time_in_ms_to_str(offset, True), int(round(confidence * 100))))
+        result = dlg.LocalShowModal()
+        dlg.Destroy()
+        # If the user accepts the proposed offset ...
+        if result == wx.ID_YES:
+            # Keep the first media player where it is and move the second one, if that keeps it in the media file
+            pos1 = self.mp1.GetTimecode()
+            pos2 = pos1 - offset
+            # If the second media player would be before its start ...
+            if pos2 < 0:
+                # ... move the first media player instead
+                pos2 = 0
+                pos1 = offset
+            # If the second media player would be after its end ...
+            elif pos2 > self.mp2.GetMediaLength():
+                # ... move both media players so the second one is just before its end
+                pos2 = self.mp2.GetMediaLength() - 10
+                pos1 = pos2 + offset
+            # Position the media players
+            self.mp1.SetCurrentVideoPosition(pos1)
+            self.mp2.SetCurrentVideoPosition(pos2)
+            # Remember the new positions
+            self.pos1 = pos1
+            self.pos2 = pos2
+            # Update the waveforms to reflect the change
+            self.UpdateWaveforms()
+            # Update the offset text box
+            self.txtOffset.SetValue(Misc.time_in_ms_to_str(self.pos1 - self.pos2, True))
+
     def OnSlider(self, event):
         """ Event handler for the Zoom Sliders """
         # Call the underlying parent event.  (Mac wasn't letting go of the handles!)
@@ -992,12 +1067,8 @@ class Synchronize(wx.Dialog):
 
     def LoadWaveform(self, mediaFile):
         """ Load a Waveform, based on the mediaFile, into the GraphicControl """
-        # Separate the path from the file name
-        (path1, fn1) = os.path.split(mediaFile)
-        # Separate the file name from the extension
-        (fnroot1, ext1) = os.path.splitext(fn1)
-        # Determine the correct WAV file name
-        waveFilename1 = os.path.join(TransanaGlobal.configData.visualizationPath, fnroot1 + '.wav')
+        # Determine the correct WAV file name from the Waveform Cache
+        waveFilename1 = WaveformCache.GetWaveFilename(mediaFile)
 
         # We just have to assume that audio extraction worked.  Signal success!
         dllvalue = 0
@@ -1028,6 +1099,10 @@ class Synchronize(wx.Dialog):
                 if (len(errorLog) == 1) and (errorLog[0] == 'Cancelled'):
                     # ... signal that the WAV file was NOT created!
                     dllvalue = 1  
+                # If the WAV file was created ...
+                else:
+                    # ... remove old cache files if the Waveform Cache has grown too large, keeping the new file
+                    WaveformCache.Evict(keep=[waveFilename1])
             # handle exceptions
             except UnicodeDecodeError:
                 if DEBUG:
@@ -105,6 +105,14 @@ USESRTC = True
 # Indicate if the Partial Transcript Editing fix should be applied
 partialTranscriptEdit = False
 
+# Indicate whether the Database Tree should be loaded lazily.  If so, the children of a node aren't added to the
+# tree until the node is expanded, which makes opening large databases much faster.
+lazyDatabaseTree = True
+
+# Indicate whether the data used to build the Database Tree should be saved in the Database Tree Cache, so the tree
+# can be built without querying the database the next time the database is opened
+useDatabaseTreeCache = True
+
 # IDs for the Visualization Window
 VISUAL_BUTTON_ZOOMIN            =  wx.NewId()
 VISUAL_BUTTON_ZOOMOUT           =  wx.NewId()
@@ -58,10 +58,14 @@ import TranscriptionUI_RTC
 import TextReport
 # Import Transana's Miscellaneous functions
 import Misc
+# Import Python's bisect module
+import bisect
 # Import Python's Regular Expression handler
 import re
 # Import Python's cPickle module
 import cPickle
+# Import Python's hashlib module
+import hashlib
 # Import Python's pickle module
 import pickle
 # import fast string IO handling
@@ -72,6 +76,8 @@ import os
 import string
 # Import Python's sys module
 import sys
+# Import Python's time module
+import time
 # Import Python's types module
 import types
 
@@ -84,6 +90,57 @@ TIMECODE_CHAR = TransanaConstants.TIMECODE_CHAR
 # rather than the desired "\xA4<1234>".
 # My REGEXP "\xA4<[\d]*>" appears to do that.
 TIMECODE_REGEXP = "%s<[\d]*>" % TIMECODE_CHAR            # "\xA4<[^<]*>"
+# This REGEXP captures the time code data (the time value) so time codes can be indexed
+TIMECODE_VALUE_REGEXP = re.compile("%s<([\d]+)>" % TIMECODE_CHAR)
+# This REGEXP finds a time code character and its data up to the next ">", which is the part of a time code that
+# must be formatted when RTF transcripts are imported
+TIMECODE_DATA_REGEXP = re.compile("%s[^>]*>" % TIMECODE_CHAR)
+# This REGEXP finds time codes in the XML representation of the control's contents.  The time code character and the
+# hidden time code data are in separate, differently-formatted text runs, so there may be tags between them.
+# Group 1 is everything up to the time code data, group 2 is the time code value, and group 3 closes the time code.
+TIMECODE_XML_REGEXP = re.compile(r'((?:&#164;|\xc2\xa4)(?:\s*</text>\s*<text[^>]*>\s*)?&lt;)(\d+)(&gt;)')
+
+# XML transcripts with at least this many paragraphs are loaded in chunks.  The first chunk is displayed right away,
+# and the rest are added while the program is otherwise idle.  Documents are always loaded all at once, as Quotes are
+# located by their character positions in the Document.
+CHUNKED_LOAD_MIN_PARAGRAPHS = 500
+# The number of paragraphs in each chunk
+CHUNKED_LOAD_PARAGRAPHS = 100
+# The interval, in milliseconds, between chunks
+CHUNKED_LOAD_INTERVAL = 50
+
+
+def SplitXMLIntoChunks(xmlText, chunkSize):
+    """ Split the XML for a transcript into a list of smaller, complete XML documents with chunkSize paragraphs each.
+        If the XML doesn't have the expected structure, a list holding just the original XML is returned. """
+    # Divide the XML into lines
+    lines = xmlText.split('\n')
+    # Find the lines that start paragraphs
+    paragraphStarts = [x for x in range(len(lines)) if ("<paragraph " in lines[x]) or ("<paragraph>" in lines[x])]
+    # Find the line that closes the main paragraph layout, which follows the last paragraph
+    footerStart = len(lines) - 1
+    while (footerStart >= 0) and (lines[footerStart].strip() != '</paragraphlayout>'):
+        footerStart -= 1
+    # If we don't have a paragraph structure we understand ...
+    if (len(paragraphStarts) == 0) or (footerStart < paragraphStarts[-1]):
+        # ... we can't split the XML
+        return [xmlText]
+    # Everything before the first paragraph is the header for each chunk
+    header = '\n'.join(lines[:paragraphStarts[0]])
+    # Everything from the end of the last paragraph on is the footer for each chunk
+    footer = '\n'.join(lines[footerStart:])
+    # Initialize the list of chunks
+    chunks = []
+    # For each group of chunkSize paragraphs ...
+    for x in range(0, len(paragraphStarts), chunkSize):
+        # ... determine the line that ends the chunk, which is the start of the next chunk or the footer
+        if x + chunkSize < len(paragraphStarts):
+            endLine = paragraphStarts[x + chunkSize]
+        else:
+            endLine = footerStart
+        # ... and build a complete XML document for the chunk
+        chunks.append(header + '\n' + '\n'.join(lines[paragraphStarts[x]:endLine]) + '\n' + footer)
+    return chunks
 
 class TranscriptEditor(RichTextEditCtrl):
     """This class is a word processor for transcribing and editing.  It
@@ -123,6 +180,22 @@ class TranscriptEditor(RichTextEditCtrl):
         self.timecodes = []
         # Initialize the current time code to DOES NOT EXIST
         self.current_timecode = -1
+        # Initialize the load time metrics for the most recent transcript load
+        self.loadMetrics = {}
+        # Initialize the hash of the transcript contents as last saved, so Auto-Save can skip unchanged transcripts
+        self.savedTextHash = None
+        # Initialize the list of XML chunks of a long transcript that have not yet been added to the control
+        self.pendingChunks = []
+        # Create the Timer that adds chunks of long transcripts to the control
+        self.chunkLoadTimer = wx.Timer()
+        # Define the Timer Event
+        self.chunkLoadTimer.Bind(wx.EVT_TIMER, self.OnChunkLoadTimer)
+        # Initialize the Time Code Index, a list of (time, character position, length) for every time code in the
+        # document, sorted by time, and a parallel list of just the times that can be searched with bisect.
+        self.timecodeIndex = []
+        self.timecodeIndexTimes = []
+        # The Time Code Index is built when it is needed, and must be rebuilt when the document length changes
+        self.timecodeIndexLength = -1
 
         # Create the AutoSave Timer
         self.autoSaveTimer = wx.Timer()
@@ -177,6 +250,14 @@ class TranscriptEditor(RichTextEditCtrl):
     # Public methods
     def load_transcript(self, transcript, showPopup=True):
         """ Load the given transcript object or RTF file name into the editor. """
+        # Note the start time so we can report load time metrics
+        loadStart = time.time()
+        # Clear the load time metrics
+        self.loadMetrics = {}
+        # We don't know the hash of the saved contents of the new transcript yet
+        self.savedTextHash = None
+        # Initialize the chunks of the transcript that still need to be loaded after the initial display
+        pendingChunks = []
         # Remember Partial Transcript Editing status
         tmpPartialTranscriptEdit = TransanaConstants.partialTranscriptEdit
         # Temporarily turn partial transcript editing off
@@ -305,8 +386,23 @@ class TranscriptEditor(RichTextEditCtrl):
 
         # If we have an XML document, let's assume it's XML from Transana
         elif dataType == 'xml':
-            # Load the XML Data held in the transcript's text field
-            self.LoadXMLData(transcript.text)
+            # If we're in a Transcript Window and not using Partial Transcript Editing, a long transcript (but not a
+            # Document) can be loaded in chunks
+            if isinstance(self.parent, TranscriptionUI_RTC._TranscriptPanel) and not tmpPartialTranscriptEdit and \
+               isinstance(transcript, Transcript.Transcript) and \
+               (transcript.text.count('<paragraph') >= CHUNKED_LOAD_MIN_PARAGRAPHS):
+                # Split the XML into chunks
+                pendingChunks = SplitXMLIntoChunks(transcript.text, CHUNKED_LOAD_PARAGRAPHS)
+            # If we have chunks ...
+            if len(pendingChunks) > 1:
+                # ... load just the first chunk now.  The rest will be added after the transcript is displayed.
+                self.LoadXMLData(pendingChunks.pop(0))
+            # If the transcript isn't being loaded in chunks ...
+            else:
+                # ... clear the chunk list ...
+                pendingChunks = []
+                # ... and load the XML Data held in the transcript's text field
+                self.LoadXMLData(transcript.text)
             # The transcript that was passed in is our Transcript Object
             self.TranscriptObj = transcript
             # Initialize that the transcript has not yet changed.
@@ -364,8 +460,14 @@ class TranscriptEditor(RichTextEditCtrl):
                     # Create a popup telling the user about the load (needed for large files)
                     loadDlg = Dialogs.PopupDialog(None, _("Loading..."), _("Loading your transcript.\nPlease wait...."))
 
+            # Note the time it took to load the document
+            self.loadMetrics['load'] = time.time() - loadStart
+            # Note the start time for hiding time code data
+            hideStart = time.time()
             # Hide the Time Code Data, which may be visible for RTF and TXT data
             self.HideTimeCodeData()
+            # Note the time it took to hide the time code data
+            self.loadMetrics['hide'] = time.time() - hideStart
 
 	    # If we have a Transcript in RTF Form, save it in FastSave format upon loading
 	    # to convert it.  
@@ -397,8 +499,13 @@ class TranscriptEditor(RichTextEditCtrl):
         # Restore Partial Transcript Editing status
         TransanaConstants.partialTranscriptEdit = tmpPartialTranscriptEdit
         
+        # Note the start time for the time code scan
+        scanStart = time.time()
         # Scan transcript for timecodes
         self.load_timecodes()
+        # Note the time it took to scan for time codes and the number of time codes found
+        self.loadMetrics['timecodes'] = time.time() - scanStart
+        self.loadMetrics['timecodeCount'] = len(self.timecodes)
         # Re-enable widget
         self.Enable(True)
         # Set the Transcript to Read Only initially so that the highlight will scroll as the media plays
@@ -446,6 +553,106 @@ class TranscriptEditor(RichTextEditCtrl):
             # ... we need to track the lines that are loaded
             self.LinesLoaded = self.TranscriptObj.paragraphs
 
+        # If there are chunks of the transcript that still need to be loaded ...
+        if len(pendingChunks) > 0:
+            # ... remember them ...
+            self.pendingChunks = pendingChunks
+            # ... take the time code list from the whole transcript, not just the part that's been loaded ...
+            self.timecodes = [int(match.group(2)) for match in TIMECODE_XML_REGEXP.finditer(self.TranscriptObj.text)]
+            # ... and start adding the chunks to the control
+            self.chunkLoadTimer.Start(CHUNKED_LOAD_INTERVAL)
+            # Note the number of chunks still to be loaded
+            self.loadMetrics['pendingChunks'] = len(pendingChunks)
+
+        # Note the total load time
+        self.loadMetrics['total'] = time.time() - loadStart
+
+        if DEBUG:
+            print "TranscriptEditor_RTC.load_transcript() load metrics:"
+            for key in ['load', 'hide', 'timecodes', 'total']:
+                if self.loadMetrics.has_key(key):
+                    print "  %-10s %8.3f sec" % (key, self.loadMetrics[key])
+            print "  %d time codes" % self.loadMetrics['timecodeCount']
+            if self.loadMetrics.has_key('pendingChunks'):
+                print "  %d chunks to load while idle" % self.loadMetrics['pendingChunks']
+            print
+
+    def OnChunkLoadTimer(self, event):
+        """ Add the next chunk of a long transcript to the control """
+        # If there are chunks left to load ...
+        if len(self.pendingChunks) > 0:
+            # ... add the next one
+            self.AppendXMLChunk(self.pendingChunks.pop(0))
+        # If there are no chunks left to load ...
+        if len(self.pendingChunks) == 0:
+            # ... we don't need the timer any more
+            self.chunkLoadTimer.Stop()
+
+    def AppendXMLChunk(self, xmlText):
+        """ Add a chunk of XML, created by SplitXMLIntoChunks(), to the end of the control """
+        # Remember the current selection and the modified status, neither of which should change
+        (selStart, selEnd) = self.GetSelection()
+        isModified = self.IsModified()
+        # Remember whether the control is read-only, then make it editable so we can add the chunk
+        isReadOnly = self.get_read_only()
+        self.SetReadOnly(False)
+        # Create a buffer for the chunk
+        buf = richtext.RichTextBuffer()
+        # Start exception handling
+        try:
+            # We need to setup a StringIO object to emulate a file
+            stream = cStringIO.StringIO(xmlText)
+            # Create an XML Handler
+            handler = richtext.RichTextXMLHandler()
+            # Load the chunk into the buffer
+            handler.LoadStream(buf, stream)
+        # exception handling
+        except:
+            print "TranscriptEditor_RTC.AppendXMLChunk():  XML Handler Load failed"
+            print sys.exc_info()[0], sys.exc_info()[1]
+            print
+        # Prevent screen updates and Undo tracking while adding the chunk
+        self.Freeze()
+        self.BeginSuppressUndo()
+        # Start a new paragraph at the end of the document so the chunk's first paragraph isn't merged into the
+        # last paragraph already loaded ...
+        self.GetBuffer().InsertNewlineWithUndo(self.GetLastPosition(), self)
+        # ... and add the chunk's paragraphs
+        self.GetBuffer().InsertParagraphsWithUndo(self.GetLastPosition(), buf, self)
+        # Allow Undo tracking and screen updates again
+        self.EndSuppressUndo()
+        self.Thaw()
+        # Restore the read-only status, the selection, and the modified status
+        self.SetReadOnly(isReadOnly)
+        self.SetSelection(selStart, selEnd)
+        if not isModified:
+            self.DiscardEdits()
+
+    def FinishChunkedLoad(self):
+        """ Add any chunks of a long transcript that haven't been loaded yet to the control, so the whole
+            transcript is available.  This is needed before the transcript is edited, searched, or saved. """
+        # If there are chunks left to load ...
+        if len(self.pendingChunks) > 0:
+            # Stop the chunk load timer
+            self.chunkLoadTimer.Stop()
+            # Set the Wait cursor
+            self.SetCursor(wx.StockCursor(wx.CURSOR_WAIT))
+            # While there are chunks left to load ...
+            while len(self.pendingChunks) > 0:
+                # ... add the next one
+                self.AppendXMLChunk(self.pendingChunks.pop(0))
+            # Restore the normal cursor
+            self.SetCursor(wx.StockCursor(wx.CURSOR_ARROW))
+
+    def GetFormattedSelection(self, format, selectionOnly=False, stripTimeCodes=False):
+        """ Return a string with the formatted contents of the control, or just the current selection if specified.
+            The whole transcript is loaded first if needed, so that printing and exporting don't miss the end of it. """
+        # If we want the whole transcript, make sure all of a long transcript has been loaded
+        if not selectionOnly:
+            self.FinishChunkedLoad()
+        # Get the formatted contents from the RichTextEditCtrl
+        return RichTextEditCtrl.GetFormattedSelection(self, format, selectionOnly=selectionOnly, stripTimeCodes=stripTimeCodes)
+
     def UpdateCurrentContents(self, action):
         """ This method maintains a LIMITED load of data in the editor control, rather than having all
             the data present all the time. In wxPython 2.9.4.0 and 3.0.0.0, the wxRichTextCtrl becomes
@@ -544,66 +751,57 @@ class TranscriptEditor(RichTextEditCtrl):
             #        be adequate.  Transcript that might have time codes AND images will have the time codes already
             #        formatted correctly, so if some time codes get skipped below, it doesn't matter.
             
-            # Start at the beginning of the text
-            pos = 0
-            # Run to the end of the text
+            # Scan the document text ONCE to find all the time codes and their data
+            spans = [(match.start(), match.end()) for match in TIMECODE_DATA_REGEXP.finditer(self.GetValue())]
+            # If there are no time codes, there's nothing to do
+            if len(spans) == 0:
+                return
+            # Note the end of the document
             endPos = self.GetTextLength()
-            # Find the first time code character
-            nextTC = self.FindText(pos, endPos, TIMECODE_CHAR)
-            # As long as there are additional time codes to find ...
-            while nextTC > -1:
-                # Find the END of the time code we just found
-                endTC = self.FindText(nextTC, endPos, '>')
-                # Select the time code character itself
-                self.SetSelection(nextTC + 1, endTC + 1)
-
-                # NOTE:  That doesn't work quite right for transcripts exported to RTF from Transana 2.50.  We
-                #        need an additional correction here!  Otherwise, every other time-coded segment is hidden!
-                #
-                # Get the TEXT of the current selection
-                tmp = self.GetStringSelection()
-                # If there is a ">" character BEFORE THE END of the text ...
-                if len(tmp) > tmp.find('>') + 1:
-                    # ... then we need to CORRECT the END TIME CODE position marker.
-                    endTC = nextTC + tmp.find('>') + 1
-
-                # Format the Time Code using the Time Code style
-                self.SetStyle(richtext.RichTextRange(nextTC, nextTC + 1), self.txtTimeCodeAttr)
-                # Format the Time Code data using the Hidden style
-                self.SetStyle(richtext.RichTextRange(nextTC + 1, endTC + 1), self.txtHiddenAttr)
-                # Find the next time code, if there is one
-                nextTC = self.FindText(endTC, endPos, TIMECODE_CHAR)
+            # Positions in the control's text can be slightly behind positions in the control if there are images.
+            # Initialize the correction needed to convert text positions to control positions.
+            offset = 0
+            # Freeze the control and group all the formatting into a single Undo action
+            self.Freeze()
+            self.BeginBatchUndo('HideTimeCodeData')
+            # Make sure the control is thawed and the Undo group ended even if formatting fails
+            try:
+                # For each time code ...
+                for (startTC, endTC) in spans:
+                    # ... if the control doesn't have the time code character where we expect it, adjust for images
+                    while (startTC + offset < endPos) and (self.GetRange(startTC + offset, startTC + offset + 1) != TIMECODE_CHAR):
+                        offset += 1
+                    # If we can't find the time code in the control, we can't format the rest
+                    if startTC + offset >= endPos:
+                        break
+                    # Format the Time Code using the Time Code style
+                    self.SetStyle(richtext.RichTextRange(startTC + offset, startTC + offset + 1), self.txtTimeCodeAttr)
+                    # Format the Time Code data using the Hidden style
+                    self.SetStyle(richtext.RichTextRange(startTC + offset + 1, endTC + offset), self.txtHiddenAttr)
+            finally:
+                # End the Undo group and thaw the control
+                self.EndBatchUndo()
+                self.Thaw()
 
     def load_timecodes(self):
         """Scan the document for timecodes and add to internal list."""
-        # Clear the existing time codes list
-        self.timecodes = []
-        # Get the text to scan
-        txt = self.GetText()
-        # Define the string to search for
-        findstr = TIMECODE_CHAR + "<"
-        # Locate the time code using string.find()
-        i = txt.find(findstr, 0)
-        # As long as there are more time codes to find ...
-        while i >= 0:
-            # ... find the END of the time code data, i.e. the next ">" character
-            endi = txt.find(">", i)
-            # Extract the Time Code Data
-            timestr = txt[i+2:endi]
-            # Trap exceptions
-            try:
-                # Conver the time code data to an integer and add it to the TimeCodes list
-                self.timecodes.append(int(timestr))
-            # If an exception arises (because of inability to convert the time code) ...
-            except:
-                # ... then just ignore that time code.  It's probably defective.
-                pass
-            # Look for the next time code.  Result will be -1 if NOT FOUND
-            i = txt.find(findstr, i+1)
-
-    def save_transcript(self, continueEditing=True, use_transactions=True, showPopup=True):
+        # The Time Code Index needs to be rebuilt
+        self.InvalidateTimeCodeIndex()
+        # Rebuilding the index scans the text for time codes once, using a regular expression.  Time codes
+        # with defective data (that isn't a number) are ignored.
+        self.BuildTimeCodeIndex()
+        # The time codes list holds the time codes in document order, so sort the index entries by position
+        self.timecodes = [timeVal for (pos, timeVal) in sorted([(entry[1], entry[0]) for entry in self.timecodeIndex])]
+
+    def save_transcript(self, continueEditing=True, use_transactions=True, showPopup=True, skipIfUnchanged=False):
         """ Save the transcript to the database.
-            continueEditing is used for Partial Transcript Editing only. """
+            continueEditing is used for Partial Transcript Editing only.
+            If skipIfUnchanged is True, the database write is skipped if the transcript contents are the same as when
+            they were last saved.  Returns True if the transcript was written to the database. """
+        # Note whether the transcript gets written to the database
+        saved = False
+        # Make sure all of a long transcript has been loaded before we save it!
+        self.FinishChunkedLoad()
         # Too many popups can crash the program (at least on Windows), so they're now optional.
         if showPopup:
             # Create a popup telling the user about the save (needed for large files)
@@ -641,8 +839,16 @@ class TranscriptEditor(RichTextEditCtrl):
 
                 # Specify the Document Length in Characters (for Documents)
                 self.TranscriptObj.document_length = self.GetLength()
-                # Write it to the database
-                self.TranscriptObj.db_save(use_transactions=use_transactions)
+                # Get a hash of the transcript contents
+                textHash = hashlib.md5(self.TranscriptObj.text).hexdigest()
+                # If we should save the transcript even if it's unchanged, or if it has changed since it was last saved ...
+                if not skipIfUnchanged or (textHash != self.savedTextHash):
+                    # Write it to the database
+                    self.TranscriptObj.db_save(use_transactions=use_transactions)
+                    # Remember the hash of what was saved
+                    self.savedTextHash = textHash
+                    # Note that the transcript was saved
+                    saved = True
         except TransanaExceptions.SaveError, e:
             raise
         except:
@@ -672,9 +878,13 @@ class TranscriptEditor(RichTextEditCtrl):
             if TransanaConstants.partialTranscriptEdit and continueEditing:
                 # If we have only part of the transcript in the editor, we need to restore the partial transcript state following save
                 self.UpdateCurrentContents('EnterEditMode')
+        # Let the calling routine know if the transcript was written to the database
+        return saved
 
     def export_transcript(self, fname):
         """Export the transcript to an RTF file."""
+        # Make sure all of a long transcript has been loaded
+        self.FinishChunkedLoad()
         # If Partial Transcript editing is enabled ...
         if TransanaConstants.partialTranscriptEdit:
             # If we have only part of the transcript in the editor, we need to restore the full transcript
@@ -1030,6 +1240,8 @@ class TranscriptEditor(RichTextEditCtrl):
 
     def find_text(self, txt, direction, flags=0):
         """Find text in document."""
+        # Make sure all of a long transcript has been loaded so we can search all of it
+        self.FinishChunkedLoad()
         # If we currently have the search text as the selection AND we're looking for the NEXT instance ...
         if (self.GetStringSelection().upper() == txt.upper()) and (direction == 'next'):
             # ... then the current insertion point should be one space beyond the current insertion point
@@ -1317,6 +1529,16 @@ class TranscriptEditor(RichTextEditCtrl):
 
         # Temporarily halt screen updates
         self.Freeze()
+
+        # Make sure the Time Code Index is up to date
+        self.BuildTimeCodeIndex()
+        # If part of a long transcript hasn't been loaded yet and we're looking past the time codes that have been loaded ...
+        if (len(self.pendingChunks) > 0) and \
+           ((len(self.timecodeIndexTimes) == 0) or (ms >= self.timecodeIndexTimes[-1])):
+            # ... load the rest of the transcript now ...
+            self.FinishChunkedLoad()
+            # ... and update the Time Code Index to include it
+            self.BuildTimeCodeIndex()
         
         # Find the timecodes that are on either side of what we want
         # Initialize "Before" to the start of the file
@@ -1324,37 +1546,31 @@ class TranscriptEditor(RichTextEditCtrl):
         # Initializae "After" to the end of the file (-1)
         tcAfter = -1
 
-        # Iterate through the time code list
-        for timecode in self.timecodes:
-
-            # If the entry in the time code list is less than the current media position ...
-            if timecode < ms:
-                # ... update the Before value
-                tcBefore = timecode
-            # If the entry in the time code list is greater than the current media position ...
-            else:
-                # ... then we can stop looking for our Before position and we should capture THIS as our After position
-                tcAfter = timecode
-                # We can stop iterating once we reach this point.
-                break
+        # Find the first entry in the Time Code Index that is NOT less than the current media position
+        i = bisect.bisect_left(self.timecodeIndexTimes, ms)
 
         # If the current position is before the first time code ...
-        if tcBefore == -1:
+        if i == 0:
             # ... start at the first position in the RichTextCtrl
             start = 0
         # Otherwise ...
         else:
-            # ... let's get the character position of the Before time code
-            start = self.FindText(0, self.GetTextLength(), "%s<%d>" % (TIMECODE_CHAR, tcBefore))
+            # ... the Before time code is the one just before that
+            tcBefore = self.timecodeIndexTimes[i - 1]
+            # ... let's get the character position of the Before time code.  If the same time code appears more
+            #     than once, we want the first one.
+            start = self.GetTimeCodePosition(bisect.bisect_left(self.timecodeIndexTimes, tcBefore))
 
         # If the current position is after the last time code ...
-        if tcAfter == -1:
+        if i == len(self.timecodeIndexTimes):
             # ... end at the last position in the RichTextCtrl
             end = self.GetTextLength()
         # Otherwise ...
         else:
+            # ... the After time code is the one we found
+            tcAfter = self.timecodeIndexTimes[i]
             # ... let's get the character position of the After time code
-            end = self.FindText(0, self.GetTextLength(), "%s<%d>" % (TIMECODE_CHAR, tcAfter))
+            end = self.GetTimeCodePosition(i)
 
         # Let's get the current selection position
         pos = self.GetSelection()
@@ -1387,6 +1603,49 @@ class TranscriptEditor(RichTextEditCtrl):
             # ... return False to indicate that we have not moved anything
             return False
         
+    def InvalidateTimeCodeIndex(self):
+        """ Signal that the Time Code Index needs to be rebuilt before it is used again """
+        self.timecodeIndexLength = -1
+
+    def BuildTimeCodeIndex(self):
+        """ Build the Time Code Index, a list of (time, character position, length) for each time code in the document,
+            sorted by time, if it is not already up to date.  This lets us find time code positions without searching
+            through the whole document. """
+        # If the Time Code Index is up to date, we don't need to do anything
+        if self.timecodeIndexLength == self.GetLastPosition():
+            return
+        # Clear the Time Code Index
+        self.timecodeIndex = []
+        # Scan the document text for time codes.  For each time code found ...
+        for match in TIMECODE_VALUE_REGEXP.finditer(self.GetValue()):
+            # ... add its time, position, and length to the index
+            self.timecodeIndex.append((int(match.group(1)), match.start(), match.end() - match.start()))
+        # Sort the index by time.  (Time codes with the same time stay in document order.)
+        self.timecodeIndex.sort()
+        # Build the list of times that can be searched with bisect
+        self.timecodeIndexTimes = [entry[0] for entry in self.timecodeIndex]
+        # Note the document length the Time Code Index was built for
+        self.timecodeIndexLength = self.GetLastPosition()
+
+    def GetTimeCodePosition(self, indexPos):
+        """ Return the character position in the control of the time code in position indexPos of the Time Code Index """
+        # Get the time code's information from the Time Code Index
+        (timeVal, pos, length) = self.timecodeIndex[indexPos]
+        # Build the time code's text
+        text = "%s<%d>" % (TIMECODE_CHAR, timeVal)
+        # The Time Code Index holds the position of the time code in the control's TEXT, which is not quite the
+        # position in the control if there are images earlier in the document.  If the control doesn't have our
+        # time code at this position ...
+        if self.GetRange(pos, pos + length) != text:
+            # ... find the TRUE position, starting from the text position, which is never past the true position
+            pos = self.FindText(pos, self.GetTextLength(), text)
+            # If the time code was found ...
+            if pos > -1:
+                # ... update the Time Code Index so we don't have to search next time
+                self.timecodeIndex[indexPos] = (timeVal, pos, length)
+        # Return the time code's position
+        return pos
+
     def cursor_find(self, text):
         """Move the cursor to the next occurrence of given text in the
         transcript (for word tracking)."""
@@ -1539,6 +1798,10 @@ class TranscriptEditor(RichTextEditCtrl):
     def set_read_only(self, state=True):
         """Enable or disable read-only mode, to prevent the transcript
         from being modified."""
+        # If we're entering Edit Mode ...
+        if not state:
+            # ... make sure all of a long transcript has been loaded before it is edited
+            self.FinishChunkedLoad()
         # Change the Read Only state in the RichTextEditCtrl
         self.SetReadOnly(state)
         # Reset the document length
@@ -1696,6 +1959,11 @@ class TranscriptEditor(RichTextEditCtrl):
         self.TranscriptObj = None
         # Clear the time code list
         self.timecodes = []
+        # The Time Code Index needs to be rebuilt
+        self.InvalidateTimeCodeIndex()
+        # Stop loading chunks of a long transcript, if we were
+        self.chunkLoadTimer.Stop()
+        self.pendingChunks = []
         # Clear the current time code pointer
         self.current_timecode = -1
         # Make the control read-only
@@ -1721,27 +1989,18 @@ class TranscriptEditor(RichTextEditCtrl):
             # ... then return 0 to signal to start at the beginning of the file
             return 0
 
-        # Start Exception Handling
-        try:
-            # Try to get the Index in the time codes list of the item BEFORE the current time code value (hence -1)
-            i = self.timecodes.index(tc) - 1
-            # If our index is 0 or higher ...
-            while i >= 0:
-                # If the Time Code List value is less than our original time code ...
-                if self.timecodes[i] < tc:
-                    # ... then return the value
-                    return self.timecodes[i]
-                # Otherwise, move a value earlier in the list and try again
-                i = i - 1
-            # If we exit the while loop without RETURN, then return 0 to signal to start at the beginning of the file
-            return 0
-        # If an exception is raised ...  (probably an index out of range call.)
-        except:
-            if DEBUG:
-                print sys.exc_info()[0]
-                print sys.exc_info()[1]
-            # ... return 0 to signal to start at the beginning of the file
-            return 0
+        # Make sure all of a long transcript has been loaded, so the current time code is in the Time Code Index
+        self.FinishChunkedLoad()
+        # Make sure the Time Code Index is up to date
+        self.BuildTimeCodeIndex()
+        # Find the position of the current time code value in the Time Code Index
+        i = bisect.bisect_left(self.timecodeIndexTimes, tc)
+        # If the current time code is in the index and isn't the first one ...
+        if (i > 0) and (i < len(self.timecodeIndexTimes)) and (self.timecodeIndexTimes[i] == tc):
+            # ... return the time code value before it
+            return self.timecodeIndexTimes[i - 1]
+        # Otherwise, return 0 to signal to start at the beginning of the file
+        return 0
 
     def NextTimeCode(self, tc=None):
         """Return the timecode immediately after the current one."""
@@ -1756,32 +2015,22 @@ class TranscriptEditor(RichTextEditCtrl):
                 # ... then return the FIRST value in the list.
                 return self.timecodes[0]
 
-        # Start Exception Handling
-        try:
-            # Try to get the Index in the time codes list of the item AFTER the current time code value (hence +1)
-            i = self.timecodes.index(tc) + 1
-            # If our index is less than the highest value ...
-            while i < len(self.timecodes):
-                # If the Time Code List value is greater than our original time code ...
-                if self.timecodes[i] > tc:
-                    # ... then return the value
-                    return self.timecodes[i]
-                # Otherwise, move a value later in the list and try again
-                i = i + 1
-            # If we get here, we got to the end of the list.  Just return the list's highest value
-            return self.timecodes[-1]
-        # If an exception is rasied ...  (probably an index out of range call.)
-        except:
-            if DEBUG:
-                print sys.exc_info()[0]
-                print sys.exc_info()[1]
-            # If there are time codes in the time codes list ...
-            if len(self.timecodes) > 0:
-                # ... return the highest value in the list
-                return self.timecodes[-1]
-            else:
-                # ... return -1 to signal failure
-                return -1
+        # Make sure all of a long transcript has been loaded, so the next time code is in the Time Code Index
+        self.FinishChunkedLoad()
+        # Make sure the Time Code Index is up to date
+        self.BuildTimeCodeIndex()
+        # If there are no time codes in the Time Code Index ...
+        if len(self.timecodeIndexTimes) == 0:
+            # ... return -1 to signal failure
+            return -1
+        # Find the position AFTER the current time code value in the Time Code Index
+        i = bisect.bisect_right(self.timecodeIndexTimes, tc)
+        # If the current time code is in the index and isn't the last one ...
+        if (i > 0) and (i < len(self.timecodeIndexTimes)) and (self.timecodeIndexTimes[i - 1] == tc):
+            # ... return the time code value after it
+            return self.timecodeIndexTimes[i]
+        # Otherwise, just return the highest value in the index
+        return self.timecodeIndexTimes[-1]
 
     def OnKeyDown(self, event):
         """ Called when a key is pressed down.  All characters are upper case.  """
@@ -2052,6 +2301,8 @@ class TranscriptEditor(RichTextEditCtrl):
 
     def OnContentChanged(self, event):
         """ Handle changes to the current Document """
+        # Any change to the content moves time code positions, so the Time Code Index needs to be rebuilt
+        self.InvalidateTimeCodeIndex()
 
         # Only call it if we're editing a Document and we're in Edit mode
         if not self.gettingFormattedSelection and isinstance(self.TranscriptObj, Document.Document) and not self.get_read_only():
@@ -2174,6 +2425,12 @@ class TranscriptEditor(RichTextEditCtrl):
 
     def OnAutoSave(self, event):
         """ Process the AutoSave Timer Event """
+        # If the transcript hasn't been edited since it was last saved ...
+        if not self.modified():
+            # ... there's nothing to save, so we don't need to interrupt the user at all
+            return
+        # Note the start time so we can report how long the Auto-Save took
+        saveStart = time.time()
         # Determine what control HAS focus
         focusCtrl = self.FindFocus()
         # If the media is playing ...
@@ -2193,11 +2450,12 @@ class TranscriptEditor(RichTextEditCtrl):
         lbl = self.parent.GetLabel()
         # Replace the label to indicate we are auto-saving
         self.parent.SetLabel(_("Auto-saving ..."))
-        # Save the transcript
+        # Save the transcript, skipping the database write if the contents haven't actually changed
+        # (for example, if an edit was undone)
         if TransanaConstants.partialTranscriptEdit:
-            self.save_transcript(continueEditing=True)
+            saved = self.save_transcript(continueEditing=True, showPopup=False, skipIfUnchanged=True)
         else:
-            self.save_transcript()
+            saved = self.save_transcript(showPopup=False, skipIfUnchanged=True)
         # Restore the window label to its original value
         self.parent.SetLabel(lbl)
         # Okay, we're done
@@ -2208,6 +2466,15 @@ class TranscriptEditor(RichTextEditCtrl):
             # ... tell it to play again!
             self.parent.ControlObject.Play()
 
+        # If we are in a Transcript Window, which HAS a toolbar ...
+        if isinstance(self.parent, TranscriptionUI_RTC._TranscriptPanel):
+            # ... report the Auto-Save result and latency on the toolbar
+            if saved:
+                prompt = unicode(_("Auto-saved in %0.2f seconds"), 'utf8') % (time.time() - saveStart)
+            else:
+                prompt = unicode(_("Auto-save:  no changes"), 'utf8')
+            self.parent.UpdateSelectionText(prompt)
+
         # A few users, mostly on OS X, are experiencing program crashes following Auto-Save.  I have not been able to
         # recreate this problem, despite trying on a large number of computers and with varied data.  This is an
         # attempt to solve that problem blind based on other crashes I've debugged lately.
@@ -2789,51 +3056,41 @@ class TranscriptEditor(RichTextEditCtrl):
         # Signal the calling routine whether the user entered a legal value
         return ((result == wx.ID_OK) and (adjustValue > 0))
     
-    def AdjustIndexes(self, adjustmentAmount):
-        """ Adjust Transcript Time Codes by the specified amount """
+    def AdjustIndexes(self, adjustmentAmount, startTime=None, endTime=None):
+        """ Adjust Transcript Time Codes by the specified amount (in seconds).  If startTime and / or endTime
+            (in milliseconds) are specified, only time codes from startTime up to (but not including) endTime are
+            adjusted.  Adjusted time codes are never moved before 0. """
+        # If not in Edit Mode ...
+        if not self.IsEditable():
+            # ... don't edit this!
+            return
         # Let's try to remember the cursor position
         self.SaveCursor()
-        
-        # Move the cursor to the beginning of the document
-        self.GotoPos(0)
-
-        # Let's remember the self.codes_vis setting, as show_all_hidden() changes it.
-        codes_vis = self.codes_vis
-        # Let's show all the hidden text of the time codes.  This doesn't work without it!
-        self.show_all_hidden()
-
-        # Let's find each time code mark and update it.  This will be easier if we use the
-        # POSITION rather than the VALUE of the "timecodes" list, as we need to change that
-        # list as we go too!
-        for loop in range(0, len(self.timecodes)):
-            # Find the time code
-            self.cursor_find("%s<%d>" % (TIMECODE_CHAR, self.timecodes[loop]))
-            # Remember the starting position, adjusted for the width of the Time Code Character
-            start = self.GetCurrentPos() - len(TIMECODE_CHAR)
-            # We need to determine the end position the hard way.  select_find() was giving the wrong
-            # answer because of the CheckTimeCodesAtSelectionBoundaries() call.
-            # So start at the beginning of the time code ...
-            end = start
-            # ... and keep moving until we find the first ">" character, which closes the time code.
-            while self.GetCharAt(end - 1) != ord('>'):
-                end += 1
-
-            # Now select the smaller selection, which should just be the Time Code Data
-            self.SetSelection(start, end)
-
-            # Finally, replace the old time code data with the new time code data.
-            # First delete the old data
-            self.DeleteSelection()
-            # Then insert the new data as hidden text (which is why we can't just plug it in above.)
-            self.InsertTimeCode(self.timecodes[loop] + int(adjustmentAmount* 1000))
-            # Adjust the local list of Transcript time codes too!
-            self.timecodes[loop] = self.timecodes[loop] + int(adjustmentAmount * 1000)
-       
-
-        # We better hide all the hidden text for the time codes again
-        self.hide_all_hidden()
-        # We also need to reset self.codes_vis, which was incorrectly changed by hide_all_hidden()
-        self.codes_vis = codes_vis
+        # Convert the adjustment to milliseconds
+        adjustment = int(adjustmentAmount * 1000)
+
+        def ShiftTimeCode(match):
+            """ Return the XML for a time code found by TIMECODE_XML_REGEXP, with its value adjusted """
+            # Get the time code value
+            timeVal = int(match.group(2))
+            # If the time code is in the range to be adjusted ...
+            if ((startTime is None) or (timeVal >= startTime)) and ((endTime is None) or (timeVal < endTime)):
+                # ... adjust it, but don't let it go negative
+                timeVal = max(timeVal + adjustment, 0)
+            # Return the time code with the new value
+            return '%s%d%s' % (match.group(1), timeVal, match.group(3))
+
+        # Rather than finding and replacing each time code in the control, which is very slow for long transcripts
+        # and creates a huge Undo history, let's get the XML for the whole document ...
+        xmlText = self.GetFormattedSelection('XML')
+        # ... adjust all the time codes in it in a single pass ...
+        xmlText = TIMECODE_XML_REGEXP.sub(ShiftTimeCode, xmlText)
+        # ... and reload the control ONCE.  (We don't clear the document, as that would clear the Transcript Object!)
+        self.LoadXMLData(xmlText, clearDoc=False)
+        # Signal that the transcript has changed
+        self.MarkDirty()
+        # Update the local list of Transcript time codes too!
+        self.load_timecodes()
             
         # Okay, this might not work because of changes we've made to the transcript, but let's
         # try restoring the Cursor Position when all is said and done.
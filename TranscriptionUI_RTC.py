@@ -773,8 +773,8 @@ class TranscriptionUI(wx.Frame):
             # ... then signal the Editor to insert an image
             self.dlg.editor.InsertImage(fileName, snapshotNum)
 
-    def AdjustIndexes(self, adjustmentAmount):
-        """ Adjust Transcript Time Codes by the specified amount """
+    def AdjustIndexes(self, adjustmentAmount, startTime=None, endTime=None):
+        """ Adjust Transcript Time Codes by the specified amount, optionally only from startTime to endTime """
         # Check to see if Human Readable Time Code Values are displayed
         tcHRValues = self.dlg.editor.timeCodeDataVisible
         # If Human Readable Time Code Values are visible ...
@@ -789,7 +789,7 @@ class TranscriptionUI(wx.Frame):
             # ... then we call the button's method as if it really had been pushed.
             self.dlg.toolbar.OnReadOnlySelect(None)
         # Now adjust the indexes
-        self.dlg.editor.AdjustIndexes(adjustmentAmount)
+        self.dlg.editor.AdjustIndexes(adjustmentAmount, startTime, endTime)
         # If Human Readable Time Code Values were visible ...
         if tcHRValues:
             # ... show them again!
@@ -60,6 +60,8 @@ import TransanaGlobal
 import TransanaImages
 # Import Transana's Waveform Creation routines
 import WaveformGraphic
+# import Transana's Waveform Cache
+import WaveformCache
 # Import Transana's Waveform Creation Progress Dialog, used in Wave Extraction Callback function
 import WaveformProgress
 
@@ -1332,14 +1334,12 @@ class VisualizationWindow(wx.Dialog):
                 os.makedirs(TransanaGlobal.configData.visualizationPath)
             # Initialize a result for the Waveform prompt
             result = wx.ID_NO
+            # Note whether any audio extraction has been done
+            audioExtracted = False
             # Let's do audio extraction of all the files first
             for filenameItem in filenameList:
-                # Separate path and filename
-                (path, filename) = os.path.split(filenameItem['filename'])
-                # break filename into root filename and extension
-                (filenameroot, extension) = os.path.splitext(filename)
-                # Build the correct filename for the Wave File
-                waveFilename = os.path.join(TransanaGlobal.configData.visualizationPath, filenameroot + '.wav')
+                # Get the Waveform Cache filename for the Wave File, which is based on the media file's contents
+                waveFilename = WaveformCache.GetWaveFilename(filenameItem['filename'])
                 # Add information to the Waveform Filename list.  Offsets get adjusted for the largest negative value, so they are all 0 or higher!
                 self.waveFilename.append({'filename' : waveFilename, 'offset' : filenameItem['offset'] + abs(minVal), 'length' : filenameItem['length']})
                 # Create a Wave File if none exists!
@@ -1394,6 +1394,8 @@ class VisualizationWindow(wx.Dialog):
                             errorLog = self.progressDialog.GetErrorMessages()
                             # Okay, we're done with the Progress Dialog here!
                             self.progressDialog.Destroy()
+                            # Note that audio extraction has been done
+                            audioExtracted = True
                             # If the user cancelled the audio extraction ...
                             if (len(errorLog) == 1) and (errorLog[0] == 'Cancelled'):
                                 # ... signal that the WAV file was NOT created!
@@ -1449,6 +1451,10 @@ class VisualizationWindow(wx.Dialog):
                     else:
                         # User declined to create the WAV file now
                         dllvalue = 1  # Signal that the WAV file was NOT created!
+            # If we've added to the Waveform Cache ...
+            if audioExtracted:
+                # ... remove old cache files if the cache has grown too large, keeping the files we're using now
+                WaveformCache.Evict(keep=[item['filename'] for item in self.waveFilename])
         except:
             if DEBUG:
                 import traceback
@@ -1851,11 +1857,13 @@ class VisualizationWindow(wx.Dialog):
             # ... just draw the new current position on the waveform
             self.waveform.DrawCursor(pos)
 
-        # Force a redraw at least every half second while the video is playing.  (Mostly for slow Macs and when running multi-transcript video)
+        # Make sure pending redraws happen at least every half second while the video is playing.  (Mostly for slow Macs and
+        # when running multi-transcript video)
         if (self.ControlObject.IsPlaying()) and (time.time() - self.lastRedrawTime > 0.5):
-            self.waveform.reInitBuffer = True
-            # The video was getting very jumpy when the keyword or hybrid visualization is too complex with updates every
-            # 0.2 seconds.  Removing the OnIdle line solves that, but then we don't get ANY forced visualization cursor updates.
+            # The video was getting very jumpy when the keyword or hybrid visualization is too complex and the whole
+            # visualization was redrawn every half second.  DrawCursor() now moves the cursor by redrawing only the columns
+            # it covers, so we only need to redraw everything if something other than the cursor has changed.
+            # (OnIdle() only redraws if reInitBuffer has been set.)
             self.waveform.OnIdle(None)
 
             # While we're at it, let's see if we need to Yield().  This makes the app MUCH more responsive on slow systems. 
@@ -0,0 +1,329 @@
+# Copyright (C) 2002-2016 Spurgeon Woods LLC
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of version 2 of the GNU General Public License as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+""" This module manages the Waveform Cache, the extracted audio files in the Waveforms (visualization) directory.
+
+    Cache files are named for a fingerprint of the CONTENT of the media file rather than for the media file's name,
+    so media files with the same name in different folders no longer collide, and renamed or copied media files
+    don't need to go through audio extraction again.  A manifest file in the Waveforms directory remembers the
+    fingerprint of each media file path (so we don't have to re-read media files that haven't changed) and when
+    each cache file was last used, so the least recently used cache files can be removed when the cache grows
+    larger than the size set in the configuration.
+
+    Wave files extracted by earlier versions of Transana are named for the media file.  They are adopted into the
+    cache, renamed for the fingerprint, the first time their media file is looked up, and any that are never looked
+    up are managed by the size limit like other cache files. """
+
+__author__ = 'David Woods <dwoods@wcer.wisc.edu>'
+
+DEBUG = False
+if DEBUG:
+    print "WaveformCache DEBUG is ON!!"
+
+# import Transana's Globals
+import TransanaGlobal
+# import Python's hashlib module
+import hashlib
+# import Python's os module
+import os
+# import Python's pickle module
+import pickle
+# import Python's time module
+import time
+
+# The name of the Waveform Cache manifest file
+MANIFEST_FILENAME = 'WaveformCache.pkl'
+# The version of the manifest data structure
+MANIFEST_VERSION = 1
+# The number of blocks sampled from a media file to create its fingerprint
+FINGERPRINT_BLOCKS = 16
+# The size of each sampled block
+FINGERPRINT_BLOCKSIZE = 65536
+# The number of seconds between updates to a cache entry's last used time.  The manifest doesn't need to be saved
+# every time a cache file is used to keep track of which files have been used least recently.
+LAST_USED_RESOLUTION = 3600
+
+# The manifest most recently loaded or saved, and the (path, modification time) of the manifest file at that time
+_manifest = None
+_manifestStamp = None
+
+
+def GetFingerprint(mediaFile):
+    """ Return a fingerprint of the contents of a media file, based on the file's size and an MD5 hash of
+        evenly-spaced sample blocks from the file, including the first and last blocks.  This is fast even for
+        very large files, but different enough to tell media files apart. """
+    # Get the size of the media file
+    fileSize = os.path.getsize(mediaFile)
+    # Start the hash with the file size
+    fileHash = hashlib.md5(str(fileSize))
+    # Open the media file for binary reading
+    f = open(mediaFile, 'rb')
+    try:
+        # If the file is small enough, we just hash the whole thing
+        if fileSize <= FINGERPRINT_BLOCKS * FINGERPRINT_BLOCKSIZE:
+            fileHash.update(f.read())
+        # Otherwise ...
+        else:
+            # ... determine the distance between sample blocks
+            step = (fileSize - FINGERPRINT_BLOCKSIZE) / (FINGERPRINT_BLOCKS - 1)
+            # For each sample block ...
+            for block in range(FINGERPRINT_BLOCKS):
+                # ... move to the start of the block ...
+                f.seek(block * step)
+                # ... and add it to the hash
+                fileHash.update(f.read(FINGERPRINT_BLOCKSIZE))
+    finally:
+        # Close the media file
+        f.close()
+    # The fingerprint is the file size (in hex) and the hash
+    return '%x_%s' % (fileSize, fileHash.hexdigest())
+
+def GetManifestStamp():
+    """ Return the path and modification time of the manifest file, which tell us if the manifest we already have
+        is still current """
+    # Get the manifest file name
+    manifestFile = os.path.join(TransanaGlobal.configData.visualizationPath, MANIFEST_FILENAME)
+    # Start exception handling
+    try:
+        # Return the path and modification time
+        return (manifestFile, os.path.getmtime(manifestFile))
+    # If there's no manifest file ...
+    except OSError:
+        # ... it has no modification time
+        return (manifestFile, None)
+
+def LoadManifest():
+    """ Load the Waveform Cache manifest from the Waveforms directory """
+    global _manifest, _manifestStamp
+    # If we have already loaded the manifest and no one has changed it since ...
+    if (_manifest is not None) and (_manifestStamp == GetManifestStamp()):
+        # ... there's no need to read it again
+        return _manifest
+    # Start exception handling
+    try:
+        # Open the manifest file
+        f = open(os.path.join(TransanaGlobal.configData.visualizationPath, MANIFEST_FILENAME), 'rb')
+        # Load the manifest
+        manifest = pickle.load(f)
+        # Close the manifest file
+        f.close()
+        # If the manifest is from a different version ...
+        if manifest.get('version', 0) != MANIFEST_VERSION:
+            # ... then we can't use it
+            manifest = None
+    # If there's no manifest, or it can't be read ...
+    except:
+        # ... then we start over
+        manifest = None
+    # If we don't have a usable manifest ...
+    if manifest is None:
+        # ... create an empty one.  'paths' maps media file paths to (size, modification time, fingerprint),
+        #     and 'entries' maps fingerprints to the time the cache files were last used.
+        manifest = {'version' : MANIFEST_VERSION,
+                    'paths' : {},
+                    'entries' : {}}
+    # Remember the manifest, so we don't have to read it again if it doesn't change
+    _manifest = manifest
+    _manifestStamp = GetManifestStamp()
+    return manifest
+
+def SaveManifest(manifest):
+    """ Save the Waveform Cache manifest to the Waveforms directory """
+    global _manifest, _manifestStamp
+    # Start exception handling
+    try:
+        # Open the manifest file
+        f = open(os.path.join(TransanaGlobal.configData.visualizationPath, MANIFEST_FILENAME), 'wb')
+        # Save the manifest
+        pickle.dump(manifest, f)
+        # Close the manifest file
+        f.close()
+        # Remember the manifest, so we don't have to read it again if it doesn't change
+        _manifest = manifest
+        _manifestStamp = GetManifestStamp()
+    # If the manifest can't be saved ...
+    except:
+
+        if DEBUG:
+            import sys
+            print "WaveformCache.SaveManifest():", sys.exc_info()[0], sys.exc_info()[1]
+
+        # ... that's okay.  The cache will still work, we'll just have to fingerprint more files next time.
+        pass
+
+def GetCacheFilename(mediaFile, extension='.wav'):
+    """ Return the name of the Waveform Cache file for a media file.  The cache file may not exist yet.
+        extension allows other cache files (such as waveform peak data) to share the media file's fingerprint. """
+    # If the media file can't be found ...
+    if not os.path.exists(mediaFile):
+        # ... we can't fingerprint it, so fall back to a cache file named for the media file
+        (filenameroot, ext) = os.path.splitext(os.path.basename(mediaFile))
+        return os.path.join(TransanaGlobal.configData.visualizationPath, filenameroot + extension)
+    # Load the manifest
+    manifest = LoadManifest()
+    # Note whether the manifest has changed and needs to be saved
+    changed = False
+    # Get the media file's current size and modification time
+    fileStat = os.stat(mediaFile)
+    # See if we know about this media file already
+    pathInfo = manifest['paths'].get(mediaFile, None)
+    # If we know about the media file and it hasn't changed ...
+    if (pathInfo is not None) and (pathInfo[0] == fileStat.st_size) and (pathInfo[1] == fileStat.st_mtime):
+        # ... we can use the fingerprint we already know
+        fingerprint = pathInfo[2]
+    # If this media file is new or has changed ...
+    else:
+        # ... create its fingerprint ...
+        fingerprint = GetFingerprint(mediaFile)
+        # ... and remember it for next time
+        manifest['paths'][mediaFile] = (fileStat.st_size, fileStat.st_mtime, fingerprint)
+        changed = True
+    # Build the cache file name
+    cacheFilename = os.path.join(TransanaGlobal.configData.visualizationPath, fingerprint + extension)
+    # If there's no cache file yet, there may be one named for the media file by an earlier version of Transana
+    if not os.path.exists(cacheFilename):
+        (filenameroot, ext) = os.path.splitext(os.path.basename(mediaFile))
+        legacyFilename = os.path.join(TransanaGlobal.configData.visualizationPath, filenameroot + extension)
+        # If there is one, and it was created after the media file was last changed, adopt it into the cache
+        # by renaming it for the fingerprint
+        if os.path.exists(legacyFilename) and (os.path.getmtime(legacyFilename) >= fileStat.st_mtime):
+            # Start exception handling
+            try:
+                # Rename the old file
+                os.rename(legacyFilename, cacheFilename)
+                # If Evict() added the old file to the manifest under its old name, that entry is gone now
+                if manifest['entries'].has_key(filenameroot):
+                    del(manifest['entries'][filenameroot])
+                changed = True
+            # If the old file can't be renamed (perhaps because it is in use), it can't be adopted
+            except OSError:
+
+                if DEBUG:
+                    import sys
+                    print "WaveformCache.GetCacheFilename():", sys.exc_info()[0], sys.exc_info()[1]
+
+    # Note that this cache entry has been used, if we haven't noted that recently
+    if time.time() - manifest['entries'].get(fingerprint, 0) > LAST_USED_RESOLUTION:
+        manifest['entries'][fingerprint] = time.time()
+        changed = True
+    # If the manifest has changed ...
+    if changed:
+        # ... save it
+        SaveManifest(manifest)
+    # Return the cache file name
+    return cacheFilename
+
+def GetWaveFilename(mediaFile):
+    """ Return the name of the extracted audio (WAV) file for a media file.  The file may not exist yet. """
+    return GetCacheFilename(mediaFile, '.wav')
+
+def GetCacheFiles():
+    """ Return a dictionary of the cache files in the Waveforms directory, as lists of full file names keyed by
+        the file name without its extension, which is the fingerprint for files in the Waveform Cache """
+    # Start exception handling
+    try:
+        # Get all the files in the Waveforms directory
+        fileList = os.listdir(TransanaGlobal.configData.visualizationPath)
+    # If the directory can't be read ...
+    except OSError:
+        # ... there are no files
+        return {}
+    # Group the files by name
+    cacheFiles = {}
+    for filename in fileList:
+        # The manifest isn't a cache file
+        if filename == MANIFEST_FILENAME:
+            continue
+        (filenameroot, extension) = os.path.splitext(filename)
+        if cacheFiles.has_key(filenameroot):
+            cacheFiles[filenameroot].append(os.path.join(TransanaGlobal.configData.visualizationPath, filename))
+        else:
+            cacheFiles[filenameroot] = [os.path.join(TransanaGlobal.configData.visualizationPath, filename)]
+    return cacheFiles
+
+def Evict(maxSize=None, keep=()):
+    """ Remove the least recently used cache files until the Waveform Cache is no larger than maxSize bytes.
+        If maxSize is not specified, the Waveform Cache Size configuration setting (in megabytes) is used.
+        A size of 0 means the cache size is unlimited.  Cache files named in keep are never removed. """
+    # If no maximum size is specified ...
+    if maxSize is None:
+        # ... use the configured size, converted from megabytes to bytes
+        maxSize = TransanaGlobal.configData.waveformCacheSize * 1024 * 1024
+    # An unlimited cache never needs eviction
+    if maxSize <= 0:
+        return
+    # Load the manifest
+    manifest = LoadManifest()
+    # Get all the files in the Waveforms directory
+    cacheFiles = GetCacheFiles()
+    # Wave files the manifest doesn't know about, such as those named for the media file by earlier versions of
+    # Transana, are added to the manifest as of the time they were created so that they don't stay forever
+    for (filenameroot, files) in cacheFiles.items():
+        if not manifest['entries'].has_key(filenameroot):
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() == '.wav':
+                    manifest['entries'][filenameroot] = os.path.getmtime(filename)
+                    break
+    # Create a list of (last used time, fingerprint, size, files) for all cache entries
+    entries = []
+    # Initialize the total cache size
+    totalSize = 0
+    # For each cache entry ...
+    for (fingerprint, lastUsed) in manifest['entries'].items():
+        # ... get the files for the entry ...
+        files = cacheFiles.get(fingerprint, [])
+        # ... determine their size ...
+        entrySize = 0
+        for filename in files:
+            entrySize += os.path.getsize(filename)
+        # ... add them to the total size ...
+        totalSize += entrySize
+        # ... and add the entry to the list
+        entries.append((lastUsed, fingerprint, entrySize, files))
+    # Sort the entries so the least recently used are first
+    entries.sort()
+    # Determine the fingerprints that must be kept
+    keepFingerprints = [os.path.splitext(os.path.basename(filename))[0] for filename in keep]
+    # While the cache is too big and there are entries left to consider ...
+    while (totalSize > maxSize) and (len(entries) > 0):
+        # ... get the least recently used entry
+        (lastUsed, fingerprint, entrySize, files) = entries.pop(0)
+        # Skip entries we've been asked to keep
+        if fingerprint in keepFingerprints:
+            continue
+        # Start exception handling
+        try:
+            # Delete the entry's files
+            for filename in files:
+                os.remove(filename)
+        # If a file can't be deleted (perhaps because it is in use) ...
+        except OSError:
+            # ... skip this entry
+            continue
+        # Remove the entry from the manifest
+        del(manifest['entries'][fingerprint])
+        # Remove any media file paths that point to the entry from the manifest
+        for (mediaFile, pathInfo) in manifest['paths'].items():
+            if pathInfo[2] == fingerprint:
+                del(manifest['paths'][mediaFile])
+        # Reduce the cache size by the entry's size
+        totalSize -= entrySize
+
+        if DEBUG:
+            print "WaveformCache.Evict():  removed", fingerprint, entrySize
+
+    # Save the manifest
+    SaveManifest(manifest)
@@ -51,8 +51,9 @@ class WaveformProgress(wx.Dialog):
         To use it this way, you create it, then call the Extract() method, which will show it modally and handle updating itself.
         Then Destroy() it. """
 
-    def __init__(self, parent, label='', clipStart=0, clipDuration=0, showModally=True):
-        """ Initialize the Progress Dialog """
+    def __init__(self, parent, label='', clipStart=0, clipDuration=0, showModally=True, completionCallback=None):
+        """ Initialize the Progress Dialog.  When allowing multiple threads, completionCallback, if supplied,
+            is called instead of the parent's OnConvertComplete() method when the process ends. """
 
         # There's a bug.  I think it's an interaction between OS X 10.7.5 and earlier (but not 10.8.4), wxPython (version
         # unknown, but I've seen it in 2.8.12.1, 2.9.4.0, and a pre-release build of 2.9.5.0), and the build process.
@@ -69,6 +70,8 @@ class WaveformProgress(wx.Dialog):
         self.parent = parent
         # Remember whether we're MODAL or ALLOWING MULTIPLE THREADS
         self.showModally = showModally
+        # Remember the method to call when a non-modal process is complete
+        self.completionCallback = completionCallback
         # Remember the start time and duration, if they are passed in.
         self.clipStart = clipStart
         self.clipDuration = clipDuration
@@ -77,6 +80,8 @@ class WaveformProgress(wx.Dialog):
         self.process = None
         # Initialize a list to collect error messages
         self.errorMessages = []
+        # Initialize the process's exit code, which isn't known until the process ends
+        self.exitCode = None
 
         # Encode the prompt
         prompt = unicode(_('Media File Conversion Progress'), 'utf8')
@@ -233,6 +238,11 @@ class WaveformProgress(wx.Dialog):
         # Return the error messages list
         return self.errorMessages
 
+    def GetExitCode(self):
+        """ Return the exit code of the completed process, or None if the process has not ended. """
+        # Return the exit code
+        return self.exitCode
+
     def Extract(self, inputFile, outputFile, mode='AudioExtraction'):
         """ Perform Audio Extraction, or Media Conversion with the new version. """
         # Remember the mode being used
@@ -335,6 +345,8 @@ class WaveformProgress(wx.Dialog):
         """ End of wx.Process event handler """
         # Stop the Progress Timer
         self.timer.Stop()
+        # Remember the process's exit code.  FFmpeg returns 0 only if it finished successfully.
+        self.exitCode = event.GetExitCode()
         # If the process exists ...
         if self.process is not None:
             # Get the Process Error Stream
@@ -362,8 +374,14 @@ class WaveformProgress(wx.Dialog):
             wx.YieldIfNeeded()
             # If we're allowing multiple threads ...
             if not self.showModally:
-                # ... inform the PARENT that this thread is complete for cleanup
-                self.parent.OnConvertComplete(self)
+                # If we were given a completion callback (such as a ConversionScheduler's) ...
+                if self.completionCallback is not None:
+                    # ... inform it that this thread is complete for cleanup
+                    self.completionCallback(self)
+                # Otherwise ...
+                else:
+                    # ... inform the PARENT that this thread is complete for cleanup
+                    self.parent.OnConvertComplete(self)
             # Close the Progress Dialog
             self.Close()
 